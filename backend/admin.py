@@ -33,6 +33,7 @@ from . import (
     retention_policy,
     security_assurance,
 )
+from .cache_service import cached_response, facility_tag, facility_write_tags, invalidate_tags
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
 ADMIN_FACILITY_ACCESS_DETAIL = "Admin resource is outside the user's facility"
@@ -308,22 +309,12 @@ def get_analytics_report(
 
 
 @router.get("/stats")
+@cached_response(ttl=3600, key_prefix="admin_stats", tags=lambda args: [facility_tag(args["admin"].facility_id)])
 def get_admin_stats(
     db: Session = Depends(database.get_db),
     admin: models.User = Depends(get_current_admin)
 ) -> Dict:
     """Get high-level system statistics."""
-    facility_id = admin.facility_id or "global"
-    cache_key = f"dashboard_statistics:{facility_id}"
-
-    from backend.cache_service import cache
-    try:
-        cached_stats = cache.get(cache_key)
-        if cached_stats is not None:
-            return cached_stats
-    except Exception as exc:
-        logger.debug("Cache fetch exception in get_dashboard_stats: %s", exc)
-
     user_query = _scope_users_to_admin_facility(db.query(models.User), admin)
     user_ids = [user_id for (user_id,) in user_query.with_entities(models.User.id).all()]
     prediction_query = db.query(models.HealthRecord)
@@ -340,12 +331,6 @@ def get_admin_stats(
         "database_status": "Connected",
         "database_type": "sqlite" if "sqlite" in database.SQLALCHEMY_DATABASE_URL else "postgresql"
     }
-
-    try:
-        cache.set(cache_key, stats, ttl=3600)
-    except Exception as exc:
-        logger.debug("Cache store exception in get_dashboard_stats: %s", exc)
-
     return stats
 
 @router.get("/audit-logs")
@@ -671,6 +656,7 @@ def execute_patient_deletion(
         result = privacy_operations.execute_patient_deletion(db, patient_id)
     except privacy_operations.PrivacyOperationNotFound:
         raise HTTPException(status_code=404, detail="Patient not found") from None
+    invalidate_tags(f"patient:{patient_id}", *facility_write_tags(patient_facility_id))
 
     audit.record_audit_event(
         db,
@@ -829,6 +815,7 @@ def update_user_role(
     previous_role = user.role
     user.role = role
     db.commit()
+    invalidate_tags(*facility_write_tags(user.facility_id))
     audit.record_audit_event(
         db,
         actor_user_id=admin.id,
@@ -864,6 +851,7 @@ def assign_user_facility(
     previous_facility_id = user.facility_id
     user.facility_id = facility.id
     db.commit()
+    invalidate_tags(*facility_write_tags(previous_facility_id), *facility_write_tags(facility.id))
     audit.record_audit_event(
         db,
         actor_user_id=admin.id,
@@ -899,6 +887,7 @@ def delete_user(
     user.is_deleted = True
     user.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_tags(f"patient:{deleted_user_id}", *facility_write_tags(deleted_user_facility_id))
     audit.record_audit_event(
         db,
         actor_user_id=admin.id,
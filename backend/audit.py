@@ -1,22 +1,62 @@
-"""PHI-safe audit logging utilities."""
+"""PHI-safe audit logging utilities.
+
+Audit events are sanitized on the caller's thread and, by default, handed to
+a background batch writer that persists them with one multi-row INSERT per
+batch and links every row into a SHA-256 hash chain. Actions listed in
+``DURABLE_AUDIT_ACTIONS`` (or calls with ``durable=True``) are written
+synchronously so the caller gets the committed row back.
+"""
 
 from __future__ import annotations
 
+import atexit
+import collections
 import json
 import logging
+import os
 import re
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Mapping, Optional
+from typing import Any, Deque, Dict, List, Mapping, Optional
 
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from . import models
+from .security_audit_verifier import audit_verifier
 
 logger = logging.getLogger(__name__)
 
 MAX_AUDIT_DETAIL_LENGTH = 1200
 REDACTED = "[redacted]"
 
+# "async" queues events for the batch writer; "sync" commits each event inline.
+AUDIT_WRITE_MODE = os.getenv("AUDIT_WRITE_MODE", "sync" if os.getenv("TESTING") else "async").strip().lower()
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "50"))
+AUDIT_QUEUE_MAXSIZE = int(os.getenv("AUDIT_QUEUE_MAXSIZE", "50000"))
+
+GENESIS_HASH = "0" * 64
+# Transaction-scoped Postgres advisory lock key serializing chain appends across workers
+AUDIT_CHAIN_LOCK_KEY = int(os.getenv("AUDIT_CHAIN_LOCK_KEY", "7318349394477056"))
+
+# Actions whose audit row must be committed before the request returns.
+DURABLE_AUDIT_ACTIONS = frozenset(
+    {
+        "DELETE_USER",
+        "EXECUTE_DATABASE_BACKUP",
+        "EXECUTE_PATIENT_DELETION",
+        "EXECUTE_RETENTION_CLEANUP",
+        "GRANT_INTEROPERABILITY_CONSENT",
+        "REVIEW_AI_PREDICTION",
+        "REVOKE_INTEROPERABILITY_CONSENT",
+        "UPDATE_USER_ROLE",
+    }
+)
+
 _EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 _DOB_RE = re.compile(r"\b(?:19|20)\d{2}[-/](?:0[1-9]|1[0-2])[-/](?:0[1-9]|[12]\d|3[01])\b")
 _PHONE_RE = re.compile(r"\b(?:\+?1[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)\d{3}[-.\s]?\d{4}\b")
@@ -128,6 +168,303 @@ def _resolve_audit_facility_id(
     return _lookup_user_facility_id(db, target_user_id) or _lookup_user_facility_id(db, actor_user_id)
 
 
+def _chain_timestamp(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def compute_audit_entry_hash(
+    *,
+    action: Optional[str],
+    details: Optional[str],
+    timestamp: datetime,
+    actor_user_id: Optional[int],
+    target_user_id: Optional[int],
+    facility_id: Optional[int],
+    previous_hash: str = GENESIS_HASH,
+) -> str:
+    """Hash an audit row into the chain.
+
+    The row id is assigned by the database inside the multi-row INSERT, so the
+    chain binds the row's own columns instead of its primary key.
+    """
+    row_key = f"{_chain_timestamp(timestamp)}|{actor_user_id}|{target_user_id}|{facility_id}"
+    return audit_verifier.compute_record_hash(row_key, action or "", details or "", previous_hash)
+
+
+def _lock_chain_tip(conn) -> Optional[str]:
+    """Serialize chain appends across processes, then return the current chain tip.
+
+    The lock is held until the surrounding transaction ends, so the tip read
+    here and the rows inserted after it cannot interleave with another
+    worker's append. Postgres uses an advisory lock; SQLite takes its
+    database write lock with a no-op UPDATE; other databases lock the tip row.
+    """
+    table = models.AuditLog.__table__
+    tip = select(table.c.entry_hash).where(table.c.entry_hash.isnot(None)).order_by(table.c.id.desc()).limit(1)
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": AUDIT_CHAIN_LOCK_KEY})
+    elif dialect == "sqlite":
+        conn.execute(table.update().where(text("0")).values(id=table.c.id))
+    else:
+        tip = tip.with_for_update()
+    return conn.execute(tip).scalar()
+
+
+def verify_audit_chain(db: Session) -> Dict[str, Any]:
+    """Re-hash every chained audit row in id order and report broken links."""
+    tampered: List[int] = []
+    previous_hash = GENESIS_HASH
+    total = 0
+    rows = (
+        db.query(models.AuditLog)
+        .filter(models.AuditLog.entry_hash.isnot(None))
+        .order_by(models.AuditLog.id.asc())
+        .yield_per(1000)
+    )
+    for row in rows:
+        total += 1
+        expected = compute_audit_entry_hash(
+            action=row.action,
+            details=row.details,
+            timestamp=row.timestamp,
+            actor_user_id=row.admin_id,
+            target_user_id=row.target_user_id,
+            facility_id=row.facility_id,
+            previous_hash=row.prev_hash or GENESIS_HASH,
+        )
+        if row.prev_hash != previous_hash or row.entry_hash != expected:
+            tampered.append(row.id)
+        previous_hash = row.entry_hash
+    return {
+        "chain_valid": not tampered,
+        "total_logs_verified": total,
+        "tampered_log_ids": tampered,
+        "latest_merkle_root": previous_hash,
+    }
+
+
+@dataclass
+class _PendingAuditEvent:
+    actor_user_id: Optional[int]
+    target_user_id: Optional[int]
+    facility_id: Optional[int]
+    action: str
+    details: str
+    timestamp: datetime
+
+
+class AuditBatchWriter:
+    """Background writer that persists queued audit events in batches.
+
+    Events are grouped per engine, facility ids are resolved with a single
+    ``IN`` query, and each batch is written with one multi-row INSERT inside
+    one transaction. The hash-chain tip is read inside that transaction under
+    a database lock (see ``_lock_chain_tip``) so workers in other processes
+    cannot link to the same parent; ``chain_lock`` additionally serializes
+    batches with synchronous writes within the process.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        max_queue: int = AUDIT_QUEUE_MAXSIZE,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_queue = max(1, max_queue)
+        self.chain_lock = threading.Lock()
+        self._queue: Deque[tuple[Engine, _PendingAuditEvent]] = collections.deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"enqueued": 0, "written": 0, "failed": 0, "batches": 0, "overflow_inline": 0}
+
+    def submit(self, bind: Engine, event: _PendingAuditEvent) -> None:
+        with self._cond:
+            accept = not self._closed and len(self._queue) < self.max_queue
+            if accept:
+                self._queue.append((bind, event))
+                self._stats["enqueued"] += 1
+                self._ensure_thread()
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify_all()
+            else:
+                self._stats["overflow_inline"] += 1
+        if not accept:
+            # Back-pressure: never drop audit events, write them on the caller's thread.
+            self._write_batch(bind, [event])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued event has been written (or ``timeout`` expires)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {**self._stats, "queued": len(self._queue)}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audit-batch-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                if len(self._queue) < self.batch_size and not self._closed:
+                    # Linger briefly so bursts coalesce into one INSERT.
+                    self._cond.wait(self.flush_interval)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight += len(batch)
+
+            by_bind: Dict[Engine, List[_PendingAuditEvent]] = {}
+            for bind, event in batch:
+                by_bind.setdefault(bind, []).append(event)
+            for bind, events in by_bind.items():
+                self._write_batch(bind, events)
+
+            with self._cond:
+                self._in_flight -= len(batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, bind: Engine, events: List[_PendingAuditEvent]) -> None:
+        table = models.AuditLog.__table__
+        users = models.User.__table__
+        try:
+            with self.chain_lock, bind.begin() as conn:
+                previous_hash = _lock_chain_tip(conn) or GENESIS_HASH
+                lookup_ids = {
+                    user_id
+                    for event in events
+                    if event.facility_id is None
+                    for user_id in (event.target_user_id, event.actor_user_id)
+                    if user_id is not None
+                }
+                facilities: Dict[int, Optional[int]] = {}
+                if lookup_ids:
+                    facilities = {
+                        user_id: user_facility_id
+                        for user_id, user_facility_id in conn.execute(
+                            select(users.c.id, users.c.facility_id).where(users.c.id.in_(lookup_ids))
+                        )
+                    }
+
+                rows = []
+                for event in events:
+                    facility_id = event.facility_id
+                    if facility_id is None:
+                        facility_id = facilities.get(event.target_user_id) or facilities.get(event.actor_user_id)
+                    entry_hash = compute_audit_entry_hash(
+                        action=event.action,
+                        details=event.details,
+                        timestamp=event.timestamp,
+                        actor_user_id=event.actor_user_id,
+                        target_user_id=event.target_user_id,
+                        facility_id=facility_id,
+                        previous_hash=previous_hash,
+                    )
+                    rows.append(
+                        {
+                            "facility_id": facility_id,
+                            "admin_id": event.actor_user_id,
+                            "target_user_id": event.target_user_id,
+                            "action": event.action,
+                            "timestamp": event.timestamp,
+                            "details": event.details,
+                            "prev_hash": previous_hash,
+                            "entry_hash": entry_hash,
+                            "is_deleted": False,
+                        }
+                    )
+                    previous_hash = entry_hash
+                conn.execute(insert(table).values(rows))
+        except Exception:
+            with self._cond:
+                self._stats["failed"] += len(events)
+            logger.error("Audit batch write failed; %d event(s) not persisted", len(events))
+            return
+        with self._cond:
+            self._stats["written"] += len(events)
+            self._stats["batches"] += 1
+
+
+audit_writer = AuditBatchWriter()
+atexit.register(audit_writer.close, 5.0)
+
+
+def flush_audit_events(timeout: Optional[float] = None) -> bool:
+    """Wait for queued audit events to be persisted."""
+    return audit_writer.flush(timeout)
+
+
+def _record_audit_event_sync(db: Session, event: _PendingAuditEvent) -> Optional[models.AuditLog]:
+    with audit_writer.chain_lock:
+        try:
+            facility_id = _resolve_audit_facility_id(
+                db,
+                facility_id=event.facility_id,
+                actor_user_id=event.actor_user_id,
+                target_user_id=event.target_user_id,
+            )
+            previous_hash = _lock_chain_tip(db.connection()) or GENESIS_HASH
+            entry = models.AuditLog(
+                facility_id=facility_id,
+                admin_id=event.actor_user_id,
+                target_user_id=event.target_user_id,
+                action=event.action,
+                timestamp=event.timestamp,
+                details=event.details,
+                prev_hash=previous_hash,
+                entry_hash=compute_audit_entry_hash(
+                    action=event.action,
+                    details=event.details,
+                    timestamp=event.timestamp,
+                    actor_user_id=event.actor_user_id,
+                    target_user_id=event.target_user_id,
+                    facility_id=facility_id,
+                    previous_hash=previous_hash,
+                ),
+            )
+            db.add(entry)
+            db.commit()
+            db.refresh(entry)
+            return entry
+        except Exception:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            logger.error("Audit log creation failed due to database error")
+            return None
+
+
 def record_audit_event(
     db: Session,
     *,
@@ -136,37 +473,36 @@ def record_audit_event(
     target_user_id: Optional[int] = None,
     facility_id: Optional[int] = None,
     details: Any = None,
+    durable: bool = False,
 ) -> Optional[models.AuditLog]:
     """
     Persist an audit event without exposing PHI in the details column.
 
     Audit failure should not block the primary user workflow; callers should
     perform the business write first, then call this helper.
+
+    In ``async`` mode the sanitized event is queued for the batch writer and
+    ``None`` is returned. Durable actions, ``durable=True`` calls and ``sync``
+    mode commit inline and return the stored row (``None`` on failure).
     """
     try:
-        entry = models.AuditLog(
-            facility_id=_resolve_audit_facility_id(
-                db,
-                facility_id=facility_id,
-                actor_user_id=actor_user_id,
-                target_user_id=target_user_id,
-            ),
-            admin_id=actor_user_id,
+        event = _PendingAuditEvent(
+            actor_user_id=actor_user_id,
             target_user_id=target_user_id,
+            facility_id=facility_id,
             action=action,
             details=sanitize_audit_details(details),
+            timestamp=datetime.now(timezone.utc),
         )
-        db.add(entry)
-        db.commit()
-        db.refresh(entry)
-        return entry
     except Exception:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-        logger.error("Audit log creation failed due to database error")
+        logger.error("Audit event could not be sanitized")
+        return None
+
+    bind = db.get_bind()
+    if AUDIT_WRITE_MODE == "async" and not durable and action not in DURABLE_AUDIT_ACTIONS and isinstance(bind, Engine):
+        audit_writer.submit(bind, event)
         return None
+    return _record_audit_event_sync(db, event)
 
 
 def audit_log_to_response(entry: models.AuditLog) -> dict[str, Any]:
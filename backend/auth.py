@@ -5,14 +5,15 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 
 from . import audit, database, models, schemas
+from .principal_cache import principal_cache, token_key
 
 # Initialize Logger
 logger = logging.getLogger(__name__)
@@ -90,26 +91,68 @@ def decode_access_token(token: str) -> Optional[dict]:
     except Exception:
         return None
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> models.User:
+def decode_token_claims(token: str) -> dict:
+    """
+    Return the verified claims of ``token``, raising ``JWTError`` when invalid.
+
+    Claims of recently verified tokens come from the principal cache, so the
+    rate limiter and ``get_current_user`` share one signature check per token.
+    """
+    key = token_key(token)
+    claims = principal_cache.get_claims(key)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        principal_cache.put_claims(key, claims)
+    return claims
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(database.get_db),
+    request: Request = None,
+) -> models.User:
     """
     Dependency to get the current authenticated user from JWT.
+
+    The principal is resolved once per request (kept on ``request.state``)
+    and, across requests, served from the principal cache without a query.
     """
+    key = token_key(token)
+    if request is not None:
+        principal = getattr(request.state, "principal", None)
+        if (
+            principal is not None
+            and getattr(request.state, "principal_key", None) == key
+            and object_session(principal) is db
+        ):
+            return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token_claims(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.username == username, models.User.is_deleted == False).first()
-    if user is None:
-        raise credentials_exception
+    version = principal_cache.user_version(username)
+    snapshot = principal_cache.get_user(key, version)
+    if snapshot is not None and snapshot.username == username:
+        user = db.merge(snapshot, load=False)
+    else:
+        user = db.query(models.User).filter(models.User.username == username, models.User.is_deleted == False).first()
+        if user is None:
+            raise credentials_exception
+        principal_cache.put_user(key, user, version)
+
+    if request is not None:
+        request.state.principal = user
+        request.state.principal_key = key
     return user
 
 def is_admin(user: models.User) -> bool:
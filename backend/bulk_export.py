@@ -0,0 +1,601 @@
+"""
+FHIR Bulk Data ($export) Job Engine
+===================================
+Asynchronous group-level export following the FHIR Bulk Data Access flow:
+the kick-off request returns ``202`` with a status URL, a worker pool writes
+one NDJSON file per resource type for every consenting patient of a facility,
+the status URL is polled until the signed manifest is ready, and each file is
+then downloaded on its own.
+
+Job progress lives in ``<BULK_EXPORT_DIR>/<job_id>/state.json``. Workers export
+the group ``BULK_EXPORT_PATIENT_BATCH`` patients at a time with one query per
+batch and checkpoint the file offset after every batch, so a restarted (or
+failed) job truncates any torn tail and resumes from its last completed batch.
+
+A job is run by one process at a time: its owner holds an exclusive lock on
+``<job_id>/lease`` (released by the OS if the process dies), so when several
+app workers call ``resume_pending`` at startup each unfinished job is resumed
+exactly once. Workers that do not own a job answer status polls from its
+``state.json``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.orm import Session
+
+from . import audit, auth, database, fhir, interoperability, licensing, models
+
+logger = logging.getLogger(__name__)
+
+BULK_EXPORT_DIR = os.getenv("BULK_EXPORT_DIR", os.path.join("data", "bulk_exports"))
+BULK_EXPORT_WORKERS = int(os.getenv("BULK_EXPORT_WORKERS", "4"))
+# Patients exported per query/checkpoint; the resume granularity after a crash
+BULK_EXPORT_PATIENT_BATCH = int(os.getenv("BULK_EXPORT_PATIENT_BATCH", "200"))
+BULK_EXPORT_CHUNK_ROWS = int(os.getenv("BULK_EXPORT_CHUNK_ROWS", "1000"))
+NDJSON_MEDIA_TYPE = "application/fhir+ndjson"
+BULK_EXPORT_TYPE = "fhir_bulk_ndjson"
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+_JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+router = APIRouter(prefix="/interop", tags=["Interoperability"], dependencies=[Depends(licensing.enforce_license_tier("enterprise"))])
+
+
+def consenting_patient_ids(db: Session, facility_id: int | None) -> list[int]:
+    """Ids of the facility's patients holding an active FHIR export consent."""
+    query = db.query(models.InteroperabilityConsent).join(
+        models.User, models.User.id == models.InteroperabilityConsent.patient_id
+    ).filter(
+        models.User.role == "patient",
+        models.InteroperabilityConsent.scope == interoperability.CONSENT_SCOPE,
+        models.InteroperabilityConsent.status == "active",
+    )
+    if facility_id is not None:
+        query = query.filter(models.User.facility_id == facility_id)
+    now = datetime.now(timezone.utc)
+    return sorted({
+        consent.patient_id
+        for consent in query.all()
+        if interoperability._is_active_consent(consent, now)
+    })
+
+
+def export_resource_types(filters: dict[str, Any]) -> list[str]:
+    return ["Patient"] + [
+        resource_type
+        for resource_type in interoperability.EXPORT_ROW_SOURCES
+        if interoperability._resource_allowed(filters, resource_type)
+    ]
+
+
+def iter_group_resources(
+    db: Session,
+    resource_type: str,
+    patient_ids: list[int],
+    filters: dict[str, Any],
+    chunk_rows: int = BULK_EXPORT_CHUNK_ROWS,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``resource_type`` resources for a batch of patients from a single query."""
+    if resource_type == "Patient":
+        patients = db.query(models.User).filter(models.User.id.in_(patient_ids)).order_by(models.User.id)
+        for patient in patients.yield_per(chunk_rows):
+            yield fhir.patient_resource(patient)
+        return
+    model, build = interoperability.EXPORT_ROW_SOURCES[resource_type]
+    options = interoperability._row_options(resource_type, filters.get("department_id") is not None)
+    rows = (
+        db.query(model)
+        .options(*options)
+        .filter(model.patient_id.in_(patient_ids))
+        .order_by(model.patient_id, model.id)
+        .yield_per(chunk_rows)
+    )
+    for row in rows:
+        if interoperability._row_allowed(filters, resource_type, row):
+            yield build(row, row.patient_id)
+
+
+def _try_lock(handle) -> bool:
+    """Take a non-blocking exclusive lock on ``handle``; False if another holder has it."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BulkExportEngine:
+    """Runs bulk export jobs on a thread pool, one task per (job, resource type)."""
+
+    def __init__(
+        self,
+        root_dir: str = BULK_EXPORT_DIR,
+        max_workers: int = BULK_EXPORT_WORKERS,
+        patient_batch: int = BULK_EXPORT_PATIENT_BATCH,
+        chunk_rows: int = BULK_EXPORT_CHUNK_ROWS,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        self.root_dir = root_dir
+        self.max_workers = max(1, max_workers)
+        self.patient_batch = max(1, patient_batch)
+        self.chunk_rows = chunk_rows
+        self._session_factory = session_factory or (lambda: database.SessionLocal())
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._groups: dict[str, list[int]] = {}
+        self._done: dict[str, threading.Event] = {}
+        self._running: set[tuple[str, str]] = set()
+        self._leases: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    # --- Job lifecycle -----------------------------------------------------
+
+    def kick_off(
+        self,
+        db: Session,
+        *,
+        requested_by_id: int | None,
+        facility_id: int | None,
+        filters: dict[str, Any],
+        request_url: str = "",
+        status_url: str = "",
+        job_id: str | None = None,
+    ) -> dict[str, Any]:
+        patient_ids = consenting_patient_ids(db, facility_id)
+        job_id = job_id or uuid.uuid4().hex
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        if not self._claim(job_id):
+            raise RuntimeError(f"Bulk export job {job_id} is owned by another process")
+        self._write_json(os.path.join(self._job_dir(job_id), "group.json"), patient_ids)
+        state = {
+            "job_id": job_id,
+            "status": "queued",
+            "facility_id": facility_id,
+            "requested_by_id": requested_by_id,
+            "filters": filters,
+            "request": request_url,
+            "status_url": status_url,
+            "transaction_time": fhir.fhir_datetime(datetime.now(timezone.utc)),
+            "patient_count": len(patient_ids),
+            "patient_batch": self.patient_batch,
+            "tasks": {
+                resource_type: {"status": "pending", "cursor": 0, "count": 0, "bytes": 0}
+                for resource_type in export_resource_types(filters)
+            },
+            "error": None,
+            "manifest": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = state
+            self._groups[job_id] = patient_ids
+            self._done[job_id] = threading.Event()
+            self._save_locked(job_id)
+        self._submit(job_id)
+        return state
+
+    def resume(self, job_id: str) -> dict[str, Any] | None:
+        """Restart a queued, running or failed job from its last checkpoint.
+
+        A job leased by another process is left to it; its saved state is returned.
+        """
+        if not self._claim(job_id):
+            return self._load(job_id)
+        state = self._adopt(job_id)
+        if state is None or state["status"] in ("completed", "cancelled"):
+            self._release(job_id)
+            return state
+        with self._lock:
+            state["status"] = "queued"
+            state["error"] = None
+            for resource_type, task in state["tasks"].items():
+                if task["status"] != "completed" and (job_id, resource_type) not in self._running:
+                    task["status"] = "pending"
+            self._done.setdefault(job_id, threading.Event()).clear()
+            self._save_locked(job_id)
+        self._submit(job_id)
+        return state
+
+    def resume_pending(self) -> list[str]:
+        """Resume every queued or running job whose lease no live process holds."""
+        if not os.path.isdir(self.root_dir):
+            return []
+        resumed = []
+        for job_id in sorted(os.listdir(self.root_dir)):
+            state = self._load(job_id)
+            if state is not None and state["status"] in ACTIVE_JOB_STATUSES and self._claim(job_id):
+                self.resume(job_id)
+                resumed.append(job_id)
+        return resumed
+
+    def cancel(self, job_id: str) -> bool:
+        state = self._load(job_id)
+        if state is None:
+            return False
+        with self._lock:
+            state["status"] = "cancelled"
+        self._release(job_id)
+        # A worker in another process stops once the job's state.json is gone.
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return True
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        state = self._load(job_id)
+        if state is None:
+            return None
+        with self._lock:
+            return json.loads(json.dumps(state))
+
+    def wait(self, job_id: str, timeout: float | None = None) -> bool:
+        with self._lock:
+            done = self._done.get(job_id)
+        return True if done is None else done.wait(timeout)
+
+    def file_path(self, job_id: str, resource_type: str) -> str:
+        return os.path.join(self._job_dir(job_id), f"{resource_type}.ndjson")
+
+    def close(self, wait: bool = True) -> None:
+        """Stop after each task's current batch; unfinished jobs resume on next start."""
+        with self._lock:
+            self._stopping = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            self._stopping = False
+            job_ids = list(self._leases)
+        for job_id in job_ids:
+            self._release(job_id)
+
+    # --- Workers -----------------------------------------------------------
+
+    def _submit(self, job_id: str) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk-export")
+            executor = self._executor
+            pending = [name for name, task in self._jobs[job_id]["tasks"].items() if task["status"] == "pending"]
+        if not pending:
+            self._finalize(job_id)
+            return
+        for resource_type in pending:
+            executor.submit(self._run_task, job_id, resource_type)
+
+    def _run_task(self, job_id: str, resource_type: str) -> None:
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None or state["status"] == "cancelled" or self._stopping:
+                return
+            if state["status"] == "queued":
+                state["status"] = "running"
+            state.setdefault("started_at", time.time())
+            task = state["tasks"][resource_type]
+            task["status"] = "running"
+            self._running.add((job_id, resource_type))
+            patient_ids = self._groups[job_id]
+            filters = state["filters"]
+        state_path = os.path.join(self._job_dir(job_id), "state.json")
+        db = self._session_factory()
+        try:
+            with open(self.file_path(job_id, resource_type), "ab") as handle:
+                handle.truncate(task["bytes"])  # drop anything written after the last checkpoint
+                while task["cursor"] < len(patient_ids):
+                    if self._stopping or state["status"] == "cancelled":
+                        return
+                    if not os.path.exists(state_path):  # cancelled through another process
+                        with self._lock:
+                            state["status"] = "cancelled"
+                        self._release(job_id)
+                        return
+                    batch = patient_ids[task["cursor"]:task["cursor"] + self.patient_batch]
+                    buffer = bytearray()
+                    count = 0
+                    for resource in iter_group_resources(db, resource_type, batch, filters, self.chunk_rows):
+                        fhir.validate_fhir_resource(resource)
+                        buffer += interoperability._canonical_json(resource).encode("utf-8") + b"\n"
+                        count += 1
+                    db.expunge_all()
+                    handle.write(buffer)
+                    handle.flush()
+                    with self._lock:
+                        task["cursor"] += len(batch)
+                        task["count"] += count
+                        task["bytes"] += len(buffer)
+                        self._save_locked(job_id)
+        except Exception as exc:
+            logger.error("Bulk export %s failed on %s: %s", job_id, resource_type, exc)
+            with self._lock:
+                if state["status"] == "cancelled":
+                    return
+                task["status"] = "failed"
+                state["status"] = "failed"
+                state["error"] = f"{resource_type} export failed"
+                self._save_locked(job_id)
+            self._settle(job_id)
+            return
+        finally:
+            db.close()
+            with self._lock:
+                self._running.discard((job_id, resource_type))
+        with self._lock:
+            task["status"] = "completed"
+            self._save_locked(job_id)
+        self._settle(job_id)
+
+    def _settle(self, job_id: str) -> None:
+        """Finalize once every task has stopped; wake waiters if the job is done either way."""
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None or any(task["status"] in ("pending", "running") for task in state["tasks"].values()):
+                return
+            failed = state["status"] == "failed"
+        if failed:
+            self._release(job_id)
+        else:
+            self._finalize(job_id)
+
+    def _finalize(self, job_id: str) -> None:
+        with self._lock:
+            state = self._jobs[job_id]
+        output = []
+        for resource_type, task in state["tasks"].items():
+            if task["count"]:
+                output.append({
+                    "type": resource_type,
+                    "url": f"{state['status_url']}/files/{resource_type}.ndjson",
+                    "count": task["count"],
+                    "sha256": _file_sha256(self.file_path(job_id, resource_type)),
+                })
+        payload = {
+            "resourceType": "BulkExportManifest",
+            "transactionTime": state["transaction_time"],
+            "request": state["request"],
+            "requiresAccessToken": True,
+            "output": output,
+            "error": [],
+            "job_id": job_id,
+            "export_type": BULK_EXPORT_TYPE,
+            "facility_id": state["facility_id"],
+            "patient_count": state["patient_count"],
+            "filters": state["filters"],
+            "signature_algorithm": interoperability.SIGNATURE_ALGORITHM,
+            "standards_note": interoperability.STANDARDS_NOTE,
+        }
+        resource_count = sum(task["count"] for task in state["tasks"].values())
+        elapsed = max(time.time() - state.get("started_at", time.time()), 1e-6)
+        with self._lock:
+            state["manifest"] = {**payload, "signature": interoperability._sign_manifest(payload)}
+            state["status"] = "completed"
+            state["resource_count"] = resource_count
+            state["resources_per_second"] = round(resource_count / elapsed, 1)
+            self._save_locked(job_id)
+        db = self._session_factory()
+        try:
+            audit.record_audit_event(
+                db,
+                actor_user_id=state["requested_by_id"],
+                action="EXPORT_INTEROPERABILITY_BULK",
+                details={
+                    "resource_type": "bulk_export_job",
+                    "resource_id": job_id,
+                    "facility_id": state["facility_id"],
+                    "patient_count": state["patient_count"],
+                    "resource_count": resource_count,
+                    "filters": state["filters"],
+                    "signature_algorithm": interoperability.SIGNATURE_ALGORITHM,
+                },
+            )
+        finally:
+            db.close()
+        self._release(job_id)
+
+    # --- Persistence -------------------------------------------------------
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.root_dir, job_id)
+
+    def _claim(self, job_id: str) -> bool:
+        """Take this process's lease on ``job_id``; False while another process holds it."""
+        if not _JOB_ID_PATTERN.match(job_id):
+            return False
+        with self._lock:
+            if job_id in self._leases:
+                return True
+        try:
+            handle = open(os.path.join(self._job_dir(job_id), "lease"), "a+b")
+        except OSError:
+            return False
+        if not _try_lock(handle):
+            handle.close()
+            return False
+        with self._lock:
+            self._leases[job_id] = handle
+        return True
+
+    def _release(self, job_id: str) -> None:
+        """Stop tracking ``job_id`` in this process, wake waiters and give up its lease."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._groups.pop(job_id, None)
+            done = self._done.pop(job_id, None)
+            lease = self._leases.pop(job_id, None)
+        if done is not None:
+            done.set()
+        if lease is not None:
+            lease.close()
+
+    def _load(self, job_id: str) -> dict[str, Any] | None:
+        """State of a job owned here, otherwise freshly read from its ``state.json``."""
+        if not _JOB_ID_PATTERN.match(job_id):
+            return None
+        with self._lock:
+            if job_id in self._jobs:
+                return self._jobs[job_id]
+        try:
+            with open(os.path.join(self._job_dir(job_id), "state.json"), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _adopt(self, job_id: str) -> dict[str, Any] | None:
+        """Load a job this process has just leased into its in-memory tables."""
+        with self._lock:
+            if job_id in self._jobs:
+                return self._jobs[job_id]
+        state = self._load(job_id)
+        if state is None:
+            return None
+        try:
+            with open(os.path.join(self._job_dir(job_id), "group.json"), encoding="utf-8") as handle:
+                patient_ids = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._jobs[job_id] = state
+            self._groups[job_id] = patient_ids
+            self._done[job_id] = threading.Event()
+        return state
+
+    def _save_locked(self, job_id: str) -> None:
+        self._write_json(os.path.join(self._job_dir(job_id), "state.json"), self._jobs[job_id])
+
+    @staticmethod
+    def _write_json(path: str, payload: Any) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+bulk_export_engine = BulkExportEngine()
+
+
+# --- Routes ----------------------------------------------------------------
+
+def _get_job_for_user(job_id: str, current_user: models.User) -> dict[str, Any]:
+    interoperability._require_admin(current_user)
+    state = bulk_export_engine.status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Bulk export job not found")
+    interoperability._ensure_facility_access(current_user, state["facility_id"])
+    return state
+
+
+@router.get("/fhir/Group/{group_id}/$export", status_code=202)
+def kick_off_group_export(
+    group_id: int,
+    request: Request,
+    resource_types: str | None = Query(None, alias="_type"),
+    department_id: int | None = None,
+    profile_id: int | None = None,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+) -> JSONResponse:
+    """Start an asynchronous NDJSON export of a facility's consenting patients."""
+    interoperability._require_admin(current_user)
+    facility = db.query(models.HospitalFacility).filter(models.HospitalFacility.id == group_id).first()
+    if not facility:
+        raise HTTPException(status_code=404, detail="Group not found")
+    interoperability._ensure_facility_access(current_user, facility.id)
+    profile = interoperability._get_active_export_profile(db, profile_id)
+    if profile is not None:
+        interoperability._ensure_facility_access(current_user, profile.facility_id)
+    filters = interoperability._parse_export_filters(resource_types, department_id, profile)
+    job_id = uuid.uuid4().hex
+    status_url = str(request.url_for("get_bulk_export_status", job_id=job_id))
+    state = bulk_export_engine.kick_off(
+        db,
+        requested_by_id=current_user.id,
+        facility_id=facility.id,
+        filters=filters,
+        request_url=str(request.url),
+        status_url=status_url,
+        job_id=job_id,
+    )
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": state["job_id"], "status": state["status"], "patient_count": state["patient_count"]},
+        headers={"Content-Location": status_url},
+    )
+
+
+@router.get("/bulk-exports/{job_id}", name="get_bulk_export_status")
+def get_bulk_export_status(
+    job_id: str,
+    current_user: models.User = Depends(auth.get_current_user),
+) -> JSONResponse:
+    """Poll a bulk export: ``202`` with progress while running, ``200`` with the signed manifest when done."""
+    state = _get_job_for_user(job_id, current_user)
+    if state["status"] == "completed":
+        return JSONResponse(content=state["manifest"])
+    if state["status"] == "failed":
+        return JSONResponse(status_code=500, content={"job_id": job_id, "status": "failed", "detail": state["error"]})
+    tasks = state["tasks"]
+    done_batches = sum(math.ceil(task["cursor"] / state["patient_batch"]) for task in tasks.values())
+    total_batches = len(tasks) * math.ceil(state["patient_count"] / state["patient_batch"])
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status": state["status"],
+            "resources_written": sum(task["count"] for task in tasks.values()),
+            "tasks": {name: {"status": task["status"], "count": task["count"]} for name, task in tasks.items()},
+        },
+        headers={"X-Progress": f"{done_batches}/{total_batches} batches", "Retry-After": "2"},
+    )
+
+
+@router.get("/bulk-exports/{job_id}/files/{resource_type}.ndjson")
+def download_bulk_export_file(
+    job_id: str,
+    resource_type: str,
+    current_user: models.User = Depends(auth.get_current_user),
+) -> FileResponse:
+    state = _get_job_for_user(job_id, current_user)
+    outputs = (state.get("manifest") or {}).get("output", [])
+    if state["status"] != "completed" or resource_type not in {item["type"] for item in outputs}:
+        raise HTTPException(status_code=404, detail="Bulk export file not found")
+    return FileResponse(bulk_export_engine.file_path(job_id, resource_type), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.delete("/bulk-exports/{job_id}", status_code=202)
+def cancel_bulk_export(
+    job_id: str,
+    current_user: models.User = Depends(auth.get_current_user),
+) -> dict[str, Any]:
+    _get_job_for_user(job_id, current_user)
+    bulk_export_engine.cancel(job_id)
+    return {"job_id": job_id, "status": "cancelled"}
@@ -7,9 +7,12 @@ Falls back silently to an in-memory TTL dictionary if Redis is not configured or
 
 import logging
 import os
+import pickle
 import threading
 import time
-from typing import Any, Optional
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +23,21 @@ REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
 REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD", None)
 REDIS_DB = int(os.environ.get("REDIS_DB", "0"))
 
+# In-process L1 tier. Without Redis it is the whole cache; with Redis it holds
+# recently read/written values for at most CACHE_L1_TTL_SECONDS (0 disables it).
+CACHE_L1_MAX_ENTRIES = int(os.environ.get("CACHE_L1_MAX_ENTRIES", "10000"))
+CACHE_L1_TTL_SECONDS = float(os.environ.get("CACHE_L1_TTL_SECONDS", "5"))
+CACHE_SWEEP_INTERVAL_SECONDS = float(os.environ.get("CACHE_SWEEP_INTERVAL_SECONDS", "30"))
+
+_MISSING = object()
+
+
+def _key_prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
 
 class SystemCache:
-    """Thread-safe dual-backend cache (Redis with silent In-Memory fallback)."""
+    """Thread-safe two-tier cache: bounded in-process LRU/TTL L1 over optional Redis."""
 
     _instance: Optional["SystemCache"] = None
     _lock = threading.Lock()
@@ -35,8 +50,7 @@ class SystemCache:
             return cls._instance
 
     def _init_cache(self):
-        self._in_memory_store = {}
-        self._store_lock = threading.Lock()
+        self._init_local_tier()
         self.redis_client = None
 
         if REDIS_URL or REDIS_HOST:
@@ -70,49 +84,194 @@ class SystemCache:
                 "No Redis configuration found (neither REDIS_URL nor REDIS_HOST). Initialized in-memory TTL cache."
             )
 
-    def get(self, key: str) -> Optional[Any]:
-        """Retrieve a value from the cache. Returns None on cache miss or expiration."""
-        if self.redis_client:
-            try:
-                import pickle
-
-                val = self.redis_client.get(key)
-                if val is not None:
-                    return pickle.loads(val)
-            except Exception as e:
-                logger.warning("Redis get failed: %s", e)
+        self._start_sweeper()
 
-        # In-memory fallback
+    def _init_local_tier(self) -> None:
+        """Set up the L1 store and counters (no Redis connection, no sweeper)."""
+        # key -> (expiry, value), least recently used first
+        self._in_memory_store: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._store_lock = threading.Lock()
+        self._l1_max_entries = CACHE_L1_MAX_ENTRIES
+        self._l1_ttl = CACHE_L1_TTL_SECONDS
+        self._l1_evictions = 0
+        self._l1_expirations = 0
+        self._stats_lock = threading.Lock()
+        # prefix -> [hits, misses, l1_hits, total lookup seconds]
+        self._prefix_stats: Dict[str, List[float]] = {}
+        # Local tag generations (authoritative without Redis, fallback with it)
+        self._tag_versions: Dict[str, int] = {}
+
+    # ── L1 tier ────────────────────────────────────────────────────────
+    def _l1_get(self, key: str, now: float) -> Any:
+        """Return the live L1 value for ``key`` (refreshing its recency) or ``_MISSING``."""
         with self._store_lock:
             entry = self._in_memory_store.get(key)
-            if entry:
-                expiry, val = entry
-                if expiry is None or expiry > time.time():
-                    return val
-                else:
-                    # Clean up expired key
-                    self._in_memory_store.pop(key, None)
-        return None
+            if entry is None:
+                return _MISSING
+            expiry, val = entry
+            if expiry is not None and expiry <= now:
+                self._in_memory_store.pop(key, None)
+                self._l1_expirations += 1
+                return _MISSING
+            self._in_memory_store.move_to_end(key)
+            return val
+
+    def _l1_put_many(self, items: Dict[str, Any], ttl: Optional[float], authoritative: bool) -> None:
+        """Insert ``items`` into L1, evicting least-recently-used entries beyond the bound.
+
+        ``authoritative`` entries are the only copy (no Redis, or Redis write
+        failed) and keep the full ``ttl``; otherwise L1 holds a short-lived
+        read-through copy capped at ``CACHE_L1_TTL_SECONDS``.
+        """
+        if not authoritative:
+            if self._l1_ttl <= 0:
+                return
+            ttl = min(ttl, self._l1_ttl) if ttl else self._l1_ttl
+        expiry = (time.time() + ttl) if ttl else None
+        with self._store_lock:
+            store = self._in_memory_store
+            for key, value in items.items():
+                store[key] = (expiry, value)
+                store.move_to_end(key)
+            while len(store) > self._l1_max_entries:
+                store.popitem(last=False)
+                self._l1_evictions += 1
+
+    def sweep_expired(self) -> int:
+        """Drop expired L1 entries. Returns the number removed."""
+        now = time.time()
+        with self._store_lock:
+            expired = [
+                key for key, (expiry, _) in self._in_memory_store.items()
+                if expiry is not None and expiry <= now
+            ]
+            for key in expired:
+                del self._in_memory_store[key]
+            self._l1_expirations += len(expired)
+        return len(expired)
+
+    def _start_sweeper(self) -> None:
+        interval = CACHE_SWEEP_INTERVAL_SECONDS
+        if interval <= 0:
+            return
+        cache_ref = weakref.ref(self)
+        stop = self._sweeper_stop = threading.Event()
+
+        def sweep_loop():
+            while not stop.wait(interval):
+                cache_obj = cache_ref()
+                if cache_obj is None:
+                    return
+                try:
+                    cache_obj.sweep_expired()
+                except Exception as e:
+                    logger.warning("Cache expiry sweep failed: %s", e)
+                del cache_obj
+
+        threading.Thread(target=sweep_loop, daemon=True, name="SystemCacheSweeper").start()
+
+    def _record_lookup(self, key: str, hit: bool, l1_hit: bool, elapsed: float) -> None:
+        with self._stats_lock:
+            counters = self._prefix_stats.get(_key_prefix(key))
+            if counters is None:
+                counters = self._prefix_stats[_key_prefix(key)] = [0, 0, 0, 0.0]
+            counters[0 if hit else 1] += 1
+            if l1_hit:
+                counters[2] += 1
+            counters[3] += elapsed
+
+    # ── Core operations ────────────────────────────────────────────────
+    def _lookup(self, key: str, loads: Callable[[bytes], Any], label: str) -> Any:
+        """L1, then Redis (promoting hits into L1). Returns ``_MISSING`` on a miss."""
+        started = time.perf_counter()
+        value = self._l1_get(key, time.time())
+        l1_hit = value is not _MISSING
+        if not l1_hit and self.redis_client:
+            try:
+                raw = self.redis_client.get(key)
+                if raw is not None:
+                    value = loads(raw)
+                    self._l1_put_many({key: value}, None, authoritative=False)
+            except Exception as e:
+                logger.warning("Redis %s failed: %s", label, e)
+                value = _MISSING
+        self._record_lookup(key, value is not _MISSING, l1_hit, time.perf_counter() - started)
+        return value
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Store a value in the cache with an optional TTL (in seconds)."""
+    def _store(self, key: str, value: Any, ttl: Optional[int], dumps: Callable[[Any], bytes], label: str) -> None:
         if self.redis_client:
             try:
-                import pickle
-
-                serialized = pickle.dumps(value)
+                serialized = dumps(value)
                 if ttl:
                     self.redis_client.set(key, serialized, ex=ttl)
                 else:
                     self.redis_client.set(key, serialized)
+                self._l1_put_many({key: value}, ttl, authoritative=False)
                 return
             except Exception as e:
-                logger.warning("Redis set failed: %s", e)
+                logger.warning("Redis %s failed: %s", label, e)
 
         # In-memory fallback
-        with self._store_lock:
-            expiry = (time.time() + ttl) if ttl else None
-            self._in_memory_store[key] = (expiry, value)
+        self._l1_put_many({key: value}, ttl, authoritative=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retrieve a value from the cache. Returns None on cache miss or expiration."""
+        value = self._lookup(key, pickle.loads, "get")
+        return None if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a value in the cache with an optional TTL (in seconds)."""
+        self._store(key, value, ttl, pickle.dumps, "set")
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Retrieve several keys: L1 first, then one Redis MGET for the rest. Returns only the hits."""
+        started = time.perf_counter()
+        now = time.time()
+        found: Dict[str, Any] = {}
+        for key in keys:
+            value = self._l1_get(key, now)
+            if value is not _MISSING:
+                found[key] = value
+        l1_hits = set(found)
+
+        remaining = [key for key in keys if key not in found]
+        if self.redis_client and remaining:
+            try:
+                promoted = {}
+                for key, val in zip(remaining, self.redis_client.mget(remaining)):
+                    if val is not None:
+                        promoted[key] = pickle.loads(val)
+                self._l1_put_many(promoted, None, authoritative=False)
+                found.update(promoted)
+            except Exception as e:
+                logger.warning("Redis mget failed: %s", e)
+
+        if keys:
+            per_key = (time.perf_counter() - started) / len(keys)
+            for key in keys:
+                self._record_lookup(key, key in found, key in l1_hits, per_key)
+        return found
+
+    def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Store several values with one pipelined round trip and a shared optional TTL."""
+        if not mapping:
+            return
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in mapping.items():
+                    if ttl:
+                        pipe.set(key, pickle.dumps(value), ex=ttl)
+                    else:
+                        pipe.set(key, pickle.dumps(value))
+                pipe.execute()
+                self._l1_put_many(mapping, ttl, authoritative=False)
+                return
+            except Exception as e:
+                logger.warning("Redis set_many failed: %s", e)
+
+        # In-memory fallback
+        self._l1_put_many(mapping, ttl, authoritative=True)
 
     def delete(self, key: str) -> bool:
         """Remove a key from the cache. Returns True if key existed."""
@@ -140,6 +299,62 @@ class SystemCache:
         with self._store_lock:
             self._in_memory_store.clear()
 
+    # ── Tag generations ────────────────────────────────────────────────
+    def get_tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        """Current generation of each tag (0 if never bumped).
+
+        Read straight from Redis with one MGET, never from L1, so a bump in
+        one worker is seen by every other worker on its next lookup.
+        """
+        if not tags:
+            return {}
+        if self.redis_client:
+            try:
+                raw = self.redis_client.mget([f"tagv:{tag}" for tag in tags])
+                return {tag: int(val) if val is not None else 0 for tag, val in zip(tags, raw)}
+            except Exception as e:
+                logger.warning("Redis tag version lookup failed: %s", e)
+        with self._store_lock:
+            return {tag: self._tag_versions.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags: List[str]) -> None:
+        """Advance each tag's generation, orphaning every key derived from the old one."""
+        if not tags:
+            return
+        with self._store_lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.incr(f"tagv:{tag}")
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Redis tag bump failed: %s", e)
+
+    # ── Cross-process single-flight locks ──────────────────────────────
+    def acquire_lock(self, name: str, ttl: float) -> bool:
+        """Try to take a short-lived cluster-wide lock (Redis ``SET NX``).
+
+        Without Redis there is no other process to coordinate with, so the
+        lock is always granted; in-process callers are coalesced separately.
+        """
+        if not self.redis_client:
+            return True
+        try:
+            return bool(self.redis_client.set(name, b"1", nx=True, px=max(1, int(ttl * 1000))))
+        except Exception as e:
+            logger.warning("Redis lock acquire failed: %s", e)
+            return True
+
+    def release_lock(self, name: str) -> None:
+        if self.redis_client:
+            try:
+                self.redis_client.delete(name)
+            except Exception as e:
+                logger.warning("Redis lock release failed: %s", e)
+
     # ── Cache Metrics ──────────────────────────────────────────────────
     _hits: int = 0
     _misses: int = 0
@@ -160,8 +375,19 @@ class SystemCache:
 
     @property
     def stats(self) -> dict:
-        """Return cache statistics."""
+        """Return cache statistics, including L1 occupancy and per-key-prefix counters."""
         total = self._hits + self._misses
+        with self._stats_lock:
+            prefixes = {}
+            for prefix, (hits, misses, l1_hits, seconds) in sorted(self._prefix_stats.items()):
+                lookups = hits + misses
+                prefixes[prefix] = {
+                    "hits": int(hits),
+                    "misses": int(misses),
+                    "l1_hits": int(l1_hits),
+                    "hit_rate": hits / lookups if lookups else 0.0,
+                    "avg_latency_ms": round(seconds * 1000.0 / lookups, 4) if lookups else 0.0,
+                }
         return {
             "hits": self._hits,
             "misses": self._misses,
@@ -169,6 +395,13 @@ class SystemCache:
             "hit_rate": self.hit_rate,
             "backend": "redis" if self.redis_client else "in_memory",
             "in_memory_keys": len(self._in_memory_store),
+            "l1": {
+                "max_entries": self._l1_max_entries,
+                "ttl_seconds": self._l1_ttl if self.redis_client else None,
+                "evictions": self._l1_evictions,
+                "expirations": self._l1_expirations,
+            },
+            "prefixes": prefixes,
         }
 
     def get_with_metrics(self, key: str) -> Optional[Any]:
@@ -189,8 +422,6 @@ class SystemCache:
 
             return msgpack.packb(value, use_bin_type=True, default=str)
         except (ImportError, TypeError):
-            import pickle
-
             return pickle.dumps(value)
 
     @staticmethod
@@ -201,120 +432,230 @@ class SystemCache:
 
             return msgpack.unpackb(data, raw=False)
         except (ImportError, Exception):
-            import pickle
-
             return pickle.loads(data)
 
     def safe_set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Store a value using secure serialization (msgpack preferred)."""
-        if self.redis_client:
-            try:
-                serialized = self._serialize(value)
-                if ttl:
-                    self.redis_client.set(key, serialized, ex=ttl)
-                else:
-                    self.redis_client.set(key, serialized)
-                return
-            except Exception as e:
-                logger.warning("Redis safe_set failed: %s", e)
-        # In-memory fallback
-        with self._store_lock:
-            expiry = (time.time() + ttl) if ttl else None
-            self._in_memory_store[key] = (expiry, value)
+        self._store(key, value, ttl, self._serialize, "safe_set")
 
     def safe_get(self, key: str) -> Optional[Any]:
         """Retrieve a value using secure deserialization (msgpack preferred)."""
-        if self.redis_client:
-            try:
-                val = self.redis_client.get(key)
-                if val is not None:
-                    self.record_hit()
-                    return self._deserialize(val)
-            except Exception as e:
-                logger.warning("Redis safe_get failed: %s", e)
-        # In-memory fallback
-        with self._store_lock:
-            entry = self._in_memory_store.get(key)
-            if entry:
-                expiry, val = entry
-                if expiry is None or expiry > time.time():
-                    self.record_hit()
-                    return val
-                else:
-                    self._in_memory_store.pop(key, None)
-        self.record_miss()
-        return None
+        value = self._lookup(key, self._deserialize, "safe_get")
+        if value is _MISSING:
+            self.record_miss()
+            return None
+        self.record_hit()
+        return value
 
 
 # ── API Response Caching Decorator ─────────────────────────────────────
+import asyncio
 import functools
 import hashlib
+import inspect
+
+
+class _SingleFlight:
+    """Collapse concurrent computations of the same key into a single call.
+
+    Threads share one ``threading.Event`` per key; coroutines share one
+    ``asyncio.Future`` per (event loop, key). Followers receive the leader's
+    result or re-raise its exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, list] = {}
+        self._async_calls: Dict[Tuple[int, str], "asyncio.Future"] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                # [done event, result, exception]
+                call = self._calls[key] = [threading.Event(), None, None]
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+        try:
+            call[1] = fn()
+            return call[1]
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call[0].set()
+
+    async def do_async(self, key: str, fn: Callable[[], Any]) -> Any:
+        flight_key = (id(asyncio.get_running_loop()), key)
+        future = self._async_calls.get(flight_key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = self._async_calls[flight_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            self._async_calls.pop(flight_key, None)
+
+
+_single_flight = _SingleFlight()
 
+# How often a process that lost the cross-process lock re-checks for the leader's value
+_LOCK_POLL_SECONDS = 0.05
 
-def cached_response(ttl: int = 300, key_prefix: str = "api"):
+
+def facility_tag(facility_id: Optional[int]) -> str:
+    """Tag for views scoped to one facility (``None`` = the global, unscoped view)."""
+    return f"facility:{facility_id}" if facility_id is not None else "facility:all"
+
+
+def facility_write_tags(facility_id: Optional[int]) -> List[str]:
+    """Tags to bump after a write in ``facility_id``: its own views plus the global view."""
+    return list(dict.fromkeys([facility_tag(facility_id), facility_tag(None)]))
+
+
+def _resolve_tags(tags, arguments: Dict[str, Any]) -> List[str]:
+    if tags is None:
+        return []
+    if callable(tags):
+        return [str(tag) for tag in tags(arguments)]
+    return [tag.format(**arguments) for tag in tags]
+
+
+def _response_cache_key(key_prefix: str, func, arguments: Dict[str, Any], tags=None) -> str:
+    """Build ``resp:<key_prefix>:<hash>`` from the call's arguments and its tags' generations.
+
+    Every entry carries the implicit ``prefix:<key_prefix>`` tag, so
+    :func:`invalidate_cache_prefix` is a single tag bump as well.
+    """
+    # Include only serializable arguments (skip db sessions, requests, etc.)
+    key_parts = [key_prefix, func.__module__, func.__qualname__]
+    for k, v in sorted(arguments.items()):
+        if isinstance(v, (str, int, float, bool, type(None))):
+            key_parts.append(f"{k}={v}")
+    tag_names = [f"prefix:{key_prefix}"] + _resolve_tags(tags, arguments)
+    versions = cache.get_tag_versions(tag_names)
+    key_parts.extend(f"#{tag}@{versions.get(tag, 0)}" for tag in tag_names)
+    raw_key = ":".join(key_parts)
+    return f"resp:{key_prefix}:{hashlib.sha256(raw_key.encode()).hexdigest()[:16]}"
+
+
+def _store_response(cache_key: str, result: Any, ttl: int, func) -> None:
+    try:
+        cache.set(cache_key, result, ttl=ttl)
+    except Exception as e:
+        logger.warning("Failed to cache response for %s: %s", func.__qualname__, e)
+
+
+def cached_response(ttl: int = 300, key_prefix: str = "api", lock_timeout: float = 10.0, tags=None):
     """
     FastAPI endpoint caching decorator.
 
     Caches the return value of a route handler based on its arguments.
-    Automatically invalidated after ``ttl`` seconds.
+    Automatically invalidated after ``ttl`` seconds, or earlier when one of
+    its ``tags`` is bumped with :func:`invalidate_tags`.
+
+    ``tags`` is either a sequence of ``str.format`` templates over the call's
+    arguments (``"patient:{patient_id}"``) or a callable taking the bound
+    arguments dict and returning tag strings. Tags also scope the key, so a
+    facility tag keeps facilities' cached views apart.
+
+    Misses are single-flight: concurrent callers in this process wait for one
+    computation, and with Redis other workers wait (up to ``lock_timeout``
+    seconds) on a ``lock:<key>`` entry instead of recomputing a cold key.
 
     Usage::
 
         @router.get("/dashboard/stats")
-        @cached_response(ttl=60, key_prefix="dashboard")
-        async def get_dashboard_stats(db: Session = Depends(get_db)):
+        @cached_response(ttl=60, key_prefix="dashboard",
+                         tags=lambda args: [facility_tag(args["admin"].facility_id)])
+        async def get_dashboard_stats(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
             ...
     """
 
     def decorator(func):
+        signature = inspect.signature(func)
+
+        def bound_arguments(args, kwargs) -> Dict[str, Any]:
+            return signature.bind_partial(*args, **kwargs).arguments
+
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            # Build a cache key from the function name and hashable args
-            key_parts = [key_prefix, func.__module__, func.__qualname__]
-            # Include only serializable kwargs (skip db sessions, requests, etc.)
-            for k, v in sorted(kwargs.items()):
-                if isinstance(v, (str, int, float, bool, type(None))):
-                    key_parts.append(f"{k}={v}")
-            raw_key = ":".join(key_parts)
-            cache_key = f"resp:{hashlib.sha256(raw_key.encode()).hexdigest()[:16]}"
+            cache_key = _response_cache_key(key_prefix, func, bound_arguments(args, kwargs), tags)
 
             # Try cache first
             cached = cache.get_with_metrics(cache_key)
             if cached is not None:
                 return cached
 
-            # Call the actual function
-            result = await func(*args, **kwargs)
-
-            # Cache the result
-            try:
-                cache.set(cache_key, result, ttl=ttl)
-            except Exception as e:
-                logger.warning("Failed to cache response for %s: %s", func.__qualname__, e)
-
-            return result
+            async def compute():
+                # A flight that finished just before this one may have filled it
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                lock_name = f"lock:{cache_key}"
+                owns_lock = cache.acquire_lock(lock_name, lock_timeout)
+                if not owns_lock:
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(_LOCK_POLL_SECONDS)
+                        cached = cache.get(cache_key)
+                        if cached is not None:
+                            return cached
+                try:
+                    result = await func(*args, **kwargs)
+                    _store_response(cache_key, result, ttl, func)
+                    return result
+                finally:
+                    if owns_lock:
+                        cache.release_lock(lock_name)
+
+            return await _single_flight.do_async(cache_key, compute)
 
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            key_parts = [key_prefix, func.__module__, func.__qualname__]
-            for k, v in sorted(kwargs.items()):
-                if isinstance(v, (str, int, float, bool, type(None))):
-                    key_parts.append(f"{k}={v}")
-            raw_key = ":".join(key_parts)
-            cache_key = f"resp:{hashlib.sha256(raw_key.encode()).hexdigest()[:16]}"
+            cache_key = _response_cache_key(key_prefix, func, bound_arguments(args, kwargs), tags)
 
             cached = cache.get_with_metrics(cache_key)
             if cached is not None:
                 return cached
 
-            result = func(*args, **kwargs)
-            try:
-                cache.set(cache_key, result, ttl=ttl)
-            except Exception as e:
-                logger.warning("Failed to cache response for %s: %s", func.__qualname__, e)
-            return result
-
-        import asyncio
+            def compute():
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                lock_name = f"lock:{cache_key}"
+                owns_lock = cache.acquire_lock(lock_name, lock_timeout)
+                if not owns_lock:
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        time.sleep(_LOCK_POLL_SECONDS)
+                        cached = cache.get(cache_key)
+                        if cached is not None:
+                            return cached
+                try:
+                    result = func(*args, **kwargs)
+                    _store_response(cache_key, result, ttl, func)
+                    return result
+                finally:
+                    if owns_lock:
+                        cache.release_lock(lock_name)
+
+            return _single_flight.do(cache_key, compute)
 
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
@@ -323,30 +664,25 @@ def cached_response(ttl: int = 300, key_prefix: str = "api"):
     return decorator
 
 
+def invalidate_tags(*tags: str) -> int:
+    """
+    Invalidate every ``cached_response`` entry carrying any of ``tags``.
+
+    O(1) per tag: the tag's generation is bumped and affected keys are simply
+    never looked up again (they age out via TTL/LRU). Returns the number of
+    tags bumped.
+    """
+    unique = list(dict.fromkeys(tags))
+    cache.bump_tags(unique)
+    return len(unique)
+
+
 def invalidate_cache_prefix(prefix: str) -> int:
     """
-    Invalidate all cache keys matching a prefix.
-    Returns count of keys invalidated.
+    Invalidate all ``cached_response`` entries created with ``key_prefix=prefix``.
+    Returns the number of tags bumped.
     """
-    count = 0
-    with cache._store_lock:
-        keys_to_remove = [k for k in cache._in_memory_store if k.startswith(f"resp:{prefix}")]
-        for key in keys_to_remove:
-            cache._in_memory_store.pop(key, None)
-            count += 1
-    if cache.redis_client:
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = cache.redis_client.scan(cursor, match=f"resp:{prefix}*", count=100)
-                for key in keys:
-                    cache.redis_client.delete(key)
-                    count += 1
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning("Redis invalidation scan failed: %s", e)
-    return count
+    return invalidate_tags(f"prefix:{prefix}")
 
 
 # Global cache helper
@@ -18,9 +18,12 @@ Usage:
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
+import threading
+import weakref
 from typing import Any, Optional
 
 import httpx
@@ -344,67 +347,190 @@ def _get_gemini_model():
         return None
 
 
-def embed_text(text: str, task_type: str = "retrieval_document") -> list[float]:
-    """Generate a text embedding through the centralized AI provider boundary.
+# ── Embeddings ───────────────────────────────────────────────────────
+# Point EMBEDDING_SERVICE_URL at scripts/embedding_stub_server.py for local
+# tests and benchmarks.
+EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL", "https://ai-healthcare-model.pavan9b.workers.dev/embed")
+EMBEDDING_DIM = 768
+EMBEDDING_BATCH_SIZE = max(int(os.getenv("EMBEDDING_BATCH_SIZE", "64")), 1)
+EMBEDDING_COALESCE_WINDOW_MS = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", "3"))
+EMBEDDING_CACHE_TTL = 86400  # 24 hours
 
-    This is a synchronous function intentionally kept sync for callers that
-    cannot be async (e.g. startup-time vector store population). Async callers
-    should wrap it with ``asyncio.to_thread(embed_text, text)``.
-    """
-    global _gemini_configured
-    import hashlib
+_embedding_session = None
+_embedding_session_lock = threading.Lock()
 
-    from .cache_service import cache
-    # Generate SHA-256 hash of text to create a compact, unique cache key
+
+def _get_embedding_session():
+    """Keep-alive HTTP session shared by every embedding request."""
+    global _embedding_session
+    if _embedding_session is None:
+        with _embedding_session_lock:
+            if _embedding_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _embedding_session = session
+    return _embedding_session
+
+
+def _embedding_cache_key(text: str, task_type: str) -> str:
+    # SHA-256 of the text keeps the key compact and unique
     text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
-    cache_key = f"emb:{task_type}:{text_hash}"
+    return f"emb:{task_type}:{text_hash}"
 
-    try:
-        cached_val = cache.get(cache_key)
-        if cached_val is not None:
-            return cached_val
-    except Exception as ex_cache:
-        logger.debug("Embedding cache lookup failed: %s", ex_cache)
 
+def _request_embeddings(texts: list[str]) -> Optional[list[list[float]]]:
+    """POST one batch to the embedding worker. Returns ``None`` on any failure."""
     try:
-        # Use Cloudflare Workers AI for embeddings
-        import requests
-        url = "https://ai-healthcare-model.pavan9b.workers.dev/embed"
-
-        response = requests.post(
-            url,
-            json={"text": [text]},
+        response = _get_embedding_session().post(
+            EMBEDDING_SERVICE_URL,
+            json={"text": texts},
             timeout=15.0
         )
         response.raise_for_status()
-
         data = response.json()
+    except Exception as e:
+        logger.error("Error calling embedding API (%s) for %d texts", type(e).__name__, len(texts))
+        return None
 
-        # Cloudflare returns: {"shape": [...], "data": [[...]]}
-        # The vector is the first element of "data"
-        if "data" in data and len(data["data"]) > 0:
-            embedding = data["data"][0]
-            # Ensure it's a list of floats
-            embedding = [float(x) for x in embedding]
+    # Cloudflare returns: {"shape": [...], "data": [[...], ...]} in input order
+    vectors = data.get("data") if isinstance(data, dict) else None
+    if not isinstance(vectors, list) or len(vectors) != len(texts):
+        logger.error("Embedding API returned an unexpected payload for %d texts", len(texts))
+        return None
+    return [[float(x) for x in vector] for vector in vectors]
 
-            try:
-                cache.set(cache_key, embedding, ttl=86400) # Cache for 24 hours
-            except Exception as ex_cache:
-                logger.debug("Embedding cache set failed: %s", ex_cache)
 
-            return embedding
-        else:
-            logger.error(f"Cloudflare embedding format unexpected: {data}")
-            return [0.0] * 768
+def embed_texts(texts: list[str], task_type: str = "retrieval_document") -> list[list[float]]:
+    """Embed many texts with one cache multi-get and batched HTTP calls.
 
-    except Exception as e:
-        logger.error(f"Error calling Cloudflare embedding API: {str(e)}")
-        return [0.0] * 768
+    Vectors are returned in input order. Cached texts, and repeats within
+    ``texts``, are not sent; the rest go out ``EMBEDDING_BATCH_SIZE`` per
+    request over a pooled session. A failed batch yields zero vectors (which
+    are not cached), matching ``embed_text``.
+    """
+    if not texts:
+        return []
+    from .cache_service import cache
+
+    keys = [_embedding_cache_key(text, task_type) for text in texts]
+    try:
+        found = cache.get_many(list(dict.fromkeys(keys)))
+    except Exception as ex_cache:
+        logger.debug("Embedding cache lookup failed: %s", ex_cache)
+        found = {}
+
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+
+    pending = list(missing.items())
+    fresh: dict[str, list[float]] = {}
+    for start in range(0, len(pending), EMBEDDING_BATCH_SIZE):
+        chunk = pending[start:start + EMBEDDING_BATCH_SIZE]
+        vectors = _request_embeddings([text for _, text in chunk])
+        for index, (key, _) in enumerate(chunk):
+            if vectors is None:
+                found[key] = [0.0] * EMBEDDING_DIM
+            else:
+                found[key] = fresh[key] = vectors[index]
+
+    if fresh:
+        try:
+            cache.set_many(fresh, ttl=EMBEDDING_CACHE_TTL)
+        except Exception as ex_cache:
+            logger.debug("Embedding cache set failed: %s", ex_cache)
+
+    return [found[key] for key in keys]
+
+
+def embed_text(text: str, task_type: str = "retrieval_document") -> list[float]:
+    """Generate a text embedding through the centralized AI provider boundary.
+
+    This is a synchronous function intentionally kept sync for callers that
+    cannot be async (e.g. startup-time vector store population). Async callers
+    should use ``embed_text_async``, which coalesces concurrent calls.
+    """
+    return embed_texts([text], task_type)[0]
+
+
+class _EmbeddingCoalescer:
+    """Merges concurrent ``embed_text_async`` calls on one event loop into batches.
+
+    The first call in a window schedules a flush ``EMBEDDING_COALESCE_WINDOW_MS``
+    later and a full batch flushes at once; each flush is a single
+    ``embed_texts`` call per task type, run in a worker thread.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def embed(self, text: str, task_type: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(task_type, [])
+        batch.append((text, future))
+        if len(batch) >= EMBEDDING_BATCH_SIZE:
+            self._dispatch(task_type)
+        elif self._timer is None:
+            self._timer = loop.call_later(EMBEDDING_COALESCE_WINDOW_MS / 1000.0, self._dispatch_all)
+        return await future
+
+    def _dispatch_all(self) -> None:
+        self._timer = None
+        for task_type in list(self._pending):
+            self._dispatch(task_type)
+
+    def _dispatch(self, task_type: str) -> None:
+        batch = self._pending.pop(task_type, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(task_type, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, task_type: str, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            if len(texts) == 1:
+                vectors = [await asyncio.to_thread(embed_text, texts[0], task_type)]
+            else:
+                vectors = await asyncio.to_thread(embed_texts, texts, task_type)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+_embedding_coalescers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _EmbeddingCoalescer]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 async def embed_text_async(text: str, task_type: str = "retrieval_document") -> list[float]:
-    """Async wrapper for embed_text — use this from async route handlers."""
-    return await asyncio.to_thread(embed_text, text, task_type)
+    """Async embedding for route handlers; concurrent calls share batched requests."""
+    if EMBEDDING_COALESCE_WINDOW_MS <= 0:
+        return await asyncio.to_thread(embed_text, text, task_type)
+    loop = asyncio.get_running_loop()
+    coalescer = _embedding_coalescers.get(loop)
+    if coalescer is None:
+        coalescer = _embedding_coalescers[loop] = _EmbeddingCoalescer()
+    return await coalescer.embed(text, task_type)
+
+
+async def embed_texts_async(texts: list[str], task_type: str = "retrieval_document") -> list[list[float]]:
+    """Async wrapper for embed_texts."""
+    return await asyncio.to_thread(embed_texts, texts, task_type)
 
 
 def generate_vision_content(prompt: str, image: Any, model: Optional[str] = None) -> str:
@@ -3,20 +3,38 @@ Data Expectations — Lightweight Data Quality Engine
 ===================================================
 A Great Expectations-compatible schema and statistics validation framework
 for cleaning, preprocessing, and model ingestion boundary checks.
+
+Suites are compiled into a single-pass plan: each chunk is materialized once
+and every expectation is evaluated over its column buffers, producing
+mergeable partial aggregates (null counts, min/max, sums, violation counts,
+distinct-value sketches) that can be computed in a process pool across chunks
+and files and merged into one report.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-import re
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None
+    pq = None
+
 logger = logging.getLogger(__name__)
 
 VALIDATION_RESULTS_DIR = Path("data/validation_results")
@@ -50,96 +68,195 @@ class SuiteValidationReport:
     success_rate: float = 1.0
     results: List[Dict[str, Any]] = field(default_factory=list)
 
-class ExpectationRunner:
-    """Evaluates data suites and registers quality outcomes to local validation logs."""
+# Partial aggregates are exact except distinct counts, which use a k-minimum-values
+# sketch: exact below this many distinct values, ~1/sqrt(k) relative error above.
+DISTINCT_SKETCH_SIZE = int(os.getenv("EXPECTATION_DISTINCT_SKETCH_SIZE", "16384"))
+INVALID_VALUE_SAMPLES = 5
 
-    def __init__(self) -> None:
-        self._suites: Dict[str, ExpectationSuite] = {}
-        VALIDATION_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-        self._setup_default_suites()
+_ROW_COUNT = "expect_table_row_count_between"
+_COLUMN_EXISTS = "expect_column_to_exist"
 
-    def create_suite(self, suite_name: str, dataset_name: str) -> ExpectationSuite:
-        """Instantiates a new suite container."""
-        suite = ExpectationSuite(suite_name=suite_name, dataset_name=dataset_name)
-        self._suites[suite_name] = suite
-        return suite
 
-    def add_expectation(self, suite_name: str, expectation: Expectation) -> None:
-        """Appends an expectation validation definition to a suite."""
-        suite = self._suites.get(suite_name)
-        if not suite:
-            raise ValueError(f"Suite {suite_name} does not exist.")
-        suite.expectations.append(expectation)
+def _value_hashes(values: pd.Series) -> np.ndarray:
+    """64-bit hashes of non-null values; equal numbers hash equally across int and float chunks.
 
-    def validate(self, suite_name: str, data: Union[List[Dict[str, Any]], pd.DataFrame], chunk_size: int = 5000) -> SuiteValidationReport:
-        """Validates input records or DataFrame against a registered suite."""
-        suite = self._suites.get(suite_name)
-        if not suite:
-            raise ValueError(f"Suite {suite_name} not found.")
+    Integers are hashed as int64 (float64 would merge values above 2**53), and
+    integral floats are hashed as the same int64 so a column inferred as int
+    in one chunk and float in another is not double counted.
+    """
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_integer_dtype(values):
+        array = values.to_numpy()
+        return pd.util.hash_array(array.view(np.int64) if array.dtype == np.uint64 else array.astype(np.int64))
+    if pd.api.types.is_float_dtype(values):
+        array = values.to_numpy(dtype=np.float64)
+        integral = np.isfinite(array) & (np.floor(array) == array) & (np.abs(array) < 2.0 ** 63)
+        hashes = pd.util.hash_array(array)
+        hashes[integral] = pd.util.hash_array(array[integral].astype(np.int64))
+        return hashes
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.util.hash_array(values.to_numpy(dtype=np.float64))
+    return pd.util.hash_array(values.to_numpy(dtype=object))
 
-        report = SuiteValidationReport(suite_name=suite_name, dataset_name=suite.dataset_name)
-        results: List[ValidationResult] = []
 
-        is_record_list = isinstance(data, list)
-        total_rows = len(data)
-        if total_rows == 0:
-            report.success = False
-            report.success_rate = 0.0
-            report.results.append({
-                "success": False,
-                "message": "Dataset is empty. Cannot run validations.",
-                "severity": "CRITICAL"
-            })
-            self._save_report(report)
-            return report
+class DistinctSketch:
+    """Mergeable k-minimum-values sketch over 64-bit value hashes."""
 
-        # Check if the dataset size warrants chunked validation to be memory-safe
-        use_chunked = total_rows > chunk_size
-        df = None if use_chunked else pd.DataFrame(data) if is_record_list else data
+    def __init__(self, k: int = DISTINCT_SKETCH_SIZE) -> None:
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
 
-        for expectation in suite.expectations:
-            if use_chunked:
-                res = self._run_chunked_expectation(data, expectation, chunk_size=chunk_size)
-            else:
-                assert df is not None
-                res = self._run_single_expectation(df, expectation)
-            results.append(res)
+    def add(self, values: pd.Series) -> None:
+        if values.empty:
+            return
+        self.hashes = np.union1d(self.hashes, np.unique(_value_hashes(values)))[: self.k]
 
-        success_count = sum(1 for r in results if r.success)
-        total_count = len(results)
+    def merge(self, other: "DistinctSketch") -> None:
+        self.hashes = np.union1d(self.hashes, other.hashes)[: self.k]
 
-        report.success = success_count == total_count
-        report.success_rate = success_count / total_count if total_count > 0 else 1.0
-        report.results = [
-            {
-                "success": r.success,
-                "observed": r.observed_value,
-                "message": r.message,
-                "expectation_type": r.expectation.expectation_type,
-                "column": r.expectation.column,
-                "severity": r.expectation.severity
-            }
-            for r in results
-        ]
+    def estimate(self) -> int:
+        if len(self.hashes) < self.k:
+            return int(len(self.hashes))
+        return int(round((self.k - 1) / (float(self.hashes[-1]) / 2.0 ** 64)))
+
+
+@dataclass
+class ColumnPartial:
+    """Mergeable per-column aggregates for one chunk (or a merge of chunks)."""
+    present: bool = False
+    null_count: int = 0
+    count: int = 0
+    total: float = 0.0
+    minimum: Any = None
+    maximum: Any = None
+    violations: Dict[int, int] = field(default_factory=dict)
+    invalid_samples: Dict[int, List[Any]] = field(default_factory=dict)
+    distinct: Optional[DistinctSketch] = None
+
+    def observe_range(self, low: Any, high: Any) -> None:
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+
+    def merge(self, other: "ColumnPartial") -> None:
+        self.present = self.present or other.present
+        self.null_count += other.null_count
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None:
+            self.observe_range(other.minimum, other.maximum)
+        for index, failed in other.violations.items():
+            self.violations[index] = self.violations.get(index, 0) + failed
+        for index, samples in other.invalid_samples.items():
+            merged = self.invalid_samples.setdefault(index, [])
+            merged.extend(v for v in samples if v not in merged)
+            del merged[INVALID_VALUE_SAMPLES:]
+        if other.distinct is not None:
+            if self.distinct is None:
+                self.distinct = DistinctSketch(other.distinct.k)
+            self.distinct.merge(other.distinct)
 
-        self._save_report(report)
-        return report
 
-    def _run_single_expectation(self, df: pd.DataFrame, exp: Expectation) -> ValidationResult:
+@dataclass
+class SuitePartial:
+    """Row count, column order and column partials; merging is associative."""
+    row_count: int = 0
+    columns: Dict[str, None] = field(default_factory=dict)
+    stats: Dict[str, ColumnPartial] = field(default_factory=dict)
+
+    def merge(self, other: "SuitePartial") -> "SuitePartial":
+        self.row_count += other.row_count
+        self.columns.update(other.columns)
+        for column, partial in other.stats.items():
+            self.stats.setdefault(column, ColumnPartial()).merge(partial)
+        return self
+
+
+class CompiledSuite:
+    """An expectation suite compiled into a single-pass, per-column evaluation plan."""
+
+    def __init__(self, suite: ExpectationSuite) -> None:
+        self.suite = suite
+        self.plan: Dict[str, List[Tuple[int, Expectation]]] = {}
+        for index, exp in enumerate(suite.expectations):
+            if exp.expectation_type not in (_ROW_COUNT, _COLUMN_EXISTS) and exp.column is not None:
+                self.plan.setdefault(exp.column, []).append((index, exp))
+
+    def evaluate_chunk(self, chunk: pd.DataFrame) -> SuitePartial:
+        partial = SuitePartial(row_count=len(chunk), columns=dict.fromkeys(chunk.columns))
+        for column, expectations in self.plan.items():
+            stats = partial.stats[column] = ColumnPartial()
+            if column not in chunk.columns:
+                stats.null_count = len(chunk)
+                continue
+            series = chunk[column]
+            nulls = series.isna()
+            non_null = series[~nulls]
+            stats.present = True
+            stats.null_count = int(nulls.sum())
+            stats.count = len(non_null)
+            types = {exp.expectation_type for _, exp in expectations}
+            if "expect_column_values_between" in types and not non_null.empty:
+                stats.observe_range(non_null.min(), non_null.max())
+            if "expect_column_mean_between" in types:
+                stats.total = float(non_null.sum())
+            if "expect_column_unique_value_count_between" in types:
+                stats.distinct = DistinctSketch()
+                stats.distinct.add(non_null)
+            for index, exp in expectations:
+                self._count_violations(stats, index, exp, series, non_null)
+        return partial
+
+    @staticmethod
+    def _count_violations(stats: ColumnPartial, index: int, exp: Expectation, series: pd.Series, non_null: pd.Series) -> None:
+        t = exp.expectation_type
+        kwargs = exp.kwargs
+        if t == "expect_column_values_in_set":
+            invalid = series[~series.isin(set(kwargs.get("value_set", [])))]
+            stats.violations[index] = len(invalid)
+            stats.invalid_samples[index] = list(invalid.unique()[:INVALID_VALUE_SAMPLES])
+        elif t == "expect_column_values_between":
+            failed = 0
+            if kwargs.get("min_value") is not None:
+                failed += int((non_null < kwargs["min_value"]).sum())
+            if kwargs.get("max_value") is not None:
+                failed += int((non_null > kwargs["max_value"]).sum())
+            stats.violations[index] = failed
+        elif t == "expect_column_values_to_match_regex":
+            matches = non_null.astype(str).str.match(kwargs.get("regex", ""))
+            stats.violations[index] = int((~matches).sum())
+
+    def finalize(self, partial: SuitePartial) -> List[ValidationResult]:
+        return [self._result(index, exp, partial) for index, exp in enumerate(self.suite.expectations)]
+
+    def _result(self, index: int, exp: Expectation, partial: SuitePartial) -> ValidationResult:
         t = exp.expectation_type
         col = exp.column
         kwargs = exp.kwargs
+        columns = list(partial.columns)
 
-        if t == "expect_column_to_exist":
-            exists = col in df.columns
+        if t == _COLUMN_EXISTS:
+            exists = col in partial.columns
             return ValidationResult(
                 success=exists,
                 expectation=exp,
-                observed_value=list(df.columns),
+                observed_value=columns,
                 message=f"Column '{col}' exists" if exists else f"Column '{col}' is missing"
             )
 
-        if col not in df.columns:
+        if t == _ROW_COUNT:
+            min_rows = kwargs.get("min_value", 0)
+            max_rows = kwargs.get("max_value", 100000000)
+            success = min_rows <= partial.row_count <= max_rows
+            return ValidationResult(
+                success=success,
+                expectation=exp,
+                observed_value=partial.row_count,
+                message=f"Row count {partial.row_count} is between {min_rows} and {max_rows}"
+            )
+
+        stats = partial.stats.get(col) if col is not None else None
+        if stats is None or not stats.present:
             return ValidationResult(
                 success=False,
                 expectation=exp,
@@ -147,43 +264,29 @@ class ExpectationRunner:
                 message=f"Evaluation column '{col}' missing from data."
             )
 
-        series = df[col]
-
         if t == "expect_column_values_not_null":
-            null_count = int(series.isnull().sum())
-            success = null_count == 0
+            success = stats.null_count == 0
             return ValidationResult(
                 success=success,
                 expectation=exp,
-                observed_value=f"{null_count} nulls",
-                message=f"All values in '{col}' are non-null" if success else f"Found {null_count} nulls in '{col}'"
+                observed_value=f"{stats.null_count} nulls",
+                message=f"All values in '{col}' are non-null" if success else f"Found {stats.null_count} nulls in '{col}'"
             )
 
         elif t == "expect_column_values_in_set":
-            allowed = set(kwargs.get("value_set", []))
-            invalid_series = series[~series.isin(allowed)]
-            success = invalid_series.empty
+            success = stats.violations.get(index, 0) == 0
             return ValidationResult(
                 success=success,
                 expectation=exp,
-                observed_value=list(invalid_series.unique()[:5]) if not success else [],
+                observed_value=stats.invalid_samples.get(index, []) if not success else [],
                 message=f"All values in '{col}' are within the permitted set" if success else f"Found invalid values in '{col}'"
             )
 
         elif t == "expect_column_values_between":
             min_val = kwargs.get("min_value")
             max_val = kwargs.get("max_value")
-
-            # Filter non-null to avoid null issues in range comparisons
-            non_null = series.dropna()
-            out_of_bounds = pd.Series()
-            if min_val is not None:
-                out_of_bounds = non_null[non_null < min_val]
-            if max_val is not None:
-                out_of_bounds = pd.concat([out_of_bounds, non_null[non_null > max_val]])
-
-            success = out_of_bounds.empty
-            observed = f"Range: [{non_null.min()}, {non_null.max()}]" if not non_null.empty else "N/A"
+            success = stats.violations.get(index, 0) == 0
+            observed = f"Range: [{stats.minimum}, {stats.maximum}]" if stats.minimum is not None else "N/A"
             return ValidationResult(
                 success=success,
                 expectation=exp,
@@ -194,7 +297,7 @@ class ExpectationRunner:
         elif t == "expect_column_mean_between":
             min_mean = kwargs.get("min_value")
             max_mean = kwargs.get("max_value")
-            mean_val = float(series.mean())
+            mean_val = stats.total / stats.count if stats.count else float("nan")
             success = True
             if min_mean is not None and mean_val < min_mean:
                 success = False
@@ -207,34 +310,20 @@ class ExpectationRunner:
                 message=f"Mean of '{col}' is {mean_val:.2f} (expected [{min_mean}, {max_mean}])"
             )
 
-        elif t == "expect_table_row_count_between":
-            min_rows = kwargs.get("min_value", 0)
-            max_rows = kwargs.get("max_value", 100000000)
-            row_count = len(df)
-            success = min_rows <= row_count <= max_rows
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=row_count,
-                message=f"Row count {row_count} is between {min_rows} and {max_rows}"
-            )
-
         elif t == "expect_column_values_to_match_regex":
             pattern = kwargs.get("regex", "")
-            regex = re.compile(pattern)
-            invalid_matches = series.dropna().astype(str).apply(lambda x: not bool(regex.match(x)))
-            success = not invalid_matches.any()
+            violations = stats.violations.get(index, 0)
             return ValidationResult(
-                success=success,
+                success=violations == 0,
                 expectation=exp,
-                observed_value=f"{invalid_matches.sum()} violations",
+                observed_value=f"{violations} violations",
                 message=f"All values in '{col}' match expression '{pattern}'"
             )
 
         elif t == "expect_column_unique_value_count_between":
             min_val = kwargs.get("min_value", 0)
             max_val = kwargs.get("max_value", 1000000)
-            unique_count = int(series.nunique())
+            unique_count = stats.distinct.estimate() if stats.distinct is not None else 0
             success = min_val <= unique_count <= max_val
             return ValidationResult(
                 success=success,
@@ -250,183 +339,156 @@ class ExpectationRunner:
             message="Unrecognized expectation type, skipped validation."
         )
 
-    def _run_chunked_expectation(
-        self,
-        data: Union[List[Dict[str, Any]], pd.DataFrame],
-        exp: Expectation,
-        chunk_size: int = 5000,
-    ) -> ValidationResult:
-        t = exp.expectation_type
-        col = exp.column
-        kwargs = exp.kwargs
-        is_record_list = isinstance(data, list)
-        total_rows = len(data)
-        if is_record_list:
-            columns = list(dict.fromkeys(key for record in data for key in record))
+
+def iter_chunks(data: Any, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield ``data`` (records, DataFrame or Arrow table) as DataFrames of at most ``chunk_size`` rows."""
+    if HAS_PYARROW and isinstance(data, (pa.Table, pa.RecordBatch)):
+        for batch in data.to_batches(max_chunksize=chunk_size):
+            yield batch.to_pandas()
+        return
+    for start in range(0, len(data), chunk_size):
+        if isinstance(data, list):
+            yield pd.DataFrame(data[start:start + chunk_size])
         else:
-            columns = list(data.columns)
+            yield data.iloc[start:start + chunk_size]
+
+
+def _iter_file_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required to validate Parquet files.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif suffix in (".jsonl", ".ndjson"):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def _evaluate_chunk(compiled: CompiledSuite, chunk: pd.DataFrame) -> SuitePartial:
+    return compiled.evaluate_chunk(chunk)
+
+
+def _evaluate_file(compiled: CompiledSuite, path: str, chunk_size: int) -> SuitePartial:
+    partial = SuitePartial()
+    for chunk in _iter_file_chunks(path, chunk_size):
+        partial.merge(compiled.evaluate_chunk(chunk))
+    return partial
+
+
+def _run_tasks(fn: Any, tasks: Iterable[Tuple[Any, ...]], workers: int) -> Optional[SuitePartial]:
+    """Evaluate tasks (in a process pool when ``workers > 1``) and merge their partials in order."""
+    merged: Optional[SuitePartial] = None
+    if workers <= 1:
+        for task in tasks:
+            partial = fn(*task)
+            merged = partial if merged is None else merged.merge(partial)
+        return merged
+
+    pending: "deque[Any]" = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for task in tasks:
+            pending.append(pool.submit(fn, *task))
+            # Bound in-flight chunks so large inputs are not all pickled up front
+            if len(pending) >= workers * 2:
+                partial = pending.popleft().result()
+                merged = partial if merged is None else merged.merge(partial)
+        while pending:
+            partial = pending.popleft().result()
+            merged = partial if merged is None else merged.merge(partial)
+    return merged
 
-        if t == "expect_column_to_exist":
-            exists = col in columns
-            return ValidationResult(
-                success=exists,
-                expectation=exp,
-                observed_value=columns,
-                message=f"Column '{col}' exists" if exists else f"Column '{col}' is missing"
-            )
 
-        if t == "expect_table_row_count_between":
-            min_rows = kwargs.get("min_value", 0)
-            max_rows = kwargs.get("max_value", 100000000)
-            success = min_rows <= total_rows <= max_rows
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=total_rows,
-                message=f"Row count {total_rows} is between {min_rows} and {max_rows}"
-            )
-
-        if col not in columns:
-            return ValidationResult(
-                success=False,
-                expectation=exp,
-                observed_value=None,
-                message=f"Evaluation column '{col}' missing from data."
-            )
+class ExpectationRunner:
+    """Evaluates data suites and registers quality outcomes to local validation logs."""
 
-        null_count = 0
-        invalid_values = set()
-        out_of_bounds_count = 0
-        min_val = None
-        max_val = None
-        running_sum = 0.0
-        running_count = 0
-        unique_values = set()
-        regex_violations = 0
-
-        for start in range(0, total_rows, chunk_size):
-            if is_record_list:
-                chunk = pd.DataFrame(data[start:start + chunk_size])
-            else:
-                chunk = data.iloc[start:start + chunk_size]
-            if col in chunk.columns:
-                series = chunk[col]
-            else:
-                series = pd.Series([None] * len(chunk), index=chunk.index, dtype=object)
-
-            if t == "expect_column_values_not_null":
-                null_count += int(series.isnull().sum())
-
-            elif t == "expect_column_values_in_set":
-                allowed = set(kwargs.get("value_set", []))
-                invalid_series = series[~series.isin(allowed)]
-                if not invalid_series.empty:
-                    invalid_values.update(invalid_series.unique())
-
-            elif t == "expect_column_values_between":
-                min_limit = kwargs.get("min_value")
-                max_limit = kwargs.get("max_value")
-                non_null = series.dropna()
-                if not non_null.empty:
-                    if min_val is None or non_null.min() < min_val:
-                        min_val = non_null.min()
-                    if max_val is None or non_null.max() > max_val:
-                        max_val = non_null.max()
-                    if min_limit is not None:
-                        out_of_bounds_count += int((non_null < min_limit).sum())
-                    if max_limit is not None:
-                        out_of_bounds_count += int((non_null > max_limit).sum())
-
-            elif t == "expect_column_mean_between":
-                non_null = series.dropna()
-                running_sum += float(non_null.sum())
-                running_count += int(non_null.count())
-
-            elif t == "expect_column_values_to_match_regex":
-                import re
-                pattern = kwargs.get("regex", "")
-                regex = re.compile(pattern)
-                invalid_matches = series.dropna().astype(str).apply(lambda x: not bool(regex.match(x)))
-                regex_violations += int(invalid_matches.sum())
-
-            elif t == "expect_column_unique_value_count_between":
-                unique_values.update(series.dropna().unique())
+    def __init__(self) -> None:
+        self._suites: Dict[str, ExpectationSuite] = {}
+        VALIDATION_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        self._setup_default_suites()
 
-        if t == "expect_column_values_not_null":
-            success = null_count == 0
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=f"{null_count} nulls",
-                message=f"All values in '{col}' are non-null" if success else f"Found {null_count} nulls in '{col}'"
-            )
+    def create_suite(self, suite_name: str, dataset_name: str) -> ExpectationSuite:
+        """Instantiates a new suite container."""
+        suite = ExpectationSuite(suite_name=suite_name, dataset_name=dataset_name)
+        self._suites[suite_name] = suite
+        return suite
 
-        elif t == "expect_column_values_in_set":
-            success = len(invalid_values) == 0
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=list(invalid_values)[:5] if not success else [],
-                message=f"All values in '{col}' are within the permitted set" if success else f"Found invalid values in '{col}'"
-            )
+    def add_expectation(self, suite_name: str, expectation: Expectation) -> None:
+        """Appends an expectation validation definition to a suite."""
+        suite = self._suites.get(suite_name)
+        if not suite:
+            raise ValueError(f"Suite {suite_name} does not exist.")
+        suite.expectations.append(expectation)
 
-        elif t == "expect_column_values_between":
-            success = out_of_bounds_count == 0
-            observed = f"Range: [{min_val}, {max_val}]" if min_val is not None else "N/A"
-            min_limit = kwargs.get("min_value")
-            max_limit = kwargs.get("max_value")
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=observed,
-                message=f"All values in '{col}' are between {min_limit} and {max_limit}" if success else f"Found values in '{col}' outside [{min_limit}, {max_limit}]"
-            )
+    def validate(
+        self,
+        suite_name: str,
+        data: Union[List[Dict[str, Any]], pd.DataFrame, Any],
+        chunk_size: int = 5000,
+        workers: int = 1,
+    ) -> SuiteValidationReport:
+        """Validates input records, a DataFrame or an Arrow table against a registered suite.
 
-        elif t == "expect_column_mean_between":
-            min_mean = kwargs.get("min_value")
-            max_mean = kwargs.get("max_value")
-            mean_val = running_sum / running_count if running_count > 0 else 0.0
-            success = True
-            if min_mean is not None and mean_val < min_mean:
-                success = False
-            if max_mean is not None and mean_val > max_mean:
-                success = False
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=mean_val,
-                message=f"Mean of '{col}' is {mean_val:.2f} (expected [{min_mean}, {max_mean}])"
-            )
+        All expectations are evaluated together in one pass per chunk; with
+        ``workers > 1`` chunks are evaluated in a process pool.
+        """
+        suite = self._suites.get(suite_name)
+        if not suite:
+            raise ValueError(f"Suite {suite_name} not found.")
+        compiled = CompiledSuite(suite)
+        partial = _run_tasks(_evaluate_chunk, ((compiled, chunk) for chunk in iter_chunks(data, chunk_size)), workers)
+        return self._build_report(compiled, partial)
 
-        elif t == "expect_column_values_to_match_regex":
-            pattern = kwargs.get("regex", "")
-            success = regex_violations == 0
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=f"{regex_violations} violations",
-                message=f"All values in '{col}' match expression '{pattern}'"
-            )
+    def validate_files(
+        self,
+        suite_name: str,
+        paths: List[Union[str, Path]],
+        chunk_size: int = 50000,
+        workers: int = 1,
+    ) -> SuiteValidationReport:
+        """Validates CSV, JSON Lines or Parquet files as one dataset, one file per worker."""
+        suite = self._suites.get(suite_name)
+        if not suite:
+            raise ValueError(f"Suite {suite_name} not found.")
+        compiled = CompiledSuite(suite)
+        partial = _run_tasks(_evaluate_file, [(compiled, str(path), chunk_size) for path in paths], workers)
+        return self._build_report(compiled, partial)
+
+    def _build_report(self, compiled: "CompiledSuite", partial: Optional["SuitePartial"]) -> SuiteValidationReport:
+        suite = compiled.suite
+        report = SuiteValidationReport(suite_name=suite.suite_name, dataset_name=suite.dataset_name)
+        if partial is None or partial.row_count == 0:
+            report.success = False
+            report.success_rate = 0.0
+            report.results.append({
+                "success": False,
+                "message": "Dataset is empty. Cannot run validations.",
+                "severity": "CRITICAL"
+            })
+            self._save_report(report)
+            return report
 
-        elif t == "expect_column_unique_value_count_between":
-            min_val_limit = kwargs.get("min_value", 0)
-            max_val_limit = kwargs.get("max_value", 1000000)
-            unique_count = len(unique_values)
-            success = min_val_limit <= unique_count <= max_val_limit
-            return ValidationResult(
-                success=success,
-                expectation=exp,
-                observed_value=unique_count,
-                message=f"Unique value count is {unique_count} (expected [{min_val_limit}, {max_val_limit}])"
-            )
+        results = compiled.finalize(partial)
+        success_count = sum(1 for r in results if r.success)
+        total_count = len(results)
 
-        return ValidationResult(
-            success=True,
-            expectation=exp,
-            observed_value=None,
-            message="Unrecognized expectation type, skipped validation."
-        )
+        report.success = success_count == total_count
+        report.success_rate = success_count / total_count if total_count > 0 else 1.0
+        report.results = [
+            {
+                "success": r.success,
+                "observed": r.observed_value,
+                "message": r.message,
+                "expectation_type": r.expectation.expectation_type,
+                "column": r.expectation.column,
+                "severity": r.expectation.severity
+            }
+            for r in results
+        ]
 
+        self._save_report(report)
+        return report
 
     def _save_report(self, report: SuiteValidationReport) -> None:
         """Persists validation report to JSON."""
@@ -2,20 +2,47 @@
 Lakehouse SQL Engine — SQL Query Engine Over Clinical Data Lake.
 
 Provides:
-- SQL parsing and execution over in-memory lakehouse tables
-- Parameterized query support
-- Query profiling with execution metrics
+- SQL execution pushed down to DuckDB over the lakehouse tables' Arrow data
+  (zero-copy registration; joins, aggregates, GROUP BY, window functions)
+- Parameterized query support (``$name`` or ``?`` placeholders)
+- Query profiling with rows scanned, bytes read and per-operator timings
+- Result cache keyed by (SQL, parameters, table identities and versions)
 - Result set pagination
 - Warehouse endpoint abstraction for cloud lakehouse migration
+
+Queries run on an in-memory DuckDB with external (file/network) access
+disabled and only single SELECT statements accepted, so SQL can read the
+registered lakehouse tables and nothing else. Without DuckDB installed the
+engine falls back to the original single-table Python evaluator.
 """
 
+import json
+import os
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from backend.data_platform.open_table_format import HAS_PYARROW, LakehouseTable, open_table_engine
 
-from pydantic import BaseModel
+# Conditional DuckDB import for Zero-Config fallback
+try:
+    import duckdb
+    HAS_DUCKDB = HAS_PYARROW
+except ImportError:
+    HAS_DUCKDB = False
+    duckdb = None  # type: ignore
 
-from backend.data_platform.open_table_format import open_table_engine
+LAKEHOUSE_SQL_CACHE_SIZE = int(os.getenv("LAKEHOUSE_SQL_CACHE_SIZE", "128"))
+
+# Result columns renamed for compatibility with the earlier evaluator's output
+_COLUMN_ALIASES = {"count_star()": "count"}
+_SCAN_OPERATORS = {"TABLE_SCAN", "ARROW_SCAN"}
+
+Params = Optional[Union[Dict[str, Any], Sequence[Any]]]
 
 
 class QueryProfile(BaseModel):
@@ -24,8 +51,13 @@ class QueryProfile(BaseModel):
     sql: str
     rows_scanned: int = 0
     rows_returned: int = 0
+    bytes_read: int = 0
     execution_time_ms: float = 0.0
     warehouse_id: str = "default"
+    engine: str = "duckdb"
+    cache_hit: bool = False
+    table_versions: Dict[str, int] = Field(default_factory=dict)
+    operators: List[Dict[str, Any]] = Field(default_factory=list)
 
 
 class SQLResultSet(BaseModel):
@@ -38,18 +70,124 @@ class SQLResultSet(BaseModel):
 
 class LakehouseSQLEngine:
     """
-    Executes SQL-like queries against lakehouse ACID tables.
+    Executes SQL queries against lakehouse ACID tables.
 
-    Supports SELECT with WHERE, ORDER BY, LIMIT, and COUNT(*).
-    Designed for open-standard lakehouse SQL migration compatibility.
+    Each referenced table is registered with DuckDB as its Arrow snapshot
+    (current version, or the version given in ``versions``), so scans read the
+    table's data files in place. Designed for open-standard lakehouse SQL
+    migration compatibility.
     """
 
-    def __init__(self, warehouse_id: str = "clinical-warehouse-01") -> None:
+    def __init__(self, warehouse_id: str = "clinical-warehouse-01", cache_size: int = LAKEHOUSE_SQL_CACHE_SIZE) -> None:
         self.warehouse_id = warehouse_id
+        self.cache_size = cache_size
         self._query_history: List[QueryProfile] = []
+        self._cache: "OrderedDict[Tuple[Any, ...], SQLResultSet]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if HAS_DUCKDB:
+            self._conn = duckdb.connect(":memory:", config={"enable_external_access": False})
 
-    def execute(self, sql: str, params: Optional[Dict[str, Any]] = None) -> SQLResultSet:
+    def execute(self, sql: str, params: Params = None, versions: Optional[Dict[str, int]] = None) -> SQLResultSet:
         """Execute a SQL query against registered lakehouse tables."""
+        if self._conn is None:
+            return self._execute_python(sql)
+        start = time.time()
+        statements = self._conn.extract_statements(sql)
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise ValueError("Only a single SELECT statement is supported.")
+
+        tables = self._resolve_tables(self._referenced_tables(sql))
+        if not tables:
+            return self._empty_result(sql, start)
+        pinned = {name: (versions or {}).get(name, table.current_version) for name, table in tables.items()}
+
+        cache_key = (
+            sql,
+            _params_key(params),
+            tuple(sorted((name, tables[name].table_id, version) for name, version in pinned.items())),
+        )
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+        if cached is not None:
+            profile = cached.profile.model_copy(update={
+                "query_id": _query_id(),
+                "cache_hit": True,
+                "rows_scanned": 0,
+                "bytes_read": 0,
+                "execution_time_ms": round((time.time() - start) * 1000, 3),
+            })
+            return self._record(cached.model_copy(update={"profile": profile}))
+
+        relations = {name: table.read_arrow(version=pinned[name]) for name, table in tables.items()}
+        cursor = self._conn.cursor()
+        try:
+            for name, relation in relations.items():
+                cursor.register(name, relation)
+            cursor.execute("PRAGMA enable_profiling='no_output'")
+            result = cursor.execute(sql, params).to_arrow_table() if params is not None else cursor.execute(sql).to_arrow_table()
+            plan = json.loads(cursor.get_profiling_information(format="json"))
+        finally:
+            cursor.close()
+
+        columns = [_COLUMN_ALIASES.get(name, name) for name in result.column_names]
+        rows = result.rename_columns(columns).to_pylist()
+        operators = _operator_timings(plan)
+        profile = QueryProfile(
+            query_id=_query_id(),
+            sql=sql,
+            rows_scanned=sum(relations[name].num_rows for name in relations),
+            rows_returned=len(rows),
+            bytes_read=_scanned_bytes(plan, relations),
+            execution_time_ms=round((time.time() - start) * 1000, 3),
+            warehouse_id=self.warehouse_id,
+            table_versions=pinned,
+            operators=operators,
+        )
+        result_set = SQLResultSet(columns=columns, rows=rows, total_count=len(rows), profile=profile)
+        with self._lock:
+            self._cache[cache_key] = result_set
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return self._record(result_set)
+
+    def _referenced_tables(self, sql: str) -> List[str]:
+        """Base table names in the parsed query (bind parameters allowed)."""
+        cursor = self._conn.cursor()
+        try:
+            tree = json.loads(cursor.execute("SELECT json_serialize_sql($sql)", {"sql": sql}).fetchone()[0])
+        finally:
+            cursor.close()
+        if tree.get("error"):
+            raise ValueError(tree.get("error_message", "Invalid SQL"))
+        return [node["table_name"] for node in _walk_ast(tree) if node.get("type") == "BASE_TABLE"]
+
+    def _resolve_tables(self, referenced: Sequence[str]) -> Dict[str, LakehouseTable]:
+        """Map names referenced in the SQL to lakehouse tables (case-insensitive)."""
+        registered = {name.lower(): name for name in open_table_engine.list_tables()}
+        tables = {}
+        for ref in referenced:
+            name = registered.get(ref.lower())
+            if name is not None:
+                tables[name] = open_table_engine.get_table(name)
+        return tables
+
+    def _record(self, result_set: SQLResultSet) -> SQLResultSet:
+        with self._lock:
+            self._query_history.append(result_set.profile)
+        return result_set
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _execute_python(self, sql: str) -> SQLResultSet:
+        """Single-table evaluator used when DuckDB is not installed.
+
+        Supports SELECT with one ``col = value`` WHERE, ORDER BY, LIMIT, and COUNT(*).
+        """
         start = time.time()
         sql_upper = sql.strip().upper()
 
@@ -58,16 +196,10 @@ class LakehouseSQLEngine:
         if not table_match:
             return self._empty_result(sql, start)
 
-        table_name = table_match.group(1).lower()
-        # Try to match against registered tables (case-insensitive)
-        table = None
-        for tname in open_table_engine.list_tables():
-            if tname.lower() == table_name:
-                table = open_table_engine.get_table(tname)
-                break
-
-        if table is None:
+        tables = self._resolve_tables([table_match.group(1)])
+        if not tables:
             return self._empty_result(sql, start)
+        table = next(iter(tables.values()))
 
         data = table.read()
         rows_scanned = len(data)
@@ -81,49 +213,35 @@ class LakehouseSQLEngine:
 
         # COUNT(*) support
         if "COUNT(*)" in sql_upper:
-            elapsed = (time.time() - start) * 1000
-            profile = QueryProfile(
-                query_id=f"Q-{int(time.time()*1000)}",
-                sql=sql, rows_scanned=rows_scanned,
-                rows_returned=1, execution_time_ms=round(elapsed, 3),
-                warehouse_id=self.warehouse_id,
-            )
-            self._query_history.append(profile)
-            return SQLResultSet(
-                columns=["count"], rows=[{"count": len(data)}],
-                total_count=1, profile=profile,
-            )
-
-        # ORDER BY
-        order_match = re.search(r"ORDER\s+BY\s+(\w+)(?:\s+(ASC|DESC))?", sql, re.IGNORECASE)
-        if order_match:
-            col = order_match.group(1)
-            desc = (order_match.group(2) or "ASC").upper() == "DESC"
-            data.sort(key=lambda r: r.get(col, ""), reverse=desc)
-
-        # LIMIT
-        limit_match = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
-        if limit_match:
-            data = data[:int(limit_match.group(1))]
+            data = [{"count": len(data)}]
+        else:
+            # ORDER BY
+            order_match = re.search(r"ORDER\s+BY\s+(\w+)(?:\s+(ASC|DESC))?", sql, re.IGNORECASE)
+            if order_match:
+                col = order_match.group(1)
+                desc = (order_match.group(2) or "ASC").upper() == "DESC"
+                data.sort(key=lambda r: r.get(col, ""), reverse=desc)
 
-        columns = list(data[0].keys()) if data else []
-        elapsed = (time.time() - start) * 1000
+            # LIMIT
+            limit_match = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
+            if limit_match:
+                data = data[:int(limit_match.group(1))]
 
+        columns = list(data[0].keys()) if data else []
         profile = QueryProfile(
-            query_id=f"Q-{int(time.time()*1000)}",
+            query_id=_query_id(),
             sql=sql, rows_scanned=rows_scanned,
-            rows_returned=len(data), execution_time_ms=round(elapsed, 3),
-            warehouse_id=self.warehouse_id,
+            rows_returned=len(data), execution_time_ms=round((time.time() - start) * 1000, 3),
+            warehouse_id=self.warehouse_id, engine="python",
+            table_versions={table.name: table.current_version},
         )
-        self._query_history.append(profile)
-
-        return SQLResultSet(columns=columns, rows=data, total_count=len(data), profile=profile)
+        return self._record(SQLResultSet(columns=columns, rows=data, total_count=len(data), profile=profile))
 
     def _empty_result(self, sql: str, start: float) -> SQLResultSet:
         """Return empty result set."""
         elapsed = (time.time() - start) * 1000
         profile = QueryProfile(
-            query_id=f"Q-{int(time.time()*1000)}",
+            query_id=_query_id(),
             sql=sql, rows_scanned=0, rows_returned=0,
             execution_time_ms=round(elapsed, 3),
             warehouse_id=self.warehouse_id,
@@ -136,4 +254,61 @@ class LakehouseSQLEngine:
         return list(self._query_history)
 
 
+def _query_id() -> str:
+    return f"Q-{int(time.time()*1000)}"
+
+
+def _params_key(params: Params) -> Any:
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted((k, repr(v)) for k, v in params.items()))
+    return tuple(repr(v) for v in params)
+
+
+def _walk_ast(node: Any):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk_ast(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk_ast(value)
+
+
+def _walk(node: Dict[str, Any]):
+    for child in node.get("children", []):
+        yield child
+        yield from _walk(child)
+
+
+def _operator_timings(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Physical operators in plan order with their output rows and self time."""
+    return [
+        {
+            "operator": node.get("operator_type", ""),
+            "rows": node.get("operator_cardinality", 0),
+            "time_ms": round(node.get("operator_timing", 0.0) * 1000, 3),
+        }
+        for node in _walk(plan)
+    ]
+
+
+def _scanned_bytes(plan: Dict[str, Any], relations: Dict[str, Any]) -> int:
+    """Bytes of the Arrow columns each scan read (projected and filtered columns only)."""
+    total = 0
+    for node in _walk(plan):
+        info = node.get("extra_info") or {}
+        if node.get("operator_type") not in _SCAN_OPERATORS and info.get("Function") not in _SCAN_OPERATORS:
+            continue
+        text = f"{info.get('Projections', '')}\n{info.get('Filters', '')}"
+        words = set(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", text))
+        for relation in relations.values():
+            used = [name for name in relation.column_names if name in words]
+            if used:
+                total += sum(relation.column(name).nbytes for name in used)
+                break
+    return total
+
+
 lakehouse_sql_engine = LakehouseSQLEngine()
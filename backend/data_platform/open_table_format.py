@@ -2,20 +2,60 @@
 Open Table Format — ACID Transactional Clinical Tables.
 
 Provides:
-- Versioned, append-only transaction log (write-ahead log)
-- Time-travel reads (query any historical snapshot)
+- Log-structured storage: immutable columnar data files (Arrow in memory,
+  Parquet on disk) plus an append-only transaction log of add/remove-file actions
+- Copy-on-write commits that write only the delta: new rows, plus a deletion
+  vector (keep-mask) over each file a MERGE / DELETE actually touches
+- Time-travel reads reconstructed from the log via periodic checkpoints
+- Zero-copy Arrow reads (``read_arrow``)
 - Schema enforcement & evolution
 - MERGE / UPSERT / DELETE semantics
-- Partition pruning metadata
+- OPTIMIZE (compaction) and VACUUM to bound file count and storage
 """
 
-import copy
+import base64
+import json
+import os
+import shutil
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field
 
+# Conditional Arrow import: without pyarrow, data files hold immutable row tuples
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None  # type: ignore
+    pc = None  # type: ignore
+    pq = None  # type: ignore
+
+LAKEHOUSE_TABLE_DIR = os.getenv("LAKEHOUSE_TABLE_DIR")
+# A full file list is kept every N versions; older versions replay the log from there
+CHECKPOINT_INTERVAL = int(os.getenv("LAKEHOUSE_CHECKPOINT_INTERVAL", "10"))
+COMPACTION_TARGET_ROWS = int(os.getenv("LAKEHOUSE_COMPACTION_TARGET_ROWS", "1000000"))
+
+_ARROW_TYPES = {
+    "str": "string", "string": "string", "int": "int64", "integer": "int64",
+    "float": "float64", "double": "float64", "bool": "bool", "boolean": "bool",
+}
+
+
+def _encode_types(types: Dict[str, Any]) -> str:
+    """Arrow types of evolved columns as a base64 IPC schema (nested types included)."""
+    schema = pa.schema([pa.field(name, type_) for name, type_ in types.items()])
+    return base64.b64encode(schema.serialize().to_pybytes()).decode("ascii")
+
+
+def _decode_types(encoded: str) -> Dict[str, Any]:
+    schema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(encoded)))
+    return {field.name: field.type for field in schema}
+
 
 class TableSchema(BaseModel):
     """Schema definition for a lakehouse table."""
@@ -28,25 +68,124 @@ class TransactionLogEntry(BaseModel):
     """A single entry in the table's write-ahead transaction log."""
     txn_id: str = Field(default_factory=lambda: f"TXN-{uuid.uuid4().hex[:8]}")
     version: int
-    operation: str  # "INSERT", "MERGE", "DELETE", "SCHEMA_CHANGE"
+    operation: str  # "INSERT", "MERGE", "DELETE", "OPTIMIZE", "SCHEMA_CHANGE"
     rows_affected: int = 0
     timestamp: float = Field(default_factory=time.time)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    added_files: List[str] = Field(default_factory=list)
+    removed_files: List[str] = Field(default_factory=list)
+
+
+class DataFile:
+    """An immutable batch of rows; never modified after it is committed.
+
+    A file with a ``base`` is a deletion vector: the rows of the base file
+    selected by the boolean ``keep`` mask, so removing a few rows from a large
+    file stores one bit per row instead of a rewritten copy.
+    """
+
+    __slots__ = ("file_id", "num_rows", "path", "removed_at", "base", "keep_path", "_data", "_keep")
+
+    def __init__(
+        self,
+        file_id: str,
+        num_rows: int,
+        data: Any = None,
+        path: Optional[str] = None,
+        base: Optional["DataFile"] = None,
+        keep: Any = None,
+        keep_path: Optional[str] = None,
+    ) -> None:
+        self.file_id = file_id
+        self.num_rows = num_rows
+        self.path = path
+        self.removed_at: Optional[int] = None
+        self.base = base
+        self.keep_path = keep_path
+        self._data = data
+        self._keep = keep
+
+    @property
+    def physical(self) -> "DataFile":
+        return self.base or self
+
+    @property
+    def keep(self) -> Any:
+        if self._keep is None and self.keep_path:
+            self._keep = pq.read_table(self.keep_path).column("keep")
+        return self._keep
+
+    @property
+    def data(self) -> Any:
+        """``pa.Table`` (or a tuple of row dicts without pyarrow), memory-mapped from Parquet on first use."""
+        if self.base is not None:
+            return self.base.data.filter(self.keep)
+        if self._data is None and self.path:
+            self._data = pq.read_table(self.path, memory_map=True)
+        return self._data
+
+    def rows(self) -> List[Dict[str, Any]]:
+        data = self.data
+        return data.to_pylist() if HAS_PYARROW else [dict(row) for row in data]
 
 
 class LakehouseTable:
     """
     A single ACID-compliant lakehouse table with write-ahead transaction log.
 
-    Supports time-travel reads, schema enforcement, and MERGE/UPSERT semantics.
+    Each version is the set of live data files after replaying the log; a
+    commit adds and removes whole files, so unchanged data is shared between
+    versions instead of copied. Supports time-travel reads, schema
+    enforcement, and MERGE/UPSERT semantics.
     """
 
-    def __init__(self, name: str, schema: TableSchema) -> None:
+    def __init__(self, name: str, schema: TableSchema, root_dir: Optional[str] = None) -> None:
         self.name = name
         self.schema = schema
-        self._snapshots: Dict[int, List[Dict[str, Any]]] = {0: []}
+        # Distinguishes a re-created table from the dropped one whose versions it restarts
+        self.table_id = uuid.uuid4().hex
+        self.root_dir = root_dir if HAS_PYARROW else None  # Parquet persistence needs pyarrow
+        self._files: Dict[str, DataFile] = {}
+        self._live: Dict[str, None] = {}  # ordered set of file ids in the current version
+        self._checkpoints: Dict[int, Tuple[str, ...]] = {0: ()}
         self._txn_log: List[TransactionLogEntry] = []
         self._current_version = 0
+        self._min_version = 0
+        self._arrow_schema = self._declared_arrow_schema()
+        # Table-level types of undeclared (evolved) columns; every file is cast to them
+        self._column_types: Dict[str, Any] = {}
+        self._pending_types: Dict[str, Any] = {}
+        if self.root_dir:
+            os.makedirs(os.path.join(root_dir, "_txn_log"), exist_ok=True)
+            with open(os.path.join(root_dir, "_schema.json"), "w", encoding="utf-8") as handle:
+                handle.write(schema.model_dump_json())
+
+    @classmethod
+    def load(cls, name: str, root_dir: str) -> "LakehouseTable":
+        """Rebuild a table from its on-disk transaction log; data files load lazily."""
+        with open(os.path.join(root_dir, "_schema.json"), encoding="utf-8") as handle:
+            schema = TableSchema.model_validate_json(handle.read())
+        table = cls(name, schema, root_dir=root_dir)
+        log_dir = os.path.join(root_dir, "_txn_log")
+        for log_name in sorted(n for n in os.listdir(log_dir) if not n.startswith("_")):
+            with open(os.path.join(log_dir, log_name), encoding="utf-8") as handle:
+                entry = TransactionLogEntry.model_validate_json(handle.read())
+            deletion_vectors = entry.metadata.get("deletion_vectors", {})
+            for file_id, num_rows in entry.metadata.get("file_rows", {}).items():
+                if file_id in deletion_vectors:
+                    table._files[file_id] = DataFile(
+                        file_id, num_rows, base=table._files[deletion_vectors[file_id]],
+                        keep_path=table._file_path(file_id, ".dv.parquet"),
+                    )
+                else:
+                    table._files[file_id] = DataFile(file_id, num_rows, path=table._file_path(file_id))
+            table._apply(entry)
+        vacuum_path = os.path.join(log_dir, "_last_vacuum.json")
+        if os.path.exists(vacuum_path):
+            with open(vacuum_path, encoding="utf-8") as handle:
+                min_version = json.load(handle)["min_version"]
+            table.vacuum(retain_versions=table.current_version - min_version)
+        return table
 
     @property
     def current_version(self) -> int:
@@ -59,56 +198,244 @@ class LakehouseTable:
             if col not in row:
                 raise ValueError(f"Missing required column '{col}' in table '{self.name}'.")
 
-    def _commit(self, operation: str, new_data: List[Dict[str, Any]], rows_affected: int) -> TransactionLogEntry:
-        """Commit a new snapshot version."""
-        self._current_version += 1
-        self._snapshots[self._current_version] = copy.deepcopy(new_data)
+    # --- Data files ----------------------------------------------------------
+
+    def _declared_arrow_schema(self) -> Dict[str, Any]:
+        if not HAS_PYARROW:
+            return {}
+        return {
+            col: pa.type_for_alias(_ARROW_TYPES[type_name.lower()])
+            for col, type_name in self.schema.columns.items()
+            if type_name.lower() in _ARROW_TYPES
+        }
+
+    def _to_batch(self, rows: List[Dict[str, Any]]) -> Any:
+        """Rows as a ``pa.Table`` over the union of their keys, cast to the table's column types.
+
+        Declared columns are cast to their declared type. An undeclared column
+        takes the type it was first written with, widened (e.g. int to float)
+        when later rows need it; rows whose values cannot share one type are
+        rejected, so files of one table always concatenate.
+        """
+        if not HAS_PYARROW:
+            return tuple(dict(row) for row in rows)
+        keys = list(dict.fromkeys(key for row in rows for key in row))
+        columns = []
+        try:
+            for key in keys:
+                values = pa.array([row.get(key) for row in rows])
+                target = self._arrow_schema.get(key)
+                if target is None:
+                    known = self._pending_types.get(key, self._column_types.get(key))
+                    target = values.type if known is None else pa.unify_schemas(
+                        [pa.schema([(key, known)]), pa.schema([(key, values.type)])], promote_options="permissive",
+                    ).field(key).type
+                    if target != known and not pa.types.is_null(target):
+                        self._pending_types[key] = target
+                columns.append(values.cast(target))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as exc:
+            self._pending_types.clear()
+            raise ValueError(f"Rows do not match the schema of table '{self.name}': {exc}") from exc
+        return pa.Table.from_arrays(columns, names=keys)
+
+    def _file_path(self, file_id: str, suffix: str = ".parquet") -> str:
+        return os.path.join(self.root_dir, f"{file_id}{suffix}")
+
+    def _new_file(self, batch: Any) -> DataFile:
+        file_id = f"part-{uuid.uuid4().hex}"
+        path = None
+        if self.root_dir:
+            path = self._file_path(file_id)
+            pq.write_table(batch, path)
+        data_file = DataFile(file_id, len(batch), data=batch, path=path)
+        self._files[file_id] = data_file
+        return data_file
+
+    def _match_mask(self, data_file: DataFile, column: str, values: Sequence[Any]) -> Optional[Any]:
+        """Mask over the physical file's rows that are live in ``data_file`` and whose
+        ``column`` is in ``values``; ``None`` if no row matches."""
+        data = data_file.physical.data
+        if not HAS_PYARROW:
+            wanted = list(values)
+            mask = [column in row and row[column] in wanted for row in data]
+            return mask if any(mask) else None
+        if column not in data.column_names:
+            return None
+        col = data.column(column)
+        non_null = [v for v in values if v is not None]
+        try:
+            mask = pc.is_in(col, value_set=pa.array(non_null, type=col.type)) if non_null else pa.repeat(False, len(col))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+            mask = pa.repeat(False, len(col))
+        if len(non_null) != len(values):
+            mask = pc.or_(mask, pc.is_null(col))
+        mask = pc.fill_null(mask, False)
+        if data_file.base is not None:
+            mask = pc.and_(mask, data_file.keep)
+        return mask if pc.any(mask).as_py() else None
+
+    def _rewrite_without(self, data_file: DataFile, mask: Any) -> Optional[DataFile]:
+        """Copy-on-write: the rows of ``data_file`` outside ``mask``, as a deletion vector."""
+        if not HAS_PYARROW:
+            kept = tuple(row for row, hit in zip(data_file.data, mask) if not hit)
+            return self._new_file(kept) if kept else None
+        keep = pc.invert(mask) if data_file.base is None else pc.and_not(data_file.keep, mask)
+        num_rows = pc.sum(keep).as_py() or 0
+        if not num_rows:
+            return None
+        file_id = f"dv-{uuid.uuid4().hex}"
+        keep_path = None
+        if self.root_dir:
+            keep_path = self._file_path(file_id, ".dv.parquet")
+            pq.write_table(pa.table({"keep": keep}), keep_path)
+        dv_file = DataFile(file_id, num_rows, base=data_file.physical, keep=keep, keep_path=keep_path)
+        self._files[file_id] = dv_file
+        return dv_file
+
+    # --- Transaction log -----------------------------------------------------
+
+    def _apply(self, entry: TransactionLogEntry) -> None:
+        for file_id in entry.removed_files:
+            self._live.pop(file_id, None)
+            self._files[file_id].removed_at = entry.version
+        for file_id in entry.added_files:
+            self._live[file_id] = None
+        if HAS_PYARROW and "column_types" in entry.metadata:
+            self._column_types.update(_decode_types(entry.metadata["column_types"]))
+        self._current_version = entry.version
+        self._txn_log.append(entry)
+        if entry.version % CHECKPOINT_INTERVAL == 0:
+            self._checkpoints[entry.version] = tuple(self._live)
+
+    def _commit(
+        self,
+        operation: str,
+        rows_affected: int,
+        added: Iterable[DataFile] = (),
+        removed: Iterable[DataFile] = (),
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> TransactionLogEntry:
+        """Commit a new version by appending add/remove-file actions to the log."""
+        added = list(added)
+        metadata = dict(metadata or {})
+        if self._pending_types:
+            metadata["column_types"] = _encode_types(self._pending_types)
+            self._pending_types = {}
         entry = TransactionLogEntry(
-            version=self._current_version,
+            version=self._current_version + 1,
             operation=operation,
             rows_affected=rows_affected,
+            metadata={
+                **metadata,
+                "file_rows": {f.file_id: f.num_rows for f in added},
+                "deletion_vectors": {f.file_id: f.base.file_id for f in added if f.base is not None},
+            },
+            added_files=[f.file_id for f in added],
+            removed_files=[f.file_id for f in removed],
         )
-        self._txn_log.append(entry)
+        if self.root_dir:
+            log_path = os.path.join(self.root_dir, "_txn_log", f"{entry.version:020d}.json")
+            with open(log_path, "w", encoding="utf-8") as handle:
+                handle.write(entry.model_dump_json())
+        self._apply(entry)
         return entry
 
+    def _snapshot(self, version: int) -> Tuple[str, ...]:
+        if not 0 <= version <= self._current_version:
+            raise ValueError(f"Version {version} does not exist for table '{self.name}'.")
+        if version < self._min_version:
+            raise ValueError(f"Version {version} of table '{self.name}' was vacuumed.")
+        return self._replay(version)
+
+    def _replay(self, version: int) -> Tuple[str, ...]:
+        """File ids live at ``version``: the nearest checkpoint plus the log entries after it."""
+        if version == self._current_version:
+            return tuple(self._live)
+        base = max(v for v in self._checkpoints if v <= version)
+        live = dict.fromkeys(self._checkpoints[base])
+        for entry in self._txn_log:
+            if base < entry.version <= version:
+                for file_id in entry.removed_files:
+                    live.pop(file_id, None)
+                for file_id in entry.added_files:
+                    live[file_id] = None
+        return tuple(live)
+
+    # --- Writes --------------------------------------------------------------
+
     def insert(self, rows: List[Dict[str, Any]]) -> TransactionLogEntry:
         """Insert rows with schema enforcement."""
         for row in rows:
             self._validate_row(row)
-        current_data = copy.deepcopy(self._snapshots[self._current_version])
-        current_data.extend(rows)
-        return self._commit("INSERT", current_data, len(rows))
+        added = [self._new_file(self._to_batch(rows))] if rows else []
+        return self._commit("INSERT", len(rows), added=added)
 
     def merge_upsert(self, rows: List[Dict[str, Any]], match_key: str) -> TransactionLogEntry:
-        """MERGE (upsert): update matching rows or insert new ones."""
+        """MERGE (upsert): update matching rows or insert new ones.
+
+        Only files holding a matched key are rewritten; updated rows are
+        written with the inserts in one new file.
+        """
         for row in rows:
             self._validate_row(row)
-        current_data = copy.deepcopy(self._snapshots[self._current_version])
-        existing_keys = {r[match_key]: i for i, r in enumerate(current_data) if match_key in r}
-        upserted = 0
+        latest: Dict[Any, Dict[str, Any]] = {}
+        unkeyed = []
         for row in rows:
-            key_val = row.get(match_key)
-            if key_val in existing_keys:
-                current_data[existing_keys[key_val]] = row
+            if match_key in row:
+                latest[row[match_key]] = row
             else:
-                current_data.append(row)
-            upserted += 1
-        return self._commit("MERGE", current_data, upserted)
+                unkeyed.append(row)
+        added, removed = self._remove_matching(match_key, list(latest))
+        merged = list(latest.values()) + unkeyed
+        if merged:
+            added.append(self._new_file(self._to_batch(merged)))
+        return self._commit("MERGE", len(rows), added=added, removed=removed)
 
     def delete(self, predicate_key: str, predicate_value: Any) -> TransactionLogEntry:
         """Delete rows matching a predicate."""
-        current_data = copy.deepcopy(self._snapshots[self._current_version])
-        before = len(current_data)
-        current_data = [r for r in current_data if r.get(predicate_key) != predicate_value]
-        removed = before - len(current_data)
-        return self._commit("DELETE", current_data, removed)
+        before = self.row_count
+        added, removed = self._remove_matching(predicate_key, [predicate_value])
+        after = before - sum(f.num_rows for f in removed) + sum(f.num_rows for f in added)
+        return self._commit("DELETE", before - after, added=added, removed=removed)
+
+    def _remove_matching(self, column: str, values: List[Any]) -> Tuple[List[DataFile], List[DataFile]]:
+        added: List[DataFile] = []
+        removed: List[DataFile] = []
+        if not values:
+            return added, removed
+        for file_id in self._live:
+            data_file = self._files[file_id]
+            mask = self._match_mask(data_file, column, values)
+            if mask is None:
+                continue
+            rewritten = self._rewrite_without(data_file, mask)
+            removed.append(data_file)
+            if rewritten is not None:
+                added.append(rewritten)
+        return added, removed
+
+    # --- Reads ---------------------------------------------------------------
+
+    def data_files(self, version: Optional[int] = None) -> List[DataFile]:
+        """Live data files of a version, in commit order."""
+        v = version if version is not None else self._current_version
+        return [self._files[file_id] for file_id in self._snapshot(v)]
+
+    def read_arrow(self, version: Optional[int] = None) -> Any:
+        """Read a version as one ``pa.Table`` whose chunks are the data files (no row copies)."""
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for Arrow reads.")
+        tables = [f.data for f in self.data_files(version)]
+        if not tables:
+            return pa.table({col: pa.array([], type=self._arrow_schema.get(col, pa.null())) for col in self.schema.columns})
+        return pa.concat_tables(tables, promote_options="permissive")
 
     def read(self, version: Optional[int] = None) -> List[Dict[str, Any]]:
         """Read table data. Supports time-travel via version parameter."""
-        v = version if version is not None else self._current_version
-        if v not in self._snapshots:
-            raise ValueError(f"Version {v} does not exist for table '{self.name}'.")
-        return copy.deepcopy(self._snapshots[v])
+        rows: List[Dict[str, Any]] = []
+        for data_file in self.data_files(version):
+            rows.extend(data_file.rows())
+        return rows
 
     def history(self) -> List[TransactionLogEntry]:
         """Return full transaction log history."""
@@ -117,7 +444,62 @@ class LakehouseTable:
     @property
     def row_count(self) -> int:
         """Return current row count."""
-        return len(self._snapshots[self._current_version])
+        return sum(self._files[file_id].num_rows for file_id in self._live)
+
+    # --- Maintenance ---------------------------------------------------------
+
+    def compact(self, target_rows: int = COMPACTION_TARGET_ROWS) -> Optional[TransactionLogEntry]:
+        """OPTIMIZE: rewrite small live files and deletion vectors into as few files as possible."""
+        groups: List[List[DataFile]] = [[]]
+        group_rows = 0
+        for file_id in self._live:
+            data_file = self._files[file_id]
+            if data_file.num_rows >= target_rows and data_file.base is None:
+                continue
+            if groups[-1] and group_rows + data_file.num_rows > target_rows:
+                groups.append([])
+                group_rows = 0
+            groups[-1].append(data_file)
+            group_rows += data_file.num_rows
+        groups = [group for group in groups if len(group) > 1 or (group and group[0].base is not None)]
+        if not groups:
+            return None
+        added = [self._new_file(self._concat(group)) for group in groups]
+        removed = [data_file for group in groups for data_file in group]
+        return self._commit(
+            "OPTIMIZE", sum(f.num_rows for f in added), added=added, removed=removed,
+            metadata={"files_compacted": len(removed)},
+        )
+
+    def _concat(self, files: List[DataFile]) -> Any:
+        if not HAS_PYARROW:
+            return tuple(row for f in files for row in f.data)
+        return pa.concat_tables([f.data for f in files], promote_options="permissive").combine_chunks()
+
+    def vacuum(self, retain_versions: int = 0) -> Dict[str, int]:
+        """Drop files only needed by versions older than ``current - retain_versions``.
+
+        Those versions can no longer be time-travelled to; the log entries are kept.
+        """
+        min_version = max(self._min_version, self._current_version - max(0, retain_versions))
+        checkpoint = self._replay(min_version)
+        self._checkpoints = {v: files for v, files in self._checkpoints.items() if v > min_version}
+        self._checkpoints[min_version] = checkpoint
+        self._min_version = min_version
+        expired = {
+            file_id for file_id, f in self._files.items() if f.removed_at is not None and f.removed_at <= min_version
+        }
+        # A base file stays while any retained deletion vector still reads from it
+        expired -= {f.base.file_id for file_id, f in self._files.items() if f.base is not None and file_id not in expired}
+        for file_id in expired:
+            data_file = self._files.pop(file_id)
+            for path in (data_file.path, data_file.keep_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+        if self.root_dir:
+            with open(os.path.join(self.root_dir, "_txn_log", "_last_vacuum.json"), "w", encoding="utf-8") as handle:
+                json.dump({"min_version": min_version}, handle)
+        return {"files_removed": len(expired), "min_version": min_version, "live_files": len(self._live)}
 
 
 class OpenTableFormatEngine:
@@ -126,14 +508,20 @@ class OpenTableFormatEngine:
     Standard open specification compatible.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, root_dir: Optional[str] = LAKEHOUSE_TABLE_DIR) -> None:
+        self.root_dir = root_dir
         self._tables: Dict[str, LakehouseTable] = {}
+        if root_dir and os.path.isdir(root_dir):
+            for name in sorted(os.listdir(root_dir)):
+                if os.path.exists(os.path.join(root_dir, name, "_schema.json")):
+                    self._tables[name] = LakehouseTable.load(name, os.path.join(root_dir, name))
 
     def create_table(self, name: str, schema: TableSchema) -> LakehouseTable:
         """Create a new ACID table."""
         if name in self._tables:
             raise ValueError(f"Table '{name}' already exists.")
-        table = LakehouseTable(name=name, schema=schema)
+        table_dir = os.path.join(self.root_dir, name) if self.root_dir else None
+        table = LakehouseTable(name=name, schema=schema, root_dir=table_dir)
         self._tables[name] = table
         return table
 
@@ -146,11 +534,13 @@ class OpenTableFormatEngine:
         return list(self._tables.keys())
 
     def drop_table(self, name: str) -> bool:
-        """Drop a table."""
-        if name in self._tables:
-            del self._tables[name]
-            return True
-        return False
+        """Drop a table, deleting its data files and transaction log."""
+        table = self._tables.pop(name, None)
+        if table is None:
+            return False
+        if table.root_dir:
+            shutil.rmtree(table.root_dir, ignore_errors=True)
+        return True
 
 
 open_table_engine = OpenTableFormatEngine()
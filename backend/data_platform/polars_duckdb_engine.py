@@ -5,10 +5,22 @@ Provides high-performance analytical query execution on edge nodes and single-ho
 deployments without JVM overhead:
 - Polars: Rust-backed zero-copy columnar DataFrame transformations
 - DuckDB: Vectorized SQL query execution over Parquet, Delta, & CSV files
+
+The engine is long-lived: one DuckDB database serves a bounded pool of
+connections, named datasets are held as Arrow tables registered once per
+pooled connection (appends add chunks without copying existing data), Polars
+work runs as lazy plans so filters and projections are pushed into the scan,
+and results can be produced as Arrow tables or an Arrow IPC byte stream for
+API routes to stream without per-row dict conversion.
 """
 
+import io
+import os
+import queue
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 from pydantic import BaseModel
 
@@ -27,6 +39,19 @@ except ImportError:
     HAS_DUCKDB = False
     duckdb = Any  # type: ignore
 
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None  # type: ignore
+
+POLARS_DUCKDB_POOL_SIZE = int(os.getenv("POLARS_DUCKDB_POOL_SIZE", "4"))
+ARROW_IPC_BATCH_ROWS = int(os.getenv("ARROW_IPC_BATCH_ROWS", "65536"))
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+Params = Optional[Union[Dict[str, Any], Sequence[Any]]]
+
 
 class PolarsQueryResult(BaseModel):
     """Result of a Polars / DuckDB query execution."""
@@ -37,6 +62,24 @@ class PolarsQueryResult(BaseModel):
     execution_time_ms: float
 
 
+class DatasetInfo(BaseModel):
+    """A named Arrow dataset registered with the engine."""
+    name: str
+    version: int
+    row_count: int
+    columns: List[str]
+
+
+class _PooledConnection:
+    """A DuckDB connection plus the dataset versions registered on it."""
+
+    __slots__ = ("cursor", "versions")
+
+    def __init__(self, cursor: Any) -> None:
+        self.cursor = cursor
+        self.versions: Dict[str, int] = {}
+
+
 class PolarsDuckDBEngine:
     """
     Zero-JVM analytical compute engine.
@@ -45,6 +88,165 @@ class PolarsDuckDBEngine:
     falling back to Python in-memory processing if libraries are absent.
     """
 
+    def __init__(self, pool_size: int = POLARS_DUCKDB_POOL_SIZE) -> None:
+        self.pool_size = max(1, pool_size)
+        self._datasets: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._conn: Any = None
+        self._pool: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._created = 0
+
+    @property
+    def _sql_enabled(self) -> bool:
+        return HAS_DUCKDB and HAS_PYARROW
+
+    # ── Connection pool ──────────────────────────────────────────────
+
+    @contextmanager
+    def _acquire(self) -> Iterator[_PooledConnection]:
+        """Borrow a pooled connection with every dataset registered at its latest version."""
+        pooled = None
+        with self._lock:
+            if self._conn is None:
+                # Replacement scans off: SQL sees registered datasets, not Python locals
+                self._conn = duckdb.connect(database=":memory:", config={"python_enable_replacements": False})
+            try:
+                pooled = self._pool.get_nowait()
+            except queue.Empty:
+                if self._created < self.pool_size:
+                    pooled = _PooledConnection(self._conn.cursor())
+                    self._created += 1
+        if pooled is None:
+            pooled = self._pool.get()
+        try:
+            self._sync(pooled)
+            yield pooled
+        finally:
+            self._pool.put(pooled)
+
+    def _sync(self, pooled: _PooledConnection) -> None:
+        with self._lock:
+            datasets = dict(self._datasets)
+            versions = dict(self._versions)
+        for name in [n for n in pooled.versions if n not in datasets]:
+            pooled.cursor.unregister(name)
+            del pooled.versions[name]
+        for name, table in datasets.items():
+            if pooled.versions.get(name) != versions[name]:
+                pooled.cursor.register(name, table)
+                pooled.versions[name] = versions[name]
+
+    def close(self) -> None:
+        """Close pooled connections and the database; datasets are kept."""
+        with self._lock:
+            while True:
+                try:
+                    self._pool.get_nowait().cursor.close()
+                except queue.Empty:
+                    break
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._created = 0
+
+    # ── Datasets ─────────────────────────────────────────────────────
+
+    def _to_arrow(self, data: Any, schema: Any = None) -> Any:
+        if HAS_POLARS and isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+            data = (data.collect() if isinstance(data, pl.LazyFrame) else data).to_arrow()
+        if isinstance(data, pa.Table):
+            return data.select(schema.names).cast(schema) if schema is not None else data
+        return _records_to_arrow(list(data), schema)
+
+    def _info(self, name: str) -> DatasetInfo:
+        table = self._datasets[name]
+        return DatasetInfo(name=name, version=self._versions[name], row_count=table.num_rows, columns=table.column_names)
+
+    def register_dataset(self, name: str, data: Any) -> DatasetInfo:
+        """Register (or replace) a named dataset from records, a Polars frame or an Arrow table."""
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for registered datasets.")
+        table = self._to_arrow(data)
+        with self._lock:
+            self._datasets[name] = table
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._info(name)
+
+    def append_to_dataset(self, name: str, data: Any) -> DatasetInfo:
+        """Append rows to a dataset; existing Arrow chunks are shared, not copied."""
+        with self._lock:
+            existing = self._datasets.get(name)
+        if existing is None:
+            return self.register_dataset(name, data)
+        batch = self._to_arrow(data, schema=existing.schema)
+        with self._lock:
+            self._datasets[name] = pa.concat_tables([self._datasets[name], batch])
+            self._versions[name] += 1
+            return self._info(name)
+
+    def drop_dataset(self, name: str) -> bool:
+        # The version counter is kept so a re-registered dataset never reuses a version number
+        with self._lock:
+            return self._datasets.pop(name, None) is not None
+
+    def datasets(self) -> List[DatasetInfo]:
+        with self._lock:
+            return [self._info(name) for name in self._datasets]
+
+    def lazy_dataset(self, name: str) -> Any:
+        """Polars LazyFrame over a registered dataset (zero-copy from Arrow)."""
+        with self._lock:
+            table = self._datasets[name]
+        return pl.from_arrow(table).lazy()
+
+    def _dataset_plan(
+        self,
+        name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Any:
+        plan = self.lazy_dataset(name)
+        for column, value in (filters or {}).items():
+            plan = plan.filter(pl.col(column) == value)
+        if columns:
+            plan = plan.select(columns)
+        if limit is not None:
+            plan = plan.head(limit)
+        return plan
+
+    def query_dataset(
+        self,
+        name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> PolarsQueryResult:
+        """Equality-filter and project a dataset through a lazy Polars plan."""
+        start = time.time()
+        frame = self._dataset_plan(name, filters, columns, limit).collect()
+        rows = frame.to_dicts()
+        return PolarsQueryResult(
+            engine_used="POLARS_RUST",
+            columns=list(frame.columns),
+            rows=rows,
+            record_count=len(rows),
+            execution_time_ms=round((time.time() - start) * 1000, 3),
+        )
+
+    def query_dataset_arrow(
+        self,
+        name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Any:
+        """Like :meth:`query_dataset` but returns an Arrow table."""
+        return self._dataset_plan(name, filters, columns, limit).collect().to_arrow()
+
+    # ── Polars ───────────────────────────────────────────────────────
+
     def execute_polars_pipeline(
         self,
         records: List[Dict[str, Any]],
@@ -56,8 +258,7 @@ class PolarsDuckDBEngine:
 
         if HAS_POLARS and records:
             try:
-                df = pl.DataFrame(records)
-                filtered = df.filter(pl.col(filter_column) == filter_value)
+                filtered = pl.LazyFrame(records).filter(pl.col(filter_column) == filter_value).collect()
                 rows = filtered.to_dicts()
                 cols = list(filtered.columns)
                 elapsed = (time.time() - start) * 1000
@@ -83,29 +284,43 @@ class PolarsDuckDBEngine:
             execution_time_ms=round(elapsed, 3),
         )
 
+    # ── DuckDB ───────────────────────────────────────────────────────
+
+    @staticmethod
+    def _run(cursor: Any, sql: str, params: Params) -> Any:
+        return cursor.execute(sql, params) if params is not None else cursor.execute(sql)
+
     def execute_duckdb_sql(
         self,
         sql: str,
         table_name: str = "vitals",
         records: Optional[List[Dict[str, Any]]] = None,
+        params: Params = None,
     ) -> PolarsQueryResult:
-        """Execute vectorized SQL query using DuckDB."""
+        """Execute vectorized SQL query using DuckDB.
+
+        ``records``, when given, are exposed as ``table_name`` for this query only
+        (shadowing a dataset of the same name); otherwise the SQL runs over the
+        registered datasets.
+        """
         start = time.time()
 
-        if HAS_DUCKDB and records:
+        if self._sql_enabled and (records or self._datasets):
             try:
-                con = duckdb.connect(database=":memory:")
-                # Register Python records as DuckDB view
-                df_temp = pl.DataFrame(records) if HAS_POLARS else records
-                con.register(table_name, df_temp)
-                res_df = con.execute(sql).pl() if HAS_POLARS else con.execute(sql).fetchdf()
-                rows = res_df.to_dicts() if hasattr(res_df, "to_dicts") else res_df.to_dict(orient="records")
-                cols = list(rows[0].keys()) if rows else []
-                con.close()
+                with self._acquire() as pooled:
+                    if records:
+                        pooled.cursor.register(table_name, _records_to_arrow(records))
+                        pooled.versions.pop(table_name, None)  # re-sync any shadowed dataset next time
+                    try:
+                        result = self._run(pooled.cursor, sql, params).to_arrow_table()
+                    finally:
+                        if records:
+                            pooled.cursor.unregister(table_name)
+                rows = result.to_pylist()
                 elapsed = (time.time() - start) * 1000
                 return PolarsQueryResult(
                     engine_used="DUCKDB_VECTORIZED",
-                    columns=cols,
+                    columns=result.column_names,
                     rows=rows,
                     record_count=len(rows),
                     execution_time_ms=round(elapsed, 3),
@@ -124,5 +339,41 @@ class PolarsDuckDBEngine:
             execution_time_ms=round(elapsed, 3),
         )
 
+    def execute_sql_arrow(self, sql: str, params: Params = None) -> Any:
+        """Run SQL over the registered datasets and return an Arrow table."""
+        with self._acquire() as pooled:
+            return self._run(pooled.cursor, sql, params).to_arrow_table()
+
+    def stream_sql_ipc(self, sql: str, params: Params = None, batch_rows: int = ARROW_IPC_BATCH_ROWS) -> Iterator[bytes]:
+        """Yield the query result as an Arrow IPC stream, one chunk per record batch.
+
+        Suitable as the body of a ``StreamingResponse`` with
+        ``ARROW_STREAM_MEDIA_TYPE``; the pooled connection is held until the
+        generator is exhausted or closed.
+        """
+        with self._acquire() as pooled:
+            reader = self._run(pooled.cursor, sql, params).to_arrow_reader(batch_rows)
+            sink = io.BytesIO()
+            with pa.ipc.new_stream(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    yield _drain(sink)
+            yield _drain(sink)
+
+
+def _records_to_arrow(records: List[Dict[str, Any]], schema: Any = None) -> Any:
+    """Arrow table of ``records`` with a column for every key of any record (missing keys are null)."""
+    if schema is not None:
+        return pa.Table.from_pylist(records, schema=schema)
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    return pa.table({key: pa.array([record.get(key) for record in records]) for key in keys})
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
 
 polars_duckdb_engine = PolarsDuckDBEngine()
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import or_
+from sqlalchemy import Engine, case, exists, func, or_, select
 from sqlalchemy.orm import Session
 
 from . import models
+from .cache_service import cache
 
 OPENLINEAGE_NAMESPACE = "ai-healthcare-system"
 OPENLINEAGE_PRODUCER = "https://github.com/pavan/AI-Healthcare-System/backend.data_quality"
@@ -62,17 +66,177 @@ DATASET_LINEAGE: dict[str, dict[str, Any]] = {
 }
 
 
-def _scope_query(query, model, facility_id: int | None):
-    if facility_id is None:
-        return query
-    facility_column = getattr(model, "facility_id", None)
-    if facility_column is None:
-        return query
-    return query.filter(facility_column == facility_id)
+# Aggregates are cached per facility and only rows past each table's id
+# watermark are re-aggregated; a full recompute happens when the entry ages out,
+# so in-place edits to existing rows are reflected within this many seconds.
+DATA_QUALITY_FULL_REFRESH_SECONDS = int(os.getenv("DATA_QUALITY_FULL_REFRESH_SECONDS", "900"))
+DATA_QUALITY_MAX_WORKERS = int(os.getenv("DATA_QUALITY_MAX_WORKERS", "4"))
+_CACHE_KEY_PREFIX = "data_quality:aggregates"
+
+
+def _failed(condition) -> Any:
+    """Conditional aggregate: number of rows matching ``condition``."""
+    return func.count(case((condition, 1)))
+
+
+# One aggregate query per dataset. ``metrics`` are evaluated together with the
+# row count in a single scan; ``depends_on`` lists child tables whose new rows
+# can change the metrics of existing parent rows (forcing a full recompute).
+DATASET_AGGREGATES: dict[str, dict[str, Any]] = {
+    "patient_accounts": {
+        "model": models.User,
+        "filter": models.User.role == "patient",
+        "metrics": {"missing_dob": _failed(or_(models.User.dob.is_(None), models.User.dob == ""))},
+    },
+    "encounters": {"model": models.Encounter},
+    "vital_observations": {
+        "model": models.VitalObservation,
+        "metrics": {
+            "spo2_count": func.count(models.VitalObservation.spo2),
+            "spo2_out_of_range": _failed(or_(models.VitalObservation.spo2 < 0, models.VitalObservation.spo2 > 100)),
+            "heart_rate_count": func.count(models.VitalObservation.heart_rate),
+            "heart_rate_out_of_range": _failed(
+                or_(models.VitalObservation.heart_rate < 20, models.VitalObservation.heart_rate > 250)
+            ),
+        },
+    },
+    "diagnostic_results": {
+        "model": models.DiagnosticResult,
+        "metrics": {
+            "missing_summary": _failed(or_(models.DiagnosticResult.summary.is_(None), models.DiagnosticResult.summary == "")),
+        },
+    },
+    "prescriptions": {
+        "model": models.Prescription,
+        "metrics": {
+            "missing_items": _failed(
+                ~exists().where(models.PrescriptionItem.prescription_id == models.Prescription.id)
+            ),
+        },
+        "depends_on": [models.PrescriptionItem],
+    },
+    "invoices": {
+        "model": models.Invoice,
+        "metrics": {
+            "negative_amounts": _failed(or_(
+                models.Invoice.subtotal < 0,
+                models.Invoice.discount_amount < 0,
+                models.Invoice.tax_amount < 0,
+                models.Invoice.total_amount < 0,
+                models.Invoice.paid_amount < 0,
+                models.Invoice.balance_amount < 0,
+            )),
+        },
+    },
+    "interoperability_exports": {
+        "model": models.InteroperabilityExport,
+        "metrics": {
+            "missing_manifest": _failed(or_(
+                models.InteroperabilityExport.bundle_sha256.is_(None),
+                models.InteroperabilityExport.manifest_signature.is_(None),
+                models.InteroperabilityExport.resource_count <= 0,
+            )),
+        },
+    },
+}
 
 
-def _count(query) -> int:
-    return int(query.count())
+def _watermark_models() -> list:
+    tables = []
+    for spec in DATASET_AGGREGATES.values():
+        for model in [spec["model"], *spec.get("depends_on", [])]:
+            if model not in tables:
+                tables.append(model)
+    return tables
+
+
+def _watermarks(db: Session) -> dict[str, int]:
+    """Highest primary key of every source table, fetched in one round trip."""
+    tables = _watermark_models()
+    statement = select(*[
+        select(func.max(model.id)).scalar_subquery().label(model.__tablename__) for model in tables
+    ])
+    row = db.execute(statement).one()
+    return {model.__tablename__: int(value or 0) for model, value in zip(tables, row)}
+
+
+def _aggregate_statement(name: str, facility_id: int | None, after_id: int, upto_id: int):
+    """Aggregate over the dataset's rows with ``after_id < id <= upto_id``.
+
+    The upper bound is the watermark read for this report, so rows committed
+    after it are left to the next incremental pass instead of being counted twice.
+    """
+    spec = DATASET_AGGREGATES[name]
+    model = spec["model"]
+    metrics = spec.get("metrics", {})
+    statement = select(
+        func.count().label("record_count"),
+        *[expression.label(label) for label, expression in metrics.items()],
+    ).select_from(model)
+    if spec.get("filter") is not None:
+        statement = statement.where(spec["filter"])
+    facility_column = getattr(model, "facility_id", None)
+    if facility_id is not None and facility_column is not None:
+        statement = statement.where(facility_column == facility_id)
+    if after_id:
+        statement = statement.where(model.id > after_id)
+    return statement.where(model.id <= upto_id)
+
+
+def _run_aggregates(db: Session, statements: dict[str, Any]) -> dict[str, dict[str, int]]:
+    """Execute one aggregate per dataset, concurrently on a pooled server database."""
+    if not statements:
+        return {}
+
+    def collect(row) -> dict[str, int]:
+        return {key: int(value or 0) for key, value in row._mapping.items()}
+
+    bind = db.get_bind()
+    if DATA_QUALITY_MAX_WORKERS <= 1 or len(statements) == 1 or not isinstance(bind, Engine) or bind.dialect.name == "sqlite":
+        return {name: collect(db.execute(statement).one()) for name, statement in statements.items()}
+
+    def run(statement) -> dict[str, int]:
+        with bind.connect() as connection:
+            return collect(connection.execute(statement).one())
+
+    with ThreadPoolExecutor(max_workers=min(DATA_QUALITY_MAX_WORKERS, len(statements))) as pool:
+        futures = {name: pool.submit(run, statement) for name, statement in statements.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _dataset_aggregates(db: Session, facility_id: int | None, refresh: bool = False) -> dict[str, dict[str, int]]:
+    """Per-dataset row counts and check metrics, refreshed incrementally from the cache."""
+    cache_key = f"{_CACHE_KEY_PREFIX}:{facility_id if facility_id is not None else 'all'}"
+    cached = None if refresh else cache.get(cache_key)
+    watermarks = _watermarks(db)
+
+    statements: dict[str, Any] = {}
+    incremental: set[str] = set()
+    aggregates: dict[str, dict[str, int]] = {}
+    for name, spec in DATASET_AGGREGATES.items():
+        previous = cached["aggregates"].get(name) if cached else None
+        sources = [spec["model"].__tablename__] + [model.__tablename__ for model in spec.get("depends_on", [])]
+        seen = cached["watermarks"] if cached else {}
+        head = spec["model"].__tablename__
+        if previous is not None and all(watermarks[t] == seen.get(t) for t in sources):
+            aggregates[name] = previous
+        elif previous is not None and watermarks[head] > seen.get(head, 0) and all(
+            watermarks[t] == seen.get(t) for t in sources[1:]
+        ):
+            statements[name] = _aggregate_statement(name, facility_id, after_id=seen[head], upto_id=watermarks[head])
+            incremental.add(name)
+        else:
+            statements[name] = _aggregate_statement(name, facility_id, after_id=0, upto_id=watermarks[head])
+
+    for name, values in _run_aggregates(db, statements).items():
+        if name in incremental:
+            values = {key: cached["aggregates"][name][key] + value for key, value in values.items()}
+        aggregates[name] = values
+
+    expires_at = cached["expires_at"] if cached else time.time() + DATA_QUALITY_FULL_REFRESH_SECONDS
+    ttl = max(int(expires_at - time.time()), 1)
+    cache.set(cache_key, {"watermarks": watermarks, "aggregates": aggregates, "expires_at": expires_at}, ttl=ttl)
+    return aggregates
 
 
 def _check(
@@ -98,14 +262,11 @@ def _check(
     }
 
 
-def _dataset_summary(db: Session, name: str, model, facility_id: int | None, query_filter=None) -> dict[str, Any]:
-    query = _scope_query(db.query(model), model, facility_id)
-    if query_filter is not None:
-        query = query.filter(query_filter)
+def _dataset_summary(name: str, record_count: int) -> dict[str, Any]:
     lineage = DATASET_LINEAGE[name]
     return {
         "name": name,
-        "record_count": _count(query),
+        "record_count": record_count,
         "pii_exposed": False,
         "lineage": {
             "source_tables": list(lineage["source_tables"]),
@@ -116,136 +277,71 @@ def _dataset_summary(db: Session, name: str, model, facility_id: int | None, que
     }
 
 
-def _patient_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.User), models.User, facility_id).filter(models.User.role == "patient")
-    total = _count(query)
-    missing_dob = _count(query.filter(or_(models.User.dob.is_(None), models.User.dob == "")))
+def _quality_checks(aggregates: dict[str, dict[str, int]]) -> list[dict[str, Any]]:
+    patients = aggregates["patient_accounts"]
+    vitals = aggregates["vital_observations"]
+    diagnostics = aggregates["diagnostic_results"]
+    prescriptions = aggregates["prescriptions"]
+    invoices = aggregates["invoices"]
+    exports = aggregates["interoperability_exports"]
     return [
         _check(
             check_id="patients_birth_date_completeness",
             dataset="patient_accounts",
             description="Patient accounts should have birth date populated for clinical context.",
-            total_count=total,
-            failed_count=missing_dob,
-        )
-    ]
-
-
-def _vital_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.VitalObservation), models.VitalObservation, facility_id)
-    spo2_query = query.filter(models.VitalObservation.spo2.is_not(None))
-    heart_rate_query = query.filter(models.VitalObservation.heart_rate.is_not(None))
-    return [
+            total_count=patients["record_count"],
+            failed_count=patients["missing_dob"],
+        ),
         _check(
             check_id="vitals_spo2_range",
             dataset="vital_observations",
             description="SpO2 values must be between 0 and 100 percent.",
-            total_count=_count(spo2_query),
-            failed_count=_count(spo2_query.filter(or_(models.VitalObservation.spo2 < 0, models.VitalObservation.spo2 > 100))),
+            total_count=vitals["spo2_count"],
+            failed_count=vitals["spo2_out_of_range"],
             severity="critical",
         ),
         _check(
             check_id="vitals_heart_rate_range",
             dataset="vital_observations",
             description="Heart rate values must remain within a clinically plausible numeric range.",
-            total_count=_count(heart_rate_query),
-            failed_count=_count(
-                heart_rate_query.filter(or_(models.VitalObservation.heart_rate < 20, models.VitalObservation.heart_rate > 250))
-            ),
+            total_count=vitals["heart_rate_count"],
+            failed_count=vitals["heart_rate_out_of_range"],
             severity="critical",
         ),
-    ]
-
-
-def _diagnostic_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.DiagnosticResult), models.DiagnosticResult, facility_id)
-    total = _count(query)
-    missing_summary = _count(query.filter(or_(models.DiagnosticResult.summary.is_(None), models.DiagnosticResult.summary == "")))
-    return [
         _check(
             check_id="diagnostics_summary_completeness",
             dataset="diagnostic_results",
             description="Diagnostic results should include a non-empty summary for clinician review.",
-            total_count=total,
-            failed_count=missing_summary,
-        )
-    ]
-
-
-def _prescription_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.Prescription), models.Prescription, facility_id)
-    total = _count(query)
-    missing_items = _count(query.outerjoin(models.PrescriptionItem).filter(models.PrescriptionItem.id.is_(None)))
-    return [
+            total_count=diagnostics["record_count"],
+            failed_count=diagnostics["missing_summary"],
+        ),
         _check(
             check_id="prescriptions_have_items",
             dataset="prescriptions",
             description="Prescriptions should have at least one medication item.",
-            total_count=total,
-            failed_count=missing_items,
+            total_count=prescriptions["record_count"],
+            failed_count=prescriptions["missing_items"],
             severity="critical",
-        )
-    ]
-
-
-def _invoice_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.Invoice), models.Invoice, facility_id)
-    total = _count(query)
-    negative_amounts = _count(
-        query.filter(or_(
-            models.Invoice.subtotal < 0,
-            models.Invoice.discount_amount < 0,
-            models.Invoice.tax_amount < 0,
-            models.Invoice.total_amount < 0,
-            models.Invoice.paid_amount < 0,
-            models.Invoice.balance_amount < 0,
-        ))
-    )
-    return [
+        ),
         _check(
             check_id="invoices_amounts_non_negative",
             dataset="invoices",
             description="Invoice monetary fields must not be negative.",
-            total_count=total,
-            failed_count=negative_amounts,
+            total_count=invoices["record_count"],
+            failed_count=invoices["negative_amounts"],
             severity="critical",
-        )
-    ]
-
-
-def _interoperability_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    query = _scope_query(db.query(models.InteroperabilityExport), models.InteroperabilityExport, facility_id)
-    total = _count(query)
-    missing_manifest = _count(
-        query.filter(or_(
-            models.InteroperabilityExport.bundle_sha256.is_(None),
-            models.InteroperabilityExport.manifest_signature.is_(None),
-            models.InteroperabilityExport.resource_count <= 0,
-        ))
-    )
-    return [
+        ),
         _check(
             check_id="interop_exports_manifest_integrity",
             dataset="interoperability_exports",
             description="Interoperability exports should have resource count, bundle hash, and manifest signature.",
-            total_count=total,
-            failed_count=missing_manifest,
+            total_count=exports["record_count"],
+            failed_count=exports["missing_manifest"],
             severity="critical",
-        )
+        ),
     ]
 
 
-def _quality_checks(db: Session, facility_id: int | None) -> list[dict[str, Any]]:
-    checks: list[dict[str, Any]] = []
-    checks.extend(_patient_checks(db, facility_id))
-    checks.extend(_vital_checks(db, facility_id))
-    checks.extend(_diagnostic_checks(db, facility_id))
-    checks.extend(_prescription_checks(db, facility_id))
-    checks.extend(_invoice_checks(db, facility_id))
-    checks.extend(_interoperability_checks(db, facility_id))
-    return checks
-
-
 def _overall_score(checks: list[dict[str, Any]]) -> float:
     if not checks:
         return 1.0
@@ -341,19 +437,16 @@ def _quarantine_summary(checks: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
-def generate_quality_report(db: Session, facility_id: int | None = None) -> dict[str, Any]:
-    checks = _quality_checks(db, facility_id)
+def generate_quality_report(db: Session, facility_id: int | None = None, refresh: bool = False) -> dict[str, Any]:
+    """Build the report from one conditional-aggregate query per dataset.
+
+    ``refresh`` bypasses the cached aggregates and rescans every dataset.
+    """
+    aggregates = _dataset_aggregates(db, facility_id, refresh=refresh)
+    checks = _quality_checks(aggregates)
     generated_at = datetime.now(timezone.utc).isoformat()
     run_id = f"data-quality-{uuid4()}"
-    datasets = [
-        _dataset_summary(db, "patient_accounts", models.User, facility_id, models.User.role == "patient"),
-        _dataset_summary(db, "encounters", models.Encounter, facility_id),
-        _dataset_summary(db, "vital_observations", models.VitalObservation, facility_id),
-        _dataset_summary(db, "diagnostic_results", models.DiagnosticResult, facility_id),
-        _dataset_summary(db, "prescriptions", models.Prescription, facility_id),
-        _dataset_summary(db, "invoices", models.Invoice, facility_id),
-        _dataset_summary(db, "interoperability_exports", models.InteroperabilityExport, facility_id),
-    ]
+    datasets = [_dataset_summary(name, aggregates[name]["record_count"]) for name in DATASET_AGGREGATES]
     return {
         "source": "backend.data_quality",
         "generated_at": generated_at,
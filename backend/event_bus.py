@@ -1,8 +1,8 @@
 """Clinical Event Bus — async pub/sub for AI Healthcare System domain events.
 
 Provides topic-based routing for clinical events (vitals, diagnostics,
-admissions, care events).  Uses in-memory asyncio queues by default and
-upgrades to Redis Streams when ``REDIS_URL`` is configured.
+admissions, care events).  Uses a bounded in-memory asyncio queue by default
+and upgrades to Redis Streams consumer groups when ``REDIS_URL`` is configured.
 
 Usage::
 
@@ -13,14 +13,32 @@ Usage::
 
     event_bus.subscribe("VITALS_RECORDED", on_vitals)
     await event_bus.publish("VITALS_RECORDED", {"patient_id": 42, "hr": 78})
+
+Tuning (environment variables):
+
+* ``EVENT_BUS_QUEUE_MAXSIZE`` / ``EVENT_BUS_OVERFLOW_POLICY`` — capacity of
+  the in-memory queue and what ``publish`` does when it is full: ``block``
+  (backpressure the publisher), ``drop_newest`` or ``drop_oldest``.
+* ``EVENT_BUS_WORKERS`` — dispatch workers (in-memory) or concurrent stream
+  messages in flight (Redis).  Use ``1`` for strict per-topic ordering.
+* ``EVENT_BUS_BATCH_SIZE`` — max entries per pipelined ``XADD`` flush and per
+  ``XREADGROUP`` / ``XAUTOCLAIM`` call.
+* ``EVENT_BUS_CONSUMER_GROUP`` / ``EVENT_BUS_CONSUMER_NAME`` — Redis consumer
+  group shared by all replicas and this replica's consumer identity.
+* ``EVENT_BUS_CLAIM_IDLE_MS`` / ``EVENT_BUS_CLAIM_INTERVAL_SECONDS`` — how long
+  a delivered-but-unacked entry may sit before another consumer claims it,
+  and how often pending entries are checked.
 """
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
+import socket
+import time
 from collections import defaultdict
-from typing import Any, Callable, Coroutine, Dict, List, Optional
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -32,18 +50,77 @@ CARE_EVENT = "CARE_EVENT"
 
 ALL_TOPICS = [VITALS_RECORDED, DIAGNOSTIC_ALERT, ADMISSION_EVENT, CARE_EVENT]
 
+STREAM_KEY_PREFIX = "AI Healthcare System:events:"
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+EVENT_BUS_QUEUE_MAXSIZE = int(os.getenv("EVENT_BUS_QUEUE_MAXSIZE", "10000"))
+EVENT_BUS_OVERFLOW_POLICY = os.getenv("EVENT_BUS_OVERFLOW_POLICY", "block")
+EVENT_BUS_WORKERS = int(os.getenv("EVENT_BUS_WORKERS", "4"))
+EVENT_BUS_BATCH_SIZE = int(os.getenv("EVENT_BUS_BATCH_SIZE", "100"))
+EVENT_BUS_STREAM_MAXLEN = int(os.getenv("EVENT_BUS_STREAM_MAXLEN", "100000"))
+EVENT_BUS_CONSUMER_GROUP = os.getenv("EVENT_BUS_CONSUMER_GROUP", "clinical-event-bus")
+EVENT_BUS_CONSUMER_NAME = os.getenv("EVENT_BUS_CONSUMER_NAME") or f"{socket.gethostname()}-{os.getpid()}"
+EVENT_BUS_CLAIM_IDLE_MS = int(os.getenv("EVENT_BUS_CLAIM_IDLE_MS", "60000"))
+EVENT_BUS_CLAIM_INTERVAL_SECONDS = float(os.getenv("EVENT_BUS_CLAIM_INTERVAL_SECONDS", "30"))
+_READ_BLOCK_MS = 5000
+
 # Type alias for subscriber callbacks
 Subscriber = Callable[[dict], Coroutine[Any, Any, None]]
 
 
+def _is_quota_error(exc: Exception) -> bool:
+    exc_str = str(exc).lower()
+    return "limit exceeded" in exc_str or "max requests" in exc_str or "quota" in exc_str
+
+
+class _TopicStats:
+    """Per-topic counters; mutated only from the event loop, so no lock."""
+
+    __slots__ = ("published", "delivered", "failed", "dropped", "claimed", "lag_total_ms", "lag_max_ms", "since")
+
+    def __init__(self) -> None:
+        self.published = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.claimed = 0
+        self.lag_total_ms = 0.0
+        self.lag_max_ms = 0.0
+        self.since = time.monotonic()
+
+    def record_delivery(self, lag_ms: float) -> None:
+        self.delivered += 1
+        self.lag_total_ms += lag_ms
+        if lag_ms > self.lag_max_ms:
+            self.lag_max_ms = lag_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.since, 1e-9)
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "claimed": self.claimed,
+            "avg_lag_ms": round(self.lag_total_ms / self.delivered, 3) if self.delivered else 0.0,
+            "max_lag_ms": round(self.lag_max_ms, 3),
+            "publish_rate_per_sec": round(self.published / elapsed, 2),
+            "delivery_rate_per_sec": round(self.delivered / elapsed, 2),
+        }
+
+
 class ClinicalEventBus:
     """Singleton async event bus with optional Redis Streams backend.
 
-    * **In-memory mode** (default): events are dispatched via an
-      ``asyncio.Queue`` and a background worker task.
-    * **Redis mode**: when ``REDIS_URL`` is set the bus publishes to and
-      consumes from Redis Streams so events survive process restarts and
-      can be shared across replicas.
+    * **In-memory mode** (default): events go through a bounded
+      ``asyncio.Queue`` drained by a pool of dispatch workers.
+    * **Redis mode**: when ``REDIS_URL`` is set, ``publish`` coalesces events
+      into pipelined ``XADD`` batches and every replica reads through one
+      consumer group, so each event is handled once across the fleet.
+      Entries are acknowledged after their subscribers finish; entries left
+      pending by a crashed replica are re-claimed with ``XAUTOCLAIM``.
+
+    Either way, the subscribers of a topic receive each event concurrently.
     """
 
     _instance: Optional["ClinicalEventBus"] = None
@@ -60,10 +137,23 @@ class ClinicalEventBus:
         self._initialized = True
 
         self._subscribers: Dict[str, List[Subscriber]] = defaultdict(list)
-        self._queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
-        self._worker_task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, _TopicStats] = defaultdict(_TopicStats)
+        self._worker_tasks: List[asyncio.Task] = []
         self._redis: Any = None  # lazy redis client
         self._consumer_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._outbox: List[Tuple[str, dict, asyncio.Future]] = []
+        self.configure(
+            queue_maxsize=EVENT_BUS_QUEUE_MAXSIZE,
+            overflow_policy=EVENT_BUS_OVERFLOW_POLICY,
+            workers=EVENT_BUS_WORKERS,
+            batch_size=EVENT_BUS_BATCH_SIZE,
+            consumer_group=EVENT_BUS_CONSUMER_GROUP,
+            consumer_name=EVENT_BUS_CONSUMER_NAME,
+            claim_idle_ms=EVENT_BUS_CLAIM_IDLE_MS,
+            claim_interval_seconds=EVENT_BUS_CLAIM_INTERVAL_SECONDS,
+        )
+        self._queue: asyncio.Queue[Tuple[str, dict, float]] = asyncio.Queue(maxsize=self.queue_maxsize)
 
         redis_url = os.getenv("REDIS_URL")
         if redis_url and not os.getenv("TESTING"):
@@ -71,6 +161,38 @@ class ClinicalEventBus:
         else:
             logger.info("ClinicalEventBus: using in-memory async queue (set REDIS_URL for Redis Streams)")
 
+    def configure(
+        self,
+        *,
+        queue_maxsize: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        consumer_group: Optional[str] = None,
+        consumer_name: Optional[str] = None,
+        claim_idle_ms: Optional[int] = None,
+        claim_interval_seconds: Optional[float] = None,
+    ) -> None:
+        """Override tuning knobs; queue and worker changes apply on the next ``start()``."""
+        if overflow_policy is not None and overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}")
+        if queue_maxsize is not None:
+            self.queue_maxsize = max(0, int(queue_maxsize))  # 0 = unbounded
+        if overflow_policy is not None:
+            self.overflow_policy = overflow_policy
+        if workers is not None:
+            self.workers = max(1, int(workers))
+        if batch_size is not None:
+            self.batch_size = max(1, int(batch_size))
+        if consumer_group is not None:
+            self.consumer_group = consumer_group
+        if consumer_name is not None:
+            self.consumer_name = consumer_name
+        if claim_idle_ms is not None:
+            self.claim_idle_ms = max(0, int(claim_idle_ms))
+        if claim_interval_seconds is not None:
+            self.claim_interval_seconds = float(claim_interval_seconds)
+
     # ------------------------------------------------------------------
     # Redis Streams initialisation (best-effort)
     # ------------------------------------------------------------------
@@ -85,6 +207,14 @@ class ClinicalEventBus:
             logger.warning("ClinicalEventBus: Redis unavailable (%s). Falling back to in-memory.", exc)
             self._redis = None
 
+    def _fall_back_to_memory(self, exc: Exception) -> None:
+        logger.warning("Upstash Redis quota exceeded (%s). Automatically falling back to in-memory EventBus.", exc)
+        self._redis = None
+
+    @staticmethod
+    def _stream_key(topic: str) -> str:
+        return f"{STREAM_KEY_PREFIX}{topic}"
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -102,108 +232,322 @@ class ClinicalEventBus:
         """Publish an event.
 
         In Redis mode the payload is added to a Redis Stream keyed by
-        ``AI Healthcare System:events:{topic}``.  Otherwise it is enqueued locally.
+        ``AI Healthcare System:events:{topic}``; concurrent publishes are
+        flushed together in one pipeline.  Otherwise (or if Redis fails) it
+        is enqueued locally under the configured overflow policy.
 
         Args:
             topic: The event topic string.
             payload: Arbitrary JSON-serialisable dict.
         """
+        self._stats[topic].published += 1
         if self._redis is not None:
-            try:
-                import json
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._outbox.append((topic, payload, future))
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = loop.create_task(self._flush_outbox())
+            if await future:
+                return
 
-                stream_key = f"AI Healthcare System:events:{topic}"
-                await self._redis.xadd(stream_key, {"payload": json.dumps(payload)})
-                logger.debug("Published to Redis stream '%s'", stream_key)
-                # Also dispatch locally so in-process subscribers still fire.
-                await self._dispatch(topic, payload)
+        await self._enqueue(topic, payload)
+
+    async def publish_many(self, events: Iterable[Tuple[str, dict]]) -> None:
+        """Publish ``(topic, payload)`` pairs, pipelining ``XADD`` in ``batch_size`` chunks."""
+        events = list(events)
+        for topic, _ in events:
+            self._stats[topic].published += 1
+        i = 0
+        if self._redis is not None:
+            try:
+                for i in range(0, len(events), self.batch_size):
+                    await self._xadd_batch(events[i:i + self.batch_size])
                 return
             except Exception as exc:
-                logger.warning("Redis publish failed (%s). Dispatching in-memory.", exc)
+                if _is_quota_error(exc):
+                    self._fall_back_to_memory(exc)
+                else:
+                    logger.warning("Redis publish failed (%s). Dispatching in-memory.", exc)
+                # The failed chunk and everything after it go to the local queue
+                events = events[i:]
 
-        # In-memory fallback
-        await self._queue.put((topic, payload))
+        for topic, payload in events:
+            await self._enqueue(topic, payload)
 
     async def start(self) -> None:
-        """Start the background dispatch worker (and optional Redis consumer)."""
+        """Start the dispatch worker pool (and the Redis consumer-group reader)."""
         await self.stop()
-        self._queue = asyncio.Queue()
+        self._queue = asyncio.Queue(maxsize=self.queue_maxsize)
 
-        if self._worker_task is None or self._worker_task.done():
-            self._worker_task = asyncio.create_task(self._worker_loop())
-            logger.info("ClinicalEventBus: background worker started")
+        self._worker_tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+        logger.info("ClinicalEventBus: %d background workers started", self.workers)
 
-        if self._redis is not None and (self._consumer_task is None or self._consumer_task.done()):
+        if self._redis is not None:
+            try:
+                await self._ensure_groups(self._stream_keys())
+            except Exception as exc:
+                logger.warning("ClinicalEventBus: could not create consumer groups yet (%s)", exc)
             self._consumer_task = asyncio.create_task(self._redis_consumer_loop())
-            logger.info("ClinicalEventBus: Redis consumer started")
+            logger.info(
+                "ClinicalEventBus: Redis consumer '%s' joined group '%s'", self.consumer_name, self.consumer_group
+            )
 
     async def stop(self) -> None:
-        """Cancel background tasks gracefully."""
-        for task in (self._worker_task, self._consumer_task):
+        """Flush buffered publishes, then cancel background tasks gracefully."""
+        if self._flush_task is not None and not self._flush_task.done():
+            try:
+                await self._flush_task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+        self._flush_task = None
+        for task in (*self._worker_tasks, self._consumer_task):
             if task and not task.done():
                 task.cancel()
                 try:
                     await task
                 except (asyncio.CancelledError, RuntimeError):
                     pass
-        self._worker_task = None
+        self._worker_tasks = []
         self._consumer_task = None
         logger.info("ClinicalEventBus: stopped")
 
+    async def join(self) -> None:
+        """Wait until buffered publishes are flushed and the in-memory queue is drained."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self._queue.join()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-topic throughput, drop and lag counters plus queue occupancy."""
+        return {
+            "backend": "redis_streams" if self._redis is not None else "in_memory",
+            "overflow_policy": self.overflow_policy,
+            "queue_depth": self._queue.qsize(),
+            "queue_maxsize": self.queue_maxsize,
+            "workers": self.workers,
+            "consumer_group": self.consumer_group if self._redis is not None else None,
+            "topics": {topic: stats.snapshot() for topic, stats in sorted(self._stats.items())},
+        }
+
+    def reset_metrics(self) -> None:
+        self._stats.clear()
+
     # ------------------------------------------------------------------
-    # Internal dispatch
+    # Publishing internals
     # ------------------------------------------------------------------
-    async def _dispatch(self, topic: str, payload: dict) -> None:
-        """Invoke every subscriber registered for *topic*."""
-        for callback in self._subscribers.get(topic, []):
+    async def _enqueue(self, topic: str, payload: dict) -> None:
+        item = (topic, payload, time.monotonic())
+        if self.overflow_policy == "block":
+            await self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == "drop_newest":
+            self._stats[topic].dropped += 1
+            logger.debug("Event queue full; dropped new '%s' event", topic)
+            return
+        # drop_oldest: no await between the get and the put, so the slot is ours
+        dropped_topic, _, _ = self._queue.get_nowait()
+        self._queue.task_done()
+        self._stats[dropped_topic].dropped += 1
+        logger.debug("Event queue full; dropped oldest '%s' event", dropped_topic)
+        self._queue.put_nowait(item)
+
+    async def _xadd_batch(self, events: List[Tuple[str, dict]]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for topic, payload in events:
+            pipe.xadd(
+                self._stream_key(topic),
+                {"payload": json.dumps(payload, default=str)},
+                maxlen=EVENT_BUS_STREAM_MAXLEN,
+                approximate=True,
+            )
+        await pipe.execute()
+
+    async def _flush_outbox(self) -> None:
+        """Drain the publish outbox in pipelined batches, resolving each publisher's future."""
+        # Let publishers scheduled in the same loop iteration join this flush
+        await asyncio.sleep(0)
+        while self._outbox:
+            batch = self._outbox[:self.batch_size]
+            del self._outbox[:self.batch_size]
             try:
-                await callback(payload)
-            except Exception:
-                logger.exception("Error in subscriber for topic '%s'", topic)
+                if self._redis is None:
+                    raise RuntimeError("Redis backend disabled")
+                await self._xadd_batch([(topic, payload) for topic, payload, _ in batch])
+                ok = True
+                logger.debug("Flushed %d events to Redis streams", len(batch))
+            except Exception as exc:
+                if _is_quota_error(exc):
+                    self._fall_back_to_memory(exc)
+                elif self._redis is not None:
+                    logger.warning("Redis publish failed (%s). Dispatching in-memory.", exc)
+                ok = False
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(ok)
+
+    # ------------------------------------------------------------------
+    # Internal dispatch
+    # ------------------------------------------------------------------
+    async def _invoke(self, topic: str, callback: Subscriber, payload: dict) -> bool:
+        try:
+            await callback(payload)
+            return True
+        except Exception:
+            logger.exception("Error in subscriber for topic '%s'", topic)
+            return False
+
+    async def _dispatch(self, topic: str, payload: dict, lag_ms: float = 0.0) -> None:
+        """Fan *payload* out to every subscriber of *topic* concurrently."""
+        callbacks = self._subscribers.get(topic)
+        stats = self._stats[topic]
+        if callbacks:
+            if len(callbacks) == 1:
+                results = [await self._invoke(topic, callbacks[0], payload)]
+            else:
+                results = await asyncio.gather(*(self._invoke(topic, cb, payload) for cb in callbacks))
+            stats.failed += results.count(False)
+        stats.record_delivery(lag_ms)
 
     async def _worker_loop(self) -> None:
         """Background loop that drains the in-memory queue."""
         try:
             while True:
-                topic, payload = await self._queue.get()
-                await self._dispatch(topic, payload)
-                self._queue.task_done()
+                topic, payload, enqueued_at = await self._queue.get()
+                try:
+                    await self._dispatch(topic, payload, (time.monotonic() - enqueued_at) * 1000.0)
+                finally:
+                    self._queue.task_done()
         except (asyncio.CancelledError, RuntimeError) as exc:
             if isinstance(exc, RuntimeError) and "different event loop" not in str(exc):
                 raise
             logger.debug("ClinicalEventBus worker cancelled or event loop changed")
 
-    async def _redis_consumer_loop(self) -> None:
-        """Background loop reading new entries from Redis Streams."""
-        import json
+    # ------------------------------------------------------------------
+    # Redis consumer group
+    # ------------------------------------------------------------------
+    def _stream_keys(self) -> List[str]:
+        topics = dict.fromkeys([*ALL_TOPICS, *self._subscribers])
+        return [self._stream_key(topic) for topic in topics]
 
-        streams = {f"AI Healthcare System:events:{t}": "$" for t in ALL_TOPICS}
+    async def _ensure_groups(self, streams: List[str]) -> None:
+        for stream_key in streams:
+            try:
+                # "$": a brand-new group starts at the tail rather than replaying
+                # history; after that the group's cursor survives restarts.
+                await self._redis.xgroup_create(stream_key, self.consumer_group, id="$", mkstream=True)
+            except Exception as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
 
-        try:
+    async def _process_entries(self, stream_key: str, entries: List[Tuple[str, Optional[dict]]]) -> None:
+        """Dispatch stream entries with at most ``workers`` in flight, then XACK them together."""
+        topic = stream_key[len(STREAM_KEY_PREFIX):]
+        semaphore = asyncio.Semaphore(self.workers)
+        now_ms = time.time() * 1000.0
+
+        async def handle(msg_id: str, fields: Optional[dict]) -> None:
+            if fields is None:  # entry trimmed while pending
+                return
+            try:
+                payload = json.loads(fields.get("payload", "{}"))
+            except (TypeError, ValueError):
+                # Poison message: ack it so it is not redelivered forever
+                logger.exception("Failed to decode Redis message %s", msg_id)
+                return
+            lag_ms = max(0.0, now_ms - int(str(msg_id).split("-", 1)[0]))
+            async with semaphore:
+                await self._dispatch(topic, payload, lag_ms)
+
+        if not entries:
+            return
+        await asyncio.gather(*(handle(msg_id, fields) for msg_id, fields in entries))
+        await self._redis.xack(stream_key, self.consumer_group, *[msg_id for msg_id, _ in entries])
+
+    async def _replay_own_pending(self, streams: List[str]) -> None:
+        """Re-deliver entries this consumer read but never acked (e.g. before a crash)."""
+        for stream_key in streams:
+            cursor = "0"
             while True:
+                results = await self._redis.xreadgroup(
+                    self.consumer_group, self.consumer_name, {stream_key: cursor}, count=self.batch_size
+                )
+                entries = results[0][1] if results else []
+                if not entries:
+                    break
+                await self._process_entries(stream_key, entries)
+                cursor = entries[-1][0]
+
+    async def _claim_stale(self, streams: List[str]) -> int:
+        """Take over entries another consumer left pending longer than ``claim_idle_ms``."""
+        claimed = 0
+        for stream_key in streams:
+            start_id = "0-0"
+            while True:
+                reply = await self._redis.xautoclaim(
+                    stream_key,
+                    self.consumer_group,
+                    self.consumer_name,
+                    min_idle_time=self.claim_idle_ms,
+                    start_id=start_id,
+                    count=self.batch_size,
+                )
+                start_id, entries = reply[0], reply[1]
+                if entries:
+                    claimed += len(entries)
+                    self._stats[stream_key[len(STREAM_KEY_PREFIX):]].claimed += len(entries)
+                    await self._process_entries(stream_key, entries)
+                if start_id in ("0-0", b"0-0"):
+                    break
+        if claimed:
+            logger.info("ClinicalEventBus: claimed %d stale pending events", claimed)
+        return claimed
+
+    async def _redis_consumer_loop(self) -> None:
+        """Background loop reading new entries through the consumer group."""
+        streams = self._stream_keys()
+        loop = asyncio.get_running_loop()
+        recovered = False
+        next_claim = 0.0
+
+        try:
+            while self._redis is not None:
                 try:
-                    results = await self._redis.xread(streams, block=5000, count=50)
+                    if not recovered:
+                        await self._ensure_groups(streams)
+                        await self._replay_own_pending(streams)
+                        recovered = True
+                    if loop.time() >= next_claim:
+                        await self._claim_stale(streams)
+                        next_claim = loop.time() + self.claim_interval_seconds
+                    results = await self._redis.xreadgroup(
+                        self.consumer_group,
+                        self.consumer_name,
+                        {stream_key: ">" for stream_key in streams},
+                        count=self.batch_size,
+                        block=_READ_BLOCK_MS,
+                    )
+                    if not results:
+                        # Backends that ignore BLOCK (fakeredis, some proxies)
+                        # return immediately; don't spin the event loop.
+                        await asyncio.sleep(0.01)
+                    for stream_key, entries in results or []:
+                        await self._process_entries(stream_key, entries)
+                except asyncio.CancelledError:
+                    raise
                 except Exception as exc:
-                    exc_str = str(exc).lower()
-                    if "limit exceeded" in exc_str or "max requests" in exc_str or "quota" in exc_str:
-                        logger.warning("Upstash Redis quota exceeded (%s). Automatically falling back to in-memory EventBus.", exc)
-                        self._use_redis = False
-                        asyncio.create_task(self._inmemory_consumer_loop())
+                    if _is_quota_error(exc):
+                        self._fall_back_to_memory(exc)
                         break
-                    logger.warning("Redis xread error: %s. Retrying in 5s.", exc)
+                    if "NOGROUP" in str(exc):
+                        recovered = False  # stream or group deleted underneath us
+                    logger.warning("Redis xreadgroup error: %s. Retrying in 5s.", exc)
                     await asyncio.sleep(5)
-                    continue
-
-                for stream_key, messages in results:
-                    topic = stream_key.replace("AI Healthcare System:events:", "")
-                    for msg_id, fields in messages:
-                        try:
-                            payload = json.loads(fields.get("payload", "{}"))
-                            await self._dispatch(topic, payload)
-                        except Exception:
-                            logger.exception("Failed to process Redis message %s", msg_id)
-                        # Advance read cursor
-                        streams[stream_key] = msg_id
         except asyncio.CancelledError:
             logger.debug("ClinicalEventBus Redis consumer cancelled")
 
@@ -211,28 +555,76 @@ class ClinicalEventBus:
 class KafkaKinesisStreamBuffer:
     """High-throughput Kafka / AWS Kinesis Stream Buffer Adapter for zero-backpressure ICU vitals streaming.
 
-    Dynamically routes high-frequency telemetry events (>100k events/sec) through Apache Kafka or AWS Kinesis
-    when KAFKA_BOOTSTRAP_SERVERS or KINESIS_STREAM_NAME is set, with graceful fallback to Redis Streams / In-Memory queues.
+    Routes high-frequency telemetry events through a :class:`~backend.stream_producer.BufferedStreamProducer`
+    (linger/size batching, compression, ``patient_id`` partitioning) writing to Apache Kafka when
+    ``KAFKA_BOOTSTRAP_SERVERS`` is set, AWS Kinesis when ``KINESIS_STREAM_NAME`` is set, or the local
+    append-log broker when ``STREAM_LOG_DIR`` is set, with graceful fallback to Redis Streams / In-Memory queues.
     """
 
+    _ENGINES = {"kafka": "Apache Kafka", "kinesis": "AWS Kinesis", "local_log": "Local Append Log"}
+
     def __init__(self):
         self.kafka_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS")
         self.kinesis_stream = os.getenv("KINESIS_STREAM_NAME")
-        self.buffer_mode = "kafka" if self.kafka_servers else ("kinesis" if self.kinesis_stream else "redis_fallback")
+        self.local_log_dir = os.getenv("STREAM_LOG_DIR")
+        if self.kafka_servers:
+            self.buffer_mode = "kafka"
+        elif self.kinesis_stream:
+            self.buffer_mode = "kinesis"
+        elif self.local_log_dir:
+            self.buffer_mode = "local_log"
+        else:
+            self.buffer_mode = "redis_fallback"
+        self._producer: Any = None
+
+    def _get_producer(self) -> Any:
+        """Create the producer on first use; on a missing client library fall back to the event bus."""
+        if self._producer is None and self.buffer_mode != "redis_fallback":
+            from .stream_producer import BufferedStreamProducer, KafkaBroker, KinesisBroker, LocalLogBroker
+
+            try:
+                if self.buffer_mode == "kafka":
+                    broker: Any = KafkaBroker(self.kafka_servers)
+                elif self.buffer_mode == "kinesis":
+                    broker = KinesisBroker(self.kinesis_stream)
+                else:
+                    broker = LocalLogBroker(self.local_log_dir)
+                self._producer = BufferedStreamProducer(broker)
+            except Exception as exc:
+                logger.warning("Stream buffer %s unavailable (%s). Falling back to the event bus.", self.buffer_mode, exc)
+                self.buffer_mode = "redis_fallback"
+        return self._producer
 
     async def publish_buffered_event(self, topic: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Publishes streaming event into high-throughput ingestion buffer."""
         pid_mask = "[REDACTED]" if payload.get("patient_id") is not None else "N/A"
-        if self.buffer_mode == "kafka":
-            logger.info("Published streaming event to Kafka topic [%s]: patient_id=%s", topic, pid_mask)
-            return {"status": "buffered", "engine": "Apache Kafka", "topic": topic}
-        elif self.buffer_mode == "kinesis":
-            logger.info("Published streaming event to AWS Kinesis stream [%s]: patient_id=%s", self.kinesis_stream, pid_mask)
-            return {"status": "buffered", "engine": "AWS Kinesis", "stream": self.kinesis_stream}
+        producer = self._get_producer()
+        if producer is not None:
+            from .stream_producer import ProducerBufferFull
 
-        else:
-            await event_bus.publish(topic, payload)
-            return {"status": "buffered", "engine": "Redis/InMemory Stream Bus", "topic": topic}
+            key = payload.get("patient_id")
+            try:
+                partition = producer.send(topic, payload, key=key, max_block_ms=0)
+            except ProducerBufferFull:
+                # Backpressure: wait for buffer space off the event loop
+                partition = await asyncio.to_thread(producer.send, topic, payload, key)
+            logger.debug("Buffered streaming event for %s [%s]: patient_id=%s", self.buffer_mode, topic, pid_mask)
+            result = {"status": "buffered", "engine": self._ENGINES[self.buffer_mode], "topic": topic, "partition": partition}
+            if self.buffer_mode == "kinesis":
+                result["stream"] = self.kinesis_stream
+            return result
+
+        await event_bus.publish(topic, payload)
+        return {"status": "buffered", "engine": "Redis/InMemory Stream Bus", "topic": topic}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buffer_mode": self.buffer_mode, "producer": self._producer.stats() if self._producer else None}
+
+    def close(self) -> None:
+        """Flush buffered events and stop the producer thread."""
+        if self._producer is not None:
+            self._producer.close(timeout=10.0)
+            self._producer = None
 
 
 # Module-level singletons
@@ -1,7 +1,7 @@
 import logging
 import os
 from datetime import date, datetime, timezone
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 import requests
 
@@ -457,6 +457,23 @@ def build_bundle(resources: Iterable[dict[str, Any]], timestamp: Any = None) ->
         "entry": entries,
     }
 
+def stream_bundle_entries(resources: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Validate and wrap resources one at a time for streamed bundles.
+
+    Unlike ``build_bundle`` this never holds the whole resource list, so local
+    references must point at a resource emitted earlier in the stream (exports
+    emit the Patient and Encounters before anything that references them).
+    """
+    present = set()
+    for r in resources:
+        validate_fhir_resource(r)
+        key = f"{r['resourceType']}/{r['id']}"
+        if key in present:
+            raise FHIRValidationError("Duplicate FHIR bundle entry")
+        present.add(key)
+        _validate_references(r, present)
+        yield bundle_entry(r)
+
 def audit_event_resource(audit_log: Any) -> dict[str, Any]:
     if os.environ.get("MICROSERVICES_MODE") == "true":
         return _call_fhir_audit_event(audit_log)
@@ -0,0 +1,351 @@
+"""
+HNSW Vector Index — NumPy-backed Hierarchical Navigable Small World Graph
+=========================================================================
+Approximate cosine nearest-neighbour search for the semantic cache tiers.
+
+Vectors live in a float32 matrix of up to ``max_elements`` slots (grown on
+demand) used as a ring buffer: once full, each insert evicts the oldest slot
+and repairs the evicted node's neighbourhood. Layer-0 adjacency is a dense int32 array
+(``2 * M`` links per node); the sparse upper layers are per-node arrays.
+Deletion is soft — deleted nodes keep routing searches but are never returned.
+"""
+
+import heapq
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_INITIAL_ROWS = 1024
+# Frontier nodes expanded per vectorised step of the beam search
+_EXPAND_BATCH = 8
+
+
+class HnswIndex:
+    """Cosine-similarity HNSW index with ring-buffer slot reuse."""
+
+    def __init__(
+        self,
+        dim: int,
+        max_elements: int,
+        M: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 42,
+    ):
+        if dim <= 0 or max_elements <= 0:
+            raise ValueError("dim and max_elements must be positive")
+        if M < 2:
+            raise ValueError("M must be at least 2")
+        self.dim = dim
+        self.max_elements = max_elements
+        self.M = M
+        self.max_links0 = 2 * M
+        self.ef_construction = max(ef_construction, M)
+        self.ef_search = ef_search
+        self._level_mult = 1.0 / math.log(M)
+        self._rng = np.random.default_rng(seed)
+
+        # Row storage grows geometrically up to max_elements
+        rows = min(max_elements, _INITIAL_ROWS)
+        self._vectors = np.zeros((rows, dim), dtype=np.float32)
+        self._levels = np.full(rows, -1, dtype=np.int8)  # -1 = empty slot
+        self._deleted = np.zeros(rows, dtype=bool)
+        self._links0 = np.full((rows, self.max_links0), -1, dtype=np.int32)
+        self._link_counts0 = np.zeros(rows, dtype=np.int32)
+        # _upper[level - 1][node] -> neighbour ids on that level
+        self._upper: List[Dict[int, np.ndarray]] = []
+        self._visited = np.zeros(rows, dtype=np.uint32)
+        self._visit_tag = 0
+
+        self._entry_point = -1
+        self._max_level = -1
+        self._cursor = 0
+        self._occupied = 0
+        self._live = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._live
+
+    # ── Public API ─────────────────────────────────────────────────────
+    def add(self, vector) -> Tuple[int, Optional[int]]:
+        """Insert ``vector``; returns ``(slot, evicted_slot)``.
+
+        ``evicted_slot`` equals ``slot`` when the ring buffer was full and the
+        oldest entry was overwritten, otherwise ``None``.
+        """
+        q = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if q.shape[0] != self.dim:
+            raise ValueError(f"expected a {self.dim}-d vector, got {q.shape[0]}")
+        norm = float(np.linalg.norm(q))
+        if norm == 0.0:
+            raise ValueError("cannot index a zero vector")
+        q = q / norm
+
+        with self._lock:
+            slot = self._cursor
+            self._cursor = (self._cursor + 1) % self.max_elements
+            if slot >= len(self._levels):
+                self._grow()
+            evicted = None
+            if self._levels[slot] >= 0:
+                evicted = slot
+                self._unlink(slot)
+            else:
+                self._occupied += 1
+            self._insert(slot, q)
+            self._live += 1
+            return slot, evicted
+
+    def mark_deleted(self, slot: int) -> bool:
+        """Soft-delete ``slot``. Returns False if it was empty or already deleted."""
+        with self._lock:
+            if self._levels[slot] < 0 or self._deleted[slot]:
+                return False
+            self._deleted[slot] = True
+            self._live -= 1
+            return True
+
+    def search(self, vector, k: int = 1, ef: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(slots, similarities)`` of the ``k`` nearest live entries, best first."""
+        q = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if q.shape[0] != self.dim or norm == 0.0:
+            return empty
+        q = q / norm
+
+        with self._lock:
+            if self._entry_point < 0 or self._live == 0:
+                return empty
+            ep = self._greedy_descend(q, self._entry_point, self._max_level, 1)
+            found = self._search_layer(q, [ep], max(ef or self.ef_search, k), 0)
+            hits = [(d, n) for d, n in found if not self._deleted[n]][:k]
+        if not hits:
+            return empty
+        dists, slots = zip(*hits)
+        return np.asarray(slots, dtype=np.int64), 1.0 - np.asarray(dists, dtype=np.float32)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._levels.fill(-1)
+            self._deleted.fill(False)
+            self._links0.fill(-1)
+            self._link_counts0.fill(0)
+            self._upper = []
+            self._entry_point = -1
+            self._max_level = -1
+            self._cursor = self._occupied = self._live = 0
+
+    # ── Graph maintenance ──────────────────────────────────────────────
+    def _grow(self) -> None:
+        rows = len(self._levels)
+        new_rows = min(self.max_elements, rows * 2)
+        extra = new_rows - rows
+        self._vectors = np.vstack([self._vectors, np.zeros((extra, self.dim), dtype=np.float32)])
+        self._levels = np.concatenate([self._levels, np.full(extra, -1, dtype=np.int8)])
+        self._deleted = np.concatenate([self._deleted, np.zeros(extra, dtype=bool)])
+        self._links0 = np.vstack([self._links0, np.full((extra, self.max_links0), -1, dtype=np.int32)])
+        self._link_counts0 = np.concatenate([self._link_counts0, np.zeros(extra, dtype=np.int32)])
+        self._visited = np.concatenate([self._visited, np.zeros(extra, dtype=np.uint32)])
+
+    def _random_level(self) -> int:
+        return min(int(-math.log(1.0 - self._rng.random()) * self._level_mult), 127)
+
+    def _neighbors(self, node: int, level: int) -> np.ndarray:
+        if level == 0:
+            return self._links0[node, : self._link_counts0[node]]
+        return self._upper[level - 1].get(node, np.empty(0, dtype=np.int32))
+
+    def _set_neighbors(self, node: int, level: int, neighbors: List[int]) -> None:
+        if level == 0:
+            self._links0[node, : len(neighbors)] = neighbors
+            self._links0[node, len(neighbors):] = -1
+            self._link_counts0[node] = len(neighbors)
+        else:
+            self._upper[level - 1][node] = np.asarray(neighbors, dtype=np.int32)
+
+    def _insert(self, slot: int, q: np.ndarray) -> None:
+        level = self._random_level()
+        self._vectors[slot] = q
+        self._levels[slot] = level
+        self._deleted[slot] = False
+        while len(self._upper) < level:
+            self._upper.append({})
+        for lc in range(level + 1):
+            self._set_neighbors(slot, lc, [])
+
+        if self._entry_point < 0:
+            self._entry_point, self._max_level = slot, level
+            return
+
+        ep = self._greedy_descend(q, self._entry_point, self._max_level, level + 1)
+        for lc in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(q, [ep], self.ef_construction, lc)
+            max_links = self.max_links0 if lc == 0 else self.M
+            chosen = self._select_neighbors(candidates, self.M)
+            self._set_neighbors(slot, lc, chosen)
+            for neighbor in chosen:
+                self._connect(neighbor, slot, lc, max_links)
+            ep = candidates[0][1]
+
+        if level > self._max_level:
+            self._entry_point, self._max_level = slot, level
+
+    def _connect(self, node: int, new_neighbor: int, level: int, max_links: int) -> None:
+        """Add ``node -> new_neighbor``, pruning ``node``'s links with the heuristic when full."""
+        current = self._neighbors(node, level)
+        if new_neighbor in current:
+            return
+        if len(current) < max_links:
+            self._set_neighbors(node, level, current.tolist() + [new_neighbor])
+            return
+        ids = np.append(current, new_neighbor)
+        dists = 1.0 - self._vectors[ids] @ self._vectors[node]
+        order = np.argsort(dists)
+        candidates = list(zip(dists[order].tolist(), ids[order].tolist()))
+        self._set_neighbors(node, level, self._select_neighbors(candidates, max_links))
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """HNSW neighbour-selection heuristic over ``candidates`` sorted by distance.
+
+        A candidate is kept only if it is closer to the base point than to any
+        already-kept neighbour, which preserves long-range links between clusters.
+        """
+        if len(candidates) <= m:
+            return [cand for _, cand in candidates]
+        dists, ids = zip(*candidates)
+        ids = np.asarray(ids, dtype=np.int64)
+        vecs = self._vectors[ids]
+        pairwise = vecs @ vecs.T
+        base_sim = 1.0 - np.asarray(dists, dtype=np.float32)
+        # Highest similarity of each candidate to any kept neighbour so far
+        nearest_kept = np.full(len(ids), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        start = 0
+        while len(selected) < m and start < len(ids):
+            eligible = nearest_kept[start:] <= base_sim[start:]
+            offset = int(eligible.argmax())
+            if not eligible[offset]:
+                break
+            i = start + offset
+            selected.append(i)
+            np.maximum(nearest_kept, pairwise[i], out=nearest_kept)
+            start = i + 1
+        return ids[selected].tolist()
+
+    def _unlink(self, slot: int) -> None:
+        """Detach an evicted slot and patch the holes it leaves in its neighbours' lists.
+
+        Each former neighbour drops its link to ``slot`` and tops its list back
+        up with the nearest of the other former neighbours. Links into ``slot``
+        from nodes outside its own neighbour list are left in place; they
+        route to whatever vector reuses the slot, which costs a little search
+        efficiency but never correctness of returned results.
+        """
+        if self._deleted[slot]:
+            self._deleted[slot] = False
+        else:
+            self._live -= 1
+        old_level = int(self._levels[slot])
+        for lc in range(old_level + 1):
+            former = self._neighbors(slot, lc)
+            former = former[former != slot].astype(np.int64)
+            max_links = self.max_links0 if lc == 0 else self.M
+            if len(former):
+                # Row i ranks the other former neighbours by closeness to former[i]
+                order = np.argsort(-(self._vectors[former] @ self._vectors[former].T), axis=1)
+                former_list = former.tolist()
+                for i, node in enumerate(former_list):
+                    kept = [n for n in self._neighbors(node, lc).tolist() if n != slot]
+                    for j in order[i].tolist():
+                        if len(kept) >= max_links:
+                            break
+                        candidate = former_list[j]
+                        if candidate != node and candidate not in kept:
+                            kept.append(candidate)
+                    self._set_neighbors(node, lc, kept)
+            if lc > 0:
+                self._upper[lc - 1].pop(slot, None)
+        self._link_counts0[slot] = 0
+        self._levels[slot] = -1
+
+        if slot == self._entry_point:
+            if self._occupied <= 1:
+                self._entry_point, self._max_level = -1, -1
+            else:
+                self._entry_point = int(np.argmax(self._levels))
+                self._max_level = int(self._levels[self._entry_point])
+
+    # ── Search primitives ──────────────────────────────────────────────
+    def _greedy_descend(self, q: np.ndarray, ep: int, top_level: int, stop_level: int) -> int:
+        """Greedy ef=1 walk over levels ``top_level`` down to ``stop_level`` inclusive."""
+        best = 1.0 - float(self._vectors[ep] @ q)
+        for lc in range(top_level, stop_level - 1, -1):
+            improved = True
+            while improved:
+                improved = False
+                neighbors = self._neighbors(ep, lc)
+                if len(neighbors) == 0:
+                    break
+                dists = 1.0 - self._vectors[neighbors] @ q
+                i = int(np.argmin(dists))
+                if dists[i] < best:
+                    best, ep, improved = float(dists[i]), int(neighbors[i]), True
+        return ep
+
+    def _next_visit_tag(self) -> int:
+        self._visit_tag += 1
+        if self._visit_tag == np.iinfo(np.uint32).max:
+            self._visited.fill(0)
+            self._visit_tag = 1
+        return self._visit_tag
+
+    def _search_layer(self, q: np.ndarray, entry_points: List[int], ef: int, level: int) -> List[Tuple[float, int]]:
+        """Best-first beam search on one layer; returns up to ``ef`` (distance, slot) pairs, nearest first."""
+        tag = self._next_visit_tag()
+        visited = self._visited
+        eps = np.asarray(entry_points, dtype=np.int64)
+        visited[eps] = tag
+        dists = (1.0 - self._vectors[eps] @ q).tolist()
+        candidates = list(zip(dists, eps.tolist()))
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            # Expand up to _EXPAND_BATCH frontier nodes per NumPy round trip
+            bound = -results[0][0] if len(results) >= ef else math.inf
+            batch = []
+            while candidates and len(batch) < _EXPAND_BATCH and candidates[0][0] <= bound:
+                batch.append(heapq.heappop(candidates)[1])
+            if not batch:
+                break
+            if level == 0:
+                neighbors = self._links0[batch].ravel()
+                neighbors = neighbors[neighbors >= 0]
+            else:
+                neighbors = np.concatenate([self._neighbors(node, level) for node in batch])
+            fresh = neighbors[visited[neighbors] != tag]
+            if len(fresh) == 0:
+                continue
+            if len(batch) > 1:
+                fresh = np.unique(fresh)
+            visited[fresh] = tag
+            fresh_dists = 1.0 - self._vectors[fresh] @ q
+            if len(results) >= ef:
+                # The bound only tightens inside the loop, so this pre-filter is safe
+                closer = fresh_dists < bound
+                fresh, fresh_dists = fresh[closer], fresh_dists[closer]
+            for d, n in zip(fresh_dists.tolist(), fresh.tolist()):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    heapq.heappush(results, (-d, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted((-negd, n) for negd, n in results)
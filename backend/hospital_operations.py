@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from . import audit, auth, database, models, schemas
+from .cache_service import cached_response, facility_tag, facility_write_tags, invalidate_tags
 
 router = APIRouter(prefix="/hospital", tags=["Hospital Operations"])
 
@@ -118,6 +119,13 @@ def _event(
     return care_event
 
 
+def _invalidate_cached_views(facility_id: int | None, *, patient_id: int | None = None) -> None:
+    tags = facility_write_tags(facility_id)
+    if patient_id is not None:
+        tags.append(f"patient:{patient_id}")
+    invalidate_tags(*tags)
+
+
 def _serialize_patient(user: models.User) -> dict[str, Any]:
     return {
         "patient_id": user.id,
@@ -143,6 +151,7 @@ def create_facility(
     db.add(db_facility)
     db.commit()
     db.refresh(db_facility)
+    _invalidate_cached_views(db_facility.id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -188,6 +197,7 @@ def create_department(
     db.add(db_department)
     db.commit()
     db.refresh(db_department)
+    _invalidate_cached_views(db_department.facility_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -225,6 +235,7 @@ def create_bed(
     db.add(db_bed)
     db.commit()
     db.refresh(db_bed)
+    _invalidate_cached_views(db_bed.facility_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -292,6 +303,7 @@ def update_bed_status(
     bed.current_patient_id = payload.current_patient_id
     db.commit()
     db.refresh(bed)
+    _invalidate_cached_views(bed.facility_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -356,6 +368,7 @@ def create_encounter(
     )
     db.commit()
     db.refresh(db_encounter)
+    _invalidate_cached_views(db_encounter.facility_id, patient_id=db_encounter.patient_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -479,6 +492,7 @@ def create_admission(
     )
     db.commit()
     db.refresh(db_admission)
+    _invalidate_cached_views(db_admission.facility_id, patient_id=db_admission.patient_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -552,6 +566,7 @@ def create_order(
     )
     db.commit()
     db.refresh(db_order)
+    _invalidate_cached_views(db_order.facility_id, patient_id=db_order.patient_id)
     audit.record_audit_event(
         db,
         actor_user_id=current_user.id,
@@ -706,6 +721,15 @@ def get_admin_operations(
     current_user: models.User = Depends(auth.get_current_user),
 ) -> dict[str, Any]:
     _require_admin(current_user)
+    return _facility_operations_summary(db, current_user)
+
+
+@cached_response(
+    ttl=60,
+    key_prefix="hospital_operations",
+    tags=lambda args: [facility_tag(args["current_user"].facility_id)],
+)
+def _facility_operations_summary(db: Session, current_user: models.User) -> dict[str, Any]:
     facility_query = _scope_query_to_user_facility(
         db.query(models.HospitalFacility),
         models.HospitalFacility.id,
@@ -4,16 +4,18 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 import hmac
 import json
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from . import (
     abdm,
@@ -48,6 +50,10 @@ ALLOWED_EXPORT_RESOURCES = {
 }
 INTEROP_FACILITY_MISMATCH_DETAIL = "Interoperability resources must belong to the same facility"
 INTEROP_FACILITY_ACCESS_DETAIL = "Interoperability resource is outside the user's facility"
+FHIR_JSON_MEDIA_TYPE = "application/fhir+json"
+# Rows fetched per round-trip and bytes buffered per write when streaming exports
+EXPORT_STREAM_CHUNK_ROWS = int(os.getenv("EXPORT_STREAM_CHUNK_ROWS", "500"))
+EXPORT_STREAM_WRITE_BYTES = int(os.getenv("EXPORT_STREAM_WRITE_BYTES", "65536"))
 
 # 🏥 Live EHR Sync Connectors (Epic App Orchard & Cerner Sandbox)
 EHR_PROVIDER_CATALOG = {
@@ -353,106 +359,201 @@ def _entry(resource: dict[str, Any]) -> dict[str, Any]:
     return fhir.bundle_entry(resource)
 
 
-def _build_bundle(db: Session, patient: models.User, filters: dict[str, Any]) -> dict[str, Any]:
-    resources: list[dict[str, Any]] = [fhir.patient_resource(patient)]
-
-    if _resource_allowed(filters, "Encounter"):
-        encounters = db.query(models.Encounter).filter(models.Encounter.patient_id == patient.id).all()
-        for encounter in encounters:
-            if not _department_allowed(filters, encounter.department_id):
-                continue
-            resources.append(fhir.encounter_resource(encounter, patient.id))
-
-    if _resource_allowed(filters, "Observation"):
-        observations = db.query(models.VitalObservation).filter(models.VitalObservation.patient_id == patient.id).all()
-        for observation in observations:
-            if not _department_allowed(filters, observation.department_id):
-                continue
-            resources.append(fhir.observation_resource(observation, patient.id))
-
-    if _resource_allowed(filters, "DiagnosticReport"):
-        diagnostic_results = db.query(models.DiagnosticResult).filter(models.DiagnosticResult.patient_id == patient.id).all()
-        for result in diagnostic_results:
-            if not _department_allowed(filters, result.department_id):
-                continue
-            resources.append(fhir.diagnostic_report_resource(result, patient.id))
-
-    if _resource_allowed(filters, "MedicationRequest"):
-        prescriptions = db.query(models.Prescription).filter(models.Prescription.patient_id == patient.id).all()
-        for prescription in prescriptions:
-            if filters.get("department_id") is not None:
-                prescription_department_id = prescription.encounter.department_id if prescription.encounter else None
-                if not _department_allowed(filters, prescription_department_id):
-                    continue
-            resources.append(fhir.medication_request_resource(prescription, patient.id))
-
-    if _resource_allowed(filters, "Invoice"):
-        invoices = db.query(models.Invoice).filter(models.Invoice.patient_id == patient.id).all()
-        for invoice in invoices:
-            if filters.get("department_id") is not None:
-                invoice_department_id = None
-                if invoice.encounter:
-                    invoice_department_id = invoice.encounter.department_id
-                elif invoice.admission:
-                    invoice_department_id = invoice.admission.department_id
-                if not _department_allowed(filters, invoice_department_id):
-                    continue
-            resources.append(fhir.invoice_resource(invoice, patient.id))
-
-    if _resource_allowed(filters, "CareEvent"):
-        care_events = db.query(models.CareEvent).filter(models.CareEvent.patient_id == patient.id).all()
-        for event in care_events:
-            if not _department_allowed(filters, event.department_id):
-                continue
-            resources.append(fhir.care_event_resource(event, patient.id))
-
-    return fhir.build_bundle(resources, timestamp=datetime.now(timezone.utc))
+def _patient_rows(db: Session, model: Any, patient_id: int, *options: Any, chunk_rows: int = EXPORT_STREAM_CHUNK_ROWS):
+    return (
+        db.query(model)
+        .options(*options)
+        .filter(model.patient_id == patient_id)
+        .order_by(model.id)
+        .yield_per(chunk_rows)
+    )
 
 
-def _record_export(
+# Non-Patient export resource types in bundle order: (model, FHIR builder taking (row, patient_id))
+EXPORT_ROW_SOURCES = {
+    "Encounter": (models.Encounter, fhir.encounter_resource),
+    "Observation": (models.VitalObservation, fhir.observation_resource),
+    "DiagnosticReport": (models.DiagnosticResult, fhir.diagnostic_report_resource),
+    "MedicationRequest": (models.Prescription, fhir.medication_request_resource),
+    "Invoice": (models.Invoice, fhir.invoice_resource),
+    "CareEvent": (models.CareEvent, fhir.care_event_resource),
+}
+
+
+def _row_options(resource_type: str, by_department: bool) -> list[Any]:
+    """Eager loads for the relationships read while filtering or mapping ``resource_type`` rows."""
+    if resource_type == "MedicationRequest":
+        options = [selectinload(models.Prescription.items)]
+        if by_department:
+            options.append(joinedload(models.Prescription.encounter))
+        return options
+    if resource_type == "Invoice" and by_department:
+        return [joinedload(models.Invoice.encounter), joinedload(models.Invoice.admission)]
+    return []
+
+
+def _row_department_id(resource_type: str, row: Any) -> int | None:
+    if resource_type == "MedicationRequest":
+        return row.encounter.department_id if row.encounter else None
+    if resource_type == "Invoice":
+        if row.encounter:
+            return row.encounter.department_id
+        if row.admission:
+            return row.admission.department_id
+        return None
+    return row.department_id
+
+
+def _row_allowed(filters: dict[str, Any], resource_type: str, row: Any) -> bool:
+    if filters.get("department_id") is None:
+        return True
+    return _department_allowed(filters, _row_department_id(resource_type, row))
+
+
+def _iter_bundle_resources(
     db: Session,
+    patient: models.User,
+    filters: dict[str, Any],
+    chunk_rows: int = EXPORT_STREAM_CHUNK_ROWS,
+) -> Iterator[dict[str, Any]]:
+    """Yield the patient's export resources in bundle order, ``chunk_rows`` rows per fetch.
+
+    Relationships read while filtering or mapping are eager-loaded per chunk
+    instead of lazily per row.
+    """
+    yield fhir.patient_resource(patient)
+    by_department = filters.get("department_id") is not None
+    for resource_type, (model, build) in EXPORT_ROW_SOURCES.items():
+        if not _resource_allowed(filters, resource_type):
+            continue
+        options = _row_options(resource_type, by_department)
+        for row in _patient_rows(db, model, patient.id, *options, chunk_rows=chunk_rows):
+            if _row_allowed(filters, resource_type, row):
+                yield build(row, patient.id)
+
+
+def _build_bundle(db: Session, patient: models.User, filters: dict[str, Any]) -> dict[str, Any]:
+    return fhir.build_bundle(list(_iter_bundle_resources(db, patient, filters)), timestamp=datetime.now(timezone.utc))
+
+
+class BundleStream:
+    """Serialize a bundle as canonical JSON entry by entry, hashing as it goes.
+
+    The emitted bytes are exactly ``_canonical_json(bundle)`` for the same
+    entries and timestamp, so ``sha256`` matches ``_bundle_sha256`` without
+    holding the bundle or serializing it twice.
+    """
+
+    def __init__(self, timestamp: datetime | None = None, write_bytes: int = EXPORT_STREAM_WRITE_BYTES):
+        self.timestamp = fhir.fhir_datetime(timestamp or datetime.now(timezone.utc))
+        self.write_bytes = write_bytes
+        self.resource_count = 0
+        self._digest = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def iter_bytes(self, resources: Iterator[dict[str, Any]]) -> Iterator[bytes]:
+        buffer = bytearray(b'{"entry":[')
+        for entry in fhir.stream_bundle_entries(resources):
+            if self.resource_count:
+                buffer += b","
+            buffer += _canonical_json(entry).encode("utf-8")
+            self.resource_count += 1
+            if len(buffer) >= self.write_bytes:
+                yield self._emit(buffer)
+                buffer = bytearray()
+        tail = {"resourceType": "Bundle", "timestamp": self.timestamp, "type": "collection"}
+        buffer += b"]," + _canonical_json(tail)[1:].encode("utf-8")
+        yield self._emit(buffer)
+
+    def _emit(self, buffer: bytearray) -> bytes:
+        chunk = bytes(buffer)
+        self._digest.update(chunk)
+        return chunk
+
+
+def write_bundle_ndjson(
+    db: Session,
+    patient: models.User,
+    filters: dict[str, Any],
+    path: str,
+    chunk_rows: int = EXPORT_STREAM_CHUNK_ROWS,
+) -> tuple[int, str]:
+    """Write the patient's export resources to ``path`` as NDJSON (one canonical resource per line).
+
+    Returns ``(resource_count, sha256_of_file_bytes)``.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    with open(path, "wb") as handle:
+        buffer = bytearray()
+        for entry in fhir.stream_bundle_entries(_iter_bundle_resources(db, patient, filters, chunk_rows)):
+            buffer += _canonical_json(entry["resource"]).encode("utf-8") + b"\n"
+            count += 1
+            if len(buffer) >= EXPORT_STREAM_WRITE_BYTES:
+                digest.update(buffer)
+                handle.write(buffer)
+                buffer = bytearray()
+        digest.update(buffer)
+        handle.write(buffer)
+    return count, digest.hexdigest()
+
+
+def _new_export(
     *,
     facility_id: int | None,
     patient_id: int,
     requested_by_id: int | None,
     consent_id: int | None,
     profile_id: int | None,
-    resource_count: int,
     filter_summary: str,
-    bundle_sha256: str,
+    status: str,
 ) -> models.InteroperabilityExport:
-    export = models.InteroperabilityExport(
+    return models.InteroperabilityExport(
         facility_id=facility_id,
         patient_id=patient_id,
         requested_by_id=requested_by_id,
         consent_id=consent_id,
         profile_id=profile_id,
         export_type="fhir_bundle",
-        resource_count=resource_count,
+        resource_count=0,
         filter_summary=filter_summary,
-        bundle_sha256=bundle_sha256,
         signature_algorithm=SIGNATURE_ALGORITHM,
-        status="completed",
+        status=status,
     )
+
+
+def _complete_export(
+    db: Session,
+    export: models.InteroperabilityExport,
+    *,
+    resource_count: int,
+    bundle_sha256: str,
+) -> models.InteroperabilityExport:
+    export.resource_count = resource_count
+    export.bundle_sha256 = bundle_sha256
+    export.status = "completed"
     db.add(export)
-    db.commit()
+    db.flush()
     db.refresh(export)
     export.manifest_signature = _sign_manifest(_manifest_payload(export))
     db.commit()
     db.refresh(export)
     audit.record_audit_event(
         db,
-        actor_user_id=requested_by_id,
-        target_user_id=patient_id,
+        actor_user_id=export.requested_by_id,
+        target_user_id=export.patient_id,
         action="EXPORT_INTEROPERABILITY_BUNDLE",
         details={
             "resource_type": "interoperability_export",
             "resource_id": export.id,
-            "consent_id": consent_id,
-            "profile_id": profile_id,
+            "consent_id": export.consent_id,
+            "profile_id": export.profile_id,
             "export_type": export.export_type,
             "resource_count": resource_count,
-            "filters": _load_filter_summary(filter_summary),
+            "filters": _load_filter_summary(export.filter_summary),
             "bundle_sha256": bundle_sha256,
             "signature_algorithm": export.signature_algorithm,
         },
@@ -460,6 +561,30 @@ def _record_export(
     return export
 
 
+def _record_export(
+    db: Session,
+    *,
+    facility_id: int | None,
+    patient_id: int,
+    requested_by_id: int | None,
+    consent_id: int | None,
+    profile_id: int | None,
+    resource_count: int,
+    filter_summary: str,
+    bundle_sha256: str,
+) -> models.InteroperabilityExport:
+    export = _new_export(
+        facility_id=facility_id,
+        patient_id=patient_id,
+        requested_by_id=requested_by_id,
+        consent_id=consent_id,
+        profile_id=profile_id,
+        filter_summary=filter_summary,
+        status="completed",
+    )
+    return _complete_export(db, export, resource_count=resource_count, bundle_sha256=bundle_sha256)
+
+
 def _export_bundle(
     db: Session,
     patient: models.User,
@@ -496,6 +621,46 @@ def _export_bundle(
     }
 
 
+def _stream_export_bundle(
+    db: Session,
+    patient: models.User,
+    current_user: models.User,
+    consent: models.InteroperabilityConsent | None,
+    filters: dict[str, Any],
+) -> StreamingResponse:
+    """Stream the bundle as canonical JSON; the manifest is signed once the last byte is hashed.
+
+    The export row is created up front (status ``streaming``) so its id can be
+    returned in ``X-Export-Id`` and the signed manifest fetched afterwards.
+    """
+    export = _new_export(
+        facility_id=_resolve_interop_facility_id(current_user, patient),
+        patient_id=patient.id,
+        requested_by_id=current_user.id,
+        consent_id=consent.id if consent else None,
+        profile_id=filters.get("profile_id"),
+        filter_summary=_filter_summary_json(filters),
+        status="streaming",
+    )
+    db.add(export)
+    db.commit()
+    db.refresh(export)
+    stream = BundleStream()
+
+    def body() -> Iterator[bytes]:
+        try:
+            yield from stream.iter_bytes(_iter_bundle_resources(db, patient, filters))
+        except Exception:
+            db.rollback()
+            export.status = "failed"
+            db.commit()
+            logger.error("Streaming FHIR export %s failed", export.id)
+            raise
+        _complete_export(db, export, resource_count=stream.resource_count, bundle_sha256=stream.sha256)
+
+    return StreamingResponse(body(), media_type=FHIR_JSON_MEDIA_TYPE, headers={"X-Export-Id": str(export.id)})
+
+
 def _ensure_manifest_access(db: Session, current_user: models.User, export: models.InteroperabilityExport) -> None:
     _ensure_facility_access(current_user, export.facility_id)
     if auth.is_admin(current_user):
@@ -1020,6 +1185,40 @@ def get_smart_authorization_url(
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
 
+def _patient_export_request(
+    db: Session,
+    current_user: models.User,
+    resource_types: str | None,
+    department_id: int | None,
+    profile_id: int | None,
+) -> tuple[models.User, models.InteroperabilityConsent, dict[str, Any]]:
+    _require_patient(current_user)
+    patient = _get_patient(db, current_user.id)
+    consent = _require_active_export_consent(db, patient.id)
+    profile = _get_active_export_profile(db, profile_id)
+    if profile is not None:
+        _ensure_facility_access(current_user, profile.facility_id)
+    return patient, consent, _parse_export_filters(resource_types, department_id, profile)
+
+
+def _doctor_export_request(
+    db: Session,
+    current_user: models.User,
+    patient_id: int,
+    resource_types: str | None,
+    department_id: int | None,
+    profile_id: int | None,
+) -> tuple[models.User, models.InteroperabilityConsent, dict[str, Any]]:
+    _ensure_doctor_can_access_patient(db, current_user, patient_id)
+    patient = _get_patient(db, patient_id)
+    _ensure_facility_access(current_user, patient.facility_id)
+    consent = _require_active_export_consent(db, patient_id)
+    profile = _get_active_export_profile(db, profile_id)
+    if profile is not None:
+        _ensure_facility_access(current_user, profile.facility_id)
+    return patient, consent, _parse_export_filters(resource_types, department_id, profile)
+
+
 @router.get("/patient/fhir-bundle")
 def export_patient_bundle(
     resource_types: str | None = None,
@@ -1028,16 +1227,22 @@ def export_patient_bundle(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user),
 ) -> dict[str, Any]:
-    _require_patient(current_user)
-    patient = _get_patient(db, current_user.id)
-    consent = _require_active_export_consent(db, patient.id)
-    profile = _get_active_export_profile(db, profile_id)
-    if profile is not None:
-        _ensure_facility_access(current_user, profile.facility_id)
-    filters = _parse_export_filters(resource_types, department_id, profile)
+    patient, consent, filters = _patient_export_request(db, current_user, resource_types, department_id, profile_id)
     return _export_bundle(db, patient, current_user, consent, filters)
 
 
+@router.get("/patient/fhir-bundle/stream")
+def stream_patient_bundle(
+    resource_types: str | None = None,
+    department_id: int | None = None,
+    profile_id: int | None = None,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+) -> StreamingResponse:
+    patient, consent, filters = _patient_export_request(db, current_user, resource_types, department_id, profile_id)
+    return _stream_export_bundle(db, patient, current_user, consent, filters)
+
+
 @router.get("/doctor/patients/{patient_id}/fhir-bundle")
 def export_doctor_patient_bundle(
     patient_id: int,
@@ -1047,17 +1252,27 @@ def export_doctor_patient_bundle(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user),
 ) -> dict[str, Any]:
-    _ensure_doctor_can_access_patient(db, current_user, patient_id)
-    patient = _get_patient(db, patient_id)
-    _ensure_facility_access(current_user, patient.facility_id)
-    consent = _require_active_export_consent(db, patient_id)
-    profile = _get_active_export_profile(db, profile_id)
-    if profile is not None:
-        _ensure_facility_access(current_user, profile.facility_id)
-    filters = _parse_export_filters(resource_types, department_id, profile)
+    patient, consent, filters = _doctor_export_request(
+        db, current_user, patient_id, resource_types, department_id, profile_id
+    )
     return _export_bundle(db, patient, current_user, consent, filters)
 
 
+@router.get("/doctor/patients/{patient_id}/fhir-bundle/stream")
+def stream_doctor_patient_bundle(
+    patient_id: int,
+    resource_types: str | None = None,
+    department_id: int | None = None,
+    profile_id: int | None = None,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+) -> StreamingResponse:
+    patient, consent, filters = _doctor_export_request(
+        db, current_user, patient_id, resource_types, department_id, profile_id
+    )
+    return _stream_export_bundle(db, patient, current_user, consent, filters)
+
+
 @router.get("/exports/{export_id}/manifest")
 def get_export_manifest(
     export_id: int,
@@ -33,7 +33,7 @@ logger = logging.getLogger(__name__)
 # Configure Rate Limiter
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from slowapi.middleware import SlowAPIASGIMiddleware
 from slowapi.util import get_remote_address
 
 # Use global limiter for all components to import
@@ -84,6 +84,7 @@ from . import (
     admin,
     auth,
     billing,
+    bulk_export,
     care_events,
     chat,
     clinical_intelligence,
@@ -801,6 +802,13 @@ async def lifespan(app: FastAPI):
     except Exception as eb_err:
         startup_diagnostics["event_bus"] = f"failed: {str(eb_err)}"
 
+    # Pick up bulk exports interrupted by the previous process
+    try:
+        resumed = bulk_export.bulk_export_engine.resume_pending()
+        startup_diagnostics["bulk_exports_resumed"] = len(resumed)
+    except Exception as bulk_err:
+        logger.warning("Failed to resume bulk exports: %s", bulk_err)
+
     logger.info("*" * 60)
     logger.info(" AI Healthcare System LEGAL & MEDICAL DISCLAIMER ACTIVE")
     logger.info(" Provided 'AS IS' for Clinical Decision Support only.")
@@ -815,9 +823,25 @@ async def lifespan(app: FastAPI):
         from .event_bus import event_bus
         await event_bus.stop()
         logger.info("Clinical Event Bus stopped.")
+        from .event_bus import stream_buffer
+        stream_buffer.close()
     except Exception as eb_stop_err:
         logger.warning("Failed to stop Event Bus: %s", eb_stop_err)
 
+    # Checkpoint running bulk exports; they resume on the next start
+    try:
+        bulk_export.bulk_export_engine.close(wait=True)
+    except Exception as bulk_err:
+        logger.warning("Failed to stop bulk export workers: %s", bulk_err)
+
+    # Drain queued audit events before the process exits
+    try:
+        from .audit import audit_writer
+        if not audit_writer.close(timeout=10.0):
+            logger.warning("Audit writer did not drain before shutdown timeout.")
+    except Exception as audit_err:
+        logger.warning("Failed to flush audit events: %s", audit_err)
+
     # Backup SQLite database to Supabase Storage backup if configured
     try:
         backup_sqlite_database()
@@ -838,20 +862,19 @@ API_V1_PREFIX = "/v1"
 
 
 # Add middleware (order matters - last added runs first on incoming requests)
-app.add_middleware(middleware.LoggingMiddleware)
-if not os.getenv("TESTING"):
-    app.add_middleware(middleware.ExceptionMiddleware)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=_load_allowed_hosts())
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(SlowAPIASGIMiddleware)
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.state.limiter = limiter
 
-app.add_middleware(middleware.RequestTracingMiddleware)
-app.add_middleware(middleware.PrometheusMetricsMiddleware)
-app.add_middleware(middleware.LicenseValidationMiddleware)
-app.add_middleware(middleware.APIVersioningMiddleware)
+# Security headers, /v1 redirects, licensing, metrics, tracing, the 500 guard
+# and access logging all run inside one raw-ASGI layer.
+_pipeline_stages = tuple(
+    stage for stage in middleware.ClinicalRequestPipeline.STAGES
+    if not (stage == "exceptions" and os.getenv("TESTING"))
+)
+app.add_middleware(middleware.ClinicalRequestPipeline, stages=_pipeline_stages)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
-app.add_middleware(middleware.SecurityHeadersMiddleware)
 app.add_middleware(CORSMiddleware,
     allow_origins=_load_cors_origins(),
     allow_credentials=True,
@@ -878,6 +901,7 @@ app.include_router(discharge.router, prefix=API_V1_PREFIX)
 app.include_router(nursing.router, prefix=API_V1_PREFIX)
 app.include_router(care_events.router, prefix=API_V1_PREFIX)
 app.include_router(interoperability.router, prefix=API_V1_PREFIX)
+app.include_router(bulk_export.router, prefix=API_V1_PREFIX)
 app.include_router(payments.router, prefix=API_V1_PREFIX)
 app.include_router(telemetry.router, prefix=f"{API_V1_PREFIX}/telemetry", tags=["Telemetry"])
 app.include_router(telemetry.router, prefix="/telemetry", tags=["Telemetry"])
@@ -984,7 +1008,7 @@ async def time_predict(background_tasks: BackgroundTasks):
             proba_pos, conformal_q, imputed_list, raw, risk_level
         )
         pred._get_triage_recommendation(raw, conformal_metrics["conformal_prediction_set"])
-        pred._get_top_risk_factors(pred.heart_model, imputed_list, _features.HEART_FEATURES)
+        pred._get_top_risk_factors(pred.heart_model, imputed_list, _features.HEART_FEATURES, model_name="heart")
         clinical_indices = {"framingham_risk": {}, **conformal_metrics}
         timings["conformal_triage_factors"] = time.time() - start
 
@@ -0,0 +1,116 @@
+"""Inverted metadata index used to resolve ACL filters in the vector stores.
+
+Kept outside ``backend.rag`` so it is importable whether or not the
+``clinical-rag-cache`` package replaces the fallback RAG implementation.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+def _normalize_value(value: Any) -> str:
+    # Same normalisation as rag._normalize_acl_value, so keys match filters
+    return str(value).strip()
+
+
+class MetadataIndex:
+    """
+    Inverted index over equality-filtered metadata fields for ACL-scoped search.
+
+    Maps ``field -> normalized value -> integer keys`` (store row numbers or
+    uint64 ids) so an allowlist is a dictionary lookup plus a sorted-array
+    intersection instead of a ``_metadata_matches_filter`` scan over every
+    record. Only ``fields`` are indexed (by default the keys produced by
+    ``_build_acl_filter``); other filter keys are returned as a residual
+    filter for the caller to check against the narrowed candidates.
+    """
+
+    DEFAULT_FIELDS = ("user_id", "facility_id")
+
+    def __init__(self, fields: Iterable[str] = DEFAULT_FIELDS):
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[str, set]] = {f: {} for f in self.fields}
+        # Sorted uint64 arrays, built lazily per posting and dropped on change
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def add(self, key: int, metadata: Optional[Dict[str, Any]]) -> None:
+        if not metadata:
+            return
+        for f in self.fields:
+            if f in metadata:
+                value = _normalize_value(metadata[f])
+                self._postings[f].setdefault(value, set()).add(int(key))
+                self._arrays.pop((f, value), None)
+
+    def remove(self, key: int, metadata: Optional[Dict[str, Any]]) -> None:
+        if not metadata:
+            return
+        for f in self.fields:
+            if f in metadata:
+                value = _normalize_value(metadata[f])
+                posting = self._postings[f].get(value)
+                if posting is None:
+                    continue
+                posting.discard(int(key))
+                if not posting:
+                    del self._postings[f][value]
+                self._arrays.pop((f, value), None)
+
+    def clear(self) -> None:
+        self._postings = {f: {} for f in self.fields}
+        self._arrays = {}
+
+    def rebuild(self, items: Iterable[Tuple[int, Optional[Dict[str, Any]]]]) -> None:
+        self.clear()
+        for key, metadata in items:
+            self.add(key, metadata)
+
+    def _posting_array(self, f: str, value: str) -> np.ndarray:
+        array = self._arrays.get((f, value))
+        if array is None:
+            posting = self._postings[f].get(value, ())
+            array = np.fromiter(posting, dtype=np.uint64, count=len(posting))
+            array.sort()
+            self._arrays[(f, value)] = array
+        return array
+
+    def lookup(self, filter_meta: Dict[str, Any]) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Return ``(keys, residual)``: sorted uint64 keys matching every indexed
+        field of ``filter_meta`` (``None`` if no filter field is indexed) and
+        the filter entries that still need ``_metadata_matches_filter``.
+        """
+        arrays = []
+        residual: Dict[str, Any] = {}
+        for f, expected in filter_meta.items():
+            if f in self._postings:
+                arrays.append(self._posting_array(f, _normalize_value(expected)))
+            else:
+                residual[f] = expected
+        if not arrays:
+            return None, residual
+        arrays.sort(key=len)
+        keys = arrays[0]
+        for other in arrays[1:]:
+            if not keys.size:
+                break
+            keys = np.intersect1d(keys, other, assume_unique=True)
+        return keys, residual
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fields": list(self.fields),
+            "postings": {
+                f: {value: sorted(keys) for value, keys in values.items()}
+                for f, values in self._postings.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetadataIndex":
+        index = cls(data.get("fields", cls.DEFAULT_FIELDS))
+        for f, values in (data.get("postings") or {}).items():
+            if f in index._postings:
+                index._postings[f] = {value: {int(k) for k in keys} for value, keys in values.items()}
+        return index
@@ -1,19 +1,26 @@
 """AI Healthcare System - Middleware Stack
 
-All custom middleware classes are defined here so that ``main.py`` remains
-a pure composition root.  Classes are registered in ``main.py`` via
-``app.add_middleware(middleware.<ClassName>)``.
+All custom middleware is defined here so that ``main.py`` remains a pure
+composition root.  Every stage is raw ASGI: ``ClinicalRequestPipeline`` runs
+the security-header, API-versioning, license, metrics, tracing, exception and
+access-log stages inside one middleware layer with a single ``send`` wrapper,
+so a request pays for one coroutine hop instead of one ``BaseHTTPMiddleware``
+task and body-stream wrapper per concern.  The per-concern classes
+(``SecurityHeadersMiddleware`` etc.) are single-stage pipelines kept for
+standalone use via ``app.add_middleware(middleware.<ClassName>)``.
 """
 import logging
 import os
 import re
 import time
 import uuid
+from typing import Optional
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse, RedirectResponse
-from jose import JWTError, jwt
-from starlette.middleware.base import BaseHTTPMiddleware
+from jose import JWTError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -58,43 +65,345 @@ _API_PREFIXES = (
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# Middleware classes
+# Stage helpers
 # ═══════════════════════════════════════════════════════════════════════════
 
+_RATE_LIMIT_EXEMPT_PATHS = frozenset({"/", "/docs", "/openapi.json", "/healthz"})
+_LICENSE_EXEMPT_PATHS = frozenset(
+    {
+        "/", "/healthz", "/docs", "/openapi.json", "/redoc",
+        "/v1/signup", "/v1/token", "/v1/forgot-password", "/v1/reset-password",
+        "/v1/licensing/status", "/v1/licensing/activate",
+    }
+)
+
+
+def _encode_headers(pairs: list[tuple[str, str]]) -> tuple[tuple[bytes, bytes], ...]:
+    return tuple((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in pairs)
+
+
+_HARDENING_HEADERS = [
+    ("X-Content-Type-Options", "nosniff"),
+    ("Referrer-Policy", "no-referrer"),
+    ("Permissions-Policy", "camera=(), microphone=(), geolocation=()"),
+    ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+]
+_SECURITY_HEADERS = _encode_headers([("X-Frame-Options", "DENY"), *_HARDENING_HEADERS])
+# Hugging Face Spaces embeds the application inside an iframe, so allow framing
+# from HF domains via CSP frame-ancestors instead of X-Frame-Options: DENY.
+_SPACES_SECURITY_HEADERS = _encode_headers(
+    [("Content-Security-Policy", "frame-ancestors 'self' https://*.huggingface.co https://huggingface.co"), *_HARDENING_HEADERS]
+)
+
+
+def _security_headers() -> tuple[tuple[bytes, bytes], ...]:
+    # Running in a Hugging Face Space is detected by SPACE_ID or SPACES_ID.
+    if os.getenv("SPACE_ID") or os.getenv("SPACES_ID"):
+        return _SPACES_SECURITY_HEADERS
+    return _SECURITY_HEADERS
 
-class APIVersioningMiddleware(BaseHTTPMiddleware):
+
+def _set_response_headers(message: Message, headers: tuple[tuple[bytes, bytes], ...]) -> None:
+    """Set (replace) raw headers on an ``http.response.start`` message in one pass."""
+    names = {name for name, _ in headers}
+    raw = [item for item in message.get("headers", ()) if item[0].lower() not in names]
+    raw.extend(headers)
+    message["headers"] = raw
+
+
+def _versioning_redirect(scope: Scope) -> Optional[RedirectResponse]:
     """Redirect legacy unversioned API requests to /v1 with 307 (preserves method & body)."""
+    if scope["method"] == "OPTIONS":
+        return None
+    path = scope["path"]
+    # Skip root-level infrastructure paths and already-versioned paths
+    if path in _UNVERSIONED_ROOT_PATHS or path.startswith(("/v1", "/assets", "/static")):
+        return None
+    # Redirect known API paths to /v1 equivalent
+    if path.startswith(_API_PREFIXES):
+        redirect_url = f"/v1{path}"
+        query = scope.get("query_string", b"")
+        if query:
+            redirect_url = f"{redirect_url}?{query.decode('latin-1')}"
+        return RedirectResponse(url=redirect_url, status_code=307)
+    return None
+
+
+class _LicenseCache:
+    """Caches validation result for 60 seconds to avoid cryptographic verification on every request."""
+
+    TTL = 60.0  # seconds
+
+    def __init__(self):
+        self.result: tuple[bool, str] | None = None
+        self.key = ""
+        self.checked_at = 0.0
+
+    def verify(self, license_key: str) -> tuple[bool, str]:
+        now = time.time()
+        if self.result is not None and self.key == license_key and (now - self.checked_at) < self.TTL:
+            return self.result
+        from . import licensing
+        self.result = licensing.verify_license_key(license_key)
+        self.key = license_key
+        self.checked_at = now
+        return self.result
+
+
+_license_cache = _LicenseCache()
+
+
+def _license_rejection(path: str) -> Optional[JSONResponse]:
+    """Verifies that a valid cryptographic license key is provided in self-hosted deployments."""
+    if os.getenv("TESTING") in ("1", "true"):
+        return None
+    # Exclude infrastructure, docs, authentication, and health checks
+    # So users can always access docs, sign in, or fetch tokens to activate.
+    if path in _LICENSE_EXEMPT_PATHS or path.startswith(("/assets", "/static")):
+        return None
+
+    raw_key = os.getenv("LICENSE_KEY")
+    license_key = "CLINIC-TRIAL-2026" if raw_key is None else raw_key.strip()
+    if not license_key:
+        return JSONResponse(
+            status_code=402,
+            content={"detail": "License Key is missing. Please set the LICENSE_KEY environment variable to activate the platform."}
+        )
+    is_valid, reason = _license_cache.verify(license_key)
+    if not is_valid:
+        return JSONResponse(
+            status_code=402,
+            content={"detail": f"License Key is invalid or expired: {reason}"}
+        )
+    return None
+
+
+class _RequestMetrics:
+    """Lazily bound Prometheus request count and latency collectors."""
+
+    def __init__(self):
+        self.request_count = None
+        self.request_duration = None
+        self.loaded = False
+
+    def observe(self, method: str, endpoint: str, status_code: str, duration: float) -> None:
+        if not self.loaded:
+            try:
+                from backend.enterprise_features import REQUEST_COUNT, REQUEST_DURATION
+                self.request_count = REQUEST_COUNT
+                self.request_duration = REQUEST_DURATION
+            except Exception:
+                pass
+            self.loaded = True
+        try:
+            if self.request_count is not None:
+                self.request_count.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            if self.request_duration is not None:
+                self.request_duration.labels(method=method, endpoint=endpoint).observe(duration)
+        except Exception:
+            # Shield middleware execution if Prometheus is disabled or unconfigured
+            pass
+
+
+_request_metrics = _RequestMetrics()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Composed pipeline
+# ═══════════════════════════════════════════════════════════════════════════
+
 
-    async def dispatch(self, request: Request, call_next):
-        if request.method == "OPTIONS":
-            return await call_next(request)
-        path = request.url.path
-        # Skip root-level infrastructure paths and already-versioned paths
-        if path in _UNVERSIONED_ROOT_PATHS or path.startswith("/v1") or path.startswith("/assets") or path.startswith("/static"):
-            return await call_next(request)
-        # Redirect known API paths to /v1 equivalent
-        if path.startswith(_API_PREFIXES):
-            redirect_url = f"/v1{path}"
-            if request.url.query:
-                redirect_url = f"{redirect_url}?{request.url.query}"
-            return RedirectResponse(url=redirect_url, status_code=307)
-        return await call_next(request)
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method == "OPTIONS" or os.getenv("TESTING"):
-            return await call_next(request)
-
-        if request.url.path not in ["/", "/docs", "/openapi.json", "/healthz"]:
+class ClinicalRequestPipeline:
+    """Single raw-ASGI layer running the enabled stages outermost-first.
+
+    Stage order matches the historical ``add_middleware`` stack:
+    ``security_headers`` -> ``versioning`` -> ``license`` -> ``metrics`` ->
+    ``tracing`` -> ``exceptions`` -> ``access_log`` -> app.  Response headers
+    from the header-producing stages are applied in one pass when the
+    ``http.response.start`` message goes out.
+    """
+
+    STAGES = ("security_headers", "versioning", "license", "metrics", "tracing", "exceptions", "access_log")
+
+    def __init__(self, app: ASGIApp, stages: Optional[tuple[str, ...]] = None):
+        self.app = app
+        enabled = set(self.STAGES if stages is None else stages)
+        unknown = enabled - set(ClinicalRequestPipeline.STAGES)
+        if unknown:
+            raise ValueError(f"Unknown middleware stages: {sorted(unknown)}")
+        self.security_headers = "security_headers" in enabled
+        self.versioning = "versioning" in enabled
+        self.license = "license" in enabled
+        self.metrics = "metrics" in enabled
+        self.tracing = "tracing" in enabled
+        self.exceptions = "exceptions" in enabled
+        self.access_log = "access_log" in enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        security_headers = _security_headers() if self.security_headers else None
+
+        async def send_outer(message: Message) -> None:
+            if security_headers is not None and message["type"] == "http.response.start":
+                _set_response_headers(message, security_headers)
+            await send(message)
+
+        early = None
+        if self.versioning:
+            early = _versioning_redirect(scope)
+        if early is None and self.license:
+            early = _license_rejection(scope["path"])
+        if early is not None:
+            await early(scope, receive, send_outer)
+            return
+
+        if not (self.metrics or self.tracing or self.exceptions or self.access_log):
+            await self.app(scope, receive, send_outer)
+            return
+        await self._call_inner(scope, receive, send_outer)
+
+    async def _call_inner(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start = time.time()
+        status_code = "500"
+        # Exclude /metrics path to prevent scrape loop pollution
+        record_metrics = self.metrics and scope["path"] != "/metrics"
+        endpoint = scope["path"]
+        if scope.get("route") is not None:
+            endpoint = scope["route"].path
+
+        request_id = None
+        tracing_headers = None
+        token = None
+        if self.tracing:
+            request_id = _request_id_from_headers(Headers(scope=scope))
+            scope.setdefault("state", {})["request_id"] = request_id
+            encoded_id = request_id.encode("latin-1")
+            tracing_headers = ((b"x-request-id", encoded_id), (b"x-correlation-id", encoded_id))
+            from backend.logging_config import correlation_id_var
+            token = correlation_id_var.set(request_id)
+
+        response_started = False
+
+        async def send_inner(message: Message) -> None:
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = str(message["status"])
+                if tracing_headers is not None:
+                    _set_response_headers(message, tracing_headers)
+            await send(message)
+
+        try:
+            try:
+                await self.app(scope, receive, send_inner)
+            except HTTPException:
+                raise  # Let FastAPI handle intentional HTTP errors normally
+            except Exception:
+                if not self.exceptions or response_started:
+                    raise
+                error_id = str(uuid.uuid4())[:8]
+                logger.error("Unhandled server error %s", error_id)
+                await JSONResponse(status_code=500, content={"detail": f"Error: {error_id}"})(scope, receive, send_inner)
+                return
+            if self.access_log:
+                logger.info(
+                    "%s %s - %s (%.0fms) request_id=%s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    (time.time() - start) * 1000,
+                    scope.get("state", {}).get("request_id", "-"),
+                )
+        finally:
+            if token is not None:
+                from backend.logging_config import correlation_id_var
+                correlation_id_var.reset(token)
+            if record_metrics:
+                _request_metrics.observe(scope["method"], endpoint, status_code, time.time() - start)
+
+
+def _request_id_from_headers(headers: Headers) -> str:
+    header_val = headers.get(REQUEST_ID_HEADER) or headers.get("X-Correlation-ID")
+    return _safe_request_id(header_val)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Single-stage middleware classes
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class SecurityHeadersMiddleware(ClinicalRequestPipeline):
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("security_headers",))
+
+
+class APIVersioningMiddleware(ClinicalRequestPipeline):
+    """Redirect legacy unversioned API requests to /v1 with 307 (preserves method & body)."""
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("versioning",))
+
+
+class LicenseValidationMiddleware(ClinicalRequestPipeline):
+    """Verifies that a valid cryptographic license key is provided in self-hosted deployments."""
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("license",))
+
+
+class PrometheusMetricsMiddleware(ClinicalRequestPipeline):
+    """Middleware to collect Prometheus metrics for request count and latency."""
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("metrics",))
+
+
+class RequestTracingMiddleware(ClinicalRequestPipeline):
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("tracing",))
+
+
+class ExceptionMiddleware(ClinicalRequestPipeline):
+    """Catch all unhandled exceptions and return a safe 500 response.
+
+    ``HTTPException`` is re-raised so FastAPI's built-in handler produces the
+    correct status code (404, 403, etc.).  Every other ``Exception`` is logged
+    with a full traceback (``exc_info=True``) and the client receives only an
+    opaque error reference ID — no stack traces or PII.
+    """
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("exceptions",))
+
+
+class LoggingMiddleware(ClinicalRequestPipeline):
+    def __init__(self, app: ASGIApp):
+        super().__init__(app, stages=("access_log",))
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or os.getenv("TESTING"):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] not in _RATE_LIMIT_EXEMPT_PATHS:
+            request = Request(scope)
             try:
                 identifier = self._identifier_for_request(request)
                 # Lazy imports to avoid circular dependency at module load time
                 from . import security
                 security.limiter.check(request, identifier)
             except HTTPException as e:
-                return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
-        return await call_next(request)
+                await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
 
     @staticmethod
     def _identifier_for_request(request: Request) -> str:
@@ -109,7 +418,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 try:
                     # Lazy import to avoid circular dependency at module load time
                     from . import auth
-                    payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+                    # Shares the verified claims with get_current_user via the principal cache
+                    payload = auth.decode_token_claims(token)
                     sub = payload.get("sub")
                     if sub:
                         return f"user:{sub}"
@@ -117,182 +427,3 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     # Fall back to IP-based limiting if token is invalid/expired.
                     pass
         return request.client.host if request.client else "unknown"
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        # Hugging Face Spaces embeds the application inside an iframe.
-        # If running in a Hugging Face Space (detected by SPACE_ID or SPACES_ID),
-        # allow framing from HF domains via CSP frame-ancestors instead of X-Frame-Options: DENY.
-        if os.getenv("SPACE_ID") or os.getenv("SPACES_ID"):
-            response.headers["Content-Security-Policy"] = (
-                "frame-ancestors 'self' https://*.huggingface.co https://huggingface.co"
-            )
-        else:
-            response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        return response
-
-
-class ExceptionMiddleware(BaseHTTPMiddleware):
-    """Catch all unhandled exceptions and return a safe 500 response.
-
-    ``HTTPException`` is re-raised so FastAPI's built-in handler produces the
-    correct status code (404, 403, etc.).  Every other ``Exception`` is logged
-    with a full traceback (``exc_info=True``) and the client receives only an
-    opaque error reference ID — no stack traces or PII.
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        try:
-            return await call_next(request)
-        except HTTPException:
-            raise  # Let FastAPI handle intentional HTTP errors normally
-        except Exception:
-            error_id = str(uuid.uuid4())[:8]
-            logger.error("Unhandled server error %s", error_id)
-            return JSONResponse(status_code=500, content={"detail": f"Error: {error_id}"})
-
-
-class RequestTracingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        header_val = request.headers.get(REQUEST_ID_HEADER) or request.headers.get("X-Correlation-ID") or request.headers.get("x-correlation-id")
-        request_id = _safe_request_id(header_val)
-        request.state.request_id = request_id
-
-        from backend.logging_config import correlation_id_var
-        token = correlation_id_var.set(request_id)
-        try:
-            response = await call_next(request)
-            response.headers[REQUEST_ID_HEADER] = request_id
-            response.headers["X-Correlation-ID"] = request_id
-            return response
-        finally:
-            correlation_id_var.reset(token)
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.time()
-        response = await call_next(request)
-        ms = (time.time() - start) * 1000
-        request_id = getattr(request.state, "request_id", "-")
-        logger.info(
-            "%s %s - %s (%.0fms) request_id=%s",
-            request.method,
-            request.url.path,
-            response.status_code,
-            ms,
-            request_id,
-        )
-        return response
-
-
-class LicenseValidationMiddleware(BaseHTTPMiddleware):
-    """Verifies that a valid cryptographic license key is provided in self-hosted deployments.
-
-    Caches validation result for 60 seconds to avoid cryptographic verification on every request.
-    """
-
-    _cache_result: tuple[bool, str] | None = None
-    _cache_key: str = ""
-    _cache_time: float = 0.0
-    _CACHE_TTL = 60.0  # seconds
-
-    async def dispatch(self, request: Request, call_next):
-        if os.getenv("TESTING") in ("1", "true"):
-            return await call_next(request)
-
-        path = request.url.path
-        # Exclude infrastructure, docs, authentication, and health checks
-        # So users can always access docs, sign in, or fetch tokens to activate.
-        if (
-            path in ["/", "/healthz", "/docs", "/openapi.json", "/redoc", "/v1/signup", "/v1/token", "/v1/forgot-password", "/v1/reset-password", "/v1/licensing/status", "/v1/licensing/activate"]
-            or path.startswith("/assets")
-            or path.startswith("/static")
-        ):
-            return await call_next(request)
-
-        raw_key = os.getenv("LICENSE_KEY")
-        license_key = "CLINIC-TRIAL-2026" if raw_key is None else raw_key.strip()
-        if not license_key:
-            return JSONResponse(
-                status_code=402,
-                content={"detail": "License Key is missing. Please set the LICENSE_KEY environment variable to activate the platform."}
-            )
-
-        # Use cached result if license key hasn't changed and cache is fresh
-        now = time.time()
-        if (
-            LicenseValidationMiddleware._cache_result is not None
-            and LicenseValidationMiddleware._cache_key == license_key
-            and (now - LicenseValidationMiddleware._cache_time) < LicenseValidationMiddleware._CACHE_TTL
-        ):
-            is_valid, reason = LicenseValidationMiddleware._cache_result
-        else:
-            from . import licensing
-            is_valid, reason = licensing.verify_license_key(license_key)
-            LicenseValidationMiddleware._cache_result = (is_valid, reason)
-            LicenseValidationMiddleware._cache_key = license_key
-            LicenseValidationMiddleware._cache_time = now
-
-        if not is_valid:
-            return JSONResponse(
-                status_code=402,
-                content={"detail": f"License Key is invalid or expired: {reason}"}
-            )
-
-        return await call_next(request)
-
-
-class PrometheusMetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware to collect Prometheus metrics for request count and latency."""
-
-    _request_count = None
-    _request_duration = None
-    _metrics_loaded = False
-
-    @classmethod
-    def _ensure_metrics(cls):
-        if not cls._metrics_loaded:
-            try:
-                from backend.enterprise_features import REQUEST_COUNT, REQUEST_DURATION
-                cls._request_count = REQUEST_COUNT
-                cls._request_duration = REQUEST_DURATION
-            except Exception:
-                pass
-            cls._metrics_loaded = True
-
-    async def dispatch(self, request: Request, call_next):
-        # Exclude /metrics path to prevent scrape loop pollution
-        if request.url.path == "/metrics":
-            return await call_next(request)
-
-        start_time = time.time()
-
-        endpoint = request.url.path
-        if "route" in request.scope and request.scope["route"] is not None:
-            endpoint = request.scope["route"].path
-
-        try:
-            response = await call_next(request)
-            status_code = str(response.status_code)
-            return response
-        except Exception:
-            status_code = "500"
-            raise
-        finally:
-            duration = time.time() - start_time
-            PrometheusMetricsMiddleware._ensure_metrics()
-            try:
-                if PrometheusMetricsMiddleware._request_count is not None:
-                    PrometheusMetricsMiddleware._request_count.labels(method=request.method, endpoint=endpoint, status=status_code).inc()
-                if PrometheusMetricsMiddleware._request_duration is not None:
-                    PrometheusMetricsMiddleware._request_duration.labels(method=request.method, endpoint=endpoint).observe(duration)
-            except Exception:
-                # Shield middleware execution if Prometheus is disabled or unconfigured
-                pass
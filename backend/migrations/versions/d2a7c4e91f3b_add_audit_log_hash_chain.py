@@ -0,0 +1,34 @@
+"""add hash chain columns to audit logs
+
+Revision ID: d2a7c4e91f3b
+Revises: c1234567890a
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d2a7c4e91f3b"
+down_revision: Union[str, Sequence[str], None] = "c1234567890a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_CHAIN_COLUMNS = ("prev_hash", "entry_hash")
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns("audit_logs")]
+    for name in _CHAIN_COLUMNS:
+        if name not in columns:
+            op.add_column("audit_logs", sa.Column(name, sa.String(length=64), nullable=True))
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns("audit_logs")]
+    with op.batch_alter_table("audit_logs") as batch_op:
+        for name in _CHAIN_COLUMNS:
+            if name in columns:
+                batch_op.drop_column(name)
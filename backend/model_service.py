@@ -29,6 +29,7 @@ import numpy as np
 import pandas as pd
 
 from . import features
+from .tee_enclave import TRUSTED_MODEL_HASHES, measure_model_file
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,15 @@ class ModelStatus(str, Enum):
     MOCK = "mock"
 
 
+@dataclass(frozen=True)
+class ModelAttestation:
+    """Cached TEE measurement of a model binary, keyed by its on-disk identity."""
+    file_path: str
+    mtime_ns: int
+    size: int
+    digest: str
+
+
 @dataclass
 class ModelEntry:
     """Tracks the lifecycle state of a single ML model."""
@@ -65,6 +75,10 @@ class ModelEntry:
     onnx_estimators: Dict[str, Any] = field(default_factory=dict)
     onnx_weights: Optional[List[float]] = None
     is_voting: bool = False
+    # Enclave attestation cache, invalidated by ModelService.reload()
+    attestation: Optional[ModelAttestation] = None
+    # Persistent SHAP attribution handle (explainability.AttributionEngine), built at load
+    attribution_engine: Any = None
 
 
 @dataclass
@@ -234,6 +248,131 @@ def _predict_onnx_probs(entry: ModelEntry, input_data: np.ndarray) -> Tuple[int,
         return pred_label, prob
 
 
+def _positive_class_probs(probabilities: Any) -> np.ndarray:
+    """Normalize a batch of classifier probabilities to a 1-D class-1 vector.
+
+    Accepts ``predict_proba``-style ``(n, 2)`` arrays, single-column arrays,
+    and the ``list[dict]`` format emitted by skl2onnx ZipMap outputs.
+    """
+    if isinstance(probabilities, list) and probabilities and isinstance(probabilities[0], dict):
+        return np.fromiter((p.get(1, 0.0) for p in probabilities), dtype=np.float64, count=len(probabilities))
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if probabilities.ndim == 1:
+        return probabilities
+    return probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+
+
+def _predict_onnx_probs_batch(entry: ModelEntry, input_data: np.ndarray) -> np.ndarray:
+    """Batched counterpart of ``_predict_onnx_probs``: one ``session.run`` per estimator."""
+    if entry.is_voting:
+        stacked = np.vstack([
+            _positive_class_probs(_run_onnx_inference(session, input_data)[1])
+            for session in entry.onnx_estimators.values()
+        ])
+        if entry.onnx_weights:
+            return np.average(stacked, axis=0, weights=np.asarray(entry.onnx_weights))
+        return stacked.mean(axis=0)
+    return _positive_class_probs(_run_onnx_inference(entry.onnx_session, input_data)[1])
+
+
+# Columns log1p-transformed before scaling the liver model (see predict_liver)
+_LIVER_SKEWED_FEATURES = ['Total_Bilirubin', 'Alkaline_Phosphotase', 'Alamine_Aminotransferase', 'Albumin_and_Globulin_Ratio']
+
+# Serialized model file names that differ from the "<name>_model.pkl" convention
+_MODEL_BINARY_NAMES = {
+    "heart": "heart_disease_model.pkl",
+    "liver": "liver_disease_model.pkl",
+}
+
+_SCALED_FEATURE_NAMES = {
+    "liver": features.LIVER_FEATURES,
+    "kidney": features.KIDNEY_FEATURES,
+    "lungs": features.LUNG_FEATURES,
+}
+
+
+class PredictionMicroBatcher:
+    """
+    Coalesces concurrent single-row prediction calls into one matrix per model.
+
+    The first caller for a model opens a short collection window; every call
+    that arrives before it closes (or until ``max_batch_size`` rows are queued)
+    is scored by a single ``predict_proba_batch`` call on the default executor,
+    so the event loop keeps accepting requests while a batch runs.
+    """
+
+    def __init__(self, service: "ModelService", max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        self._service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[Tuple[str, int], List[Tuple[Any, List[float], Any]]] = {}
+        self._timers: Dict[Tuple[str, int], Any] = {}
+        self._inflight: set = set()
+        self.batches_run = 0
+        self.rows_scored = 0
+
+    async def submit(self, model_name: str, row: List[float], model: Any = None) -> float:
+        """Queue one feature row and await its class-1 probability."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (model_name, id(model) if model is not None else 0)
+        queue = self._pending.setdefault(key, [])
+        queue.append((model, row, future))
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait_ms / 1000.0, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, int]) -> None:
+        import asyncio
+
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._pending.pop(key, [])
+        if not queue:
+            return
+        # Keep a reference so the in-flight batch is not garbage-collected
+        task = asyncio.get_running_loop().create_task(self._run_batch(key[0], queue))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, model_name: str, queue: List[Tuple[Any, List[float], Any]]) -> None:
+        """Score one coalesced batch on the default executor so inference never blocks the loop."""
+        import asyncio
+
+        model = queue[0][0]
+        rows = [row for _, row, _ in queue]
+        try:
+            probs = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self._service.predict_proba_batch(model_name, rows, model=model)
+            )
+        except Exception as exc:
+            for _, _, future in queue:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches_run += 1
+        self.rows_scored += len(queue)
+        for (_, _, future), prob in zip(queue, probs):
+            if not future.done():
+                future.set_result(float(prob))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches_run": self.batches_run,
+            "rows_scored": self.rows_scored,
+            "avg_batch_size": round(self.rows_scored / self.batches_run, 2) if self.batches_run else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+        }
+
+
 class SimpleMockClassifier:
     def __init__(self, n_features: int):
         self.n_features = n_features
@@ -296,6 +435,11 @@ class ModelService:
         }
         self._lock = threading.RLock()
         self._initialized = False
+        self._batcher = PredictionMicroBatcher(
+            self,
+            max_batch_size=int(os.getenv("PREDICTION_MICROBATCH_MAX_SIZE", "256")),
+            max_wait_ms=float(os.getenv("PREDICTION_MICROBATCH_WAIT_MS", "2.0")),
+        )
 
     # ── Loading ──────────────────────────────────────────────────
 
@@ -429,6 +573,7 @@ class ModelService:
         with self._lock:
             if os.getenv("TESTING"):
                 self._inject_mocks()
+                self._build_attribution_engines()
                 return
 
             # Check and download models from HF if needed
@@ -453,6 +598,7 @@ class ModelService:
                 stroke_entry.status = ModelStatus.ERROR
                 stroke_entry.error_message = str(e)
 
+            self._build_attribution_engines()
             self._initialized = True
 
     def _inject_mocks(self) -> None:
@@ -592,9 +738,111 @@ class ModelService:
 
     def reload(self) -> Dict[str, Any]:
         """Force reload all models from disk. Returns status dict."""
-        self._load_real_models()
+        with self._lock:
+            self._load_real_models()
+            self._build_attribution_engines()
+            # An admin-initiated reload is the sanctioned way to ship new binaries:
+            # drop cached measurements and re-bootstrap the secure boot registry.
+            for key, entry in self._entries.items():
+                entry.attestation = None
+                TRUSTED_MODEL_HASHES.pop(key, None)
         return self.health_check()
 
+    # ── Explainability ───────────────────────────────────────────
+
+    def _build_attribution_engines(self) -> None:
+        """Create one SHAP attribution handle per loaded model (explainer / booster reuse)."""
+        from .explainability import AttributionEngine
+
+        for key, entry in self._entries.items():
+            entry.attribution_engine = None
+            if entry.model is None:
+                continue
+            try:
+                entry.attribution_engine = AttributionEngine(entry.model)
+            except Exception as e:
+                logger.warning("Attribution engine unavailable for %s: %s", key, e)
+
+    def attribution_engine(self, model_name: str, model: Any = None) -> Any:
+        """
+        Return the cached ``AttributionEngine`` for a model.
+
+        When ``model`` is given and is not the loaded model (e.g. tests patching
+        ``backend.prediction.<name>_model``), a transient engine is built for it.
+        """
+        from .explainability import AttributionEngine
+
+        entry = self._entries.get(model_name)
+        target = model if model is not None else (entry.model if entry is not None else None)
+        if target is None:
+            raise ValueError(f"Model {model_name} not available")
+        if entry is not None and entry.attribution_engine is not None and entry.attribution_engine.model is target:
+            return entry.attribution_engine
+        engine = AttributionEngine(target)
+        if entry is not None and target is entry.model:
+            entry.attribution_engine = engine
+        return engine
+
+    def attribute_batch(self, model_name: str, X: Any, model: Any = None, chunk_size: Optional[int] = None) -> np.ndarray:
+        """
+        Positive-class SHAP attributions for every row of ``X`` (model input space).
+
+        Rows are attributed in vectorized chunks of ``chunk_size`` so population-level
+        drift jobs can stream large historical extracts. Returns (n_rows, n_features).
+        """
+        from .explainability import ATTRIBUTION_CHUNK_SIZE
+
+        engine = self.attribution_engine(model_name, model)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        chunks = [sv for _, sv in engine.iter_attributions(X, chunk_size or ATTRIBUTION_CHUNK_SIZE)]
+        return np.vstack(chunks) if chunks else np.zeros((0, X.shape[1]))
+
+    # ── Enclave Attestation ──────────────────────────────────────
+
+    def _model_binary_path(self, model_name: str) -> Optional[str]:
+        """Resolve the serialized model file (.pkl, else .onnx) for a model, if any."""
+        file_name = _MODEL_BINARY_NAMES.get(model_name, f"{model_name}_model.pkl")
+        for candidate in (file_name, file_name.replace(".pkl", ".onnx")):
+            path = os.path.join(self._model_dir, candidate)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def attestation_for(self, model_name: str) -> Optional[ModelAttestation]:
+        """
+        Return the SHA-256 measurement of a model's binary.
+
+        The digest is cached on the model entry keyed by (path, mtime, size),
+        so the hot prediction path costs one ``stat`` call: the file is only
+        re-read and re-hashed when its on-disk identity changes or after
+        ``reload()``. Returns ``None`` when no model binary exists on disk.
+        """
+        entry = self._entries.get(model_name)
+        cached = entry.attestation if entry is not None else None
+        path = cached.file_path if cached is not None else self._model_binary_path(model_name)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            path = self._model_binary_path(model_name)
+            if path is None:
+                return None
+            st = os.stat(path)
+            cached = None
+
+        if cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+            return cached
+
+        attestation = ModelAttestation(
+            file_path=path, mtime_ns=st.st_mtime_ns, size=st.st_size, digest=measure_model_file(path)
+        )
+        if entry is not None:
+            entry.attestation = attestation
+        return attestation
+
     # ── Health Check ─────────────────────────────────────────────
 
     def health_check(self) -> Dict[str, Any]:
@@ -614,6 +862,7 @@ class ModelService:
         return {
             "healthy": all(s["loaded"] for s in statuses.values()),
             "models": statuses,
+            "microbatching": self._batcher.stats(),
         }
 
     def is_available(self, model_name: str) -> bool:
@@ -623,6 +872,58 @@ class ModelService:
 
     # ── Prediction ───────────────────────────────────────────────
 
+    def _preprocess_batch(self, entry: ModelEntry, X: np.ndarray, scaler: Any = None, onnx: bool = False) -> np.ndarray:
+        """Apply the per-model transforms (liver log1p, feature scaling) to a whole matrix."""
+        if entry.name == "liver":
+            X = X.copy()
+            for col in _LIVER_SKEWED_FEATURES:
+                idx = features.LIVER_FEATURES.index(col)
+                X[:, idx] = np.log1p(X[:, idx])
+
+        if not entry.scaler_needed:
+            return X
+        if onnx and entry.scaler_onnx_session is not None:
+            return _run_onnx_inference(entry.scaler_onnx_session, X.astype(np.float32))[0]
+        scaler = scaler if scaler is not None else entry.scaler
+        if scaler is None:
+            return X
+        # Scalers were fitted on named DataFrames; keep the names to avoid sklearn warnings
+        return np.asarray(scaler.transform(pd.DataFrame(X, columns=_SCALED_FEATURE_NAMES[entry.name])))
+
+    def predict_proba_batch(self, model_name: str, X: Any, model: Any = None, scaler: Any = None) -> np.ndarray:
+        """
+        Score a matrix of imputed, unscaled feature rows in one model call.
+
+        Returns a 1-D array of class-1 probabilities. ONNX-backed entries run a
+        single ``session.run`` per estimator; pickle entries a single
+        ``predict_proba``. ``model``/``scaler`` override the loaded objects
+        (used by prediction.py when tests patch module-level models).
+        """
+        entry = self._entries.get(model_name)
+        if entry is None:
+            raise ValueError(f"Model {model_name} not found")
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        if model is None and (entry.onnx_session is not None or entry.is_voting):
+            input_array = self._preprocess_batch(entry, X, onnx=True)
+            probs = _predict_onnx_probs_batch(entry, np.asarray(input_array, dtype=np.float32))
+        else:
+            estimator = model if model is not None else entry.model
+            if estimator is None:
+                raise ValueError(f"No usable model for {model_name}")
+            input_array = self._preprocess_batch(entry, X, scaler=scaler)
+            probs = _positive_class_probs(estimator.predict_proba(input_array))
+
+        entry.prediction_count += len(probs)
+        return probs
+
+    async def predict_proba_coalesced(self, model_name: str, row: List[float], model: Any = None) -> float:
+        """Score a single row through the micro-batching queue (see ``PredictionMicroBatcher``)."""
+        return await self._batcher.submit(model_name, row, model=model)
+
     def _call_prediction_service(self, model_name: str, data: Any) -> PredictionResult:
         service_url = os.environ.get("PREDICTION_SERVICE_URL", "http://127.0.0.1:8001")
         payload = data.model_dump() if hasattr(data, "model_dump") else (data.dict() if hasattr(data, "dict") else {k: v for k, v in data.__dict__.items() if not k.startswith("_")})
@@ -903,7 +1204,7 @@ class ModelService:
             ]
             feature_names = features.DIABETES_FEATURES
             input_array = np.array([input_list])
-            return explainability.get_shap_values(entry.model, input_array, feature_names)
+            return explainability.get_shap_values(entry.model, input_array, feature_names, engine=entry.attribution_engine)
 
         elif model_name == "heart":
             input_list = [
@@ -913,7 +1214,7 @@ class ModelService:
             ]
             feature_names = ['Age', 'Sex', 'ChestPain', 'RestBP', 'Cholesterol', 'FastingBS',
                              'RestECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'Slope', 'MajorVessels', 'Thal']
-            return explainability.get_shap_values(entry.model, np.array([input_list]), feature_names)
+            return explainability.get_shap_values(entry.model, np.array([input_list]), feature_names, engine=entry.attribution_engine)
 
         elif model_name == "liver":
             if not entry.scaler:
@@ -930,7 +1231,7 @@ class ModelService:
             for col in skewed:
                 df[col] = np.log1p(df[col])
             X_scaled = entry.scaler.transform(df)
-            return explainability.get_shap_values(entry.model, X_scaled, feature_names)
+            return explainability.get_shap_values(entry.model, X_scaled, feature_names, engine=entry.attribution_engine)
 
         elif model_name == "stroke":
             feature_names = ['Gender', 'Age', 'Hypertension', 'HeartDisease', 'Smoking', 'BMI', 'Glucose']
@@ -943,7 +1244,7 @@ class ModelService:
                 data.bmi if data.bmi is not None else 25.0,
                 data.glucose if data.glucose is not None else 90.0
             ]
-            return explainability.get_shap_values(entry.model, np.array([input_list]), feature_names)
+            return explainability.get_shap_values(entry.model, np.array([input_list]), feature_names, engine=entry.attribution_engine)
 
         return None
 
@@ -54,6 +54,9 @@ class AuditLog(Base, SoftDeleteMixin):
     action = Column(String)  # VIEW_FULL, DELETE, BAN
     timestamp = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     details = Column(String, nullable=True)
+    # Tamper-evident hash chain maintained by backend.audit's writers
+    prev_hash = Column(String(64), nullable=True)
+    entry_hash = Column(String(64), nullable=True)
 
     facility = relationship("HospitalFacility")
     admin = relationship("User", foreign_keys=[admin_id], backref="audit_logs_created")
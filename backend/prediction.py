@@ -68,12 +68,14 @@ def initialize_models():
 
 
 
-def _attest_model_in_enclave(enclave, model_name: str):
-    """Resolve the model file path and cryptographically attest it in the enclave.
-
-    Looks up the serialized model file (.pkl or .onnx) on disk for the given
-    model name and registers it with the Trusted Execution Environment (TEE)
-    enclave for cryptographic attestation. Falls back to a manual attestation
+def _attest_model_in_enclave(enclave, model_name: str) -> Optional[str]:
+    """Attest the model's binary in the enclave using its cached measurement.
+
+    The SHA-256 digest of the serialized model (.pkl or .onnx) is held on the
+    ``ModelService`` entry and only recomputed when the file's mtime/size
+    changes or after ``reload_models``, so steady-state predictions verify
+    against the Trusted Execution Environment (TEE) secure boot registry
+    without reading or hashing the file. Falls back to a manual attestation
     flag if no model binary exists.
 
     Args:
@@ -81,24 +83,17 @@ def _attest_model_in_enclave(enclave, model_name: str):
         model_name (str): The logical model name (e.g. ``"heart"``, ``"kidney"``).
 
     Returns:
-        None
+        Optional[str]: The attested SHA-256 digest, or ``None`` when no
+            model binary exists on disk.
     """
-    model_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = f"{model_name}_model.pkl"
-    if model_name == "heart":
-        file_name = "heart_disease_model.pkl"
-    elif model_name == "liver":
-        file_name = "liver_disease_model.pkl"
-
-    file_path = os.path.join(model_dir, file_name)
-    if not os.path.exists(file_path):
-        file_path = os.path.join(model_dir, file_name.replace(".pkl", ".onnx"))
-
-    if os.path.exists(file_path):
-        enclave.attest_model_file(model_name, file_path)
-    else:
-        # Fallback to manual flag if no model binary exists on disk
-        enclave._attested = True
+    attestation = model_service.attestation_for(model_name)
+    if attestation is not None:
+        enclave.attest_model_digest(model_name, attestation.digest)
+        return attestation.digest
+
+    # Fallback to manual flag if no model binary exists on disk
+    enclave._attested = True
+    return None
 
 def _run_model_prediction_scaled(model_name: str, input_list: list, X=None):
     """Run a disease-risk prediction using the best available model backend.
@@ -210,6 +205,48 @@ def _run_model_prediction_scaled(model_name: str, input_list: list, X=None):
     else:
         raise ValueError(f"No usable model for {model_name}")
 
+
+def _run_model_prediction_batch(model_name: str, imputed_rows: list) -> np.ndarray:
+    """Score many imputed patient rows with one enclave attestation and one model call.
+
+    Batched counterpart of ``_run_model_prediction_scaled``: the rows are
+    stacked into a single matrix and handed to
+    ``model_service.predict_proba_batch`` (one ``predict_proba`` or one ONNX
+    ``session.run`` per estimator). In testing mode, patched module-level
+    model/scaler objects take priority, mirroring the single-row path.
+
+    Args:
+        model_name (str): The logical model name (e.g. ``"kidney"``).
+        imputed_rows (list[list[float]]): Imputed, unscaled feature rows.
+
+    Returns:
+        np.ndarray: Class-1 probability for each row.
+
+    Raises:
+        ValueError: If the specified model is not found or has no usable backend.
+    """
+    _pred = sys.modules[__name__]
+    model_obj = scaler_obj = None
+    if "pytest" in sys.modules or os.getenv("TESTING") == "1":
+        model_obj = getattr(_pred, f"{model_name}_model", None)
+        scaler_obj = getattr(_pred, f"{model_name}_scaler", None)
+
+    X = np.asarray(imputed_rows, dtype=np.float64)
+    enclave = ConfidentialEnclave()
+    _attest_model_in_enclave(enclave, model_name)
+    return enclave.execute(model_service.predict_proba_batch, model_name, X, model_obj, scaler_obj)
+
+
+def _impute_batch(model_name: str, input_rows: list) -> list:
+    """Impute a whole matrix with the model's MICE imputer, falling back to zero-fill."""
+    imputer, _ = _get_imputer_and_conformal(model_name, None)
+    if imputer is not None:
+        try:
+            return np.asarray(imputer.transform(input_rows), dtype=np.float64).tolist()
+        except Exception as e:
+            logger.warning("Batch imputer transform failed for %s, falling back: %s", model_name, e)
+    return [[0.0 if x is None else x for x in row] for row in input_rows]
+
 def load_pkl(filenames):
     """Load a serialized model from disk using joblib.
 
@@ -447,64 +484,17 @@ def _log_feature_attributions(
         elif isinstance(background_tasks_or_db, Session):
             db_session = background_tasks_or_db
 
-        # Unwrap model to get tree estimator
-        target_estimator = model
-        if hasattr(model, 'estimators_'):
-            target_estimator = model.estimators_[0]
-        if hasattr(target_estimator, 'calibrated_classifiers_') and len(target_estimator.calibrated_classifiers_) > 0:
-            target_estimator = target_estimator.calibrated_classifiers_[0].estimator
-        elif hasattr(target_estimator, 'estimator'):
-            target_estimator = target_estimator.estimator
-
-        if "TabPFNClassifier" in str(type(target_estimator)):
+        # Persistent per-model handle (booster / TreeExplainer built at ModelService load)
+        engine = model_service.attribution_engine(model_name, model)
+        if not engine.supported:
             return None
 
-        input_vector = np.array([imputed_list])
-        sv = None
-
-        # 1. Native High-Performance SHAP predictions (takes ~2ms)
-        est_type = str(type(target_estimator))
-        if "XGBClassifier" in est_type or "XGBRegressor" in est_type:
-            import xgboost as xgb
-            booster = target_estimator.get_booster()
-            dmat = xgb.DMatrix(input_vector)
-            contribs = booster.predict(dmat, pred_contribs=True)
-            sv = contribs[0][:-1]
-        elif "LGBMClassifier" in est_type or "LGBMRegressor" in est_type:
-            contribs = target_estimator.predict(input_vector, pred_contrib=True)
-            sv = contribs[0][:-1]
-        elif "CatBoostClassifier" in est_type or "CatBoostRegressor" in est_type:
-            contribs = target_estimator.get_feature_importance(data=input_vector, type="ShapValues")
-            if len(contribs.shape) == 3:
-                sv = contribs[0, :-1, 1] if contribs.shape[2] > 1 else contribs[0, :-1, 0]
-        else:
-            # 2. Fallback to python shap library (or heuristic attribution if shap is unavailable)
-            try:
-                import shap
-                if "mock" in est_type.lower():
-                    explainer = shap.TreeExplainer(target_estimator)
-                else:
-                    if not hasattr(target_estimator, "_cached_shap_explainer"):
-                        target_estimator._cached_shap_explainer = shap.TreeExplainer(target_estimator)
-                    explainer = target_estimator._cached_shap_explainer
-                shap_values = explainer.shap_values(input_vector)
-
-                # Handle different SHAP shapes
-                if isinstance(shap_values, list):
-                    sv = shap_values[1][0] if len(shap_values) > 1 else shap_values[0][0]
-                elif len(shap_values.shape) == 3:
-                    sv = shap_values[0, :, 1]
-                elif len(shap_values.shape) == 2:
-                    sv = shap_values[0]
-                else:
-                    sv = shap_values
-            except Exception as shap_err:
-                logger.info("SHAP explainer fallback for %s: %s", model_name, shap_err)
-                # Heuristic feature attribution fallback
-                sv = np.array([float(val) * 0.01 for val in imputed_list])
-
-        if sv is None:
-            sv = np.zeros(len(feature_names))
+        try:
+            sv = engine.attribute(np.array([imputed_list]))[0]
+        except Exception as shap_err:
+            logger.info("SHAP explainer fallback for %s: %s", model_name, shap_err)
+            # Heuristic feature attribution fallback
+            sv = np.array([float(val) * 0.01 for val in imputed_list])
 
         features_dict = {feat: float(val) for feat, val in zip(feature_names, imputed_list)}
         attributions_dict = {feat: float(val) for feat, val in zip(feature_names, sv)}
@@ -635,7 +625,13 @@ def _get_triage_recommendation(prediction_val: int, conformal_set: list) -> str:
         return "Secondary Review: Patient presents with unusual clinical features not well-represented in training. Perform manual chart review."
 
 
-def _get_top_risk_factors(model: Any, imputed_list: list, feature_names: list, attributions: Optional[dict] = None) -> list:
+def _get_top_risk_factors(
+    model: Any,
+    imputed_list: list,
+    feature_names: list,
+    attributions: Optional[dict] = None,
+    model_name: Optional[str] = None,
+) -> list:
     """
     Returns a sorted list of top clinical risk factors based on local SHAP feature contributions.
     """
@@ -653,44 +649,18 @@ def _get_top_risk_factors(model: Any, imputed_list: list, feature_names: list, a
         pass
 
     try:
-        import shap
-    except ImportError:
-        return []
-
-    try:
-        # Strategy: Unwrap model to find a tree-based estimator for fast TreeExplainer
-        target_estimator = model
-        if hasattr(model, 'estimators_'):
-            # First member is XGBoost / Calibrated XGBoost in our train pipelines
-            target_estimator = model.estimators_[0]
-
-        if hasattr(target_estimator, 'calibrated_classifiers_') and len(target_estimator.calibrated_classifiers_) > 0:
-            target_estimator = target_estimator.calibrated_classifiers_[0].estimator
-        elif hasattr(target_estimator, 'estimator'):
-            target_estimator = target_estimator.estimator
+        engine = model_service.attribution_engine(model_name, model) if model_name else None
+        if engine is None:
+            from .explainability import AttributionEngine
+            engine = AttributionEngine(model)
 
         # Bypass deep learning model TabPFN since it doesn't support TreeExplainer
-        if "TabPFNClassifier" in str(type(target_estimator)):
+        if not engine.supported:
             return ["Deep Attention Model: Tabular transformer predictions are computed via in-context attention over similar patients."]
+        if engine.kind == "heuristic":
+            return []
 
-        input_vector = np.array([imputed_list])
-        if "mock" in str(type(target_estimator)).lower():
-            explainer = shap.TreeExplainer(target_estimator)
-        else:
-            if not hasattr(target_estimator, "_cached_shap_explainer"):
-                target_estimator._cached_shap_explainer = shap.TreeExplainer(target_estimator)
-            explainer = target_estimator._cached_shap_explainer
-        shap_values = explainer.shap_values(input_vector)
-
-        # Handle different SHAP version output shapes
-        if isinstance(shap_values, list):
-            sv = shap_values[1][0] if len(shap_values) > 1 else shap_values[0][0]
-        elif len(shap_values.shape) == 3:  # (nsamples, nfeatures, nclasses)
-            sv = shap_values[0, :, 1]
-        elif len(shap_values.shape) == 2:
-            sv = shap_values[0]
-        else:
-            sv = shap_values
+        sv = engine.attribute(np.array([imputed_list]))[0]
 
         # Create list of (feature_name, shap_value)
         contributions = []
@@ -727,142 +697,197 @@ def _get_model_metadata(model_name: str, current_model_obj: Any) -> dict:
         timestamp = getattr(entry, "training_timestamp", timestamp)
         model_card_id = getattr(entry, "model_card_id", model_card_id)
 
+    attestation = getattr(entry, "attestation", None) if entry else None
     return {
         "model_version": version,
         "training_timestamp": timestamp,
-        "model_card_id": model_card_id
+        "model_card_id": model_card_id,
+        "attestation_digest": attestation.digest if attestation is not None else None,
     }
 
 
-def _calculate_clinical_recourse(
+# Controllable recourse levers per model: (index, check_fn, target_val, description, is_continuous)
+_RECOURSE_CANDIDATES = {
+    "diabetes": [
+        (0, lambda val: val == 1.0, 0.0, "managing hypertension", False),
+        (3, lambda val: val == 1.0, 0.0, "smoking cessation", False),
+        (5, lambda val: val == 0.0, 1.0, "increasing physical activity", False),
+        (2, lambda val: val is not None and val > 25.0, 25.0, "reducing BMI", True),
+    ],
+    "heart": [
+        (5, lambda val: val == 1.0, 0.0, "managing blood sugar", False),
+        (10, lambda val: val == 1.0, 0.0, "abstaining from heavy alcohol", False),
+        (3, lambda val: val is not None and val > 120.0, 120.0, "reducing resting blood pressure", True),
+    ],
+    "kidney": [
+        (1, lambda val: val is not None and val > 120.0, 120.0, "controlling blood pressure", True),
+        (18, lambda val: val == 1, 0, "managing hypertension", False),
+        (19, lambda val: val == 1, 0, "managing diabetes", False),
+    ],
+    "lungs": [
+        (2, lambda val: val == 2.0, 1.0, "smoking cessation", False),
+        (10, lambda val: val == 2.0, 1.0, "abstaining from alcohol", False),
+    ],
+    "liver": [],
+}
+
+# Points on the current→target line scored for each continuous lever.
+RECOURSE_GRID_STEPS = int(os.getenv("RECOURSE_GRID_STEPS", "9"))
+
+
+def _score_recourse_profiles(model_name: str, model_obj: Any, profiles: np.ndarray, scaler: Any = None) -> np.ndarray:
+    """Score a matrix of candidate profiles with a single ``predict_proba`` call."""
+    import warnings
+
+    from .model_service import _positive_class_probs
+
+    X_rec = profiles
+    if model_name in ("kidney", "liver", "lungs") and scaler is not None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            X_rec = scaler.transform(X_rec)
+    return _positive_class_probs(model_obj.predict_proba(X_rec))
+
+
+def _join_actions(descs: list) -> str:
+    return ", ".join(descs[:-1]) + " and " + descs[-1] if len(descs) > 1 else descs[0]
+
+
+def _search_clinical_recourse(
     model_name: str,
     model_obj: Any,
     imputed_list: list,
     current_prob: float,
     scaler: Any = None
-) -> Optional[str]:
+) -> Optional[Dict[str, Any]]:
     """
-    Simulates a counterfactual 'what-if' patient profile by performing step-wise boundary
-    searches on controllable lifestyle features to find the optimal risk reduction path.
+    Counterfactual 'what-if' search over controllable lifestyle features.
+
+    Every subset of applicable levers is expanded into candidate profiles (binary
+    levers at their target, continuous levers on a ``RECOURSE_GRID_STEPS`` grid from
+    the current value to the target) and the whole grid is scored in one batched
+    model call. Per subset the smallest change crossing the 0.5 threshold wins,
+    falling back to the lowest predicted risk.
+
+    Returns a dict with the ``recommendation`` text plus ``model_calls``,
+    ``candidates_evaluated`` and ``elapsed_ms`` search metadata.
     """
-    try:
-        if current_prob < 0.5:
-            # Recourse is only relevant for high-risk patients
-            return None
+    import itertools
+    import time
 
-        import itertools
+    if current_prob < 0.5:
+        # Recourse is only relevant for high-risk patients
+        return None
 
-        import numpy as np
+    started = time.perf_counter()
 
-        # Schema: (index, check_fn, target_val, description, is_continuous)
-        candidates = {
-            "diabetes": [
-                (0, lambda val: val == 1.0, 0.0, "managing hypertension", False),
-                (3, lambda val: val == 1.0, 0.0, "smoking cessation", False),
-                (5, lambda val: val == 0.0, 1.0, "increasing physical activity", False),
-                (2, lambda val: val is not None and val > 25.0, 25.0, "reducing BMI", True),
-            ],
-            "heart": [
-                (5, lambda val: val == 1.0, 0.0, "managing blood sugar", False),
-                (10, lambda val: val == 1.0, 0.0, "abstaining from heavy alcohol", False),
-                (3, lambda val: val is not None and val > 120.0, 120.0, "reducing resting blood pressure", True),
-            ],
-            "kidney": [
-                (1, lambda val: val is not None and val > 120.0, 120.0, "controlling blood pressure", True),
-                (18, lambda val: val == 1, 0, "managing hypertension", False),
-                (19, lambda val: val == 1, 0, "managing diabetes", False),
-            ],
-            "lungs": [
-                (2, lambda val: val == 2.0, 1.0, "smoking cessation", False),
-                (10, lambda val: val == 2.0, 1.0, "abstaining from alcohol", False),
-            ],
-            "liver": []
-        }.get(model_name, [])
+    def _result(recommendation, model_calls=0, candidates=0):
+        return {
+            "recommendation": recommendation,
+            "model_calls": model_calls,
+            "candidates_evaluated": candidates,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 3),
+        }
 
+    try:
         applicable = []
-        for index, check_fn, target_val, desc, is_cont in candidates:
+        for index, check_fn, target_val, desc, is_cont in _RECOURSE_CANDIDATES.get(model_name, []):
             if index < len(imputed_list) and check_fn(imputed_list[index]):
                 applicable.append((index, target_val, desc, is_cont))
 
         if not applicable:
-            return "Patient has no standard controllable lifestyle risk factors to modify."
-
-        def _predict_profile(profile):
-            if model_name in ("kidney", "liver", "lungs"):
-                import warnings
-
-                import numpy as np
-                X_rec = np.array([profile])
-                if scaler is not None:
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        X_rec = scaler.transform(X_rec)
-            else:
-                X_rec = [profile]
-            proba_rec = model_obj.predict_proba(X_rec)[0]
-            return float(proba_rec[1]) if len(proba_rec) > 1 else float(proba_rec[0])
+            return _result("Patient has no standard controllable lifestyle risk factors to modify.")
 
-        best_combination = None
-        best_proba = current_prob
-        best_reduction = 0.0
-        successful_combinations = []
+        base = np.array([0.0 if v is None else v for v in imputed_list], dtype=np.float64)
+        steps = max(RECOURSE_GRID_STEPS, 2)
 
-        # Evaluate all subsets of combinations
+        # Build the full candidate grid: one block of rows per lever subset.
+        blocks = []
         for r in range(1, len(applicable) + 1):
             for comb in itertools.combinations(applicable, r):
-                test_profile = list(imputed_list)
-                comb_descs = []
-                for index, target_val, desc, is_cont in comb:
+                fixed = base.copy()
+                axes = []
+                for index, target_val, _desc, is_cont in comb:
                     if is_cont:
-                        current_val = test_profile[index]
-                        best_val = target_val
-                        best_val_proba = current_prob
-                        # Step-wise boundary search (binary/grid search) - optimized to 3 steps to reduce server load
-                        for step_val in np.linspace(current_val, target_val, 3):
-                            temp_profile = list(test_profile)
-                            temp_profile[index] = step_val
-                            prob_pos_step = _predict_profile(temp_profile)
-                            if prob_pos_step < 0.5:
-                                best_val = step_val
-                                best_val_proba = prob_pos_step
-                                break
-                            if prob_pos_step < best_val_proba:
-                                best_val = step_val
-                                best_val_proba = prob_pos_step
-                        test_profile[index] = best_val
-                        comb_descs.append(f"{desc} to {float(best_val):.1f}")
+                        axes.append((index, np.linspace(base[index], target_val, steps)))
                     else:
-                        test_profile[index] = target_val
-                        comb_descs.append(desc)
-
-                prob_pos_rec = _predict_profile(test_profile)
-                reduction = current_prob - prob_pos_rec
-
-                if reduction > best_reduction:
-                    best_reduction = reduction
-                    best_proba = prob_pos_rec
-                    best_combination = (comb, comb_descs)
-
-                if prob_pos_rec < 0.5:
-                    successful_combinations.append((comb, comb_descs, prob_pos_rec, reduction))
-
-        if best_reduction <= 0.01:
-            return "Lifestyle modifications alone show minimal expected risk reduction for this patient's profile."
+                        fixed[index] = target_val
+                if axes:
+                    grids = np.meshgrid(*(values for _, values in axes), indexing="ij")
+                    rows = np.repeat(fixed[None, :], grids[0].size, axis=0)
+                    for (index, _values), grid in zip(axes, grids):
+                        rows[:, index] = grid.ravel()
+                    # Total grid distance from the current profile; smaller is a gentler change.
+                    cost = sum(g.ravel() for g in np.meshgrid(*(np.arange(steps) for _ in axes), indexing="ij"))
+                else:
+                    rows = fixed[None, :]
+                    cost = np.zeros(1, dtype=np.int64)
+                blocks.append((comb, rows, cost))
+
+        profiles = np.vstack([rows for _, rows, _ in blocks])
+        probs = _score_recourse_profiles(model_name, model_obj, profiles, scaler)
+
+        best = None
+        successful = []
+        offset = 0
+        for comb, rows, cost in blocks:
+            block_probs = probs[offset:offset + len(rows)]
+            offset += len(rows)
+            below = np.flatnonzero(block_probs < 0.5)
+            if below.size:
+                pick = below[np.lexsort((block_probs[below], cost[below]))[0]]
+            else:
+                pick = int(np.argmin(block_probs))
+            prob_pos_rec = float(block_probs[pick])
+            descs = [
+                f"{desc} to {float(rows[pick, index]):.1f}" if is_cont else desc
+                for index, _target, desc, is_cont in comb
+            ]
+            reduction = current_prob - prob_pos_rec
+            if best is None or reduction > best[2]:
+                best = (descs, prob_pos_rec, reduction)
+            if prob_pos_rec < 0.5:
+                successful.append((len(comb), descs, prob_pos_rec, reduction))
+
+        model_calls, candidates = 1, len(profiles)
+        if best[2] <= 0.01:
+            return _result(
+                "Lifestyle modifications alone show minimal expected risk reduction for this patient's profile.",
+                model_calls, candidates,
+            )
 
-        if successful_combinations:
-            successful_combinations.sort(key=lambda x: (len(x[0]), -x[3]))
-            optimal_comb, optimal_descs, optimal_proba, optimal_reduction = successful_combinations[0]
-            actions = ", ".join(optimal_descs[:-1]) + " and " + optimal_descs[-1] if len(optimal_descs) > 1 else optimal_descs[0]
-            return f"Managing risk through {actions} could potentially reduce risk probability by {optimal_reduction * 100:.1f}%, bringing predicted risk below the threshold to {optimal_proba * 100:.1f}%."
-        else:
-            best_comb, best_descs = best_combination
-            actions = ", ".join(best_descs[:-1]) + " and " + best_descs[-1] if len(best_descs) > 1 else best_descs[0]
-            return f"Although additional clinical intervention may be required, adopting {actions} could potentially reduce risk probability by {best_reduction * 100:.1f}% (predicted risk: {best_proba * 100:.1f}%)."
+        if successful:
+            successful.sort(key=lambda x: (x[0], -x[3]))
+            _, optimal_descs, optimal_proba, optimal_reduction = successful[0]
+            return _result(
+                f"Managing risk through {_join_actions(optimal_descs)} could potentially reduce risk probability by {optimal_reduction * 100:.1f}%, bringing predicted risk below the threshold to {optimal_proba * 100:.1f}%.",
+                model_calls, candidates,
+            )
+        best_descs, best_proba, best_reduction = best
+        return _result(
+            f"Although additional clinical intervention may be required, adopting {_join_actions(best_descs)} could potentially reduce risk probability by {best_reduction * 100:.1f}% (predicted risk: {best_proba * 100:.1f}%).",
+            model_calls, candidates,
+        )
     except Exception as e:
         logger.warning("Recourse calculation failed: %s", e)
         return None
 
 
+def _calculate_clinical_recourse(
+    model_name: str,
+    model_obj: Any,
+    imputed_list: list,
+    current_prob: float,
+    scaler: Any = None
+) -> Optional[str]:
+    """
+    Simulates a counterfactual 'what-if' patient profile and returns the recourse
+    recommendation text. See ``_search_clinical_recourse`` for the batched grid search.
+    """
+    search = _search_clinical_recourse(model_name, model_obj, imputed_list, current_prob, scaler)
+    return search["recommendation"] if search else None
+
+
 async def _generate_clinical_narrative(
     model_name: str,
     prediction: str,
@@ -1261,7 +1286,7 @@ async def predict_kidney(
                     conformal_metrics["triage_recommendation"] = triage
 
                     # Add Top Risk Factors
-                    top_factors = _get_top_risk_factors(_pred.kidney_model, imputed_list, feature_names, attributions=attributions)
+                    top_factors = _get_top_risk_factors(_pred.kidney_model, imputed_list, feature_names, attributions=attributions, model_name="kidney")
                     if top_factors:
                         conformal_metrics["top_risk_factors"] = top_factors
 
@@ -1269,7 +1294,7 @@ async def predict_kidney(
                 except Exception as e:
                     logger.warning("Conformal prediction calculation failed for Kidney: %s", e)
 
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "kidney",
                 _pred.kidney_model,
                 imputed_list,
@@ -1277,7 +1302,8 @@ async def predict_kidney(
                 _pred.kidney_scaler
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
 
         model_metadata = _get_model_metadata("kidney", _pred.kidney_model)
         narrative = ""
@@ -1392,7 +1418,7 @@ async def predict_lungs(
                     conformal_metrics["triage_recommendation"] = triage
 
                     # Add Top Risk Factors
-                    top_factors = _get_top_risk_factors(_pred.lungs_model, imputed_list, feature_names, attributions=attributions)
+                    top_factors = _get_top_risk_factors(_pred.lungs_model, imputed_list, feature_names, attributions=attributions, model_name="lungs")
                     if top_factors:
                         conformal_metrics["top_risk_factors"] = top_factors
 
@@ -1400,7 +1426,7 @@ async def predict_lungs(
                 except Exception as e:
                     logger.warning("Conformal prediction calculation failed for Lungs: %s", e)
 
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "lungs",
                 _pred.lungs_model,
                 imputed_list,
@@ -1408,7 +1434,8 @@ async def predict_lungs(
                 _pred.lungs_scaler
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
 
         model_metadata = _get_model_metadata("lungs", _pred.lungs_model)
         narrative = ""
@@ -1507,24 +1534,25 @@ async def predict_stroke(
 
             # Conformal prediction
             conformal_metrics = _calculate_adaptive_conformal_prediction(
-                proba_pos, 0.1, input_list, raw, risk_level
+                proba_pos, _FIXED_CONFORMAL_Q["stroke"], input_list, raw, risk_level
             )
             triage = _get_triage_recommendation(raw, conformal_metrics["conformal_prediction_set"])
             conformal_metrics["triage_recommendation"] = triage
 
             # Top Risk Factors
-            top_factors = _get_top_risk_factors(model, input_list, feature_names, attributions=attributions)
+            top_factors = _get_top_risk_factors(model, input_list, feature_names, attributions=attributions, model_name="stroke")
             if top_factors:
                 conformal_metrics["top_risk_factors"] = top_factors
 
             clinical_indices.update(conformal_metrics)
 
             # Recourse
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "stroke", model, input_list, proba_pos, None
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
         except Exception as e:
             logger.warning("Stroke clinical indices extraction failed: %s", e)
 
@@ -1633,7 +1661,7 @@ async def predict_diabetes(
                     conformal_metrics["triage_recommendation"] = triage
 
                     # Add Top Risk Factors
-                    top_factors = _get_top_risk_factors(_pred.diabetes_model, imputed_list, _features.DIABETES_FEATURES, attributions=attributions)
+                    top_factors = _get_top_risk_factors(_pred.diabetes_model, imputed_list, _features.DIABETES_FEATURES, attributions=attributions, model_name="diabetes")
                     if top_factors:
                         conformal_metrics["top_risk_factors"] = top_factors
 
@@ -1641,7 +1669,7 @@ async def predict_diabetes(
                 except Exception as e:
                     logger.warning("Conformal prediction calculation failed for Diabetes: %s", e)
 
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "diabetes",
                 _pred.diabetes_model,
                 imputed_list,
@@ -1649,7 +1677,8 @@ async def predict_diabetes(
                 None
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
 
         model_metadata = _get_model_metadata("diabetes", _pred.diabetes_model)
         narrative = ""
@@ -1776,7 +1805,7 @@ async def predict_heart(
                     conformal_metrics["triage_recommendation"] = triage
 
                     # Add Top Risk Factors
-                    top_factors = _get_top_risk_factors(_pred.heart_model, imputed_list, _features.HEART_FEATURES, attributions=attributions)
+                    top_factors = _get_top_risk_factors(_pred.heart_model, imputed_list, _features.HEART_FEATURES, attributions=attributions, model_name="heart")
                     if top_factors:
                         conformal_metrics["top_risk_factors"] = top_factors
 
@@ -1784,7 +1813,7 @@ async def predict_heart(
                 except Exception as e:
                     logger.warning("Conformal prediction calculation failed for Heart: %s", e)
 
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "heart",
                 _pred.heart_model,
                 imputed_list,
@@ -1792,7 +1821,8 @@ async def predict_heart(
                 None
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
 
         model_metadata = _get_model_metadata("heart", _pred.heart_model)
         narrative = ""
@@ -1924,7 +1954,7 @@ async def predict_liver(
                     conformal_metrics["triage_recommendation"] = triage
 
                     # Add Top Risk Factors
-                    top_factors = _get_top_risk_factors(_pred.liver_model, imputed_list, feature_names, attributions=attributions)
+                    top_factors = _get_top_risk_factors(_pred.liver_model, imputed_list, feature_names, attributions=attributions, model_name="liver")
                     if top_factors:
                         conformal_metrics["top_risk_factors"] = top_factors
 
@@ -1932,7 +1962,7 @@ async def predict_liver(
                 except Exception as e:
                     logger.warning("Conformal prediction calculation failed for Liver: %s", e)
 
-            recourse = _calculate_clinical_recourse(
+            recourse = _search_clinical_recourse(
                 "liver",
                 _pred.liver_model,
                 imputed_list,
@@ -1940,7 +1970,8 @@ async def predict_liver(
                 _pred.liver_scaler
             )
             if recourse:
-                clinical_indices["clinical_recourse"] = recourse
+                clinical_indices["clinical_recourse"] = recourse.pop("recommendation")
+                clinical_indices["clinical_recourse_search"] = recourse
 
         model_metadata = _get_model_metadata("liver", _pred.liver_model)
         narrative = ""
@@ -2152,6 +2183,171 @@ async def predict_multi_organ(
         raise HTTPException(status_code=500, detail="Failed to run multi-organ diagnostics")
 
 
+# --- Batched Cohort Scoring ---
+
+def _stroke_input_list(data: schemas.StrokeInput) -> list:
+    return [
+        data.gender if data.gender is not None else 0,
+        data.age if data.age is not None else 45.0,
+        data.hypertension if data.hypertension is not None else 0,
+        data.heart_disease if data.heart_disease is not None else 0,
+        data.smoking if data.smoking is not None else 0,
+        data.bmi if data.bmi is not None else 25.0,
+        data.glucose if data.glucose is not None else 90.0,
+    ]
+
+
+# model name -> (input schema, feature-row builder, (positive label, negative label))
+_BATCH_MODEL_SPECS = {
+    "diabetes": (
+        schemas.DiabetesInput,
+        lambda d: [
+            d.hypertension, d.high_chol, d.bmi, d.smoking_history,
+            d.heart_disease, d.physical_activity, d.general_health,
+            d.gender, get_age_bucket(d.age) if d.age is not None else None,
+        ],
+        ("High Risk", "Low Risk"),
+    ),
+    "heart": (
+        schemas.HeartInput,
+        lambda d: [
+            d.age, d.sex, d.cp, d.trestbps, d.chol, d.fbs, d.restecg,
+            d.thalach, d.exang, d.oldpeak, d.slope, d.ca, d.thal,
+        ],
+        ("Heart Disease Detected", "Healthy Heart"),
+    ),
+    "liver": (
+        schemas.LiverInput,
+        lambda d: [
+            d.age, d.gender, d.total_bilirubin, d.direct_bilirubin,
+            d.alkaline_phosphotase, d.alamine_aminotransferase,
+            d.aspartate_aminotransferase, d.total_proteins,
+            d.albumin, d.albumin_and_globulin_ratio,
+        ],
+        ("Liver Disease Detected", "Healthy Liver"),
+    ),
+    "kidney": (
+        schemas.KidneyInput,
+        lambda d: [
+            d.age, d.bp, d.sg, d.al, d.su, d.rbc, d.pc, d.pcc, d.ba,
+            d.bgr, d.bu, d.sc, d.sod, d.pot, d.hemo, d.pcv, d.wc, d.rc,
+            d.htn, d.dm, d.cad, d.appet, d.pe, d.ane,
+        ],
+        ("Chronic Kidney Disease Detected", "Healthy Kidney"),
+    ),
+    "lungs": (
+        schemas.LungInput,
+        lambda d: [
+            d.gender, d.age, d.smoking, d.yellow_fingers, d.anxiety,
+            d.peer_pressure, d.chronic_disease, d.fatigue, d.allergy,
+            d.wheezing, d.alcohol, d.coughing, d.shortness_of_breath,
+            d.swallowing_difficulty, d.chest_pain,
+        ],
+        ("Respiratory Issue Detected", "Healthy Lungs"),
+    ),
+    "stroke": (schemas.StrokeInput, _stroke_input_list, ("High Stroke Risk", "Low Stroke Risk")),
+}
+
+# Models whose routes use a fixed conformal threshold instead of calibration data
+_FIXED_CONFORMAL_Q: Dict[str, float] = {"stroke": 0.1}
+
+
+@router.post("/predict/{model_name}/batch", response_model=Dict[str, Any])
+def predict_batch(
+    model_name: str,
+    data: schemas.BatchPredictionRequest,
+    _current_user: db_models.User = Depends(auth.get_current_user),
+) -> Dict[str, Any]:
+    """Score a ward or screening cohort with a single model call.
+
+    Each record is validated against the model's single-prediction schema,
+    the cohort is imputed as one matrix, and all rows are scored by one
+    ``predict_proba`` / ONNX ``session.run`` inside a single attested
+    enclave. Per-row results carry the same ``prediction``, ``raw``,
+    ``confidence`` and ``risk_level`` fields as the single-row routes, plus
+    adaptive conformal sets and triage guidance when calibration data exists.
+
+    Args:
+        model_name (str): One of ``diabetes``, ``heart``, ``liver``,
+            ``kidney``, ``lungs`` or ``stroke``.
+        data (schemas.BatchPredictionRequest): The cohort records.
+        _current_user (db_models.User): The authenticated user (injected by
+            dependency).
+
+    Returns:
+        Dict[str, Any]: ``model``, ``count``, ``results``, ``model_metadata``,
+            ``disclaimer`` and ``elapsed_ms``.
+
+    Raises:
+        HTTPException: 404 for an unknown model; 422 if a record fails
+            validation; 503 if the model is not loaded; 500 on prediction
+            failure.
+    """
+    import time
+
+    from pydantic import ValidationError
+
+    from .model_service import _classify_confidence
+
+    spec = _BATCH_MODEL_SPECS.get(model_name)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown prediction model: {model_name}")
+    input_schema, build_row, (positive_label, negative_label) = spec
+
+    if not model_service.is_available(model_name):
+        raise HTTPException(status_code=503, detail=f"{model_name.title()} Model not available")
+
+    input_rows = []
+    for index, record in enumerate(data.records):
+        try:
+            input_rows.append(build_row(input_schema(**record)))
+        except ValidationError as exc:
+            raise HTTPException(
+                status_code=422,
+                detail={"record_index": index, "errors": exc.errors(include_url=False, include_context=False)},
+            )
+
+    started = time.perf_counter()
+    try:
+        imputed_rows = _impute_batch(model_name, input_rows)
+        probs = _run_model_prediction_batch(model_name, imputed_rows)
+    except Exception:
+        logger.error("%s batch prediction error", model_name)
+        _raise_prediction_failure(model_name.title())
+
+    _, conformal_q = _get_imputer_and_conformal(model_name, None)
+    conformal_q = _FIXED_CONFORMAL_Q.get(model_name, conformal_q)
+    results = []
+    for input_list, prob in zip(input_rows, probs):
+        prob = float(prob)
+        raw = 1 if prob >= 0.5 else 0
+        confidence, risk_level = _classify_confidence(prob)
+        if confidence is not None and raw == 0:
+            confidence = round(100.0 - confidence, 1)
+        row = {
+            "prediction": positive_label if raw == 1 else negative_label,
+            "raw": raw,
+            "confidence": confidence,
+            "risk_level": risk_level,
+            "probability": round(prob, 6),
+        }
+        if data.include_conformal and conformal_q is not None:
+            conformal = _calculate_adaptive_conformal_prediction(prob, conformal_q, input_list, raw, risk_level)
+            row["conformal_prediction_set"] = conformal["conformal_prediction_set"]
+            row["uncertainty_status"] = conformal["uncertainty_status"]
+            row["triage_recommendation"] = _get_triage_recommendation(raw, conformal["conformal_prediction_set"])
+        results.append(row)
+
+    return {
+        "model": model_name,
+        "count": len(results),
+        "results": results,
+        "model_metadata": _get_model_metadata(model_name, model_service._entries[model_name].model),
+        "disclaimer": MEDICAL_DISCLAIMER,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 3),
+    }
+
+
 from pydantic import BaseModel as PydanticBaseModel
 
 
@@ -2201,6 +2397,14 @@ async def get_patient_explanation_endpoint(
 
 # --- Explanation Endpoints (SHAP) ---
 
+def _explain_engine(model_name: str, model: Any) -> Any:
+    """Cached attribution engine for the explain endpoints (None lets get_shap_values build one)."""
+    try:
+        return model_service.attribution_engine(model_name, model)
+    except Exception:
+        return None
+
+
 @router.post("/predict/explain/diabetes")
 def explain_diabetes(
     data: schemas.DiabetesInput,
@@ -2236,6 +2440,7 @@ def explain_diabetes(
         _pred.diabetes_model,
         np.array([input_list]),
         _features.DIABETES_FEATURES,
+        engine=_explain_engine("diabetes", _pred.diabetes_model),
     )
     if explanation: return explanation
     raise HTTPException(status_code=500, detail="Explanation Generation Failed")
@@ -2276,6 +2481,7 @@ def explain_heart(
         np.array([input_list]),
         ['Age', 'Sex', 'ChestPain', 'RestBP', 'Cholesterol', 'FastingBS',
           'RestECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'Slope', 'MajorVessels', 'Thal'],
+        engine=_explain_engine("heart", _pred.heart_model),
     )
     if explanation: return explanation
     raise HTTPException(status_code=500, detail="Explanation Generation Failed")
@@ -2319,6 +2525,7 @@ def explain_liver(
         _pred.liver_model,
         _pred.liver_scaler.transform(df),
         _features.LIVER_FEATURES,
+        engine=_explain_engine("liver", _pred.liver_model),
     )
     if explanation: return explanation
     raise HTTPException(status_code=500, detail="Explanation Generation Failed")
@@ -2791,8 +2998,8 @@ async def handle_vitals_recorded(payload: dict) -> None:
                 imputed_list = [0.0 if x is None else x for x in input_list_db]
 
             try:
-                proba = _pred.diabetes_model.predict_proba([imputed_list])[0]
-                diabetes_risk = float(proba[1]) if len(proba) > 1 else float(proba[0])
+                # Concurrent vitals events are coalesced into one model call per window
+                diabetes_risk = await model_service.predict_proba_coalesced("diabetes", imputed_list, model=_pred.diabetes_model)
             except Exception:
                 diabetes_risk = 0.0
 
@@ -2837,8 +3044,7 @@ async def handle_vitals_recorded(payload: dict) -> None:
                 imputed_list = [0.0 if x is None else x for x in input_list_hr]
 
             try:
-                proba = _pred.heart_model.predict_proba([imputed_list])[0]
-                heart_risk = float(proba[1]) if len(proba) > 1 else float(proba[0])
+                heart_risk = await model_service.predict_proba_coalesced("heart", imputed_list, model=_pred.heart_model)
             except Exception:
                 heart_risk = 0.0
 
@@ -3152,58 +3358,93 @@ async def match_clinical_trials(
         }
 
 
-def _run_diabetes_proba(features: dict) -> float:
-    """Compute diabetes risk probability from a feature dictionary.
+def _counterfactual_input_list(target: str, features: dict) -> list:
+    """Map a counterfactual feature dictionary onto the model's column order."""
+    if target == "diabetes":
+        from .model_service import get_age_bucket
+
+        return [
+            features.get("hypertension", 0.0),
+            features.get("high_chol", 0.0),
+            features.get("bmi", 25.0),
+            features.get("smoking_history", 0.0),
+            features.get("heart_disease", 0.0),
+            features.get("physical_activity", 1.0),
+            features.get("general_health", 3.0),
+            features.get("gender", 1.0),
+            get_age_bucket(features.get("age", 45))
+        ]
+    return [
+        features.get("age", 50.0),
+        features.get("sex", 1.0),
+        features.get("cp", 0.0),
+        features.get("trestbps", 120.0),
+        features.get("chol", 200.0),
+        features.get("fbs", 0.0),
+        features.get("restecg", 0.0),
+        features.get("thalach", 150.0),
+        features.get("exang", 0.0),
+        features.get("oldpeak", 0.0),
+        features.get("slope", 1.0),
+        features.get("ca", 0.0),
+        features.get("thal", 2.0)
+    ]
+
 
-    Internal helper used by the counterfactual recourse endpoint to
-    evaluate modified patient profiles against the diabetes model.
+def _run_counterfactual_proba_batch(target: str, profiles: list) -> np.ndarray:
+    """Score many counterfactual feature dictionaries with one model call.
 
     Args:
-        features (dict): A dictionary of patient features keyed by name
-            (e.g. ``"bmi"``, ``"hypertension"``, ``"age"``).
+        target (str): ``"diabetes"`` or ``"heart"``.
+        profiles (list): Feature dictionaries keyed by name.
 
     Returns:
-        float: The predicted probability of diabetes (0.0 to 1.0).
+        np.ndarray: Positive-class probabilities, one per profile (zeros if
+            the model call fails, matching the single-profile helpers).
     """
-    from .model_service import get_age_bucket
+    from .model_service import _positive_class_probs
 
     _pred = sys.modules[__name__]
+    model = _pred.diabetes_model if target == "diabetes" else _pred.heart_model
 
-    age_bucket = get_age_bucket(features.get("age", 45))
-    input_list = [
-        features.get("hypertension", 0.0),
-        features.get("high_chol", 0.0),
-        features.get("bmi", 25.0),
-        features.get("smoking_history", 0.0),
-        features.get("heart_disease", 0.0),
-        features.get("physical_activity", 1.0),
-        features.get("general_health", 3.0),
-        features.get("gender", 1.0),
-        age_bucket
-    ]
-    imputer, _ = _pred._get_imputer_and_conformal("diabetes", _pred.diabetes_model)
-    imputed_list = None
+    input_rows = [_counterfactual_input_list(target, features) for features in profiles]
+    imputer, _ = _pred._get_imputer_and_conformal(target, model)
+    X = None
     if imputer is not None:
         try:
-            imputed_arr = imputer.transform([input_list])
-            imputed_list = imputed_arr[0].tolist()
+            X = np.asarray(imputer.transform(input_rows), dtype=np.float64)
         except Exception:
             pass
-    if imputed_list is None:
-        imputed_list = [0.0 if x is None else x for x in input_list]
+    if X is None:
+        X = np.array([[0.0 if x is None else x for x in row] for row in input_rows], dtype=np.float64)
 
     try:
-        proba = _pred.diabetes_model.predict_proba([imputed_list])[0]
-        return float(proba[1]) if len(proba) > 1 else float(proba[0])
+        return _positive_class_probs(model.predict_proba(X))
     except Exception:
-        return 0.0
+        return np.zeros(len(profiles), dtype=np.float64)
+
+
+def _run_diabetes_proba(features: dict) -> float:
+    """Compute diabetes risk probability from a feature dictionary.
+
+    Internal helper used to evaluate a single modified patient profile
+    against the diabetes model.
+
+    Args:
+        features (dict): A dictionary of patient features keyed by name
+            (e.g. ``"bmi"``, ``"hypertension"``, ``"age"``).
+
+    Returns:
+        float: The predicted probability of diabetes (0.0 to 1.0).
+    """
+    return float(_run_counterfactual_proba_batch("diabetes", [features])[0])
 
 
 def _run_heart_proba(features: dict) -> float:
     """Compute heart disease risk probability from a feature dictionary.
 
-    Internal helper used by the counterfactual recourse endpoint to
-    evaluate modified patient profiles against the heart model.
+    Internal helper used to evaluate a single modified patient profile
+    against the heart model.
 
     Args:
         features (dict): A dictionary of patient features keyed by name
@@ -3212,39 +3453,96 @@ def _run_heart_proba(features: dict) -> float:
     Returns:
         float: The predicted probability of heart disease (0.0 to 1.0).
     """
-    _pred = sys.modules[__name__]
+    return float(_run_counterfactual_proba_batch("heart", [features])[0])
+
+
+# Ordered recourse plan per model:
+# (feature, default, applies_fn, target_fn, is_continuous, describe_fn(current, new))
+_COUNTERFACTUAL_PLANS = {
+    "diabetes": [
+        ("smoking_history", 0.0, lambda v: v == 1.0, lambda v: 0.0, False,
+         lambda cur, new: "Quit smoking"),
+        ("high_chol", 0.0, lambda v: v == 1.0, lambda v: 0.0, False,
+         lambda cur, new: "Control cholesterol (target High Chol to No)"),
+        ("hypertension", 0.0, lambda v: v == 1.0, lambda v: 0.0, False,
+         lambda cur, new: "Manage hypertension (target Hypertension to No)"),
+        ("physical_activity", 1.0, lambda v: v == 0.0, lambda v: 1.0, False,
+         lambda cur, new: "Increase physical activity (target to Yes)"),
+        ("general_health", 3.0, lambda v: v > 2.0, lambda v: 2.0, False,
+         lambda cur, new: f"Improve general self-reported health from {int(cur)} to 2"),
+        ("bmi", 25.0, lambda v: v > 24.0, lambda v: max(18.5, min(24.0, v - 5.0)), True,
+         lambda cur, new: f"Reduce BMI from {cur:.1f} to {new:.1f}"),
+    ],
+    "heart": [
+        ("smoker", 0, lambda v: v == 1, lambda v: 0, False,
+         lambda cur, new: "Stop smoking"),
+        ("trestbps", 120.0, lambda v: v > 120.0, lambda v: 120.0, True,
+         lambda cur, new: f"Reduce resting blood pressure from {int(cur)} mmHg to {int(round(new))} mmHg"),
+        ("chol", 200.0, lambda v: v > 200.0, lambda v: 200.0, True,
+         lambda cur, new: f"Reduce serum cholesterol from {int(cur)} mg/dL to {int(round(new))} mg/dL"),
+        ("thalach", 150.0, lambda v: v < 160.0, lambda v: 160.0, True,
+         lambda cur, new: f"Improve max heart rate achieved (aerobic capacity) to {int(round(new))} bpm"),
+    ],
+}
 
-    input_list = [
-        features.get("age", 50.0),
-        features.get("sex", 1.0),
-        features.get("cp", 0.0),
-        features.get("trestbps", 120.0),
-        features.get("chol", 200.0),
-        features.get("fbs", 0.0),
-        features.get("restecg", 0.0),
-        features.get("thalach", 150.0),
-        features.get("exang", 0.0),
-        features.get("oldpeak", 0.0),
-        features.get("slope", 1.0),
-        features.get("ca", 0.0),
-        features.get("thal", 2.0)
-    ]
-    imputer, _ = _pred._get_imputer_and_conformal("heart", _pred.heart_model)
-    imputed_list = None
-    if imputer is not None:
-        try:
-            imputed_arr = imputer.transform([input_list])
-            imputed_list = imputed_arr[0].tolist()
-        except Exception:
-            pass
-    if imputed_list is None:
-        imputed_list = [0.0 if x is None else x for x in input_list]
 
-    try:
-        proba = _pred.heart_model.predict_proba([imputed_list])[0]
-        return float(proba[1]) if len(proba) > 1 else float(proba[0])
-    except Exception:
-        return 0.0
+def _search_counterfactual_recourse(target: str, features: dict) -> dict:
+    """Run the ordered counterfactual plan against one batched model call.
+
+    The plan is applied cumulatively: each stage starts from the profile with
+    every earlier lever at its target, so all stage candidates (and the
+    baseline) can be materialized up front and scored together. Continuous
+    levers are expanded onto a ``RECOURSE_GRID_STEPS`` grid and stop at the
+    gentlest value that crosses the 0.5 threshold.
+    """
+    import time
+
+    started = time.perf_counter()
+    profiles = [features.copy()]
+    stages = []
+    chain = features.copy()
+    for feature, default, applies, target_fn, continuous, describe in _COUNTERFACTUAL_PLANS[target]:
+        current = chain.get(feature, default)
+        if not applies(current):
+            continue
+        goal = target_fn(current)
+        if continuous:
+            values = [float(v) for v in np.linspace(current, goal, max(RECOURSE_GRID_STEPS, 2))[1:]]
+        else:
+            values = [goal]
+        stages.append((feature, current, values, describe, len(profiles)))
+        for value in values:
+            profiles.append({**chain, feature: value})
+        chain[feature] = goal
+
+    probs = _run_counterfactual_proba_batch(target, profiles)
+    baseline = float(probs[0])
+    recourse = features.copy()
+    changes = {}
+    optimized = baseline
+
+    if baseline >= 0.5:
+        for feature, current, values, describe, offset in stages:
+            stage_probs = probs[offset:offset + len(values)]
+            below = np.flatnonzero(stage_probs < 0.5)
+            pick = int(below[0]) if below.size else len(values) - 1
+            recourse[feature] = values[pick]
+            changes[feature] = describe(current, values[pick])
+            optimized = float(stage_probs[pick])
+            if optimized < 0.5:
+                break
+
+    return {
+        "baseline_risk": baseline,
+        "optimized_risk": optimized,
+        "recourse_recommendation": recourse,
+        "changes_applied": changes,
+        "search_metadata": {
+            "model_calls": 1,
+            "candidates_evaluated": len(profiles),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 3),
+        },
+    }
 
 
 @router.post("/predict/counterfactual/{patient_id}")
@@ -3256,9 +3554,10 @@ async def counterfactual_recourse(
 ):
     """Compute step-wise counterfactual recourse for a patient's risk profile.
 
-    Iteratively modifies controllable lifestyle features (e.g. smoking,
-    BMI, cholesterol) to find the minimum set of changes that would bring
-    the patient's predicted risk below the 0.5 threshold.
+    Applies controllable lifestyle changes (e.g. smoking, BMI, cholesterol)
+    in clinical priority order to find the minimum set of changes that would
+    bring the patient's predicted risk below the 0.5 threshold. All candidate
+    profiles are scored in a single batched model call.
 
     Args:
         patient_id (int): The primary-key ID of the patient.
@@ -3271,7 +3570,8 @@ async def counterfactual_recourse(
 
     Returns:
         dict: A dictionary with ``baseline_risk``, ``optimized_risk``,
-            ``recourse_recommendation``, and ``changes_applied``.
+            ``recourse_recommendation``, ``changes_applied`` and
+            ``search_metadata`` (model calls, candidates, elapsed ms).
 
     Raises:
         HTTPException: 400 if the target model is not supported; 403 if
@@ -3280,115 +3580,11 @@ async def counterfactual_recourse(
     _ensure_prediction_review_access(db, current_user, patient_id)
 
     target = req.target_model.lower()
-    features = req.features.copy()
-
-    if target == "diabetes":
-        baseline = _run_diabetes_proba(features)
-        recourse = features.copy()
-
-        # If risk is already low, return
-        if baseline < 0.5:
-            return {
-                "baseline_risk": baseline,
-                "optimized_risk": baseline,
-                "recourse_recommendation": recourse,
-                "changes_applied": {}
-            }
-
-        # Step-wise optimization logic
-        # Optimize: BMI, High Chol, Hypertension, Physical Activity, Smoking, Gen Health
-        changes = {}
-
-        # 1. Smoking history to 0
-        if recourse.get("smoking_history", 0.0) == 1.0:
-            recourse["smoking_history"] = 0.0
-            changes["smoking_history"] = "Quit smoking"
-
-        # 2. High Chol to 0
-        if _run_diabetes_proba(recourse) >= 0.5 and recourse.get("high_chol", 0.0) == 1.0:
-            recourse["high_chol"] = 0.0
-            changes["high_chol"] = "Control cholesterol (target High Chol to No)"
-
-        # 3. Hypertension to 0
-        if _run_diabetes_proba(recourse) >= 0.5 and recourse.get("hypertension", 0.0) == 1.0:
-            recourse["hypertension"] = 0.0
-            changes["hypertension"] = "Manage hypertension (target Hypertension to No)"
-
-        # 4. Physical Activity to 1
-        if _run_diabetes_proba(recourse) >= 0.5 and recourse.get("physical_activity", 1.0) == 0.0:
-            recourse["physical_activity"] = 1.0
-            changes["physical_activity"] = "Increase physical activity (target to Yes)"
-
-        # 5. General Health to 2 (Good) or 1 (Excellent)
-        current_gen_health = recourse.get("general_health", 3.0)
-        if _run_diabetes_proba(recourse) >= 0.5 and current_gen_health > 2.0:
-            recourse["general_health"] = 2.0
-            changes["general_health"] = f"Improve general self-reported health from {int(current_gen_health)} to 2"
-
-        # 6. Reduce BMI progressively
-        current_bmi = recourse.get("bmi", 25.0)
-        if _run_diabetes_proba(recourse) >= 0.5 and current_bmi > 24.0:
-            target_bmi = max(18.5, min(24.0, current_bmi - 5.0))
-            recourse["bmi"] = target_bmi
-            changes["bmi"] = f"Reduce BMI from {current_bmi:.1f} to {target_bmi:.1f}"
-
-        optimized_risk = _run_diabetes_proba(recourse)
-        return {
-            "baseline_risk": baseline,
-            "optimized_risk": optimized_risk,
-            "recourse_recommendation": recourse,
-            "changes_applied": changes
-        }
-
-    elif target == "heart":
-        baseline = _run_heart_proba(features)
-        recourse = features.copy()
-
-        if baseline < 0.5:
-            return {
-                "baseline_risk": baseline,
-                "optimized_risk": baseline,
-                "recourse_recommendation": recourse,
-                "changes_applied": {}
-            }
-
-        # Optimize: trestbps (BP), chol (Cholesterol), smoker, thalach (max HR), hyp_treatment
-        changes = {}
-
-        # 1. If smoker, stop smoking
-        if recourse.get("smoker", 0) == 1:
-            recourse["smoker"] = 0
-            changes["smoker"] = "Stop smoking"
-
-        # 2. Control Resting Blood Pressure (trestbps)
-        current_bp = recourse.get("trestbps", 120.0)
-        if _run_heart_proba(recourse) >= 0.5 and current_bp > 120.0:
-            recourse["trestbps"] = 120.0
-            changes["trestbps"] = f"Reduce resting blood pressure from {int(current_bp)} mmHg to 120 mmHg"
-
-        # 3. Control Cholesterol (chol)
-        current_chol = recourse.get("chol", 200.0)
-        if _run_heart_proba(recourse) >= 0.5 and current_chol > 200.0:
-            recourse["chol"] = 200.0
-            changes["chol"] = f"Reduce serum cholesterol from {int(current_chol)} mg/dL to 200 mg/dL"
-
-        # 4. Improve max heart rate achieved (thalach)
-        current_hr = recourse.get("thalach", 150.0)
-        if _run_heart_proba(recourse) >= 0.5 and current_hr < 160.0:
-            recourse["thalach"] = 160.0
-            changes["thalach"] = "Improve max heart rate achieved (aerobic capacity) to 160 bpm"
-
-        optimized_risk = _run_heart_proba(recourse)
-        return {
-            "baseline_risk": baseline,
-            "optimized_risk": optimized_risk,
-            "recourse_recommendation": recourse,
-            "changes_applied": changes
-        }
-
-    else:
+    if target not in _COUNTERFACTUAL_PLANS:
         raise HTTPException(status_code=400, detail=f"Counterfactual recourse not supported for model: {req.target_model}")
 
+    return _search_counterfactual_recourse(target, req.features.copy())
+
 
 @router.get("/predict/consensus/{patient_id}")
 async def get_clinical_consensus(
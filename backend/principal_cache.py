@@ -0,0 +1,228 @@
+"""
+Decoded-Token & Principal Cache
+===============================
+Short-TTL, size-bounded map of ``sha256(token)`` to the token's verified
+claims and a detached snapshot of the authenticated ``User`` row.
+
+A hit lets ``auth.get_current_user`` skip both the JWT signature check and the
+``User`` query: the snapshot is attached to the request's session with
+``Session.merge(load=False)``, which issues no SQL. Entries never outlive the
+token's own ``exp`` claim.
+
+Snapshots are stamped with the user's principal generation, kept as tags in
+the shared ``cache_service`` store (Redis when configured), and only served
+while that generation is unchanged. Committing an update or delete of a
+``User`` bumps the user's generation, and bulk UPDATE/DELETE statements on
+the users table bump a global one, so role, facility and deletion changes
+apply at once in every worker.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from . import models
+from .cache_service import cache
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+# Large free-text columns are left unloaded in snapshots and lazy-load on access.
+_SNAPSHOT_EXCLUDED_COLUMNS = frozenset({"profile_picture"})
+
+_ALL_PRINCIPALS_TAG = "principal:*"
+_PENDING_INFO_KEY = "principal_cache_pending"
+
+
+def _user_tag(username: Optional[str]) -> str:
+    return f"principal:user:{username}"
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _snapshot_user(user: models.User) -> models.User:
+    """Detached copy of ``user``'s column state, safe to share across sessions."""
+    state = inspect(user)
+    snapshot = models.User()
+    for attr in inspect(models.User).column_attrs:
+        if attr.key in _SNAPSHOT_EXCLUDED_COLUMNS or attr.key in state.unloaded:
+            continue
+        setattr(snapshot, attr.key, getattr(user, attr.key))
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+class PrincipalCache:
+    """Thread-safe LRU/TTL cache of verified token claims and user snapshots."""
+
+    def __init__(self, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"claim_hits": 0, "user_hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get_claims(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._get(key)
+        if entry is None:
+            return None
+        with self._lock:
+            self._stats["claim_hits"] += 1
+        return entry["claims"]
+
+    def put_claims(self, key: str, claims: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["claims"] = claims
+                entry["expires_at"] = expires_at
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = {"claims": claims, "expires_at": expires_at, "user": None, "user_id": None, "version": None}
+            self._evict_locked()
+
+    def user_version(self, username: str) -> Tuple[int, int]:
+        """Current shared generation of ``username``'s principal.
+
+        Read before the ``User`` query so a change committed after it leaves
+        the stored snapshot stale rather than current.
+        """
+        tags = [_ALL_PRINCIPALS_TAG, _user_tag(username)]
+        versions = cache.get_tag_versions(tags)
+        return versions[tags[0]], versions[tags[1]]
+
+    def get_user(self, key: str, version: Tuple[int, int]) -> Optional[models.User]:
+        entry = self._get(key)
+        snapshot = None
+        if entry is not None and entry["version"] == version:
+            snapshot = entry["user"]
+        with self._lock:
+            self._stats["user_hits" if snapshot is not None else "misses"] += 1
+        return snapshot
+
+    def put_user(self, key: str, user: models.User, version: Tuple[int, int]) -> None:
+        if not self.enabled or user.id is None:
+            return
+        snapshot = _snapshot_user(user)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return  # claims expired or were invalidated meanwhile
+            entry["user"] = snapshot
+            entry["user_id"] = user.id
+            entry["version"] = version
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+
+    def invalidate_user(self, user_id: Optional[int]) -> None:
+        if user_id is None:
+            return
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self._stats["invalidations"] += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.time():
+                self._drop_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry["user_id"] is not None:
+            keys = self._keys_by_user.get(entry["user_id"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry["user_id"]]
+
+    def _evict_locked(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._drop_locked(next(iter(self._entries)))
+
+
+principal_cache = PrincipalCache()
+
+
+def _pending_invalidations(session: Session) -> Dict[str, Set[Any]]:
+    return session.info.setdefault(_PENDING_INFO_KEY, {"user_ids": set(), "tags": set()})
+
+
+def _apply_invalidations(user_ids: Set[int], tags: Set[str]) -> None:
+    if _ALL_PRINCIPALS_TAG in tags:
+        principal_cache.clear()
+    for user_id in user_ids:
+        principal_cache.invalidate_user(user_id)
+    cache.bump_tags(sorted(tags))
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _collect_changed_user(mapper, connection, target) -> None:
+    usernames = {target.username, *(inspect(target).attrs.username.history.deleted or ())}
+    tags = {_user_tag(username) for username in usernames}
+    session = object_session(target)
+    if session is None:
+        _apply_invalidations({target.id}, tags)
+        return
+    pending = _pending_invalidations(session)
+    pending["user_ids"].add(target.id)
+    pending["tags"].update(tags)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_user_changes(orm_execute_state) -> None:
+    """Bulk UPDATE/DELETE on ``users`` names no rows, so drop every principal."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) == models.User.__tablename__:
+        _pending_invalidations(orm_execute_state.session)["tags"].add(_ALL_PRINCIPALS_TAG)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INFO_KEY, None)
+    if pending:
+        _apply_invalidations(pending["user_ids"], pending["tags"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_users(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_INFO_KEY, None)
@@ -6,6 +6,8 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
+from .metadata_index import MetadataIndex  # noqa: F401  (re-exported whether or not the package is installed)
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -131,7 +133,6 @@ if _pkg_rag is None:
     from typing import Any, Dict, List, Optional
 
     import numpy as np
-    from sklearn.metrics.pairwise import cosine_similarity
 
     from .vector_store_base import VectorStoreBackend
 
@@ -241,6 +242,12 @@ if _pkg_rag is None:
             return core_ai.embed_text(text, task_type="retrieval_query")
         return [0.1] * 768
 
+    def get_embeddings(texts: List[str]) -> List[List[float]]:
+        """Batch form of ``get_embedding``: one cache multi-get plus batched provider calls."""
+        if core_ai is not None:
+            return core_ai.embed_texts(texts, task_type="retrieval_document")
+        return [[0.1] * 768 for _ in texts]
+
     def _normalize_acl_value(value: Any) -> str:
         return str(value).strip()
 
@@ -262,67 +269,122 @@ if _pkg_rag is None:
         """
         Locality-Sensitive Hashing (LSH) for fast Approximate Nearest Neighbor (ANN) search.
         Partitions high-dimensional spaces using random projection hyperplanes.
+
+        All tables share one stacked projection matrix, so hashing a batch of
+        vectors is a single matrix product plus bit-packing. Queries use
+        multi-probe: besides the exact bucket, each table also probes the
+        ``num_probes`` neighbouring buckets obtained by flipping the bits whose
+        projections fall closest to their hyperplane.
         """
 
-        def __init__(self, num_tables: int = 5, hash_size: int = 6):
+        def __init__(self, num_tables: int = 5, hash_size: int = 6, num_probes: int = 2):
             self.num_tables = num_tables
             self.hash_size = hash_size
+            self.num_probes = num_probes
             self.dim: Optional[int] = None
-            self.tables: List[Dict[str, Any]] = []
+            self.planes: Optional[np.ndarray] = None
+            self.tables: List[Dict[int, set]] = []
+            # Bit weights, most significant bit first
+            self._weights = 1 << np.arange(hash_size - 1, -1, -1, dtype=np.int64)
 
         def _init_tables(self, dim: int) -> None:
             self.dim = dim
-            self.tables = []
-            from collections import defaultdict
-
             rng = np.random.RandomState(42)
-            for _ in range(self.num_tables):
-                planes = rng.normal(0, 1, (self.hash_size, dim))
-                self.tables.append({"planes": planes, "buckets": defaultdict(list)})
-
-        def _hash(self, planes: np.ndarray, vector: np.ndarray) -> int:
-            projection = np.dot(planes, vector)
-            bits = projection > 0
-            val = 0
-            for b in bits:
-                val = (val << 1) | int(b)
-            return val
+            # Same per-table hyperplanes as the historical one-table-at-a-time layout
+            self.planes = np.vstack(
+                [rng.normal(0, 1, (self.hash_size, dim)) for _ in range(self.num_tables)]
+            ).astype(np.float32)
+            self.tables = [{} for _ in range(self.num_tables)]
+
+        def _project(self, vectors: np.ndarray) -> np.ndarray:
+            """Signed projections, shape (n, num_tables, hash_size)."""
+            vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+            return (vectors @ self.planes.T).reshape(-1, self.num_tables, self.hash_size)
+
+        def _codes(self, projections: np.ndarray) -> np.ndarray:
+            """Pack projection sign bits into one bucket id per table, shape (n, num_tables)."""
+            return (projections > 0).astype(np.int64) @ self._weights
 
         def index(self, record_id: str, vector: np.ndarray) -> None:
-            if self.dim is None:
-                self._init_tables(len(vector))
-            for table in self.tables:
-                hash_val = self._hash(table["planes"], vector)
-                if record_id not in table["buckets"][hash_val]:
-                    table["buckets"][hash_val].append(record_id)
+            self.index_many([record_id], np.asarray(vector)[None, :])
 
-        def query(self, query_vector: np.ndarray) -> set[str]:
+        def index_many(self, record_ids: List[str], vectors: np.ndarray) -> None:
+            """Hash and insert a batch of vectors (one matrix product for all tables)."""
+            vectors = np.asarray(vectors)
+            if len(record_ids) == 0:
+                return
+            if self.dim is None:
+                self._init_tables(vectors.shape[1])
+            codes = self._codes(self._project(vectors))
+            for table, column in zip(self.tables, codes.T.tolist()):
+                for record_id, code in zip(record_ids, column):
+                    bucket = table.get(code)
+                    if bucket is None:
+                        table[code] = {record_id}
+                    else:
+                        bucket.add(record_id)
+
+        def query(self, query_vector: np.ndarray, num_probes: Optional[int] = None) -> set[str]:
             if self.dim is None:
                 return set()
+            probes = self.num_probes if num_probes is None else num_probes
+            projection = self._project(query_vector)[0]
+            codes = self._codes(projection[None, :, :])[0]
+
             candidates = set()
-            for table in self.tables:
-                hash_val = self._hash(table["planes"], query_vector)
-                candidates.update(table["buckets"][hash_val])
+            if probes > 0:
+                # Flip the least confident bits first (query-directed multi-probe)
+                flip_order = np.argsort(np.abs(projection), axis=1)[:, :probes]
+                flip_masks = self._weights[flip_order]
+            for t, table in enumerate(self.tables):
+                bucket = table.get(int(codes[t]))
+                if bucket:
+                    candidates.update(bucket)
+                if probes > 0:
+                    for mask in flip_masks[t].tolist():
+                        bucket = table.get(int(codes[t]) ^ mask)
+                        if bucket:
+                            candidates.update(bucket)
             return candidates
 
         def clear(self) -> None:
             self.dim = None
+            self.planes = None
             self.tables = []
 
+    # Keyword matches can lift a similarity score by at most this much (see _hybrid_score).
+    MAX_KEYWORD_BOOST = 0.20
+
     class SimpleVectorStore(VectorStoreBackend):
         """
-        Persistent vector store using SQLite + Scikit-Learn cosine similarity.
+        Persistent vector store using SQLite + a contiguous float32 NumPy matrix.
         Embeddings are generated through core_ai.
         Implements the VectorStoreBackend interface for future pluggable backends.
+
+        Rows are unit-normalized on insert so cosine similarity is a single
+        matrix-vector product. Deletes only tombstone a row; the matrix is
+        compacted once dead rows pass ``COMPACT_MIN_DEAD`` and ``COMPACT_RATIO``.
+        Metadata filters resolve through a row-keyed ``MetadataIndex``, rebuilt
+        from the SQLite rows on load.
+        With ``VECTOR_STORE_MMAP=1`` the matrix is memory-mapped from a ``.npy``
+        sidecar written by ``save()``.
         """
 
+        COMPACT_MIN_DEAD = 64
+        COMPACT_RATIO = 0.25
+        _INITIAL_CAPACITY = 64
+
         def __init__(self):
-            self.documents: List[str] = []
-            self.metadatas: List[Dict[str, Any]] = []
-            self.vectors: List[List[float]] = []
-            self.ids: List[str] = []
+            self._matrix: Optional[np.ndarray] = None
+            self._size = 0
+            self._live = np.zeros(0, dtype=bool)
+            self._dead = 0
+            self._ids: List[Optional[str]] = []
+            self._documents: List[Optional[str]] = []
+            self._metadatas: List[Optional[Dict[str, Any]]] = []
             self.id_to_idx: Dict[str, int] = {}
             self.lsh = LocalitySensitiveHash()
+            self.metadata_index = MetadataIndex()
             self._lock = threading.RLock()
             is_testing = "pytest" in sys.modules or "unittest" in sys.modules or os.environ.get("PYTEST_CURRENT_TEST") is not None
             if is_testing:
@@ -335,6 +397,8 @@ if _pkg_rag is None:
                     self.db_path = os.path.join(os.path.dirname(DB_FILE), f"vector_store_test_temp_{uuid.uuid4().hex}.db")
             else:
                 self.db_path = os.path.splitext(DB_FILE)[0] + ".db"
+            self.sidecar_path = os.path.splitext(self.db_path)[0] + ".vectors.npy"
+            self.use_mmap = os.environ.get("VECTOR_STORE_MMAP", "").strip().lower() in {"1", "true", "yes", "on"}
 
             import sqlite3
             with self._lock:
@@ -352,11 +416,175 @@ if _pkg_rag is None:
 
         def __del__(self) -> None:
             if hasattr(self, "db_path") and "vector_store_test_temp_" in self.db_path:
-                try:
-                    if os.path.exists(self.db_path):
-                        os.remove(self.db_path)
-                except OSError:
-                    pass
+                for path in (self.db_path, self.sidecar_path, self.sidecar_path + ".ids.json"):
+                    try:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    except OSError:
+                        pass
+
+        # ── Matrix storage ──
+
+        @staticmethod
+        def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+            matrix = np.asarray(matrix, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            return matrix / norms
+
+        @staticmethod
+        def _encode_vector(vector: Any) -> bytes:
+            """Raw float32 bytes stored in SQLite, so load never parses JSON vectors."""
+            return np.asarray(vector, dtype=np.float32).tobytes()
+
+        @staticmethod
+        def _decode_vector(value: Any) -> np.ndarray:
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                return np.frombuffer(value, dtype=np.float32)
+            # Legacy rows stored the vector as a JSON list
+            return np.asarray(json.loads(value), dtype=np.float32)
+
+        def _reset(self, matrix: Optional[np.ndarray] = None) -> None:
+            """Replace the matrix with ``matrix`` (already normalized) and clear tombstones."""
+            if matrix is None or len(matrix) == 0:
+                self._matrix = None
+                self._size = 0
+            else:
+                self._matrix = matrix
+                self._size = len(matrix)
+            self._live = np.ones(self._size, dtype=bool)
+            self._dead = 0
+
+        def _append_row(self, unit_vector: np.ndarray) -> int:
+            if self._matrix is None:
+                self._matrix = np.empty((self._INITIAL_CAPACITY, len(unit_vector)), dtype=np.float32)
+                self._live = np.zeros(self._INITIAL_CAPACITY, dtype=bool)
+            elif unit_vector.shape[0] != self._matrix.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {unit_vector.shape[0]} does not match store dimension {self._matrix.shape[1]}"
+                )
+            if self._size == len(self._matrix) or not self._matrix.flags.writeable:
+                # Amortized doubling; also detaches a read-only memory-mapped matrix.
+                capacity = max(self._INITIAL_CAPACITY, len(self._matrix) * 2 if self._size == len(self._matrix) else len(self._matrix))
+                grown = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                live = np.zeros(capacity, dtype=bool)
+                live[:self._size] = self._live[:self._size]
+                self._matrix, self._live = grown, live
+            row = self._size
+            self._matrix[row] = unit_vector
+            self._live[row] = True
+            self._size += 1
+            return row
+
+        def _maybe_compact(self) -> None:
+            if self._dead >= max(self.COMPACT_MIN_DEAD, self.COMPACT_RATIO * self._size):
+                self._compact()
+
+        def _compact(self) -> None:
+            """Drop tombstoned rows, re-pack the matrix and rebuild the LSH index."""
+            if self._dead == 0:
+                return
+            rows = np.flatnonzero(self._live[:self._size])
+            self._ids = [self._ids[i] for i in rows]
+            self._documents = [self._documents[i] for i in rows]
+            self._metadatas = [self._metadatas[i] for i in rows]
+            self._reset(np.array(self._matrix[rows], dtype=np.float32) if len(rows) else None)
+            self.id_to_idx = {rid: i for i, rid in enumerate(self._ids)}
+            self._reindex_lsh()
+            self._reindex_metadata()
+
+        def _reindex_metadata(self) -> None:
+            # Tombstoned rows have their metadata cleared, so only live rows are indexed
+            self.metadata_index.rebuild(
+                (row, metadata) for row, metadata in enumerate(self._metadatas) if metadata is not None
+            )
+
+        def _reindex_lsh(self) -> None:
+            self.lsh.clear()
+            rows = np.flatnonzero(self._live[:self._size])
+            if rows.size:
+                self.lsh.index_many([self._ids[i] for i in rows], self._matrix[rows])
+
+        # ── Row-aligned views (tombstones excluded) ──
+
+        def _live_view(self, values: list) -> list:
+            if self._dead == 0:
+                return values
+            return [v for v, alive in zip(values, self._live[:self._size]) if alive]
+
+        @property
+        def ids(self) -> List[str]:
+            return self._live_view(self._ids)
+
+        @ids.setter
+        def ids(self, values: List[str]) -> None:
+            self._compact()
+            self._ids = list(values)
+            self.id_to_idx = {rid: i for i, rid in enumerate(self._ids)}
+
+        @property
+        def documents(self) -> List[str]:
+            return self._live_view(self._documents)
+
+        @documents.setter
+        def documents(self, values: List[str]) -> None:
+            self._compact()
+            self._documents = list(values)
+
+        @property
+        def metadatas(self) -> List[Dict[str, Any]]:
+            return self._live_view(self._metadatas)
+
+        @metadatas.setter
+        def metadatas(self, values: List[Dict[str, Any]]) -> None:
+            self._compact()
+            self._metadatas = list(values)
+            self._reindex_metadata()
+
+        @property
+        def vectors(self) -> np.ndarray:
+            """Live rows of the unit-normalized float32 matrix, shape (count, dim)."""
+            if self._matrix is None:
+                return np.zeros((0, 0), dtype=np.float32)
+            return self._matrix[:self._size][self._live[:self._size]]
+
+        @vectors.setter
+        def vectors(self, values: Any) -> None:
+            self._compact()
+            matrix = np.asarray(values, dtype=np.float32)
+            self._reset(self._normalize_rows(matrix) if matrix.size else None)
+
+        # ── Persistence ──
+
+        def _load_sidecar(self, ids: List[str]) -> Optional[np.ndarray]:
+            """Memory-map the ``.npy`` sidecar if it was written for exactly these ids."""
+            ids_path = self.sidecar_path + ".ids.json"
+            if not (os.path.exists(self.sidecar_path) and os.path.exists(ids_path)):
+                return None
+            try:
+                with open(ids_path, "r", encoding="utf-8") as f:
+                    if json.load(f) != ids:
+                        return None
+                matrix = np.load(self.sidecar_path, mmap_mode="r")
+                return matrix if matrix.shape[0] == len(ids) else None
+            except Exception as e:
+                logger.warning("Ignoring vector sidecar: %s", e)
+                return None
+
+        def _invalidate_sidecar(self) -> None:
+            """Drop the sidecar's id manifest so a later mmap load falls back to SQLite.
+
+            The manifest only records ids, so an in-place overwrite of an existing
+            record would otherwise leave a sidecar that still "matches". The ``.npy``
+            itself is kept (it may be mapped right now) and rewritten by ``save()``.
+            """
+            ids_path = self.sidecar_path + ".ids.json"
+            try:
+                if os.path.exists(ids_path):
+                    os.remove(ids_path)
+            except OSError as e:
+                logger.warning("Failed to invalidate vector sidecar: %s", e)
 
         def load(self) -> None:
             """Load from SQLite database (with automatic legacy JSON migration)."""
@@ -376,7 +604,7 @@ if _pkg_rag is None:
                             for rid, doc, meta, vec in zip(rids, docs, metas, vecs):
                                 conn.execute(
                                     "INSERT OR REPLACE INTO vectors (id, document, metadata, vector) VALUES (?, ?, ?, ?)",
-                                    (rid, doc, json.dumps(meta, ensure_ascii=False), json.dumps(vec))
+                                    (rid, doc, json.dumps(meta, ensure_ascii=False), self._encode_vector(vec))
                                 )
                         logger.info(f"Successfully migrated {len(rids)} records from legacy JSON to SQLite.")
                         try:
@@ -409,7 +637,7 @@ if _pkg_rag is None:
                             for rid, doc, meta, vec in zip(rids, docs, metas, vecs):
                                 conn.execute(
                                     "INSERT OR REPLACE INTO vectors (id, document, metadata, vector) VALUES (?, ?, ?, ?)",
-                                    (rid, doc, json.dumps(meta, ensure_ascii=False), json.dumps(vec))
+                                    (rid, doc, json.dumps(meta, ensure_ascii=False), self._encode_vector(vec))
                                 )
                         logger.warning("Migrated legacy pickle vector store to SQLite.")
                         try:
@@ -419,74 +647,99 @@ if _pkg_rag is None:
                     except Exception:
                         logger.error("Failed to migrate legacy pickle vector store")
 
-                # Load all from SQLite into memory for fast cosine similarity scanning
+                # Load all from SQLite into the in-memory matrix for fast similarity scanning
                 try:
                     with sqlite3.connect(self.db_path) as conn:
                         cursor = conn.cursor()
-                        cursor.execute("SELECT id, document, metadata, vector FROM vectors")
-                        rows = cursor.fetchall()
-
-                    self.documents = []
-                    self.metadatas = []
-                    self.vectors = []
-                    self.ids = []
-
-                    for rid, doc, meta_str, vec_str in rows:
-                        self.ids.append(rid)
-                        self.documents.append(doc)
-                        self.metadatas.append(json.loads(meta_str))
-                        self.vectors.append(json.loads(vec_str))
-
-                    self.id_to_idx = {rid: i for i, rid in enumerate(self.ids)}
-
-                    # Re-index LSH
-                    self.lsh.clear()
-                    for record_id, vec in zip(self.ids, self.vectors):
-                        self.lsh.index(record_id, np.array(vec))
-
-                    logger.info(f"Loaded Vector Store from SQLite: {len(self.ids)} records and indexed LSH.")
+                        if self.use_mmap:
+                            cursor.execute("SELECT id, document, metadata FROM vectors ORDER BY rowid")
+                            rows = cursor.fetchall()
+                            matrix = self._load_sidecar([r[0] for r in rows])
+                            if matrix is None:
+                                cursor.execute("SELECT id, document, metadata, vector FROM vectors ORDER BY rowid")
+                                rows = cursor.fetchall()
+                        else:
+                            cursor.execute("SELECT id, document, metadata, vector FROM vectors ORDER BY rowid")
+                            rows = cursor.fetchall()
+                            matrix = None
+
+                    self._ids = [r[0] for r in rows]
+                    self._documents = [r[1] for r in rows]
+                    self._metadatas = [json.loads(r[2]) for r in rows]
+                    if matrix is None and rows:
+                        matrix = self._normalize_rows(np.vstack([self._decode_vector(r[3]) for r in rows]))
+                    self._reset(matrix)
+                    self.id_to_idx = {rid: i for i, rid in enumerate(self._ids)}
+
+                    # Re-index LSH and the metadata filter index
+                    self._reindex_lsh()
+                    self._reindex_metadata()
+
+                    logger.info(f"Loaded Vector Store from SQLite: {len(self._ids)} records and indexed LSH.")
                 except Exception as e:
                     logger.error("Failed to load vector store from SQLite: %s", e)
 
         def save(self) -> None:
-            """No-op (SQLite performs transaction-level updates immediately on add/delete)."""
-            pass
+            """
+            SQLite is updated transactionally on add/delete; with ``VECTOR_STORE_MMAP``
+            enabled this compacts and writes the ``.npy`` sidecar for memory-mapped loads.
+            """
+            if not self.use_mmap:
+                return
+            with self._lock:
+                try:
+                    self._compact()
+                    matrix = self.vectors
+                    with open(self.sidecar_path, "wb") as f:
+                        np.save(f, matrix)
+                    with open(self.sidecar_path + ".ids.json", "w", encoding="utf-8") as f:
+                        json.dump(self._ids, f)
+                except Exception as e:
+                    logger.error("Failed to write vector sidecar: %s", e)
 
         def add(self, text: str, metadata: Dict[str, Any], record_id: str) -> None:
             """Add or update a document."""
-            vector = get_embedding(text)
+            vector = np.asarray(get_embedding(text), dtype=np.float32)
+            unit_vector = self._normalize_rows(vector[None, :])[0]
             import sqlite3
 
             with self._lock:
+                if self._matrix is not None and unit_vector.shape[0] != self._matrix.shape[1]:
+                    raise ValueError(
+                        f"Embedding dimension {unit_vector.shape[0]} does not match store dimension {self._matrix.shape[1]}"
+                    )
                 metadata_str = json.dumps(metadata, ensure_ascii=False)
-                vector_str = json.dumps(vector)
                 try:
                     with sqlite3.connect(self.db_path) as conn:
                         conn.execute(
                             "INSERT OR REPLACE INTO vectors (id, document, metadata, vector) VALUES (?, ?, ?, ?)",
-                            (record_id, text, metadata_str, vector_str)
+                            (record_id, text, metadata_str, self._encode_vector(vector))
                         )
                 except Exception as e:
                     logger.error("Failed to insert record into SQLite: %s", e)
+                self._invalidate_sidecar()
 
                 if record_id in self.id_to_idx:
                     idx = self.id_to_idx[record_id]
-                    self.documents[idx] = text
-                    self.metadatas[idx] = metadata
-                    self.vectors[idx] = vector
+                    if not self._matrix.flags.writeable:
+                        self._matrix = np.array(self._matrix)
+                    self._matrix[idx] = unit_vector
+                    self._documents[idx] = text
+                    self.metadata_index.remove(idx, self._metadatas[idx])
+                    self._metadatas[idx] = metadata
                 else:
-                    idx = len(self.ids)
-                    self.documents.append(text)
-                    self.metadatas.append(metadata)
-                    self.vectors.append(vector)
-                    self.ids.append(record_id)
+                    idx = self._append_row(unit_vector)
+                    self._documents.append(text)
+                    self._metadatas.append(metadata)
+                    self._ids.append(record_id)
                     self.id_to_idx[record_id] = idx
+                self.metadata_index.add(idx, metadata)
 
                 # Index in LSH
-                self.lsh.index(record_id, np.array(vector))
+                self.lsh.index(record_id, unit_vector)
 
         def delete(self, record_id: str) -> bool:
-            """Delete by ID."""
+            """Delete by ID (tombstones the row; compaction is amortized)."""
             import sqlite3
             with self._lock:
                 try:
@@ -498,20 +751,17 @@ if _pkg_rag is None:
                     logger.error("Failed to delete record from SQLite: %s", e)
                     deleted = False
 
+                if deleted:
+                    self._invalidate_sidecar()
                 if deleted and record_id in self.id_to_idx:
-                    idx = self.id_to_idx[record_id]
-                    self.documents.pop(idx)
-                    self.metadatas.pop(idx)
-                    self.vectors.pop(idx)
-                    self.ids.pop(idx)
-
-                    # Rebuild index map because indices shifted
-                    self.id_to_idx = {rid: i for i, rid in enumerate(self.ids)}
-
-                    # Re-index LSH
-                    self.lsh.clear()
-                    for rid, vec in zip(self.ids, self.vectors):
-                        self.lsh.index(rid, np.array(vec))
+                    idx = self.id_to_idx.pop(record_id)
+                    self._live[idx] = False
+                    self._dead += 1
+                    self._documents[idx] = None
+                    self.metadata_index.remove(idx, self._metadatas[idx])
+                    self._metadatas[idx] = None
+                    # Stale LSH bucket entries are filtered through id_to_idx until compaction
+                    self._maybe_compact()
                     return True
                 return False
 
@@ -554,76 +804,76 @@ if _pkg_rag is None:
                     matches += 1
 
             # Boost score by 0.05 per keyword match, up to a maximum boost of 0.20
-            boost = min(0.05 * matches, 0.20)
+            boost = min(0.05 * matches, MAX_KEYWORD_BOOST)
             return similarity_score + boost
 
-        def search(self, query: str, filter_meta: Optional[Dict[str, Any]] = None, k: int = 3) -> List[str]:
-            """Semantic search with user filtering and hybrid keyword boosting."""
-            with self._lock:
-                if not self.vectors:
-                    return []
-
-                if len(self.ids) != len(self.vectors):
-                    self.ids = [f"auto_id_{i}" for i in range(len(self.vectors))]
-                    self.id_to_idx = {rid: i for i, rid in enumerate(self.ids)}
-                    self.lsh.clear()
-                    for record_id, vec in zip(self.ids, self.vectors):
-                        self.lsh.index(record_id, np.array(vec))
-
-                query_vector = get_query_embedding(query)
-                q_vec = np.array([query_vector])
-
-                # Hashing and Candidate Pruning (LSH ANN search)
-                use_lsh = len(self.ids) > 10
-                candidates = set()
-                if use_lsh:
-                    candidates = self.lsh.query(np.array(query_vector))
-
-                id_to_idx = self.id_to_idx
-                if use_lsh and candidates:
-                    indices_to_scan = [id_to_idx[cid] for cid in candidates if cid in id_to_idx]
-                else:
-                    indices_to_scan = list(range(len(self.ids)))
-
-                if not indices_to_scan:
-                    return []
-
-                candidate_vectors = [self.vectors[idx] for idx in indices_to_scan]
-                vec_matrix = np.array(candidate_vectors)
+        def _rank(self, query: str, filter_meta: Optional[Dict[str, Any]], k: int) -> List[tuple]:
+            """
+            Return up to ``k`` ``(row, hybrid_score)`` pairs, best first.
 
-                # Cosine similarity on subset
-                sim_scores = cosine_similarity(q_vec, vec_matrix)[0]
+            Similarity is one matrix-vector product over the candidate rows; the
+            keyword boost is only computed for rows that can still reach the top
+            ``k`` (similarity within ``MAX_KEYWORD_BOOST`` of the k-th hybrid score).
+            """
+            if self._size == 0 or self._matrix is None:
+                return []
 
-                # Apply hybrid keyword boost
-                hybrid_scores = []
-                for idx, score in enumerate(sim_scores):
-                    orig_idx = indices_to_scan[idx]
-                    h_score = self._hybrid_score(query, self.documents[orig_idx], score)
-                    hybrid_scores.append(h_score)
-                hybrid_scores = np.array(hybrid_scores)
+            if len(self._ids) != self._size:
+                self._ids = [f"auto_id_{i}" for i in range(self._size)]
+                self.id_to_idx = {rid: i for i, rid in enumerate(self._ids)}
+                self._reindex_lsh()
 
-                sorted_indices = hybrid_scores.argsort()[::-1]
+            q = self._normalize_rows(np.asarray(get_query_embedding(query), dtype=np.float32)[None, :])[0]
 
-                results = []
-                count = 0
+            # Hashing and Candidate Pruning (LSH ANN search)
+            use_lsh = (self._size - self._dead) > 10
+            candidates = self.lsh.query(q) if use_lsh else set()
 
-                for idx in sorted_indices:
-                    original_idx = indices_to_scan[idx]
-                    if hybrid_scores[idx] <= 0.0:
-                        break
-
-                    # Apply metadata filter
-                    match = True
-                    if filter_meta and not _metadata_matches_filter(self.metadatas[original_idx], filter_meta):
-                        match = False
-
-                    if match:
-                        results.append(self.documents[original_idx])
-                        count += 1
-                        if count >= k:
-                            break
+            id_to_idx = self.id_to_idx
+            if use_lsh and candidates:
+                rows = np.fromiter((id_to_idx[cid] for cid in candidates if cid in id_to_idx), dtype=np.int64)
+            else:
+                rows = np.flatnonzero(self._live[:self._size])
+
+            if filter_meta and rows.size:
+                allowed, residual = self.metadata_index.lookup(filter_meta)
+                if allowed is not None:
+                    allowed = allowed.astype(np.int64)
+                    if use_lsh and candidates:
+                        rows = np.intersect1d(rows, allowed, assume_unique=True)
+                    else:
+                        rows = allowed[allowed < self._size]
+                if residual and rows.size:
+                    metadatas = self._metadatas
+                    rows = rows[[_metadata_matches_filter(metadatas[r], residual) for r in rows]]
+            if not rows.size:
+                return []
+
+            sims = self._matrix[rows] @ q
+
+            # Pre-select by raw similarity, then widen by the maximum possible keyword boost
+            pool = min(rows.size, max(4 * k, 32))
+            top = np.argpartition(-sims, pool - 1)[:pool] if pool < rows.size else np.arange(rows.size)
+            documents = self._documents
+            scored = {int(i): self._hybrid_score(query, documents[rows[i]], float(sims[i])) for i in top}
+            if pool < rows.size and len(scored) >= k:
+                kth = sorted(scored.values(), reverse=True)[k - 1]
+                for i in np.flatnonzero(sims > kth - MAX_KEYWORD_BOOST):
+                    if int(i) not in scored:
+                        scored[int(i)] = self._hybrid_score(query, documents[rows[i]], float(sims[i]))
+
+            ranked = sorted(scored.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for i, score in ranked:
+                if score <= 0.0 or len(results) >= k:
+                    break
+                results.append((int(rows[i]), score))
+            return results
 
-                return results
+        def search(self, query: str, filter_meta: Optional[Dict[str, Any]] = None, k: int = 3) -> List[str]:
+            """Semantic search with user filtering and hybrid keyword boosting."""
+            with self._lock:
+                return [self._documents[row] for row, _ in self._rank(query, filter_meta, k)]
 
         def search_with_scores(
             self,
@@ -633,76 +883,21 @@ if _pkg_rag is None:
         ) -> List[Dict[str, Any]]:
             """Semantic search returning documents with hybrid similarity scores and metadata."""
             with self._lock:
-                if not self.vectors:
-                    return []
-
-                if len(self.ids) != len(self.vectors):
-                    self.ids = [f"auto_id_{i}" for i in range(len(self.vectors))]
-                    self.id_to_idx = {rid: i for i, rid in enumerate(self.ids)}
-                    self.lsh.clear()
-                    for record_id, vec in zip(self.ids, self.vectors):
-                        self.lsh.index(record_id, np.array(vec))
-
-                query_vector = get_query_embedding(query)
-                q_vec = np.array([query_vector])
-
-                # Hashing and Candidate Pruning (LSH ANN search)
-                use_lsh = len(self.ids) > 10
-                candidates = set()
-                if use_lsh:
-                    candidates = self.lsh.query(np.array(query_vector))
-
-                id_to_idx = self.id_to_idx
-                if use_lsh and candidates:
-                    indices_to_scan = [id_to_idx[cid] for cid in candidates if cid in id_to_idx]
-                else:
-                    indices_to_scan = list(range(len(self.ids)))
-
-                if not indices_to_scan:
-                    return []
-
-                candidate_vectors = [self.vectors[idx] for idx in indices_to_scan]
-                vec_matrix = np.array(candidate_vectors)
-
-                sim_scores = cosine_similarity(q_vec, vec_matrix)[0]
-
-                # Apply hybrid keyword boost
-                hybrid_scores = []
-                for idx, score in enumerate(sim_scores):
-                    orig_idx = indices_to_scan[idx]
-                    h_score = self._hybrid_score(query, self.documents[orig_idx], score)
-                    hybrid_scores.append(h_score)
-                hybrid_scores = np.array(hybrid_scores)
-
-                sorted_indices = hybrid_scores.argsort()[::-1]
-
-                results = []
-                count = 0
-
-                for idx in sorted_indices:
-                    original_idx = indices_to_scan[idx]
-                    if hybrid_scores[idx] <= 0.0:
-                        break
-                    if filter_meta and not _metadata_matches_filter(self.metadatas[original_idx], filter_meta):
-                        continue
-                    results.append(
-                        {
-                            "text": self.documents[original_idx],
-                            "metadata": self.metadatas[original_idx],
-                            "id": self.ids[original_idx],
-                            "score": float(hybrid_scores[idx]),
-                        }
-                    )
-                    count += 1
-                    if count >= k:
-                        break
-
-                return results
+                return [
+                    {
+                        "text": self._documents[row],
+                        "metadata": self._metadatas[row],
+                        "id": self._ids[row],
+                        "score": float(score),
+                    }
+                    for row, score in self._rank(query, filter_meta, k)
+                ]
 
         def count(self) -> int:
             """Return the total number of documents in the store."""
             with self._lock:
-                 return len(self.ids)
+                return self._size - self._dead
+
 
     class RustGatewayVectorStore(VectorStoreBackend):
         """
@@ -3,17 +3,31 @@ Multi-Tier L1/L2 Vector HNSW Cache Mesh
 ========================================
 Combines microsecond L1 memory dictionary caching with L2 HNSW vector similarity
 indexing for 99.9% query resolution speed and zero redundant LLM API costs.
+
+L1 is an exact-match LRU keyed by query text. L2 is a :class:`HnswIndex`
+ring buffer of ``l2_capacity`` embeddings (oldest answers are overwritten once
+full), so lookups stay sub-linear as the tier grows to millions of entries.
 """
 
 import logging
+import os
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional
 
 import numpy as np
 
+from .hnsw_index import HnswIndex
+
 logger = logging.getLogger(__name__)
 
+HNSW_CACHE_CAPACITY = int(os.getenv("HNSW_CACHE_CAPACITY", "100000"))
+HNSW_CACHE_M = int(os.getenv("HNSW_CACHE_M", "16"))
+HNSW_CACHE_EF_CONSTRUCTION = int(os.getenv("HNSW_CACHE_EF_CONSTRUCTION", "100"))
+HNSW_CACHE_EF_SEARCH = int(os.getenv("HNSW_CACHE_EF_SEARCH", "32"))
+
 
 @dataclass
 class HnswCacheLookupResult:
@@ -27,11 +41,28 @@ class HnswCacheLookupResult:
 class MultiTierHnswCacheMesh:
     """Multi-Tier L1/L2 HNSW Vector Similarity Cache Mesh."""
 
-    def __init__(self, l1_capacity: int = 1000, similarity_threshold: float = 0.94):
-        self.l1_cache: Dict[str, str] = {}
-        self.l2_vectors: List[Tuple[np.ndarray, str]] = []
+    def __init__(
+        self,
+        l1_capacity: int = 1000,
+        similarity_threshold: float = 0.94,
+        l2_capacity: int = HNSW_CACHE_CAPACITY,
+        M: int = HNSW_CACHE_M,
+        ef_construction: int = HNSW_CACHE_EF_CONSTRUCTION,
+        ef_search: int = HNSW_CACHE_EF_SEARCH,
+    ):
+        self.l1_cache: "OrderedDict[str, str]" = OrderedDict()
         self.similarity_threshold = similarity_threshold
         self.l1_capacity = l1_capacity
+        self.l2_capacity = l2_capacity
+        self._hnsw_params = {"M": M, "ef_construction": ef_construction, "ef_search": ef_search}
+        # Created on first insert, once the embedding dimension is known
+        self.l2_index: Optional[HnswIndex] = None
+        self._l2_responses: List[Optional[str]] = []  # slot -> response
+        self._lock = threading.Lock()
+
+    @property
+    def l2_size(self) -> int:
+        return len(self.l2_index) if self.l2_index is not None else 0
 
     def lookup_cache_mesh(
         self,
@@ -42,48 +73,40 @@ class MultiTierHnswCacheMesh:
         start_time = time.perf_counter()
 
         # 1. Tier 1: Microsecond exact string hash match
-        if query_text in self.l1_cache:
-            latency = (time.perf_counter() - start_time) * 1000.0 + 0.12
+        with self._lock:
+            l1_response = self.l1_cache.get(query_text)
+            if l1_response is not None:
+                self.l1_cache.move_to_end(query_text)
+        if l1_response is not None:
             return HnswCacheLookupResult(
                 hit=True,
                 tier_level="L1_Microsecond_Memory",
-                cached_response=self.l1_cache[query_text],
+                cached_response=l1_response,
                 similarity_score=1.0,
-                resolution_latency_ms=round(latency, 3)
+                resolution_latency_ms=round((time.perf_counter() - start_time) * 1000.0, 3)
             )
 
         # 2. Tier 2: Vector HNSW cosine graph search
-        if query_embedding and self.l2_vectors:
-            q_arr = np.array(query_embedding, dtype=np.float32)
-            q_norm = np.linalg.norm(q_arr)
-            if q_norm > 0:
-                best_score = -1.0
-                best_resp = None
-                for v_arr, resp in self.l2_vectors:
-                    v_norm = np.linalg.norm(v_arr)
-                    if v_norm > 0:
-                        score = float(np.dot(q_arr, v_arr) / (q_norm * v_norm))
-                        if score > best_score:
-                            best_score = score
-                            best_resp = resp
-
-                if best_score >= self.similarity_threshold and best_resp:
-                    latency = (time.perf_counter() - start_time) * 1000.0 + 1.2
+        index = self.l2_index
+        if query_embedding is not None and len(query_embedding) > 0 and index is not None:
+            slots, scores = index.search(query_embedding, k=1)
+            if len(slots) and float(scores[0]) >= self.similarity_threshold:
+                best_resp = self._l2_responses[int(slots[0])]
+                if best_resp:
                     return HnswCacheLookupResult(
                         hit=True,
                         tier_level="L2_HNSW_Vector_Graph",
                         cached_response=best_resp,
-                        similarity_score=round(best_score, 4),
-                        resolution_latency_ms=round(latency, 3)
+                        similarity_score=round(float(scores[0]), 4),
+                        resolution_latency_ms=round((time.perf_counter() - start_time) * 1000.0, 3)
                     )
 
-        latency = (time.perf_counter() - start_time) * 1000.0 + 0.4
         return HnswCacheLookupResult(
             hit=False,
             tier_level="MISS",
             cached_response=None,
             similarity_score=0.0,
-            resolution_latency_ms=round(latency, 3)
+            resolution_latency_ms=round((time.perf_counter() - start_time) * 1000.0, 3)
         )
 
     def insert_cache_mesh(
@@ -93,16 +116,41 @@ class MultiTierHnswCacheMesh:
         response: str
     ) -> None:
         """Inserts item into L1 and L2 multi-tier cache mesh."""
-        self.l1_cache[query_text] = response
-        if len(self.l1_cache) > self.l1_capacity:
-            # Evict oldest key
-            first_key = next(iter(self.l1_cache))
-            del self.l1_cache[first_key]
-
-        if query_embedding:
-            self.l2_vectors.append((np.array(query_embedding, dtype=np.float32), response))
-            if len(self.l2_vectors) > 2000:
-                self.l2_vectors.pop(0)
+        with self._lock:
+            self.l1_cache[query_text] = response
+            self.l1_cache.move_to_end(query_text)
+            if len(self.l1_cache) > self.l1_capacity:
+                # Evict least recently used key
+                self.l1_cache.popitem(last=False)
+
+            if query_embedding is None or len(query_embedding) == 0:
+                return
+            vector = np.asarray(query_embedding, dtype=np.float32)
+            if self.l2_index is None or self.l2_index.dim != vector.shape[0]:
+                # Embedding model changed: answers indexed under the old space are unreachable
+                self.l2_index = HnswIndex(vector.shape[0], self.l2_capacity, **self._hnsw_params)
+                self._l2_responses = []
+            try:
+                slot, _ = self.l2_index.add(vector)
+            except ValueError as e:
+                logger.debug("Skipping L2 insert: %s", e)
+                return
+            if slot == len(self._l2_responses):
+                self._l2_responses.append(response)
+            else:
+                self._l2_responses[slot] = response
+
+    def invalidate_cache_mesh(self, query_text: str, query_embedding: Optional[List[float]] = None) -> bool:
+        """Drop a cached answer from L1 and soft-delete its nearest L2 entry above the threshold."""
+        with self._lock:
+            removed = self.l1_cache.pop(query_text, None) is not None
+            index = self.l2_index
+            if query_embedding is not None and len(query_embedding) > 0 and index is not None:
+                slots, scores = index.search(query_embedding, k=1)
+                if len(slots) and float(scores[0]) >= self.similarity_threshold:
+                    removed = index.mark_deleted(int(slots[0])) or removed
+                    self._l2_responses[int(slots[0])] = None
+            return removed
 
 
 # Global singleton instance
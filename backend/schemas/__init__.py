@@ -129,6 +129,7 @@ from .pharmacy import (  # noqa: F401
 
 # Prediction domain
 from .prediction import (  # noqa: F401
+    BatchPredictionRequest,
     DiabetesInput,
     HeartInput,
     KidneyInput,
@@ -1,5 +1,5 @@
 """Prediction domain schemas: prediction review and ML model inputs."""
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -204,3 +204,17 @@ class StrokeInput(BaseModel):
     smoking: Optional[int] = Field(None, description="0: No, 1: Yes")
     bmi: Optional[float] = Field(None, description="Body Mass Index")
     glucose: Optional[float] = Field(None, description="Average blood glucose level")
+
+
+MAX_BATCH_PREDICTION_ROWS = 10000
+
+
+class BatchPredictionRequest(BaseModel):
+    """Schema for cohort scoring: one record per patient, validated against the model's input schema."""
+    records: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_PREDICTION_ROWS,
+        description="Per-patient feature payloads using the single-prediction field names",
+    )
+    include_conformal: bool = Field(True, description="Attach per-row conformal sets and triage guidance")
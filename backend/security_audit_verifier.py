@@ -6,14 +6,16 @@ and non-repudiation for HIPAA regulatory compliance.
 """
 
 import hashlib
-from typing import Dict, List
+from typing import Dict, List, Union
 
 
 class AuditHashChainVerifier:
     """Computes SHA-256 hash chains for tamper-evident audit logs."""
 
-    def compute_record_hash(self, log_id: int, action: str, details: str, previous_hash: str = "0" * 64) -> str:
-        payload = f"{log_id}:{action}:{details}:{previous_hash}"
+    def compute_record_hash(
+        self, record_key: Union[int, str], action: str, details: str, previous_hash: str = "0" * 64
+    ) -> str:
+        payload = f"{record_key}:{action}:{details}:{previous_hash}"
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
     def verify_hash_chain(self, logs: List[Dict[str, any]]) -> Dict[str, any]:
@@ -22,7 +24,7 @@ class AuditHashChainVerifier:
 
         for log in logs:
             expected = self.compute_record_hash(
-                log_id=log["id"],
+                record_key=log["id"],
                 action=log["action"],
                 details=log["details"],
                 previous_hash=prev_hash,
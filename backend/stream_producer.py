@@ -0,0 +1,632 @@
+"""
+Buffered Stream Producer
+========================
+Kafka-style batching producer for high-rate clinical telemetry (ICU vitals,
+device feeds) and the brokers it writes to.
+
+``BufferedStreamProducer.send`` never touches the network or disk: it appends
+the serialized record to an open batch for its ``(topic, partition)`` and
+returns. A single sender thread seals batches once they reach
+``batch_size_bytes`` or have lingered ``linger_ms``, compresses them, appends
+them to the broker and fires per-record delivery callbacks. Records with the
+same key (``patient_id``) always map to the same partition and batches are
+written in order, so per-patient ordering is preserved. Buffered records and
+sealed-but-unwritten batches are both bounded; ``send`` blocks up to
+``max_block_ms`` when either limit is hit and then raises
+:class:`ProducerBufferFull`.
+
+Brokers:
+
+* :class:`LocalLogBroker` — file-backed append log (one CRC-framed segment
+  file per topic partition) for tests and single-node deployments.
+* :class:`KafkaBroker` — Apache Kafka via ``confluent-kafka`` (optional).
+* :class:`KinesisBroker` — AWS Kinesis via ``boto3`` (optional).
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional codec
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+STREAM_LOG_DIR = os.getenv("STREAM_LOG_DIR", os.path.join("data", "stream_log"))
+STREAM_LOG_PARTITIONS = int(os.getenv("STREAM_LOG_PARTITIONS", "8"))
+STREAM_PRODUCER_LINGER_MS = float(os.getenv("STREAM_PRODUCER_LINGER_MS", "5"))
+STREAM_PRODUCER_BATCH_BYTES = int(os.getenv("STREAM_PRODUCER_BATCH_BYTES", str(256 * 1024)))
+STREAM_PRODUCER_COMPRESSION = os.getenv("STREAM_PRODUCER_COMPRESSION", "zlib")
+STREAM_PRODUCER_MAX_IN_FLIGHT = int(os.getenv("STREAM_PRODUCER_MAX_IN_FLIGHT", "32"))
+STREAM_PRODUCER_BUFFER_RECORDS = int(os.getenv("STREAM_PRODUCER_BUFFER_RECORDS", "500000"))
+STREAM_PRODUCER_MAX_BLOCK_MS = float(os.getenv("STREAM_PRODUCER_MAX_BLOCK_MS", "1000"))
+
+DeliveryCallback = Callable[[Optional[Exception], Optional["RecordMetadata"]], None]
+
+
+class ProducerBufferFull(BufferError):
+    """Raised by ``send`` when the producer stayed full for ``max_block_ms``."""
+
+
+class ProducerClosedError(RuntimeError):
+    """Raised by ``send`` after ``close()``."""
+
+
+@dataclass(frozen=True)
+class RecordMetadata:
+    topic: str
+    partition: int
+    offset: int  # -1 when the broker does not expose offsets (Kinesis)
+
+
+@dataclass(frozen=True)
+class StreamRecord:
+    offset: int
+    key: Optional[bytes]
+    value: bytes
+
+
+# ── Codecs ───────────────────────────────────────────────────────────
+
+_CODECS: Dict[str, Tuple[int, Callable[[bytes], bytes]]] = {
+    "none": (0, bytes),
+    "gzip": (1, lambda data: gzip.compress(data, compresslevel=1, mtime=0)),
+    "zlib": (2, lambda data: zlib.compress(data, 1)),
+}
+_DECOMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {0: bytes, 1: gzip.decompress, 2: zlib.decompress}
+if zstandard is not None:
+    _CODECS["zstd"] = (3, lambda data: zstandard.ZstdCompressor(level=1).compress(data))
+    _DECOMPRESSORS[3] = lambda data: zstandard.ZstdDecompressor().decompress(data)
+
+COMPRESSION_CODECS = tuple(_CODECS)
+
+
+def _resolve_codec(name: str) -> str:
+    if name not in _CODECS:
+        raise ValueError(f"Unsupported compression codec {name!r}; available: {COMPRESSION_CODECS}")
+    return name
+
+
+# ── Local append-log broker ──────────────────────────────────────────
+
+# Batch frame: magic, base offset, record count, codec id, payload length, CRC32(payload)
+_BATCH_HEADER = struct.Struct(">4sQIBII")
+_BATCH_MAGIC = b"HSL1"
+# Record frame inside the (decompressed) payload: key length, value length
+_RECORD_HEADER = struct.Struct(">II")
+_NULL_KEY = 0xFFFFFFFF
+
+
+def _encode_records(keys: Sequence[Optional[bytes]], values: Sequence[bytes]) -> bytes:
+    pack = _RECORD_HEADER.pack
+    parts: List[bytes] = []
+    for key, value in zip(keys, values):
+        if key is None:
+            parts.append(pack(_NULL_KEY, len(value)))
+        else:
+            parts.append(pack(len(key), len(value)))
+            parts.append(key)
+        parts.append(value)
+    return b"".join(parts)
+
+
+def _decode_records(base_offset: int, payload: bytes) -> List[StreamRecord]:
+    records = []
+    pos, offset = 0, base_offset
+    unpack = _RECORD_HEADER.unpack_from
+    while pos < len(payload):
+        key_len, value_len = unpack(payload, pos)
+        pos += _RECORD_HEADER.size
+        key = None
+        if key_len != _NULL_KEY:
+            key = payload[pos:pos + key_len]
+            pos += key_len
+        records.append(StreamRecord(offset, key, payload[pos:pos + value_len]))
+        pos += value_len
+        offset += 1
+    return records
+
+
+class _PartitionLog:
+    """One append-only segment file; torn tails are truncated on open."""
+
+    def __init__(self, path: str, fsync: bool):
+        self.path = path
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.next_offset = 0
+        self.bytes = 0
+        self._file = open(path, "a+b")
+        self._recover()
+
+    def _iter_frames(self, data: bytes):
+        pos = 0
+        while pos + _BATCH_HEADER.size <= len(data):
+            magic, base, count, codec, length, crc = _BATCH_HEADER.unpack_from(data, pos)
+            start = pos + _BATCH_HEADER.size
+            payload = data[start:start + length]
+            if magic != _BATCH_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+                return
+            yield pos, base, count, codec, payload
+            pos = start + length
+
+    def _recover(self) -> None:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        valid_end = 0
+        for pos, base, count, _, payload in self._iter_frames(data):
+            self.next_offset = base + count
+            valid_end = pos + _BATCH_HEADER.size + len(payload)
+        if valid_end < len(data):
+            logger.warning("Truncating %d torn bytes from %s", len(data) - valid_end, self.path)
+            self._file.truncate(valid_end)
+        self.bytes = valid_end
+
+    def append(self, keys: Sequence[Optional[bytes]], values: Sequence[bytes], codec: str) -> int:
+        codec_id, compress = _CODECS[codec]
+        payload = compress(_encode_records(keys, values))
+        with self.lock:
+            base = self.next_offset
+            self._file.write(
+                _BATCH_HEADER.pack(_BATCH_MAGIC, base, len(values), codec_id, len(payload), zlib.crc32(payload))
+            )
+            self._file.write(payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.next_offset = base + len(values)
+            self.bytes += _BATCH_HEADER.size + len(payload)
+        return base
+
+    def read(self, offset: int, max_records: Optional[int]) -> List[StreamRecord]:
+        with self.lock:
+            with open(self.path, "rb") as f:
+                data = f.read(self.bytes)
+        records: List[StreamRecord] = []
+        for _, base, count, codec, payload in self._iter_frames(data):
+            if base + count <= offset:
+                continue
+            for record in _decode_records(base, _DECOMPRESSORS[codec](payload)):
+                if record.offset >= offset:
+                    records.append(record)
+                    if max_records is not None and len(records) >= max_records:
+                        return records
+        return records
+
+    def close(self) -> None:
+        with self.lock:
+            self._file.close()
+
+
+class LocalLogBroker:
+    """
+    File-backed append log with Kafka-like topics, partitions and offsets.
+
+    Each topic is a directory holding ``_meta.json`` (its partition count,
+    fixed at creation so key -> partition mapping never changes) and one
+    ``partition-NNNNN.log`` per partition. Batches are framed with a CRC so a
+    crash mid-write costs at most the torn batch.
+    """
+
+    def __init__(self, root_dir: str = STREAM_LOG_DIR, num_partitions: int = STREAM_LOG_PARTITIONS, fsync: bool = False):
+        self.root_dir = root_dir
+        self.num_partitions = max(1, int(num_partitions))
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._partitions: Dict[str, int] = {}
+        self._logs: Dict[Tuple[str, int], _PartitionLog] = {}
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _topic_dir(self, topic: str) -> str:
+        return os.path.join(self.root_dir, re.sub(r"[^A-Za-z0-9._-]", "_", topic))
+
+    def partitions_for(self, topic: str) -> int:
+        count = self._partitions.get(topic)
+        if count is not None:
+            return count
+        with self._lock:
+            if topic not in self._partitions:
+                topic_dir = self._topic_dir(topic)
+                meta_path = os.path.join(topic_dir, "_meta.json")
+                os.makedirs(topic_dir, exist_ok=True)
+                if os.path.exists(meta_path):
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        count = int(json.load(f)["partitions"])
+                else:
+                    count = self.num_partitions
+                    with open(meta_path, "w", encoding="utf-8") as f:
+                        json.dump({"topic": topic, "partitions": count}, f)
+                self._partitions[topic] = count
+            return self._partitions[topic]
+
+    def _log(self, topic: str, partition: int) -> _PartitionLog:
+        log = self._logs.get((topic, partition))
+        if log is None:
+            if not 0 <= partition < self.partitions_for(topic):
+                raise ValueError(f"Partition {partition} out of range for topic {topic!r}")
+            with self._lock:
+                log = self._logs.get((topic, partition))
+                if log is None:
+                    path = os.path.join(self._topic_dir(topic), f"partition-{partition:05d}.log")
+                    log = self._logs[(topic, partition)] = _PartitionLog(path, self.fsync)
+        return log
+
+    def append(
+        self, topic: str, partition: int, keys: Sequence[Optional[bytes]], values: Sequence[bytes], codec: str = "none"
+    ) -> int:
+        """Append one batch; returns the offset of its first record."""
+        return self._log(topic, partition).append(keys, values, codec)
+
+    def read(self, topic: str, partition: int, offset: int = 0, max_records: Optional[int] = None) -> List[StreamRecord]:
+        """Records of ``topic``/``partition`` from ``offset`` on, in order."""
+        return self._log(topic, partition).read(offset, max_records)
+
+    def end_offset(self, topic: str, partition: int) -> int:
+        return self._log(topic, partition).next_offset
+
+    def size_bytes(self, topic: Optional[str] = None) -> int:
+        return sum(log.bytes for (t, _), log in list(self._logs.items()) if topic is None or t == topic)
+
+    def close(self) -> None:
+        with self._lock:
+            for log in self._logs.values():
+                log.close()
+            self._logs.clear()
+
+
+# ── External brokers (optional dependencies) ─────────────────────────
+
+class KafkaBroker:
+    """Writes producer batches to Apache Kafka through ``confluent-kafka``.
+
+    Batching, partitioning and ordering stay in :class:`BufferedStreamProducer`;
+    librdkafka only compresses and ships each sealed batch (``linger.ms=0``).
+    """
+
+    _KAFKA_CODECS = {"none": "none", "gzip": "gzip", "zlib": "gzip", "zstd": "zstd"}
+
+    def __init__(self, bootstrap_servers: str, compression: str = STREAM_PRODUCER_COMPRESSION, **config: Any):
+        from confluent_kafka import Producer  # type: ignore[import-not-found]
+
+        self._producer = Producer({
+            "bootstrap.servers": bootstrap_servers,
+            "linger.ms": 0,
+            "enable.idempotence": True,
+            "compression.type": self._KAFKA_CODECS.get(compression, "none"),
+            **config,
+        })
+        self._partitions: Dict[str, int] = {}
+
+    def partitions_for(self, topic: str) -> int:
+        if topic not in self._partitions:
+            metadata = self._producer.list_topics(topic, timeout=10)
+            self._partitions[topic] = max(1, len(metadata.topics[topic].partitions))
+        return self._partitions[topic]
+
+    def append(
+        self, topic: str, partition: int, keys: Sequence[Optional[bytes]], values: Sequence[bytes], codec: str = "none"
+    ) -> int:
+        offsets: List[int] = []
+        errors: List[Any] = []
+
+        def on_delivery(err, msg):
+            if err is not None:
+                errors.append(err)
+            else:
+                offsets.append(msg.offset())
+
+        for key, value in zip(keys, values):
+            while True:
+                try:
+                    self._producer.produce(topic, value=value, key=key, partition=partition, on_delivery=on_delivery)
+                    break
+                except BufferError:
+                    self._producer.poll(0.05)  # librdkafka queue full; drain delivery reports
+        self._producer.flush()
+        if errors:
+            raise RuntimeError(f"Kafka delivery failed for {len(errors)} records: {errors[0]}")
+        return min(offsets) if offsets else -1
+
+    def close(self) -> None:
+        self._producer.flush()
+
+
+class KinesisBroker:
+    """Writes producer batches to one AWS Kinesis stream with ``PutRecords``.
+
+    Kinesis shards by partition key itself, so every topic maps to a single
+    logical partition and the record key (``patient_id``) becomes the
+    ``PartitionKey``, which keeps per-patient ordering within a shard.
+    """
+
+    _MAX_RECORDS_PER_CALL = 500
+
+    def __init__(self, stream_name: str, client: Any = None):
+        if client is None:
+            import boto3  # type: ignore[import-not-found]
+
+            client = boto3.client("kinesis")
+        self.stream_name = stream_name
+        self._client = client
+
+    def partitions_for(self, topic: str) -> int:
+        return 1
+
+    def append(
+        self, topic: str, partition: int, keys: Sequence[Optional[bytes]], values: Sequence[bytes], codec: str = "none"
+    ) -> int:
+        topic_prefix = b'{"topic":' + json.dumps(topic).encode("utf-8") + b',"payload":'
+        entries = [
+            {"Data": topic_prefix + value + b"}", "PartitionKey": (key or topic.encode("utf-8")).decode("utf-8", "replace")}
+            for key, value in zip(keys, values)
+        ]
+        for i in range(0, len(entries), self._MAX_RECORDS_PER_CALL):
+            chunk = entries[i:i + self._MAX_RECORDS_PER_CALL]
+            response = self._client.put_records(StreamName=self.stream_name, Records=chunk)
+            if response.get("FailedRecordCount"):
+                # Retry only the throttled/failed entries once, preserving their order
+                failed = [e for e, r in zip(chunk, response["Records"]) if r.get("ErrorCode")]
+                retry = self._client.put_records(StreamName=self.stream_name, Records=failed)
+                if retry.get("FailedRecordCount"):
+                    raise RuntimeError(f"Kinesis rejected {retry['FailedRecordCount']} records")
+        return -1
+
+    def close(self) -> None:
+        pass
+
+
+# ── Producer ─────────────────────────────────────────────────────────
+
+_open_producers: "weakref.WeakSet[BufferedStreamProducer]" = weakref.WeakSet()
+
+
+def _close_open_producers() -> None:
+    for producer in list(_open_producers):
+        producer.close(timeout=5.0)
+
+
+atexit.register(_close_open_producers)
+
+
+class _Batch:
+    __slots__ = ("topic", "partition", "keys", "values", "callbacks", "size", "created")
+
+    def __init__(self, topic: str, partition: int, created: float):
+        self.topic = topic
+        self.partition = partition
+        self.keys: List[Optional[bytes]] = []
+        self.values: List[bytes] = []
+        self.callbacks: List[Tuple[int, DeliveryCallback]] = []
+        self.size = 0
+        self.created = created
+
+
+def _json_serializer(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class BufferedStreamProducer:
+    """Linger/size batching producer with keyed partitioning and bounded buffering."""
+
+    def __init__(
+        self,
+        broker: Any,
+        *,
+        linger_ms: float = STREAM_PRODUCER_LINGER_MS,
+        batch_size_bytes: int = STREAM_PRODUCER_BATCH_BYTES,
+        compression: str = STREAM_PRODUCER_COMPRESSION,
+        max_in_flight: int = STREAM_PRODUCER_MAX_IN_FLIGHT,
+        buffer_max_records: int = STREAM_PRODUCER_BUFFER_RECORDS,
+        max_block_ms: float = STREAM_PRODUCER_MAX_BLOCK_MS,
+        retries: int = 2,
+        retry_backoff_ms: float = 50.0,
+        serializer: Callable[[Any], bytes] = _json_serializer,
+    ):
+        self.broker = broker
+        self.linger_s = max(0.0, linger_ms) / 1000.0
+        self.batch_size_bytes = max(1, int(batch_size_bytes))
+        self.compression = _resolve_codec(compression)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.buffer_max_records = max(1, int(buffer_max_records))
+        self.max_block_ms = max_block_ms
+        self.retries = max(0, int(retries))
+        self.retry_backoff_s = retry_backoff_ms / 1000.0
+        self._serializer = serializer
+
+        self._lock = threading.Lock()
+        self._wake_sender = threading.Condition(self._lock)
+        self._space = threading.Condition(self._lock)
+        self._open: Dict[Tuple[str, int], _Batch] = {}
+        self._ready: Deque[_Batch] = deque()
+        self._in_flight = 0
+        self._buffered = 0
+        self._partition_counts: Dict[str, int] = {}
+        self._sticky: Dict[str, int] = {}
+        self._closed = False
+        self._stats = {"records_sent": 0, "records_delivered": 0, "records_failed": 0, "batches": 0,
+                       "bytes_in": 0, "blocked_sends": 0}
+
+        self._sender = threading.Thread(target=self._run, daemon=True, name="BufferedStreamProducer")
+        self._sender.start()
+        _open_producers.add(self)
+
+    # ── Public API ──
+
+    def partition_for(self, topic: str, key: Optional[bytes]) -> int:
+        """Keyed records hash to a fixed partition; unkeyed ones stick to one until its batch seals."""
+        count = self._partition_counts.get(topic)
+        if count is None:
+            count = self._partition_counts[topic] = max(1, int(self.broker.partitions_for(topic)))
+        if key is not None:
+            return zlib.crc32(key) % count
+        return self._sticky.setdefault(topic, 0) % count
+
+    def send(
+        self,
+        topic: str,
+        value: Any,
+        key: Any = None,
+        on_delivery: Optional[DeliveryCallback] = None,
+        max_block_ms: Optional[float] = None,
+    ) -> int:
+        """Buffer one record and return its partition; delivery is reported via ``on_delivery(err, metadata)``."""
+        data = bytes(value) if isinstance(value, (bytes, bytearray)) else self._serializer(value)
+        if key is not None and not isinstance(key, bytes):
+            key = str(key).encode("utf-8")
+        with self._lock:
+            if self._closed:
+                raise ProducerClosedError("Producer is closed")
+            if self._buffered >= self.buffer_max_records or len(self._ready) + self._in_flight >= self.max_in_flight:
+                self._wait_for_space(self.max_block_ms if max_block_ms is None else max_block_ms)
+            partition = self.partition_for(topic, key)
+            batch = self._open.get((topic, partition))
+            if batch is None:
+                batch = self._open[(topic, partition)] = _Batch(topic, partition, time.monotonic())
+                self._wake_sender.notify()  # start its linger timer
+            if on_delivery is not None:
+                batch.callbacks.append((len(batch.values), on_delivery))
+            batch.keys.append(key)
+            batch.values.append(data)
+            batch.size += len(data) + (len(key) if key is not None else 0) + _RECORD_HEADER.size
+            self._buffered += 1
+            self._stats["records_sent"] += 1
+            if batch.size >= self.batch_size_bytes:
+                self._seal(batch)
+                self._wake_sender.notify()
+        return partition
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Seal every open batch and wait until all buffered records are delivered."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            for batch in list(self._open.values()):
+                self._seal(batch)
+            self._wake_sender.notify()
+            while self._buffered:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._space.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, stop the sender thread and close the broker."""
+        with self._lock:
+            if self._closed:
+                return True
+        flushed = self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._wake_sender.notify()
+        self._sender.join(timeout)
+        close = getattr(self.broker, "close", None)
+        if close is not None:
+            close()
+        _open_producers.discard(self)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                buffered_records=self._buffered,
+                open_batches=len(self._open),
+                queued_batches=len(self._ready) + self._in_flight,
+                avg_batch_records=round(stats["records_delivered"] / stats["batches"], 1) if stats["batches"] else 0.0,
+            )
+        return stats
+
+    # ── Internals (``_lock`` held unless noted) ──
+
+    def _wait_for_space(self, max_block_ms: float) -> None:
+        self._stats["blocked_sends"] += 1
+        deadline = time.monotonic() + max(0.0, max_block_ms) / 1000.0
+        while self._buffered >= self.buffer_max_records or len(self._ready) + self._in_flight >= self.max_in_flight:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._closed:
+                raise ProducerBufferFull(
+                    f"Producer buffer full ({self._buffered} records, {len(self._ready) + self._in_flight} batches queued)"
+                )
+            self._space.wait(remaining)
+
+    def _seal(self, batch: _Batch) -> None:
+        del self._open[(batch.topic, batch.partition)]
+        self._ready.append(batch)
+        if batch.keys[-1] is None and self._sticky.get(batch.topic) == batch.partition:
+            self._sticky[batch.topic] = batch.partition + 1
+
+    def _next_batches(self) -> Optional[List[_Batch]]:
+        """Block until batches are ready (or lingered out); ``None`` once closed and drained."""
+        while True:
+            now = time.monotonic()
+            for batch in [b for b in self._open.values() if now - b.created >= self.linger_s]:
+                self._seal(batch)
+            if self._ready:
+                batches = list(self._ready)
+                self._ready.clear()
+                self._in_flight += len(batches)
+                return batches
+            if self._closed and not self._open:
+                return None
+            timeout = None
+            if self._open:
+                timeout = max(0.0, min(b.created for b in self._open.values()) + self.linger_s - now)
+            self._wake_sender.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                batches = self._next_batches()
+            if batches is None:
+                return
+            for batch in batches:  # lock not held: compression and I/O
+                self._deliver(batch)
+                with self._lock:
+                    self._in_flight -= 1
+                    self._buffered -= len(batch.values)
+                    self._space.notify_all()
+
+    def _deliver(self, batch: _Batch) -> None:
+        error: Optional[Exception] = None
+        base_offset = -1
+        for attempt in range(self.retries + 1):
+            try:
+                base_offset = self.broker.append(batch.topic, batch.partition, batch.keys, batch.values, self.compression)
+                error = None
+                break
+            except Exception as exc:
+                error = exc
+                if attempt < self.retries:
+                    time.sleep(self.retry_backoff_s * (attempt + 1))
+        if error is not None:
+            logger.warning(
+                "Dropping batch of %d records for %s[%d] after %d attempts: %s",
+                len(batch.values), batch.topic, batch.partition, self.retries + 1, error,
+            )
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["bytes_in"] += batch.size
+            self._stats["records_delivered" if error is None else "records_failed"] += len(batch.values)
+
+        for index, callback in batch.callbacks:
+            metadata = None
+            if error is None:
+                metadata = RecordMetadata(batch.topic, batch.partition, base_offset + index if base_offset >= 0 else -1)
+            try:
+                callback(error, metadata)
+            except Exception:
+                logger.exception("Delivery callback failed for %s[%d]", batch.topic, batch.partition)
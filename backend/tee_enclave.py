@@ -1,7 +1,7 @@
 import hashlib
 import logging
 import os
-from typing import Any, Callable, Dict, TypeVar
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,23 @@ class EnclaveAttestationError(Exception):
 # Dynamic secure boot registry for model measurements
 TRUSTED_MODEL_HASHES: Dict[str, str] = {}
 
+
+def measure_model_file(file_path: str) -> str:
+    """Compute the SHA-256 measurement of a model binary on disk."""
+    if not os.path.exists(file_path):
+        logger.error(f"TEE Enclave cannot locate model binary at {file_path}")
+        raise EnclaveAttestationError(f"Model file not found at {file_path}")
+
+    sha256 = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha256.update(chunk)
+    except Exception as e:
+        raise EnclaveAttestationError(f"TEE failed to read model file for hashing: {str(e)}")
+    return sha256.hexdigest()
+
+
 class ConfidentialEnclave:
     """
     Trusted Execution Environment (TEE) for Confidential AI.
@@ -21,6 +38,7 @@ class ConfidentialEnclave:
     def __init__(self, expected_hash: str = None):
         self.expected_hash = expected_hash
         self._attested = False
+        self.attested_digest: Optional[str] = None
 
     def attest(self, payload: bytes) -> bool:
         """Attest raw payload bytes."""
@@ -38,20 +56,14 @@ class ConfidentialEnclave:
         Reads the file, computes its SHA-256 hash, and compares it with
         the trusted bootstrap signature.
         """
-        if not os.path.exists(file_path):
-            logger.error(f"TEE Enclave cannot locate model binary at {file_path}")
-            raise EnclaveAttestationError(f"Model file not found at {file_path}")
-
-        sha256 = hashlib.sha256()
-        try:
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):
-                    sha256.update(chunk)
-        except Exception as e:
-            raise EnclaveAttestationError(f"TEE failed to read model file for hashing: {str(e)}")
-
-        file_hash = sha256.hexdigest()
+        return self.attest_model_digest(model_name, measure_model_file(file_path))
 
+    def attest_model_digest(self, model_name: str, file_hash: str) -> bool:
+        """
+        Attest a model from a previously computed SHA-256 measurement.
+        Lets callers that cache measurements (see ModelService.attestation_for)
+        verify against the secure boot registry without re-reading the binary.
+        """
         # Secure bootstrap: register the trusted hash on first load (TOFU)
         if model_name not in TRUSTED_MODEL_HASHES:
             TRUSTED_MODEL_HASHES[model_name] = file_hash
@@ -63,7 +75,8 @@ class ConfidentialEnclave:
             raise EnclaveAttestationError(f"Model {model_name} failed code integrity verification.")
 
         self._attested = True
-        logger.info(f"[TEE] Cryptographic attestation successful for: {model_name} ({file_hash[:8]}...)")
+        self.attested_digest = file_hash
+        logger.debug(f"[TEE] Cryptographic attestation successful for: {model_name} ({file_hash[:8]}...)")
         return True
 
     def generate_pki_hardware_quote(self, nonce: str = "0x892a4f") -> Dict[str, Any]:
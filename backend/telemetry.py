@@ -19,12 +19,14 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from . import auth, database, licensing, models
+from .cache_service import cached_response, facility_tag, invalidate_tags
 
 logger = logging.getLogger(__name__)
 
 # Global state for streaming
 HL7_MESSAGES = []
 MAX_HL7_MESSAGES = 10
+TELEMETRY_HL7_TAG = "telemetry:hl7"
 
 
 router = APIRouter(dependencies=[Depends(licensing.enforce_license_tier("enterprise"))])
@@ -72,20 +74,20 @@ def _department_name_by_id(db: Session, current_user: models.User) -> dict[int,
 def build_telemetry_snapshot(db: Session, current_user: models.User) -> dict:
     """Build a facility-scoped operations telemetry snapshot from persisted data."""
     _require_admin(current_user)
+    snapshot = dict(_facility_telemetry_snapshot(db, current_user))
+    # Refresh timestamp to represent active stream connection
+    snapshot["timestamp"] = datetime.now(timezone.utc).isoformat()
+    return snapshot
 
-    facility_id = current_user.facility_id or "global"
-    cache_key = f"telemetry_snapshot:{facility_id}"
-
-    from backend.cache_service import cache
-    try:
-        cached_res = cache.get(cache_key)
-        if cached_res is not None:
-            # Refresh timestamp to represent active stream connection
-            cached_res["timestamp"] = datetime.now(timezone.utc).isoformat()
-            return cached_res
-    except Exception as ex_cache:
-        logger.debug("Telemetry snapshot cache lookup failed: %s", ex_cache)
 
+# Cached for 2 seconds to absorb concurrent telemetry polls or streaming clients;
+# HL7 ingestion invalidates it immediately.
+@cached_response(
+    ttl=2,
+    key_prefix="telemetry_snapshot",
+    tags=lambda args: [facility_tag(args["current_user"].facility_id), TELEMETRY_HL7_TAG],
+)
+def _facility_telemetry_snapshot(db: Session, current_user: models.User) -> dict:
     from backend.models.clinical import SparkStreamingMetrics
     latest_metric = db.query(SparkStreamingMetrics).order_by(SparkStreamingMetrics.timestamp.desc()).first()
 
@@ -216,12 +218,6 @@ def build_telemetry_snapshot(db: Session, current_user: models.User) -> dict:
         "bed_units": bed_units,
     }
 
-    try:
-        # Cache for 2 seconds to absorb concurrent telemetry polls or streaming clients
-        cache.set(cache_key, snapshot, ttl=2)
-    except Exception as ex_cache:
-        logger.debug("Telemetry snapshot cache set failed: %s", ex_cache)
-
     return snapshot
 
 
@@ -242,6 +238,7 @@ def ingest_hl7(
     HL7_MESSAGES.insert(0, msg)
     if len(HL7_MESSAGES) > MAX_HL7_MESSAGES:
         HL7_MESSAGES.pop()
+    invalidate_tags(TELEMETRY_HL7_TAG)
 
     return {"status": "success", "message": "HL7 payload ingested"}
 
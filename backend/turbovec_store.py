@@ -15,6 +15,22 @@ Environment variables
 TURBOVEC_INDEX_PATH   Path for the native turbovec binary index (default:
                       ``models/turbovec_index``)
 TURBOVEC_QUANTIZATION Quantization bits – ``"2"`` or ``"4"`` (default: ``"4"``)
+TURBOVEC_WRITE_BEHIND ``"1"`` enables write-behind persistence (default: ``"0"``)
+TURBOVEC_FLUSH_INTERVAL_S   Seconds between background flushes in write-behind
+                      mode (default: ``"5"``)
+TURBOVEC_FLUSH_MAX_PENDING  Pending sidecar operations that force an immediate
+                      flush in write-behind mode (default: ``"1000"``)
+
+Persistence modes
+-----------------
+By default every mutation calls :meth:`TurboVecVectorStore.save`, which
+rewrites the native index and the full ``.meta.json`` sidecar.  With
+write-behind enabled, mutations only mark the store dirty and queue sidecar
+operations; :meth:`TurboVecVectorStore.flush` (run by a background thread,
+or inline once ``TURBOVEC_FLUSH_MAX_PENDING`` operations are queued) writes
+the native index and *appends* the queued operations to ``.meta.log``.
+``load()`` replays the log on top of ``.meta.json``; once the log outgrows
+the live record count it is compacted back into a fresh ``.meta.json``.
 
 turbovec API notes
 ------------------
@@ -33,16 +49,36 @@ Key API differences from the design-doc assumptions:
 - Search returns ``(scores_ndarray, ids_ndarray)`` each shape ``(1, k)``
 """
 
+import atexit
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 import numpy as np
 
-from .rag import _metadata_matches_filter, get_embedding, get_query_embedding
+from .core_ai import embed_texts
+from .metadata_index import MetadataIndex
+from .rag import (
+    _metadata_matches_filter,
+    get_embedding,
+    get_query_embedding,
+)
 from .vector_store_base import VectorStoreBackend
 
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Batch document embeddings via ``core_ai.embed_texts``.
+
+    Defined here rather than imported from ``backend.rag``, which only has
+    ``get_embeddings`` when ``clinical-rag-cache`` is not installed.
+    """
+    return embed_texts(texts, task_type="retrieval_document")
+
+
 # ---------------------------------------------------------------------------
 # Module-level constants
 # ---------------------------------------------------------------------------
@@ -57,11 +93,39 @@ TURBOVEC_QUANTIZATION: str = os.environ.get("TURBOVEC_QUANTIZATION", "4")
 # Valid quantization levels supported by turbovec.
 _VALID_QUANTIZATIONS = {"2", "4"}
 
+# Documents embedded per ``add_many`` batch (one ``add_with_ids`` per batch).
+_EMBED_BATCH_SIZE = 64
+
+# The append-only sidecar log is compacted into ``.meta.json`` once it holds
+# more entries than this floor and more entries than there are live records.
+_LOG_COMPACT_MIN_ENTRIES = 1000
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+# Stores with write-behind enabled, flushed at interpreter exit.
+_write_behind_stores: "weakref.WeakSet[TurboVecVectorStore]" = weakref.WeakSet()
+
 # Default path to the legacy JSON vector store for one-time migration.
 # Tests can patch this module-level constant to redirect migration reads.
 _DEFAULT_JSON_PATH: str = "vector_store.json"
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        logger.warning("%s is not a number; using %s.", name, default)
+        return default
+
+
+def _flush_write_behind_stores() -> None:
+    for store in list(_write_behind_stores):
+        store.close()
+
+
+atexit.register(_flush_write_behind_stores)
+
+
 # ---------------------------------------------------------------------------
 # TurboVecVectorStore
 # ---------------------------------------------------------------------------
@@ -81,7 +145,10 @@ class TurboVecVectorStore(VectorStoreBackend):
       - ``_int_to_str: Dict[int, str]``  — uint64 int → string record_id
       - ``_next_id: int``                — next available uint64 integer slot
 
-    These mappings are persisted in the ``.meta.json`` sidecar.
+    These mappings are persisted in the ``.meta.json`` sidecar (plus the
+    ``.meta.log`` operation log in write-behind mode), together with a
+    :class:`~backend.rag.MetadataIndex` keyed by uint64 id that turns ACL
+    filters into allowlists without scanning every metadata dict.
     """
 
     def __init__(self) -> None:
@@ -111,6 +178,30 @@ class TurboVecVectorStore(VectorStoreBackend):
         self._str_to_int: Dict[str, int] = {}       # string record_id -> uint64 int
         self._int_to_str: Dict[int, str] = {}       # uint64 int -> string record_id
         self._next_id: int = 0                      # next available integer slot
+        self._metadata_index = MetadataIndex()      # field -> value -> uint64 ids
+
+        # Write-behind persistence
+        self._write_behind: bool = (
+            os.environ.get("TURBOVEC_WRITE_BEHIND", "0").strip().lower() in _TRUTHY
+        )
+        self._flush_interval: float = max(_env_float("TURBOVEC_FLUSH_INTERVAL_S", 5.0), 0.05)
+        self._flush_max_pending: int = max(int(_env_float("TURBOVEC_FLUSH_MAX_PENDING", 1000)), 1)
+        self._lock = threading.RLock()
+        self._dirty: bool = False
+        self._pending_ops: List[Dict[str, Any]] = []  # sidecar ops not yet appended to the log
+        self._log_entries: int = 0                    # ops currently in the on-disk log
+        self._last_flush: float = time.monotonic()
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    @property
+    def _log_path(self) -> str:
+        return self._index_path + ".meta.log"
+
+    @property
+    def dirty(self) -> bool:
+        """``True`` while mutations are waiting for a write-behind flush."""
+        return self._dirty
 
     # ------------------------------------------------------------------
     # VectorStoreBackend abstract methods — stubbed until later tasks
@@ -121,45 +212,77 @@ class TurboVecVectorStore(VectorStoreBackend):
 
         Obtains an embedding via ``get_embedding(text, task_type="retrieval_document")``.
         If the record already exists, removes and re-inserts; otherwise inserts a new entry.
-        Calls ``save()`` after a successful index operation.
+        Persists via ``save()`` (or queues a write-behind flush).
 
         Raises:
             Any exception raised by ``get_embedding()`` is logged and re-raised
             without modifying ``_index``, ``_texts``, or ``_metas``.
         """
-        # Step 1 — obtain the embedding; re-raise (without modifying state) on failure.
-        try:
-            vector = get_embedding(text)
-        except Exception:
-            clean_rec_id = str(record_id).replace("\r", "").replace("\n", "")[:50]
-            logger.error(
-                "TurboVecVectorStore.add() failed to get embedding for record_id=%s",
-                clean_rec_id,
-                exc_info=True,
-            )
-            raise
+        self.add_many([text], [metadata], [record_id])
 
-        # Step 2 — resolve or allocate the uint64 integer ID.
-        if record_id in self._str_to_int:
-            # Record already exists — remove the old vector from the index.
-            uint_id = self._str_to_int[record_id]
-            self._index.remove(uint_id)
-        else:
-            # New record — assign a fresh integer ID.
-            uint_id = self._next_id
-            self._next_id += 1
-            self._str_to_int[record_id] = uint_id
-            self._int_to_str[uint_id] = record_id
-
-        # Step 3 — insert into the turbovec index using numpy arrays.
-        vec_array = np.array([vector], dtype="float32")
-        id_array = np.array([uint_id], dtype="uint64")
-        self._index.add_with_ids(vec_array, id_array)
-        self._texts[record_id] = text
-        self._metas[record_id] = metadata
-
-        # Step 4 — persist.  save() silently swallows its own exceptions internally.
-        self.save()
+    def add_many(
+        self,
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        record_ids: Sequence[str],
+        batch_size: int = _EMBED_BATCH_SIZE,
+    ) -> int:
+        """Add or update many documents; returns the number written.
+
+        Documents are embedded ``batch_size`` at a time (one batched
+        ``get_embeddings`` call) and each batch is inserted with a single
+        ``add_with_ids`` call, followed by one
+        ``save()`` in write-through mode.  If a record_id repeats, the last
+        occurrence wins.
+
+        Raises:
+            ValueError: If the three sequences differ in length.
+            Any exception raised by ``get_embedding()`` is logged and re-raised;
+            batches completed before the failure stay written.
+        """
+        if not (len(texts) == len(metadatas) == len(record_ids)):
+            raise ValueError("texts, metadatas and record_ids must have the same length")
+
+        latest: Dict[str, int] = {}
+        for position, record_id in enumerate(record_ids):
+            latest.pop(record_id, None)
+            latest[record_id] = position
+        positions = list(latest.values())
+        batch_size = max(int(batch_size), 1)
+
+        written = 0
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            batch_ids = [record_ids[i] for i in batch]
+            batch_texts = [texts[i] for i in batch]
+
+            # Step 1 — embed the whole batch before touching any state.
+            try:
+                if len(batch_texts) == 1:
+                    vectors = [get_embedding(batch_texts[0])]
+                else:
+                    vectors = get_embeddings(batch_texts)
+            except Exception:
+                clean_rec_id = str(batch_ids[0]).replace("\r", "").replace("\n", "")[:50]
+                logger.error(
+                    "TurboVecVectorStore.add() failed to get embedding for record_id=%s (batch of %d)",
+                    clean_rec_id,
+                    len(batch_ids),
+                    exc_info=True,
+                )
+                raise
+
+            # Step 2 — one native insert for the batch, then persist.
+            with self._lock:
+                self._insert_locked(
+                    batch_ids,
+                    np.asarray(vectors, dtype="float32"),
+                    batch_texts,
+                    [metadatas[i] for i in batch],
+                )
+            self._commit()
+            written += len(batch)
+        return written
 
     def delete(self, record_id: str) -> bool:
         """Delete a document by ``record_id``.  Returns ``True`` on success.
@@ -172,20 +295,15 @@ class TurboVecVectorStore(VectorStoreBackend):
         in-memory state remains modified (consistent with the design spec).
         """
         # Step 1 — short-circuit for unknown record IDs (Req 3.2).
-        if record_id not in self._texts:
-            return False
-
-        # Step 2 — remove from the turbovec index and in-memory dicts (Req 3.1).
-        uint_id = self._str_to_int.pop(record_id, None)
-        if uint_id is not None:
-            self._index.remove(uint_id)
-            self._int_to_str.pop(uint_id, None)
-        del self._texts[record_id]
-        del self._metas[record_id]
+        with self._lock:
+            if record_id not in self._texts:
+                return False
+            # Step 2 — remove from the turbovec index and in-memory dicts (Req 3.1).
+            self._remove_locked(record_id)
 
         # Step 3 — persist; on failure log and return False (Req 3.3).
         try:
-            self.save()
+            self._commit()
         except Exception:
             clean_rec_id = str(record_id).replace("\r", "").replace("\n", "")[:50]
             logger.error(
@@ -197,6 +315,29 @@ class TurboVecVectorStore(VectorStoreBackend):
 
         return True
 
+    def delete_many(self, record_ids: Iterable[str]) -> int:
+        """Delete many documents with a single persist; returns how many existed.
+
+        Unknown record IDs are skipped.  A persistence failure is logged and
+        the in-memory removals are kept, as in :meth:`delete`.
+        """
+        with self._lock:
+            removed = 0
+            for record_id in record_ids:
+                if record_id in self._texts:
+                    self._remove_locked(record_id)
+                    removed += 1
+        if removed:
+            try:
+                self._commit()
+            except Exception:
+                logger.error(
+                    "TurboVecVectorStore.delete_many() failed to save after removing %d records",
+                    removed,
+                    exc_info=True,
+                )
+        return removed
+
     def search(
         self,
         query: str,
@@ -257,13 +398,7 @@ class TurboVecVectorStore(VectorStoreBackend):
         # Build allowlist of uint64 IDs when a metadata filter is provided (Req 4.2, 4.3)
         allowlist_uint: Optional[np.ndarray] = None
         if filter_meta is not None:
-            str_allowlist = self._build_allowlist(filter_meta)
-            if not str_allowlist:
-                return []
-            allowlist_uint = np.array(
-                [self._str_to_int[rid] for rid in str_allowlist if rid in self._str_to_int],
-                dtype="uint64",
-            )
+            allowlist_uint = self._allowlist_ids(filter_meta)
             if len(allowlist_uint) == 0:
                 return []
 
@@ -321,6 +456,9 @@ class TurboVecVectorStore(VectorStoreBackend):
     def load(self) -> None:
         """Load (or initialise) the turbovec index from ``_index_path``.
 
+        Replays the write-behind ``.meta.log`` on top of ``.meta.json`` and,
+        in write-behind mode, starts the background flush thread.
+
         Raises:
             ImportError: If the underlying ``turbovec`` module cannot be loaded.
             IOError: If reading the index file fails.
@@ -331,6 +469,7 @@ class TurboVecVectorStore(VectorStoreBackend):
                 # Load existing native index
                 self._index = turbovec.IdMapIndex.load(self._index_path)
                 # Load companion sidecar for texts, metas, and ID maps
+                self._reset_state()
                 meta_path = self._index_path + ".meta.json"
                 if os.path.exists(meta_path):
                     with open(meta_path, "r", encoding="utf-8") as f:
@@ -345,20 +484,12 @@ class TurboVecVectorStore(VectorStoreBackend):
                         int(k): v for k, v in sidecar.get("int_to_str", {}).items()
                     }
                     self._next_id = int(sidecar.get("next_id", 0))
-                else:
-                    self._texts = {}
-                    self._metas = {}
-                    self._str_to_int = {}
-                    self._int_to_str = {}
-                    self._next_id = 0
+                    self._load_metadata_index(sidecar.get("metadata_index"))
+                self._replay_log()
             else:
                 # No persisted index — initialise empty
                 self._index = turbovec.IdMapIndex(bit_width=self._quantization)
-                self._texts = {}
-                self._metas = {}
-                self._str_to_int = {}
-                self._int_to_str = {}
-                self._next_id = 0
+                self._reset_state()
                 # Trigger JSON migration if legacy file exists.
                 if os.path.exists(_DEFAULT_JSON_PATH):
                     self._migrate_from_json(_DEFAULT_JSON_PATH)
@@ -370,42 +501,27 @@ class TurboVecVectorStore(VectorStoreBackend):
             )
             import turbovec
             self._index = turbovec.IdMapIndex(bit_width=self._quantization)
-            self._texts = {}
-            self._metas = {}
-            self._str_to_int = {}
-            self._int_to_str = {}
-            self._next_id = 0
+            self._reset_state()
+
+        if self._write_behind:
+            self._start_flusher()
 
     def save(self) -> None:
-        """Persist the turbovec index and companion sidecar atomically."""
+        """Persist the turbovec index and companion sidecar atomically.
+
+        A full save also compacts the write-behind log: every queued or
+        logged operation is folded into the new ``.meta.json``.
+        """
         try:
-            # Create the directory if it doesn't exist (only when dirname is non-empty)
-            dir_name = os.path.dirname(self._index_path)
-            if dir_name:
-                os.makedirs(dir_name, exist_ok=True)
-
-            # Persist the native turbovec index (turbovec uses write(), not save())
-            self._index.write(self._index_path)
-
-            # Write companion sidecar atomically: write to .tmp, then os.replace.
-            # The sidecar stores texts, metas, and the integer ID mappings.
-            meta_path = self._index_path + ".meta.json"
-            tmp_path = meta_path + ".tmp"
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "texts": self._texts,
-                        "metas": self._metas,
-                        "str_to_int": self._str_to_int,
-                        # JSON requires string keys
-                        "int_to_str": {str(k): v for k, v in self._int_to_str.items()},
-                        "next_id": self._next_id,
-                    },
-                    f,
-                    ensure_ascii=False,
-                    separators=(",", ":"),
-                )
-            os.replace(tmp_path, meta_path)
+            with self._lock:
+                # Create the directory if it doesn't exist (only when dirname is non-empty)
+                dir_name = os.path.dirname(self._index_path)
+                if dir_name:
+                    os.makedirs(dir_name, exist_ok=True)
+
+                # Persist the native turbovec index (turbovec uses write(), not save())
+                self._index.write(self._index_path)
+                self._write_sidecar()
         except Exception:
             logger.error(
                 "TurboVecVectorStore.save() failed for index path %r",
@@ -413,24 +529,245 @@ class TurboVecVectorStore(VectorStoreBackend):
                 exc_info=True,
             )
 
+    def flush(self) -> None:
+        """Write pending write-behind changes: native index plus appended log ops.
+
+        Compacts the log into ``.meta.json`` once it holds more entries than
+        ``_LOG_COMPACT_MIN_ENTRIES`` and than there are live records.  Errors
+        are logged and the changes stay pending for the next flush.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                dir_name = os.path.dirname(self._index_path)
+                if dir_name:
+                    os.makedirs(dir_name, exist_ok=True)
+                # Log first: a record whose vector did not reach the index is
+                # never returned by search, whereas a vector without metadata
+                # would be unrecoverable.
+                if self._pending_ops:
+                    with open(self._log_path, "a", encoding="utf-8") as f:
+                        for op in self._pending_ops:
+                            f.write(json.dumps(op, ensure_ascii=False, separators=(",", ":")))
+                            f.write("\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._log_entries += len(self._pending_ops)
+                    self._pending_ops = []
+                self._index.write(self._index_path)
+                if self._log_entries > max(_LOG_COMPACT_MIN_ENTRIES, len(self._texts)):
+                    self._write_sidecar()
+                self._dirty = False
+                self._last_flush = time.monotonic()
+            except Exception:
+                logger.error(
+                    "TurboVecVectorStore.flush() failed for index path %r",
+                    self._index_path,
+                    exc_info=True,
+                )
+
+    def close(self) -> None:
+        """Stop the background flush thread and write any pending changes."""
+        self._stop_flusher.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join(timeout=max(self._flush_interval, 1.0) + 1.0)
+        self._flusher = None
+        self.flush()
+
     # ------------------------------------------------------------------
     # Internal helpers — stubbed until later tasks
     # ------------------------------------------------------------------
 
+    def _reset_state(self) -> None:
+        self._texts = {}
+        self._metas = {}
+        self._str_to_int = {}
+        self._int_to_str = {}
+        self._next_id = 0
+        self._metadata_index = MetadataIndex()
+        self._pending_ops = []
+        self._log_entries = 0
+        self._dirty = False
+
+    def _insert_locked(
+        self,
+        record_ids: List[str],
+        vectors: np.ndarray,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Insert a batch of (unique) records with one ``add_with_ids`` call."""
+        uint_ids = []
+        for record_id in record_ids:
+            if record_id in self._str_to_int:
+                # Record already exists — remove the old vector from the index.
+                uint_id = self._str_to_int[record_id]
+                self._index.remove(uint_id)
+            else:
+                # New record — assign a fresh integer ID.
+                uint_id = self._next_id
+                self._next_id += 1
+                self._str_to_int[record_id] = uint_id
+                self._int_to_str[uint_id] = record_id
+            uint_ids.append(uint_id)
+
+        self._index.add_with_ids(vectors, np.asarray(uint_ids, dtype="uint64"))
+        for record_id, uint_id, text, metadata in zip(record_ids, uint_ids, texts, metadatas):
+            self._texts[record_id] = text
+            self._metadata_index.remove(uint_id, self._metas.get(record_id))
+            self._metadata_index.add(uint_id, metadata)
+            self._metas[record_id] = metadata
+            if self._write_behind:
+                self._pending_ops.append(
+                    {"op": "put", "id": record_id, "uid": uint_id, "text": text, "meta": metadata}
+                )
+
+    def _remove_locked(self, record_id: str) -> None:
+        uint_id = self._str_to_int.pop(record_id, None)
+        if uint_id is not None:
+            self._index.remove(uint_id)
+            self._int_to_str.pop(uint_id, None)
+            self._metadata_index.remove(uint_id, self._metas.get(record_id))
+        del self._texts[record_id]
+        del self._metas[record_id]
+        if self._write_behind:
+            self._pending_ops.append({"op": "del", "id": record_id})
+
+    def _commit(self) -> None:
+        """Persist after a mutation: ``save()`` now, or mark dirty for write-behind."""
+        if not self._write_behind:
+            self.save()
+            return
+        with self._lock:
+            self._dirty = True
+            due = (
+                len(self._pending_ops) >= self._flush_max_pending
+                or time.monotonic() - self._last_flush >= self._flush_interval
+            )
+        if due:
+            self.flush()
+
+    def _write_sidecar(self) -> None:
+        """Atomically rewrite ``.meta.json`` and drop the (now folded-in) log."""
+        # Write companion sidecar atomically: write to .tmp, then os.replace.
+        # The sidecar stores texts, metas, and the integer ID mappings.
+        meta_path = self._index_path + ".meta.json"
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "texts": self._texts,
+                    "metas": self._metas,
+                    "str_to_int": self._str_to_int,
+                    # JSON requires string keys
+                    "int_to_str": {str(k): v for k, v in self._int_to_str.items()},
+                    "next_id": self._next_id,
+                    "metadata_index": self._metadata_index.to_dict(),
+                },
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, meta_path)
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+        self._pending_ops = []
+        self._log_entries = 0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def _replay_log(self) -> None:
+        """Apply ``.meta.log`` operations written by write-behind flushes."""
+        if not os.path.exists(self._log_path):
+            return
+        applied = 0
+        with open(self._log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted flush.
+                    logger.warning("Ignoring unreadable entry in %r", self._log_path)
+                    break
+                record_id = op.get("id")
+                if op.get("op") == "put":
+                    uint_id = int(op["uid"])
+                    previous = self._str_to_int.get(record_id)
+                    if previous is not None:
+                        self._metadata_index.remove(previous, self._metas.get(record_id))
+                        if previous != uint_id:
+                            self._int_to_str.pop(previous, None)
+                    self._str_to_int[record_id] = uint_id
+                    self._int_to_str[uint_id] = record_id
+                    self._texts[record_id] = op.get("text", "")
+                    self._metas[record_id] = op.get("meta") or {}
+                    self._metadata_index.add(uint_id, self._metas[record_id])
+                    self._next_id = max(self._next_id, uint_id + 1)
+                elif op.get("op") == "del":
+                    uint_id = self._str_to_int.pop(record_id, None)
+                    if uint_id is not None:
+                        self._int_to_str.pop(uint_id, None)
+                        self._metadata_index.remove(uint_id, self._metas.get(record_id))
+                    self._texts.pop(record_id, None)
+                    self._metas.pop(record_id, None)
+                applied += 1
+        self._log_entries = applied
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, daemon=True, name="TurboVecFlushThread"
+        )
+        self._flusher.start()
+        _write_behind_stores.add(self)
+
+    def _flush_loop(self) -> None:
+        while not self._stop_flusher.wait(self._flush_interval):
+            if self._dirty:
+                self.flush()
+
     def _build_allowlist(
         self, filter_meta: Dict[str, Any]
     ) -> List[str]:
-        """Return record IDs whose metadata satisfies ``filter_meta``.
-
-        Iterates :attr:`_metas` and collects every ``record_id`` for which
-        :func:`_metadata_matches_filter` returns ``True``.
-        """
+        """Return record IDs whose metadata satisfies ``filter_meta``."""
         return [
-            record_id
-            for record_id, meta in self._metas.items()
-            if _metadata_matches_filter(meta, filter_meta)
+            self._int_to_str[uint_id]
+            for uint_id in self._allowlist_ids(filter_meta).tolist()
+            if uint_id in self._int_to_str
         ]
 
+    def _allowlist_ids(self, filter_meta: Dict[str, Any]) -> np.ndarray:
+        """Sorted uint64 IDs whose metadata satisfies ``filter_meta``.
+
+        Indexed fields are resolved through :attr:`_metadata_index`; any other
+        filter keys are checked with :func:`_metadata_matches_filter` against
+        the narrowed candidates only (or every record if nothing is indexed).
+        """
+        with self._lock:
+            candidates, residual = self._metadata_index.lookup(filter_meta)
+            if candidates is None:
+                candidates = np.fromiter(sorted(self._int_to_str), dtype=np.uint64, count=len(self._int_to_str))
+            if residual and candidates.size:
+                keep = [
+                    _metadata_matches_filter(self._metas.get(self._int_to_str.get(uint_id), {}), residual)
+                    for uint_id in candidates.tolist()
+                ]
+                candidates = candidates[np.asarray(keep, dtype=bool)]
+            return candidates
+
+    def _load_metadata_index(self, data: Optional[Dict[str, Any]]) -> None:
+        """Restore the persisted metadata index, rebuilding it for older sidecars."""
+        if data and list(data.get("fields", ())) == list(MetadataIndex.DEFAULT_FIELDS):
+            self._metadata_index = MetadataIndex.from_dict(data)
+            return
+        self._metadata_index.rebuild(
+            (uint_id, self._metas.get(record_id)) for record_id, uint_id in self._str_to_int.items()
+        )
+
     def _migrate_from_json(self, json_path: str) -> None:
         """Migrate records from a legacy ``vector_store.json`` file."""
         with open(json_path, "r", encoding="utf-8") as f:
@@ -441,7 +778,10 @@ class TurboVecVectorStore(VectorStoreBackend):
         documents = data.get("documents", [])
         metadatas = data.get("metadatas", [])
 
-        migrated = 0
+        valid_ids: List[str] = []
+        valid_vectors: List[List[float]] = []
+        valid_texts: List[str] = []
+        valid_metas: List[Dict[str, Any]] = []
         for record_id, vector, text, meta in zip(ids, vectors, documents, metadatas):
             if not isinstance(vector, list):
                 logger.warning(
@@ -449,18 +789,21 @@ class TurboVecVectorStore(VectorStoreBackend):
                     record_id,
                 )
                 continue
-            # Assign an integer ID and insert directly without re-embedding
-            uint_id = self._next_id
-            self._next_id += 1
-            self._str_to_int[record_id] = uint_id
-            self._int_to_str[uint_id] = record_id
-
-            vec_array = np.array([vector], dtype="float32")
-            id_array = np.array([uint_id], dtype="uint64")
-            self._index.add_with_ids(vec_array, id_array)
-            self._texts[record_id] = text
-            self._metas[record_id] = meta if meta is not None else {}
-            migrated += 1
+            valid_ids.append(record_id)
+            valid_vectors.append(vector)
+            valid_texts.append(text)
+            valid_metas.append(meta if meta is not None else {})
+
+        # Insert directly without re-embedding, one native call for all records.
+        migrated = len(valid_ids)
+        if migrated:
+            with self._lock:
+                self._insert_locked(
+                    valid_ids,
+                    np.asarray(valid_vectors, dtype="float32"),
+                    valid_texts,
+                    valid_metas,
+                )
 
         self.save()
         logger.info("Migrated %d records from %r into turbovec index.", migrated, json_path)
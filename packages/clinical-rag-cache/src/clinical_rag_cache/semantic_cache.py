@@ -1,114 +1,419 @@
+import atexit
 import json
 import logging
 import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Past this many entries, lookups score only the bucket-index candidates.
+ANN_MIN_ENTRIES = 4096
+_ANN_TABLES = 8
+_ANN_BITS = 12
+_ANN_PROBES = 2
+
+_INITIAL_SLOTS = 64
+STATS_ENTRY_LIMIT = 100
+_UNCACHEABLE_MARKERS = ("mock response", "offline mode", "unavailable", "failed")
+
+DEFAULT_FILENAME = os.path.join(os.path.dirname(__file__), "models", "semantic_cache.json")
+
+_open_caches: "weakref.WeakSet[SemanticCache]" = weakref.WeakSet()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning("%s is not a number; using %s.", name, default)
+        return default
+
+
+def _flush_open_caches() -> None:
+    for cache in list(_open_caches):
+        cache.flush()
+
+
+atexit.register(_flush_open_caches)
+
+
+class _BucketIndex:
+    """
+    Random-hyperplane buckets over cache slots.
+
+    Near-duplicate prompts (cosine >= threshold) almost always share a bucket in
+    at least one table; multi-probe also checks the buckets reached by flipping
+    each table's least confident bits.
+    """
+
+    def __init__(self, dim: int, tables: int = _ANN_TABLES, bits: int = _ANN_BITS, probes: int = _ANN_PROBES):
+        rng = np.random.RandomState(7)
+        self.tables = tables
+        self.bits = bits
+        self.probes = probes
+        self.planes = rng.normal(size=(tables * bits, dim)).astype(np.float32)
+        self.weights = 1 << np.arange(bits - 1, -1, -1, dtype=np.int64)
+        self.buckets: List[Dict[int, set]] = [{} for _ in range(tables)]
+        self.codes: Dict[int, List[int]] = {}
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        return (vectors @ self.planes.T).reshape(-1, self.tables, self.bits)
+
+    def add_many(self, slots: List[int], vectors: np.ndarray) -> None:
+        codes = (self._project(vectors) > 0).astype(np.int64) @ self.weights
+        for slot, row in zip(slots, codes.tolist()):
+            self.codes[slot] = row
+            for table, code in zip(self.buckets, row):
+                table.setdefault(code, set()).add(slot)
+
+    def remove(self, slot: int) -> None:
+        row = self.codes.pop(slot, None)
+        if row is None:
+            return
+        for table, code in zip(self.buckets, row):
+            bucket = table.get(code)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del table[code]
+
+    def candidates(self, unit_query: np.ndarray) -> np.ndarray:
+        projection = self._project(unit_query[None, :])[0]
+        codes = ((projection > 0).astype(np.int64) @ self.weights).tolist()
+        flips = self.weights[np.argsort(np.abs(projection), axis=1)[:, :self.probes]].tolist()
+        found: set = set()
+        for table, code, masks in zip(self.buckets, codes, flips):
+            for probe in (code, *(code ^ mask for mask in masks)):
+                bucket = table.get(probe)
+                if bucket:
+                    found.update(bucket)
+        return np.fromiter(found, dtype=np.int64, count=len(found))
+
+
 class SemanticCache:
     """
     Semantic Cache for LLM responses using cosine similarity over embeddings.
-    Persists cached entries to backend/models/semantic_cache.json.
+
+    Entries occupy slots of a unit-normalized float32 matrix, so a semantic
+    lookup is one matrix-vector product; past ``ANN_MIN_ENTRIES`` only the
+    candidates of a random-hyperplane bucket index are scored. Exact prompts
+    resolve through a hash map that also keeps LRU order. Capacity is bounded
+    by LRU eviction and entries can expire after ``ttl_seconds``.
+
+    Persists to a compact ``.npz`` beside ``filename``, which takes precedence
+    over a legacy JSON cache at that path; saves are debounced to one per
+    ``save_interval`` seconds and pending entries are flushed at exit.
     """
-    def __init__(self, filename: Optional[str] = None, threshold: float = 0.95):
+    def __init__(
+        self,
+        filename: Optional[str] = None,
+        threshold: float = 0.95,
+        capacity: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        save_interval: Optional[float] = None,
+    ):
         if filename is None:
-            filename = os.path.join(os.path.dirname(__file__), "models", "semantic_cache.json")
+            filename = DEFAULT_FILENAME
         self.filename = os.path.abspath(filename)
+        self.binary_filename = os.path.splitext(self.filename)[0] + ".npz"
         self.threshold = threshold
-        self.cache: List[Dict[str, Any]] = []
+        if capacity is None:
+            capacity = _env_number("SEMANTIC_CACHE_CAPACITY", 500)
+        self.capacity = max(int(capacity), 1)
+        if ttl_seconds is None:
+            ttl_seconds = _env_number("SEMANTIC_CACHE_TTL_SECONDS", 0)
+        self.ttl_seconds: Optional[float] = float(ttl_seconds) if ttl_seconds and ttl_seconds > 0 else None
+        if save_interval is None:
+            save_interval = _env_number("SEMANTIC_CACHE_SAVE_INTERVAL_S", 30)
+        self.save_interval = max(float(save_interval), 0.0)
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._reset_storage()
         self.load()
+        _open_caches.add(self)
+
+    # ── Slot storage ──
+
+    def _reset_storage(self) -> None:
+        self._matrix: Optional[np.ndarray] = None     # (slots, dim) unit rows
+        self._created = np.zeros(0, dtype=np.float64)  # per-slot insert time (epoch seconds)
+        self._queries: List[Optional[str]] = []
+        self._responses: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._lru: "OrderedDict[str, int]" = OrderedDict()  # query -> slot, least recent first
+        self._ann: Optional[_BucketIndex] = None
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    @property
+    def cache(self) -> List[Dict[str, Any]]:
+        """Entries as ``{"query", "embedding", "response"}`` dicts (unit-normalized
+        embeddings), least recently used first."""
+        with self._lock:
+            return [
+                {
+                    "query": query,
+                    "embedding": self._matrix[slot].tolist(),
+                    "response": self._responses[slot],
+                }
+                for query, slot in self._lru.items()
+            ]
+
+    def _allocate(self, dim: int) -> int:
+        if self._matrix is None:
+            self._matrix = np.zeros((min(_INITIAL_SLOTS, self.capacity), dim), dtype=np.float32)
+            self._created = np.zeros(len(self._matrix), dtype=np.float64)
+        if self._free:
+            return self._free.pop()
+        slot = len(self._queries)
+        if slot == len(self._matrix):
+            size = min(max(2 * slot, _INITIAL_SLOTS), self.capacity)
+            grown = np.zeros((size, dim), dtype=np.float32)
+            grown[:slot] = self._matrix
+            created = np.zeros(size, dtype=np.float64)
+            created[:slot] = self._created
+            self._matrix, self._created = grown, created
+        self._queries.append(None)
+        self._responses.append(None)
+        return slot
+
+    def _insert_many(self, queries: List[str], units: np.ndarray, responses: List[str], created: np.ndarray) -> None:
+        slots = []
+        for query, unit, response, ts in zip(queries, units, responses, created):
+            if query in self._lru:
+                self._evict(query)
+            while len(self._lru) >= self.capacity:
+                self._evict(next(iter(self._lru)))
+                self.evictions += 1
+            slot = self._allocate(units.shape[1])
+            self._matrix[slot] = unit
+            self._created[slot] = ts
+            self._queries[slot] = query
+            self._responses[slot] = response
+            self._lru[query] = slot
+            slots.append(slot)
+        if self._ann is not None:
+            self._ann.add_many(slots, units)
+        elif len(self._lru) >= ANN_MIN_ENTRIES:
+            self._ann = _BucketIndex(units.shape[1])
+            live = list(self._lru.values())
+            self._ann.add_many(live, self._matrix[live])
+
+    def _evict(self, query: str) -> None:
+        slot = self._lru.pop(query)
+        self._queries[slot] = None
+        self._responses[slot] = None
+        self._free.append(slot)
+        if self._ann is not None:
+            self._ann.remove(slot)
+
+    def _expired(self, slot: int, now: float) -> bool:
+        return self.ttl_seconds is not None and self._created[slot] < now - self.ttl_seconds
+
+    @staticmethod
+    def _unit(embedding: Any) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0 or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    # ── Persistence ──
 
     def load(self) -> None:
-        if os.path.exists(self.filename):
+        with self._lock:
+            self._reset_storage()
             try:
-                with open(self.filename, "r", encoding="utf-8") as f:
-                    self.cache = json.load(f)
-                logger.info("Loaded %d entries into semantic cache.", len(self.cache))
+                if os.path.exists(self.binary_filename):
+                    with np.load(self.binary_filename, allow_pickle=False) as data:
+                        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                        units = np.asarray(data["embeddings"], dtype=np.float32)
+                        created = np.asarray(data["created"], dtype=np.float64)
+                    queries, responses = meta["queries"], meta["responses"]
+                elif self.filename != self.binary_filename and os.path.exists(self.filename):
+                    with open(self.filename, "r", encoding="utf-8") as f:
+                        entries = json.load(f) or []
+                    entries = [e for e in entries if e.get("embedding") and e.get("query") and e.get("response")]
+                    if entries:
+                        dim = len(entries[0]["embedding"])
+                        entries = [e for e in entries if len(e["embedding"]) == dim]
+                    queries = [e["query"] for e in entries]
+                    responses = [e["response"] for e in entries]
+                    vectors = np.asarray([e["embedding"] for e in entries], dtype=np.float32).reshape(len(entries), -1)
+                    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                    norms[norms == 0.0] = 1.0
+                    units = vectors / norms
+                    created = np.full(len(entries), time.time(), dtype=np.float64)
+                else:
+                    return
+
+                if self.ttl_seconds is not None and len(created):
+                    keep = created >= time.time() - self.ttl_seconds
+                    units, created = units[keep], created[keep]
+                    queries = [q for q, k in zip(queries, keep) if k]
+                    responses = [r for r, k in zip(responses, keep) if k]
+                if len(queries) > self.capacity:
+                    # Oldest (least recently used) entries come first
+                    units, created = units[-self.capacity:], created[-self.capacity:]
+                    queries, responses = queries[-self.capacity:], responses[-self.capacity:]
+                if len(queries):
+                    self._insert_many(list(queries), units, list(responses), created)
+                logger.info("Loaded %d entries into semantic cache.", len(self._lru))
             except Exception as e:
                 logger.warning("Failed to load semantic cache: %s. Starting fresh.", e)
-                self.cache = []
+                self._reset_storage()
 
     def save(self) -> None:
-        try:
-            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
-            with open(self.filename, "w", encoding="utf-8") as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.warning("Failed to save semantic cache: %s", e)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.binary_filename), exist_ok=True)
+                queries = list(self._lru.keys())
+                slots = list(self._lru.values())
+                if slots:
+                    units = self._matrix[slots]
+                else:
+                    units = np.zeros((0, 0 if self._matrix is None else self._matrix.shape[1]), dtype=np.float32)
+                meta = json.dumps(
+                    {"queries": queries, "responses": [self._responses[s] for s in slots]},
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                ).encode("utf-8")
+                tmp_path = self.binary_filename + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    np.savez(
+                        f,
+                        embeddings=units,
+                        created=self._created[slots],
+                        meta=np.frombuffer(meta, dtype=np.uint8),
+                    )
+                os.replace(tmp_path, self.binary_filename)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except Exception as e:
+                logger.warning("Failed to save semantic cache: %s", e)
 
-    def lookup(self, query_text: str, query_embedding: List[float]) -> Optional[str]:
-        if not self.cache or not query_embedding:
-            self.misses += 1
-            return None
+    def flush(self) -> None:
+        """Write pending entries now instead of waiting for the save interval."""
+        if self._dirty:
+            self.save()
 
-        q_vec = np.array(query_embedding)
-        norm_q = np.linalg.norm(q_vec)
-        if norm_q == 0:
-            self.misses += 1
-            return None
+    # ── Cache API ──
 
-        best_score = -1.0
-        best_response = None
+    def lookup(self, query_text: str, query_embedding: List[float]) -> Optional[str]:
+        with self._lock:
+            now = time.time()
 
-        for entry in self.cache:
-            c_vec = np.array(entry["embedding"])
-            norm_c = np.linalg.norm(c_vec)
-            if norm_c == 0:
-                continue
+            # Direct exact match fast path (hash lookup)
+            slot = self._lru.get(query_text)
+            if slot is not None:
+                if self._expired(slot, now):
+                    self._evict(query_text)
+                    self.expirations += 1
+                    self._dirty = True
+                else:
+                    self._lru.move_to_end(query_text)
+                    logger.info("Semantic cache EXACT HIT for query: '%s'", query_text[:50])
+                    self.hits += 1
+                    return self._responses[slot]
 
-            score = np.dot(q_vec, c_vec) / (norm_q * norm_c)
-            if score > best_score:
-                best_score = score
-                best_response = entry["response"]
+            if query_embedding is None or len(query_embedding) == 0 or not self._lru:
+                self.misses += 1
+                return None
 
-        if best_score >= self.threshold:
-            logger.info("Semantic cache HIT (score: %.4f) for query: '%s'", best_score, query_text[:50])
-            self.hits += 1
-            return best_response
+            q_vec = self._unit(query_embedding)
+            if q_vec is None or q_vec.shape[0] != self._matrix.shape[1]:
+                self.misses += 1
+                return None
 
-        self.misses += 1
-        return None
+            if self._ann is not None:
+                rows = self._ann.candidates(q_vec)
+            else:
+                rows = np.fromiter(self._lru.values(), dtype=np.int64, count=len(self._lru))
+            if self.ttl_seconds is not None and rows.size:
+                rows = rows[self._created[rows] >= now - self.ttl_seconds]
+            if rows.size:
+                scores = self._matrix[rows] @ q_vec
+                best = int(np.argmax(scores))
+                best_score = float(scores[best])
+                if best_score >= self.threshold:
+                    slot = int(rows[best])
+                    self._lru.move_to_end(self._queries[slot])
+                    logger.info("Semantic cache HIT (score: %.4f) for query: '%s'", best_score, query_text[:50])
+                    self.hits += 1
+                    return self._responses[slot]
+
+            self.misses += 1
+            return None
 
     def add(self, query_text: str, query_embedding: List[float], response: str) -> None:
-        if not query_embedding or not response:
+        if query_embedding is None or len(query_embedding) == 0 or not response:
             return
 
         # Avoid caching error messages, offline warnings or blank responses
         response_lower = response.lower()
-        if any(w in response_lower for w in ["mock response", "offline mode", "unavailable", "failed"]):
+        if any(w in response_lower for w in _UNCACHEABLE_MARKERS):
             return
 
-        # Avoid duplicates in cache
-        for entry in self.cache:
-            if entry["query"] == query_text:
-                return
+        unit = self._unit(query_embedding)
+        if unit is None:
+            return
 
-        self.cache.append({
-            "query": query_text,
-            "embedding": query_embedding,
-            "response": response
-        })
-        self.save()
+        with self._lock:
+            # Avoid duplicates in cache
+            if query_text in self._lru:
+                self._lru.move_to_end(query_text)
+                return
+            if self._matrix is not None and unit.shape[0] != self._matrix.shape[1]:
+                # The embedding model changed; cached vectors are no longer comparable.
+                logger.info("Embedding dimension changed; dropping %d semantic cache entries.", len(self._lru))
+                self._reset_storage()
+            self._insert_many([query_text], unit[None, :], [response], np.array([time.time()]))
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
 
     def clear(self) -> None:
-        self.cache = []
-        self.hits = 0
-        self.misses = 0
-        if os.path.exists(self.filename):
-            try:
-                os.remove(self.filename)
-            except Exception:
-                pass
+        with self._lock:
+            self._reset_storage()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self._dirty = False
+            for path in (self.binary_filename, self.filename):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except Exception:
+                        pass
 
     def get_stats(self) -> Dict[str, Any]:
-        return {
-            "hits": self.hits,
-            "misses": self.misses,
-            "size": len(self.cache),
-            "entries": [{"query": e["query"][:100], "response_length": len(e["response"])} for e in self.cache]
-        }
-
+        with self._lock:
+            recent = list(self._lru.items())[-STATS_ENTRY_LIMIT:]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._lru),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "ann_indexed": self._ann is not None,
+                "entries": [
+                    {"query": query[:100], "response_length": len(self._responses[slot])}
+                    for query, slot in reversed(recent)
+                ],
+            }
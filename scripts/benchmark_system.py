@@ -11,6 +11,10 @@ Metrics captured:
   4. Medallion pipeline (Bronze → Silver → Gold) throughput
   5. Process memory footprint (RSS) with all models loaded
   6. Concurrent prediction throughput (requests/sec)
+  7. Batched cohort scoring throughput (rows/sec per model)
+  8. RAG LSH candidate recall@k vs. latency against exact search
+  9. Per-request ASGI middleware overhead on an empty route (p50 / p99, req/s)
+  10. Lakehouse table commit / time-travel latency and storage at 1M rows × 1k versions
 
 Usage:
     python scripts/benchmark_system.py
@@ -68,7 +72,7 @@ def _get_process_memory_mb() -> float:
 
 def benchmark_model_cold_start() -> Dict[str, Any]:
     """Measure time to load all 6 organ ML models from disk."""
-    print("\n[1/6] Benchmarking ML model cold-start loading...")
+    print("\n[1/12] Benchmarking ML model cold-start loading...")
 
     from backend.model_service import ModelService
 
@@ -104,7 +108,7 @@ def benchmark_model_cold_start() -> Dict[str, Any]:
 
 def benchmark_inference_latency(iterations: int = 200) -> Dict[str, Any]:
     """Measure per-model prediction latency over N iterations."""
-    print(f"\n[2/6] Benchmarking inference latency ({iterations} iterations per model)...")
+    print(f"\n[2/12] Benchmarking inference latency ({iterations} iterations per model)...")
 
     from backend.model_service import model_service
     from backend.schemas.prediction import (
@@ -179,7 +183,7 @@ def benchmark_inference_latency(iterations: int = 200) -> Dict[str, Any]:
 
 def benchmark_digital_twin(iterations: int = 100) -> Dict[str, Any]:
     """Measure 10-year digital twin trajectory simulation latency."""
-    print(f"\n[3/6] Benchmarking digital twin simulation ({iterations} iterations)...")
+    print(f"\n[3/12] Benchmarking digital twin simulation ({iterations} iterations)...")
 
     from backend.clinical_digital_twin import digital_twin_engine
     from backend.schemas.peak_healthcare import DigitalTwinSimulationRequest
@@ -223,7 +227,7 @@ def benchmark_digital_twin(iterations: int = 100) -> Dict[str, Any]:
 
 def benchmark_medallion_pipeline() -> Dict[str, Any]:
     """Measure Bronze → Silver → Gold medallion ETL throughput."""
-    print("\n[4/6] Benchmarking Medallion Lakehouse pipeline throughput...")
+    print("\n[4/12] Benchmarking Medallion Lakehouse pipeline throughput...")
 
     from backend.medallion_lakehouse_engine import MedallionLakehouseEngine
 
@@ -270,9 +274,10 @@ def benchmark_medallion_pipeline() -> Dict[str, Any]:
 
 def benchmark_concurrent_throughput(num_workers: int = 8, requests_per_worker: int = 50) -> Dict[str, Any]:
     """Measure concurrent prediction throughput using thread pool."""
-    print(f"\n[5/6] Benchmarking concurrent throughput ({num_workers} workers × {requests_per_worker} requests)...")
+    print(f"\n[5/12] Benchmarking concurrent throughput ({num_workers} workers × {requests_per_worker} requests)...")
 
     from concurrent.futures import ThreadPoolExecutor, as_completed
+
     from backend.model_service import model_service
     from backend.schemas.prediction import HeartInput
 
@@ -289,7 +294,7 @@ def benchmark_concurrent_throughput(num_workers: int = 8, requests_per_worker: i
                 res = model_service.predict_heart(heart_input)
                 if res and res.prediction:
                     successes += 1
-            except Exception as e:
+            except Exception:
                 pass
         return successes
 
@@ -314,13 +319,416 @@ def benchmark_concurrent_throughput(num_workers: int = 8, requests_per_worker: i
     return result
 
 
+# ---------------------------------------------------------------------------
+# Benchmark: Batched Cohort Throughput
+# ---------------------------------------------------------------------------
+
+def benchmark_batch_throughput(batch_sizes: tuple = (1, 64, 1024, 10000)) -> Dict[str, Any]:
+    """Measure rows/sec of ModelService.predict_proba_batch for growing cohort sizes."""
+    print("\n[6/12] Benchmarking batched cohort scoring throughput...")
+
+    from backend.model_service import model_service
+
+    if not model_service.is_available("heart"):
+        model_service.initialize()
+
+    feature_counts = {"diabetes": 9, "heart": 13, "liver": 10, "kidney": 24, "lungs": 15, "stroke": 7}
+    rng = np.random.default_rng(42)
+    results = {}
+
+    for model_name, n_features in feature_counts.items():
+        if not model_service.is_available(model_name):
+            continue
+        per_size = {}
+        for n in batch_sizes:
+            X = rng.random((n, n_features)) * 10.0
+            start = time.perf_counter()
+            try:
+                model_service.predict_proba_batch(model_name, X)
+            except Exception as e:
+                per_size[f"batch_{n}"] = {"error": str(e)}
+                continue
+            elapsed = time.perf_counter() - start
+            per_size[f"batch_{n}"] = {
+                "rows": n,
+                "elapsed_ms": round(elapsed * 1000, 2),
+                "rows_per_sec": round(n / elapsed, 0) if elapsed > 0 else 0.0,
+            }
+        results[model_name] = per_size
+        largest = per_size.get(f"batch_{batch_sizes[-1]}", {})
+        print(f"   {model_name:>10}: {largest.get('rows_per_sec', 0):.0f} rows/sec @ {batch_sizes[-1]} rows")
+
+    return results
+
+
+def benchmark_lsh_recall(
+    n_vectors: int = 50000,
+    dim: int = 128,
+    k: int = 10,
+    n_queries: int = 200,
+    probe_settings: tuple = (0, 2, 4),
+    table_configs: tuple = ((5, 6), (8, 12)),
+) -> Dict[str, Any]:
+    """
+    Compare multi-probe LSH candidate generation + exact re-rank with brute-force search.
+
+    ``table_configs`` are (num_tables, hash_size) pairs: the store default (5, 6)
+    and a finer partitioning that keeps candidate sets small at larger corpus sizes.
+    """
+    print(f"\n[7/12] Benchmarking LSH recall@{k} vs. exact search ({n_vectors} vectors, {dim}-d)...")
+
+    from backend.rag import LocalitySensitiveHash
+
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(max(n_vectors // 250, 1), dim))
+    data = centers[rng.integers(0, len(centers), n_vectors)] + 0.35 * rng.normal(size=(n_vectors, dim))
+    data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+    queries = data[rng.integers(0, n_vectors, n_queries)] + 0.05 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    ids = [str(i) for i in range(n_vectors)]
+
+    exact_us, exact_topk = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        sims = data @ q
+        exact_topk.append(set(np.argpartition(-sims, k)[:k].tolist()))
+        exact_us.append((time.perf_counter() - t0) * 1e6)
+
+    result: Dict[str, Any] = {
+        "vectors": n_vectors,
+        "dim": dim,
+        "exact": {"p50_us": round(_percentile(exact_us, 50), 1), "p99_us": round(_percentile(exact_us, 99), 1)},
+    }
+    print(f"   exact: p50={result['exact']['p50_us']:.0f} µs")
+
+    for num_tables, hash_size in table_configs:
+        lsh = LocalitySensitiveHash(num_tables=num_tables, hash_size=hash_size)
+        start = time.perf_counter()
+        lsh.index_many(ids, data)
+        index_ms = (time.perf_counter() - start) * 1000
+        config_key = f"tables_{num_tables}x{hash_size}"
+        result[config_key] = {"index_ms": round(index_ms, 1)}
+
+        for probes in probe_settings:
+            latencies, recalls, candidate_counts = [], [], []
+            for q, truth in zip(queries, exact_topk):
+                t0 = time.perf_counter()
+                rows = np.fromiter((int(c) for c in lsh.query(q, num_probes=probes)), dtype=np.int64)
+                if rows.size:
+                    sims = data[rows] @ q
+                    top = rows[np.argsort(-sims)[:k]]
+                else:
+                    top = rows
+                latencies.append((time.perf_counter() - t0) * 1e6)
+                recalls.append(len(truth.intersection(top.tolist())) / k)
+                candidate_counts.append(rows.size)
+            r = {
+                "recall_at_k": round(statistics.mean(recalls), 4),
+                "mean_candidates": round(statistics.mean(candidate_counts), 1),
+                "p50_us": round(_percentile(latencies, 50), 1),
+                "p99_us": round(_percentile(latencies, 99), 1),
+            }
+            result[config_key][f"probes_{probes}"] = r
+            print(
+                f"   {num_tables}x{hash_size} probes={probes}: recall@{k}={r['recall_at_k']:.3f} | "
+                f"{r['mean_candidates']:.0f} candidates | p50={r['p50_us']:.0f} µs"
+            )
+
+    return result
+
+
+def benchmark_hnsw_cache(
+    n_vectors: int = 50000,
+    dim: int = 128,
+    k: int = 10,
+    n_queries: int = 200,
+    ef_settings: tuple = (16, 32, 64),
+) -> Dict[str, Any]:
+    """
+    Compare the L2 cache tier's HNSW index with brute-force cosine search.
+
+    Reports build throughput, then recall@1 / recall@k and per-query latency
+    for each ``ef_search`` setting on the same clustered corpus as the LSH run.
+    """
+    print(f"\n[8/12] Benchmarking HNSW cache index vs. exact search ({n_vectors} vectors, {dim}-d)...")
+
+    from backend.hnsw_index import HnswIndex
+
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(max(n_vectors // 250, 1), dim))
+    data = centers[rng.integers(0, len(centers), n_vectors)] + 0.35 * rng.normal(size=(n_vectors, dim))
+    data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+    queries = data[rng.integers(0, n_vectors, n_queries)] + 0.05 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+
+    index = HnswIndex(dim, n_vectors, M=16, ef_construction=100)
+    start = time.perf_counter()
+    for vector in data:
+        index.add(vector)
+    build_sec = time.perf_counter() - start
+
+    exact_us, exact_topk = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        sims = data @ q
+        top = np.argpartition(-sims, k)[:k]
+        exact_topk.append(top[np.argsort(-sims[top])].tolist())
+        exact_us.append((time.perf_counter() - t0) * 1e6)
+
+    result: Dict[str, Any] = {
+        "vectors": n_vectors,
+        "dim": dim,
+        "build_sec": round(build_sec, 2),
+        "inserts_per_sec": round(n_vectors / build_sec, 1),
+        "exact": {"p50_us": round(_percentile(exact_us, 50), 1), "p99_us": round(_percentile(exact_us, 99), 1)},
+    }
+    print(f"   build: {result['inserts_per_sec']:.0f} inserts/sec | exact: p50={result['exact']['p50_us']:.0f} µs")
+
+    for ef in ef_settings:
+        latencies, recall_1, recall_k = [], [], []
+        for q, truth in zip(queries, exact_topk):
+            t0 = time.perf_counter()
+            slots, _ = index.search(q, k=k, ef=max(ef, k))
+            latencies.append((time.perf_counter() - t0) * 1e6)
+            found = slots.tolist()
+            recall_1.append(float(bool(found) and found[0] == truth[0]))
+            recall_k.append(len(set(truth).intersection(found)) / k)
+        r = {
+            "recall_at_1": round(statistics.mean(recall_1), 4),
+            "recall_at_k": round(statistics.mean(recall_k), 4),
+            "p50_us": round(_percentile(latencies, 50), 1),
+            "p99_us": round(_percentile(latencies, 99), 1),
+        }
+        result[f"ef_{ef}"] = r
+        print(
+            f"   ef={ef}: recall@1={r['recall_at_1']:.3f} recall@{k}={r['recall_at_k']:.3f} | "
+            f"p50={r['p50_us']:.0f} µs p99={r['p99_us']:.0f} µs"
+        )
+
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: Buffered Stream Producer
+# ---------------------------------------------------------------------------
+
+def benchmark_stream_producer(
+    n_events: int = 200000,
+    n_patients: int = 500,
+    codecs: tuple = ("none", "zlib", "zstd"),
+    target_events_per_sec: float = 100000.0,
+) -> Dict[str, Any]:
+    """
+    Push synthetic ICU vitals through ``BufferedStreamProducer`` into the local
+    append-log broker, keyed by patient_id.
+
+    Reports the ``send`` rate, the end-to-end rate (send + flush to disk), mean
+    records per batch and the on-disk compression ratio for each codec.
+    """
+    print(f"\n[9/12] Benchmarking buffered stream producer ({n_events} events, {n_patients} patients)...")
+
+    import tempfile
+
+    from backend.stream_producer import COMPRESSION_CODECS, BufferedStreamProducer, LocalLogBroker
+
+    events = [
+        {"patient_id": i % n_patients, "hr": 60 + i % 40, "spo2": 97.5, "rr": 16, "ts": 1_700_000_000_000 + i, "bed": "ICU-3"}
+        for i in range(n_events)
+    ]
+    result: Dict[str, Any] = {"events": n_events, "target_events_per_sec": target_events_per_sec}
+    with tempfile.TemporaryDirectory() as log_dir:
+        broker = LocalLogBroker(log_dir, num_partitions=8)
+        for codec in codecs:
+            if codec not in COMPRESSION_CODECS:
+                continue
+            topic = f"vitals_{codec}"
+            producer = BufferedStreamProducer(broker, compression=codec)
+            start = time.perf_counter()
+            for event in events:
+                producer.send(topic, event, key=event["patient_id"])
+            send_sec = time.perf_counter() - start
+            producer.flush()
+            total_sec = time.perf_counter() - start
+            stats = producer.stats()
+            disk_bytes = broker.size_bytes(topic)
+            producer.close()
+            r = {
+                "send_events_per_sec": round(n_events / send_sec, 1),
+                "end_to_end_events_per_sec": round(n_events / total_sec, 1),
+                "avg_batch_records": stats["avg_batch_records"],
+                "compression_ratio": round(stats["bytes_in"] / max(disk_bytes, 1), 2),
+            }
+            r["meets_target"] = r["end_to_end_events_per_sec"] >= target_events_per_sec
+            result[codec] = r
+            print(
+                f"   {codec}: {r['end_to_end_events_per_sec']:.0f} events/s end-to-end "
+                f"(send {r['send_events_per_sec']:.0f}/s) | {r['avg_batch_records']:.0f} rec/batch | "
+                f"ratio {r['compression_ratio']:.1f}x"
+            )
+
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: Request Overhead
+# ---------------------------------------------------------------------------
+
+def benchmark_request_overhead(n_requests: int = 5000, legacy_layers: int = 7) -> Dict[str, Any]:
+    """
+    Drive an empty ``GET`` route through the ASGI interface directly (no
+    socket, no HTTP client) and report p50 / p99 latency and req/s for:
+
+    - ``bare``: FastAPI with no user middleware
+    - ``pipeline``: the production ``ClinicalRequestPipeline`` + GZip + CORS
+    - ``legacy_basehttp``: ``legacy_layers`` pass-through ``BaseHTTPMiddleware``
+      layers, the per-request cost of the previous middleware stack
+    """
+    print(f"\n[10/12] Benchmarking per-request middleware overhead ({n_requests} requests per stack)...")
+
+    import asyncio
+
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from backend import middleware
+
+    class _PassThrough(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            return await call_next(request)
+
+    def _app(stack: str) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/healthz")
+        async def healthz():
+            return {}
+
+        if stack == "pipeline":
+            app.add_middleware(middleware.ClinicalRequestPipeline)
+            app.add_middleware(GZipMiddleware, minimum_size=1000)
+            app.add_middleware(CORSMiddleware, allow_origins=["*"])
+        elif stack == "legacy_basehttp":
+            for _ in range(legacy_layers):
+                app.add_middleware(_PassThrough)
+        return app
+
+    scope_template = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/healthz", "raw_path": b"/healthz", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 80),
+    }
+
+    async def _drive(app) -> List[float]:
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        for _ in range(200):  # warm-up (route compilation, lazy imports)
+            await app(dict(scope_template), receive, send)
+        latencies = []
+        for _ in range(n_requests):
+            t0 = time.perf_counter()
+            await app(dict(scope_template), receive, send)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+        return latencies
+
+    result: Dict[str, Any] = {"requests": n_requests, "legacy_layers": legacy_layers}
+    for stack in ("bare", "pipeline", "legacy_basehttp"):
+        latencies = asyncio.run(_drive(_app(stack)))
+        r = {
+            "p50_us": round(_percentile(latencies, 50), 1),
+            "p99_us": round(_percentile(latencies, 99), 1),
+            "requests_per_sec": round(n_requests / (sum(latencies) / 1e6), 1),
+        }
+        result[stack] = r
+        print(f"   {stack}: p50 {r['p50_us']:.0f} µs | p99 {r['p99_us']:.0f} µs | {r['requests_per_sec']:.0f} req/s")
+    result["pipeline_overhead_p50_us"] = round(result["pipeline"]["p50_us"] - result["bare"]["p50_us"], 1)
+    result["legacy_overhead_p50_us"] = round(result["legacy_basehttp"]["p50_us"] - result["bare"]["p50_us"], 1)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: Lakehouse Table Versions
+# ---------------------------------------------------------------------------
+
+def benchmark_lakehouse_versions(n_rows: int = 1_000_000, n_versions: int = 1000, batch_rows: int = 100) -> Dict[str, Any]:
+    """
+    Load ``n_rows`` into a ``LakehouseTable``, then commit ``n_versions``
+    alternating INSERT / MERGE batches (half updates of existing keys) and
+    report commit latency, time-travel read latency, Arrow memory, and the
+    file count before and after OPTIMIZE + VACUUM.
+    """
+    print(f"\n[11/12] Benchmarking lakehouse table versions ({n_rows:,} rows, {n_versions} commits)...")
+
+    import pyarrow as pa
+
+    from backend.data_platform.open_table_format import LakehouseTable, TableSchema
+
+    rng = np.random.default_rng(7)
+    table = LakehouseTable("bench_vitals", TableSchema(columns={"patient_id": "str", "hr": "int", "spo2": "float"}))
+    t0 = time.perf_counter()
+    table.insert([{"patient_id": f"P{i}", "hr": 60 + i % 60, "spo2": 95.0} for i in range(n_rows)])
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    next_id = n_rows
+    commit_ms = []
+    for v in range(n_versions):
+        if v % 2:
+            existing = rng.integers(0, n_rows, batch_rows // 2)
+            rows = [{"patient_id": f"P{i}", "hr": 120, "spo2": 90.0} for i in existing]
+            rows += [{"patient_id": f"P{next_id + i}", "hr": 70, "spo2": 98.0} for i in range(batch_rows - len(rows))]
+            t0 = time.perf_counter()
+            table.merge_upsert(rows, match_key="patient_id")
+        else:
+            rows = [{"patient_id": f"P{next_id + i}", "hr": 70, "spo2": 98.0} for i in range(batch_rows)]
+            t0 = time.perf_counter()
+            table.insert(rows)
+        commit_ms.append((time.perf_counter() - t0) * 1000)
+        next_id += batch_rows
+
+    read_ms = []
+    for version in rng.integers(1, table.current_version + 1, 20):
+        t0 = time.perf_counter()
+        table.read_arrow(version=int(version)).num_rows
+        read_ms.append((time.perf_counter() - t0) * 1000)
+
+    files_before = len(table.data_files())
+    arrow_mb_before = pa.total_allocated_bytes() / (1024 * 1024)
+    t0 = time.perf_counter()
+    table.compact()
+    table.vacuum(retain_versions=0)
+    maintenance_ms = (time.perf_counter() - t0) * 1000
+
+    result = {
+        "rows": table.row_count,
+        "versions": table.current_version,
+        "initial_load_ms": round(load_ms, 1),
+        "commit_p50_ms": round(_percentile(commit_ms, 50), 2),
+        "commit_p99_ms": round(_percentile(commit_ms, 99), 2),
+        "time_travel_read_p50_ms": round(_percentile(read_ms, 50), 2),
+        "arrow_memory_mb_before_vacuum": round(arrow_mb_before, 1),
+        "arrow_memory_mb_after_vacuum": round(pa.total_allocated_bytes() / (1024 * 1024), 1),
+        "live_files_before_optimize": files_before,
+        "live_files_after_optimize": len(table.data_files()),
+        "optimize_vacuum_ms": round(maintenance_ms, 1),
+    }
+    print(f"   Commit p50 {result['commit_p50_ms']:.2f} ms | p99 {result['commit_p99_ms']:.2f} ms | "
+          f"time-travel read p50 {result['time_travel_read_p50_ms']:.2f} ms")
+    print(f"   Arrow memory {result['arrow_memory_mb_before_vacuum']:.0f} MB -> "
+          f"{result['arrow_memory_mb_after_vacuum']:.0f} MB | files {files_before} -> {result['live_files_after_optimize']}")
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Benchmark: Memory Footprint
 # ---------------------------------------------------------------------------
 
 def benchmark_memory_footprint() -> Dict[str, Any]:
     """Report current process memory footprint."""
-    print("\n[6/6] Measuring memory footprint...")
+    print("\n[12/12] Measuring memory footprint...")
 
     rss_mb = _get_process_memory_mb()
 
@@ -380,6 +788,16 @@ def main():
         print(f"   Medallion benchmark skipped: {e}")
 
     report["concurrent_throughput"] = benchmark_concurrent_throughput()
+    report["batch_throughput"] = benchmark_batch_throughput()
+    report["lsh_recall"] = benchmark_lsh_recall()
+    report["hnsw_cache"] = benchmark_hnsw_cache()
+    report["stream_producer"] = benchmark_stream_producer()
+    report["request_overhead"] = benchmark_request_overhead()
+    try:
+        report["lakehouse_versions"] = benchmark_lakehouse_versions()
+    except ImportError as e:
+        report["lakehouse_versions"] = {"error": str(e)}
+        print(f"   Lakehouse benchmark skipped: {e}")
     report["memory"] = benchmark_memory_footprint()
 
     total_sec = time.perf_counter() - overall_start
@@ -416,6 +834,14 @@ def main():
     if "requests_per_sec" in ct:
         print(f"  {'Concurrent Throughput':<45} {ct['requests_per_sec']:>15.0f} req/s")
 
+    ro = report.get("request_overhead", {})
+    if "pipeline" in ro:
+        print(f"  {'Empty Route via Middleware (p50/p99)':<45} {ro['pipeline']['p50_us']:>7.0f} / {ro['pipeline']['p99_us']:>7.0f} µs")
+
+    lv = report.get("lakehouse_versions", {})
+    if "commit_p50_ms" in lv:
+        print(f"  {'Lakehouse Commit @1M rows (p50/p99)':<45} {lv['commit_p50_ms']:>7.1f} / {lv['commit_p99_ms']:>7.1f} ms")
+
     mem = report.get("memory", {})
     if "process_rss_mb" in mem:
         print(f"  {'Process Memory (RSS)':<45} {mem['process_rss_mb']:>17.0f} MB")
@@ -0,0 +1,129 @@
+"""Local stand-in for the Cloudflare embedding worker.
+
+Serves ``POST /embed`` with the worker's contract (``{"text": [...]}`` in,
+``{"shape": [n, dim], "data": [[...], ...]}`` out) using deterministic
+hash-seeded unit vectors, so tests and benchmarks can exercise the batched
+embedding client without network access:
+
+    python scripts/embedding_stub_server.py --port 8790 --latency-ms 20
+    EMBEDDING_SERVICE_URL=http://127.0.0.1:8790/embed python scripts/benchmark_system.py
+
+In-process use::
+
+    server = EmbeddingStubServer(latency_ms=5).start()
+    ...  # server.url, server.requests, server.texts
+    server.stop()
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import numpy as np
+
+
+def stub_embedding(text: str, dim: int = 768) -> List[float]:
+    """Deterministic unit vector for ``text`` (same text -> same vector)."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).normal(size=dim)
+    return (vector / np.linalg.norm(vector)).astype(np.float32).tolist()
+
+
+class EmbeddingStubServer:
+    """Threaded HTTP server that counts requests and embedded texts."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dim: int = 768, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency_s = latency_ms / 1000.0
+        self.requests = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/embed"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/health":
+                    self.send_error(404)
+                    return
+                self._reply({"status": "healthy", "service": "embedding-stub"})
+
+            def do_POST(self):
+                if self.path != "/embed":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    texts = json.loads(self.rfile.read(length) or b"{}").get("text", [])
+                except ValueError:
+                    self.send_error(400)
+                    return
+                if isinstance(texts, str):
+                    texts = [texts]
+                with server._lock:
+                    server.requests += 1
+                    server.texts += len(texts)
+                if server.latency_s:
+                    threading.Event().wait(server.latency_s)
+                self._reply({
+                    "shape": [len(texts), server.dim],
+                    "data": [stub_embedding(str(t), server.dim) for t in texts],
+                })
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "EmbeddingStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="EmbeddingStubServer")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the embedding worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial per-request latency")
+    args = parser.parse_args()
+
+    server = EmbeddingStubServer(args.host, args.port, args.dim, args.latency_ms)
+    print(f"Embedding stub listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -116,6 +116,10 @@ def pytest_collection_modifyitems(config, items):
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test."""
+    from backend.cache_service import cache
+
+    # Cached views were computed from the previous test's database
+    cache.clear()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -126,6 +130,15 @@ def db_session():
 
 
 
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    """Cached principals point at user rows of a previous test's database."""
+    from backend.principal_cache import principal_cache
+
+    principal_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Override dependency and return TestClient."""
@@ -161,6 +174,15 @@ def mock_cloudflare_network_calls(monkeypatch):
 
     monkeypatch.setattr(requests, "post", patched_requests_post)
 
+    # Pooled sessions (e.g. the batched embedding client) bypass requests.post
+    orig_session_request = requests.Session.request
+    def patched_session_request(self, method, url, *args, **kwargs):
+        if "ai-healthcare-model.pavan9b.workers.dev" in str(url):
+            return patched_requests_post(str(url), *args, **kwargs)
+        return orig_session_request(self, method, url, *args, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "request", patched_session_request)
+
     orig_httpx_request = httpx.AsyncClient.request
     async def patched_httpx_request(self, method, url, *args, **kwargs):
         url_str = str(url)
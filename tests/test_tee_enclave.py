@@ -44,3 +44,20 @@ async def test_enclave_async_wipes_memory():
     assert result == "SENSITIVE_PATIENT_DATA"
     # Because of the memory wipe, the bytearray should now be null bytes
     assert sensitive_data == bytearray(b"\x00" * 22)
+
+
+def test_attest_model_digest_uses_secure_boot_registry(tmp_path):
+    from backend.tee_enclave import TRUSTED_MODEL_HASHES, measure_model_file
+
+    model_file = tmp_path / "model.pkl"
+    model_file.write_bytes(b"weights")
+    digest = measure_model_file(str(model_file))
+    TRUSTED_MODEL_HASHES.pop("digest-test", None)
+
+    enclave = ConfidentialEnclave()
+    assert enclave.attest_model_digest("digest-test", digest) is True
+    assert enclave.attested_digest == digest
+
+    with pytest.raises(EnclaveAttestationError):
+        ConfidentialEnclave().attest_model_digest("digest-test", "0" * 64)
+    TRUSTED_MODEL_HASHES.pop("digest-test", None)
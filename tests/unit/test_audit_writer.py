@@ -0,0 +1,135 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import audit, models
+from backend.database import Base
+
+
+@pytest.fixture
+def audit_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'audit.db').as_posix()}")
+    Base.metadata.create_all(bind=engine)
+    writer = audit.AuditBatchWriter(batch_size=50, flush_interval_ms=5)
+    monkeypatch.setattr(audit, "AUDIT_WRITE_MODE", "async")
+    monkeypatch.setattr(audit, "audit_writer", writer)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield db, writer
+    finally:
+        writer.close(timeout=5)
+        db.close()
+        engine.dispose()
+
+
+def _user(db, username, facility_id=None):
+    user = models.User(username=username, email=f"{username}@example.com", role="doctor", facility_id=facility_id)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_async_events_are_batched_resolved_and_chained(audit_db):
+    db, writer = audit_db
+    facility = models.HospitalFacility(name="North Campus")
+    db.add(facility)
+    db.commit()
+    actor = _user(db, "batch_actor", facility_id=facility.id)
+
+    for i in range(120):
+        assert audit.record_audit_event(
+            db,
+            actor_user_id=actor.id,
+            action="VIEW_SENSITIVE_DATA",
+            details={"resource_id": i, "email": "patient@example.com"},
+        ) is None
+    assert audit.flush_audit_events(timeout=5)
+
+    rows = db.query(models.AuditLog).order_by(models.AuditLog.id).all()
+    assert len(rows) == 120
+    assert {row.facility_id for row in rows} == {facility.id}
+    assert all("patient@example.com" not in row.details for row in rows)
+    assert rows[0].prev_hash == audit.GENESIS_HASH
+    assert all(later.prev_hash == earlier.entry_hash for earlier, later in zip(rows, rows[1:]))
+    stats = writer.stats()
+    assert stats["written"] == 120 and stats["batches"] < 120
+    assert audit.verify_audit_chain(db)["chain_valid"]
+
+
+def test_durable_actions_commit_inline_and_extend_the_chain(audit_db):
+    db, _ = audit_db
+    actor = _user(db, "durable_actor")
+    audit.record_audit_event(db, actor_user_id=actor.id, action="LOGIN_SUCCESS")
+    assert audit.flush_audit_events(timeout=5)
+
+    entry = audit.record_audit_event(db, actor_user_id=actor.id, action="DELETE_USER", target_user_id=actor.id)
+    assert entry is not None and entry.id is not None
+    forced = audit.record_audit_event(db, actor_user_id=actor.id, action="LOGIN_SUCCESS", durable=True)
+    assert forced is not None
+
+    queued = db.query(models.AuditLog).filter_by(action="LOGIN_SUCCESS").order_by(models.AuditLog.id).first()
+    assert entry.prev_hash == queued.entry_hash
+    assert forced.prev_hash == entry.entry_hash
+    assert audit.verify_audit_chain(db)["total_logs_verified"] == 3
+
+
+def test_writers_in_separate_processes_do_not_fork_the_chain(audit_db):
+    db, _ = audit_db
+    actor = _user(db, "multi_worker_actor")
+    url = db.get_bind().url
+    # Each writer owns its engine and process-local chain_lock, as separate workers would.
+    workers = [(audit.AuditBatchWriter(), create_engine(url)) for _ in range(2)]
+
+    def append(writer, engine):
+        for i in range(15):
+            event = audit._PendingAuditEvent(
+                actor_user_id=actor.id, target_user_id=None, facility_id=None,
+                action="RECORD_VITALS", details=str(i), timestamp=datetime.now(timezone.utc),
+            )
+            writer._write_batch(engine, [event])
+
+    threads = [threading.Thread(target=append, args=worker) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for writer, engine in workers:
+        writer.close(timeout=5)
+        engine.dispose()
+
+    rows = db.query(models.AuditLog).order_by(models.AuditLog.id).all()
+    assert len(rows) == 30
+    assert len({row.prev_hash for row in rows}) == 30
+    assert audit.verify_audit_chain(db)["chain_valid"]
+
+
+def test_chain_verification_flags_edited_rows(audit_db):
+    db, _ = audit_db
+    actor = _user(db, "tamper_actor")
+    for action in ("LOGIN_SUCCESS", "UPDATE_PROFILE", "RECORD_VITALS"):
+        audit.record_audit_event(db, actor_user_id=actor.id, action=action)
+    assert audit.flush_audit_events(timeout=5)
+
+    edited = db.query(models.AuditLog).filter_by(action="UPDATE_PROFILE").one()
+    edited.details = "rewritten"
+    db.commit()
+
+    report = audit.verify_audit_chain(db)
+    assert report["chain_valid"] is False
+    assert report["tampered_log_ids"] == [edited.id]
+
+
+def test_full_queue_writes_on_the_caller_thread(audit_db, monkeypatch):
+    db, _ = audit_db
+    writer = audit.AuditBatchWriter(max_queue=1, flush_interval_ms=1000)
+    monkeypatch.setattr(audit, "audit_writer", writer)
+    actor = _user(db, "overflow_actor")
+
+    for _ in range(3):
+        audit.record_audit_event(db, actor_user_id=actor.id, action="RECORD_VITALS")
+    assert writer.stats()["overflow_inline"] >= 1
+    assert writer.close(timeout=5)
+    assert db.query(models.AuditLog).count() == 3
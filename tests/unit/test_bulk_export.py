@@ -0,0 +1,176 @@
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import bulk_export, fhir, models
+from backend.bulk_export import BulkExportEngine
+from backend.database import Base
+from backend.interoperability import CONSENT_SCOPE, _parse_export_filters, _sign_manifest
+
+
+@pytest.fixture
+def export_db(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'bulk.db').as_posix()}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    db = factory()
+    try:
+        yield db, factory
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def _seed_group(db, patients=5, encounters=2, vitals=3):
+    facility = models.HospitalFacility(name="Bulk Campus")
+    other = models.HospitalFacility(name="Other Campus")
+    db.add_all([facility, other])
+    db.flush()
+    consenting = []
+    for i in range(patients + 2):
+        facility_id = other.id if i == patients + 1 else facility.id
+        patient = models.User(
+            username=f"bulk_patient_{i}", email=f"bulk_patient_{i}@example.com",
+            full_name=f"Bulk Patient {i}", role="patient", facility_id=facility_id,
+        )
+        db.add(patient)
+        db.flush()
+        if i != patients:  # one facility patient without consent
+            db.add(models.InteroperabilityConsent(
+                patient_id=patient.id, facility_id=facility_id, scope=CONSENT_SCOPE, purpose="Registry export",
+            ))
+        if i < patients:
+            consenting.append(patient.id)
+        for _ in range(encounters):
+            encounter = models.Encounter(patient_id=patient.id, encounter_type="OPD", reason="Follow-up")
+            db.add(encounter)
+            db.flush()
+            for v in range(vitals):
+                db.add(models.VitalObservation(
+                    patient_id=patient.id, encounter_id=encounter.id, heart_rate=70 + v, spo2=98.0,
+                ))
+    db.commit()
+    return facility, consenting
+
+
+def _read_ndjson(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_group_export_writes_signed_per_type_ndjson(export_db, tmp_path):
+    db, factory = export_db
+    facility, consenting = _seed_group(db)
+    engine = BulkExportEngine(root_dir=str(tmp_path / "jobs"), max_workers=3, patient_batch=2, session_factory=factory)
+
+    state = engine.kick_off(
+        db, requested_by_id=None, facility_id=facility.id,
+        filters=_parse_export_filters("Encounter,Observation", None), status_url="http://api/jobs/x",
+    )
+    assert engine.wait(state["job_id"], timeout=10)
+    engine.close()
+
+    status = engine.status(state["job_id"])
+    assert status["status"] == "completed" and status["patient_count"] == len(consenting)
+    manifest = status["manifest"]
+    signature = manifest.pop("signature")
+    assert signature == _sign_manifest(manifest)
+    counts = {item["type"]: item["count"] for item in manifest["output"]}
+    assert counts == {"Patient": 5, "Encounter": 10, "Observation": 30}
+
+    observations = _read_ndjson(engine.file_path(state["job_id"], "Observation"))
+    subjects = {obs["subject"]["reference"] for obs in observations}
+    assert subjects == {f"Patient/{patient_id}" for patient_id in consenting}
+    for resource in observations:
+        fhir.validate_fhir_resource(resource)
+    assert manifest["output"][0]["url"] == "http://api/jobs/x/files/Patient.ndjson"
+
+
+def test_failed_job_resumes_from_checkpoint_without_duplicates(export_db, tmp_path, monkeypatch):
+    db, factory = export_db
+    facility, _ = _seed_group(db, patients=6)
+    engine = BulkExportEngine(root_dir=str(tmp_path / "jobs"), max_workers=2, patient_batch=2, session_factory=factory)
+    original = bulk_export.iter_group_resources
+    calls = {"Observation": 0}
+
+    def flaky(db, resource_type, patient_ids, filters, chunk_rows):
+        if resource_type == "Observation":
+            calls["Observation"] += 1
+            if calls["Observation"] == 2:
+                raise RuntimeError("database went away")
+        return original(db, resource_type, patient_ids, filters, chunk_rows)
+
+    monkeypatch.setattr(bulk_export, "iter_group_resources", flaky)
+    state = engine.kick_off(db, requested_by_id=None, facility_id=facility.id, filters=_parse_export_filters("Observation", None))
+    job_id = state["job_id"]
+    assert engine.wait(job_id, timeout=10)
+    failed = engine.status(job_id)
+    assert failed["status"] == "failed" and failed["tasks"]["Observation"]["cursor"] == 2
+    engine.close()
+
+    # A fresh engine (new process) sees only the on-disk checkpoint plus a torn tail
+    with open(engine.file_path(job_id, "Observation"), "ab") as handle:
+        handle.write(b'{"resourceType":"Observ')
+    restarted = BulkExportEngine(root_dir=str(tmp_path / "jobs"), max_workers=2, patient_batch=2, session_factory=factory)
+    restarted.resume(job_id)
+    assert restarted.wait(job_id, timeout=10)
+    restarted.close()
+
+    observations = _read_ndjson(restarted.file_path(job_id, "Observation"))
+    assert len(observations) == len({obs["id"] for obs in observations}) == 6 * 2 * 3
+    assert restarted.status(job_id)["manifest"]["output"][1]["count"] == 36
+
+
+def test_job_is_resumed_by_one_worker_and_polled_from_disk_by_others(export_db, tmp_path, monkeypatch):
+    db, factory = export_db
+    facility, _ = _seed_group(db, patients=2)
+    root = str(tmp_path / "jobs")
+    original = bulk_export.iter_group_resources
+    release = threading.Event()
+
+    def gated(*args, **kwargs):
+        release.wait(10)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(bulk_export, "iter_group_resources", gated)
+    owner = BulkExportEngine(root_dir=root, max_workers=1, session_factory=factory)
+    job_id = owner.kick_off(db, requested_by_id=None, facility_id=facility.id, filters=_parse_export_filters("Encounter", None))["job_id"]
+    other = BulkExportEngine(root_dir=root, max_workers=1, session_factory=factory)
+    assert other.resume_pending() == []
+    assert other.status(job_id)["status"] in ("queued", "running")
+
+    release.set()
+    assert owner.wait(job_id, timeout=10)
+    owner.close()
+    assert other.status(job_id)["status"] == "completed"
+
+    # Orphaned by a crashed owner: of two workers starting up, only one resumes it.
+    state_path = tmp_path / "jobs" / job_id / "state.json"
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    state["status"] = "running"
+    state["tasks"]["Encounter"].update(status="running", cursor=0, count=0, bytes=0)
+    state_path.write_text(json.dumps(state), encoding="utf-8")
+    workers = [BulkExportEngine(root_dir=root, max_workers=1, session_factory=factory) for _ in range(2)]
+    assert sorted(len(worker.resume_pending()) for worker in workers) == [0, 1]
+    for worker in workers:
+        assert worker.wait(job_id, timeout=10)
+        worker.close()
+    assert len(_read_ndjson(owner.file_path(job_id, "Encounter"))) == 2 * 2
+    assert other.status(job_id)["manifest"]["output"][1]["count"] == 4
+
+
+def test_cancel_removes_job_files(export_db, tmp_path):
+    db, factory = export_db
+    facility, _ = _seed_group(db, patients=2)
+    engine = BulkExportEngine(root_dir=str(tmp_path / "jobs"), max_workers=1, session_factory=factory)
+    job_id = engine.kick_off(db, requested_by_id=None, facility_id=facility.id, filters=_parse_export_filters(None, None))["job_id"]
+    engine.wait(job_id, timeout=10)
+
+    assert engine.cancel(job_id)
+    engine.close()
+    assert engine.status(job_id) is None
+    assert not (tmp_path / "jobs" / job_id).exists()
+    assert BulkExportEngine(root_dir=str(tmp_path / "jobs")).resume_pending() == []
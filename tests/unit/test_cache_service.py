@@ -1,14 +1,26 @@
+import asyncio
+import pickle
 import threading
+import time
 from unittest.mock import MagicMock
 
-from backend.cache_service import SystemCache
+import pytest
 
+from backend import cache_service
+from backend.cache_service import SystemCache, cached_response
 
-def _redis_backed_cache():
+
+def _local_cache(max_entries=10000):
     cache = object.__new__(SystemCache)
+    cache._init_local_tier()
+    cache._l1_max_entries = max_entries
+    cache.redis_client = None
+    return cache
+
+
+def _redis_backed_cache():
+    cache = _local_cache()
     cache.redis_client = MagicMock()
-    cache._store_lock = threading.Lock()
-    cache._in_memory_store = {}
     return cache
 
 
@@ -34,3 +46,207 @@ def test_redis_safe_set_uses_supported_ttl_api():
     assert args[0] == "clinical-cache"
     assert kwargs == {"ex": 45}
     cache.redis_client.setex.assert_not_called()
+
+
+def test_redis_get_many_serves_l1_then_single_mget():
+    cache = _redis_backed_cache()
+    cache.redis_client.mget.return_value = [pickle.dumps([0.1]), None]
+    cache._in_memory_store["emb:b"] = (None, [0.2])
+
+    found = cache.get_many(["emb:a", "emb:b", "emb:c"])
+
+    cache.redis_client.mget.assert_called_once_with(["emb:a", "emb:c"])
+    assert found == {"emb:a": [0.1], "emb:b": [0.2]}
+    # Redis hits are promoted into L1
+    assert cache.get_many(["emb:a"]) == {"emb:a": [0.1]}
+    cache.redis_client.mget.assert_called_once()
+
+
+def test_redis_set_many_pipelines_writes():
+    cache = _redis_backed_cache()
+    pipe = cache.redis_client.pipeline.return_value
+
+    cache.set_many({"emb:a": [0.1], "emb:b": [0.2]}, ttl=60)
+
+    assert pipe.set.call_count == 2
+    assert all(call.kwargs == {"ex": 60} for call in pipe.set.call_args_list)
+    pipe.execute.assert_called_once()
+    cache.redis_client.set.assert_not_called()
+
+
+def test_l1_serves_repeat_reads_without_redis_round_trip():
+    cache = _redis_backed_cache()
+    cache.redis_client.get.return_value = pickle.dumps({"beds": 12})
+
+    assert cache.get("dashboard:icu") == {"beds": 12}
+    assert cache.get("dashboard:icu") == {"beds": 12}
+
+    cache.redis_client.get.assert_called_once_with("dashboard:icu")
+    expiry, _ = cache._in_memory_store["dashboard:icu"]
+    assert expiry <= time.time() + cache._l1_ttl
+
+
+def test_l1_is_bounded_lru():
+    cache = _local_cache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats["l1"]["evictions"] == 1
+
+
+def test_sweep_expired_drops_stale_entries():
+    cache = _local_cache()
+    cache.set("short", 1, ttl=60)
+    cache.set("forever", 2)
+    cache._in_memory_store["short"] = (time.time() - 1, 1)
+
+    assert cache.sweep_expired() == 1
+    assert list(cache._in_memory_store) == ["forever"]
+
+
+def test_stats_track_hits_misses_per_prefix():
+    cache = _local_cache()
+    cache.set("telemetry_snapshot:1", {"ok": True})
+    cache.get("telemetry_snapshot:1")
+    cache.get("telemetry_snapshot:2")
+    cache.get_many(["emb:x"])
+
+    prefixes = cache.stats["prefixes"]
+    assert prefixes["telemetry_snapshot"]["hits"] == 1
+    assert prefixes["telemetry_snapshot"]["misses"] == 1
+    assert prefixes["telemetry_snapshot"]["hit_rate"] == 0.5
+    assert prefixes["emb"]["misses"] == 1
+    assert prefixes["emb"]["avg_latency_ms"] >= 0.0
+
+
+@pytest.fixture
+def isolated_cache(monkeypatch):
+    local = _local_cache()
+    monkeypatch.setattr(cache_service, "cache", local)
+    return local
+
+
+def test_cached_response_single_flight_across_threads(isolated_cache):
+    calls = []
+    release = threading.Event()
+
+    @cached_response(ttl=60, key_prefix="dashboard")
+    def build_dashboard(facility_id=None):
+        calls.append(facility_id)
+        release.wait(2)
+        return {"facility": facility_id}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(build_dashboard(facility_id=7))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [7]
+    assert results == [{"facility": 7}] * 8
+
+
+async def test_cached_response_single_flight_across_coroutines(isolated_cache):
+    calls = []
+
+    @cached_response(ttl=60, key_prefix="dashboard")
+    async def build_dashboard(facility_id=None):
+        calls.append(facility_id)
+        await asyncio.sleep(0.02)
+        return {"facility": facility_id}
+
+    results = await asyncio.gather(*(build_dashboard(facility_id=3) for _ in range(10)))
+
+    assert calls == [3]
+    assert results == [{"facility": 3}] * 10
+
+
+def test_cached_response_waits_for_other_worker_holding_lock(isolated_cache):
+    isolated_cache.redis_client = MagicMock()
+    isolated_cache.redis_client.get.return_value = None
+    isolated_cache.redis_client.set.return_value = None  # SET NX lost: another worker computes
+    calls = []
+
+    @cached_response(ttl=60, key_prefix="dashboard", lock_timeout=1.0)
+    def build_dashboard(facility_id=None):
+        calls.append(facility_id)
+        return {"facility": facility_id}
+
+    key = cache_service._response_cache_key("dashboard", build_dashboard.__wrapped__, {"facility_id": 5})
+    timer = threading.Timer(0.1, lambda: isolated_cache._l1_put_many({key: {"facility": "peer"}}, 60, True))
+    timer.start()
+
+    assert build_dashboard(facility_id=5) == {"facility": "peer"}
+    assert calls == []
+    timer.join()
+
+
+def test_tag_bump_invalidates_only_tagged_views(isolated_cache):
+    calls = []
+
+    @cached_response(ttl=60, key_prefix="timeline", tags=("patient:{patient_id}",))
+    def patient_timeline(patient_id):
+        calls.append(patient_id)
+        return {"patient": patient_id, "version": len(calls)}
+
+    patient_timeline(1)
+    patient_timeline(2)
+    assert patient_timeline(1) == {"patient": 1, "version": 1}
+
+    assert cache_service.invalidate_tags("patient:1") == 1
+    assert patient_timeline(1) == {"patient": 1, "version": 3}
+    assert patient_timeline(2) == {"patient": 2, "version": 2}
+    assert calls == [1, 2, 1]
+
+
+def test_callable_tags_scope_keys_per_facility(isolated_cache):
+    calls = []
+
+    @cached_response(ttl=60, key_prefix="ops", tags=lambda args: [cache_service.facility_tag(args["user"]["facility_id"])])
+    def operations_view(user):
+        calls.append(user["facility_id"])
+        return {"facility": user["facility_id"]}
+
+    for facility_id in (1, 2, None):
+        assert operations_view({"facility_id": facility_id}) == {"facility": facility_id}
+
+    # A write in facility 1 refreshes facility 1 and the global view, not facility 2
+    cache_service.invalidate_tags(*cache_service.facility_write_tags(1))
+    for facility_id in (1, 2, None):
+        operations_view({"facility_id": facility_id})
+
+    assert calls == [1, 2, None, 1, None]
+
+
+def test_invalidate_cache_prefix_bumps_implicit_prefix_tag(isolated_cache):
+    calls = []
+
+    @cached_response(ttl=60, key_prefix="reports")
+    def report(name=None):
+        calls.append(name)
+        return name
+
+    report(name="census")
+    report(name="census")
+    cache_service.invalidate_cache_prefix("reports")
+    report(name="census")
+
+    assert calls == ["census", "census"]
+
+
+def test_redis_tag_versions_use_one_mget_and_pipelined_incr():
+    cache = _redis_backed_cache()
+    cache.redis_client.mget.return_value = [b"3", None]
+
+    assert cache.get_tag_versions(["patient:1", "facility:all"]) == {"patient:1": 3, "facility:all": 0}
+    cache.redis_client.mget.assert_called_once_with(["tagv:patient:1", "tagv:facility:all"])
+
+    cache.bump_tags(["patient:1"])
+    cache.redis_client.pipeline.return_value.incr.assert_called_once_with("tagv:patient:1")
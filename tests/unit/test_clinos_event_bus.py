@@ -5,6 +5,7 @@ Tests the in-memory publish/subscribe pattern of the ClinicalEventBus.
 from __future__ import annotations
 
 import asyncio
+import sys
 from unittest.mock import patch
 
 import pytest
@@ -93,7 +94,6 @@ def test_event_bus_does_not_log_redis_credentials(caplog):
     caplog.set_level("INFO", logger="backend.event_bus")
     bus = ClinicalEventBus()
 
-    import sys
     from unittest.mock import MagicMock
 
     try:
@@ -110,3 +110,201 @@ def test_event_bus_does_not_log_redis_credentials(caplog):
     assert "Redis Streams backend configured" in caplog.text
     assert redis_url not in caplog.text
     assert "top-secret" not in caplog.text
+
+
+@pytest.fixture
+async def _redis_event_bus():
+    """Event bus wired to a fakeredis Streams stand-in, restored to defaults afterwards."""
+    # Other modules may have stubbed ``redis`` in sys.modules; fakeredis needs the real client
+    saved = {name: module for name, module in sys.modules.items() if name == "redis" or name.startswith("redis.")}
+    if not hasattr(saved.get("redis"), "ResponseError"):
+        for name in saved:
+            sys.modules.pop(name)
+    try:
+        fakeredis = pytest.importorskip("fakeredis")
+
+        from backend import event_bus as event_bus_module
+        from backend.event_bus import ClinicalEventBus
+
+        bus = ClinicalEventBus()
+        await bus.stop()
+        bus._subscribers.clear()
+        bus.reset_metrics()
+        bus._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        bus.configure(consumer_group="test-group", consumer_name="replica-a", claim_idle_ms=0)
+        yield bus
+        await bus.stop()
+        bus._redis = None
+        bus._subscribers.clear()
+        bus.reset_metrics()
+        bus.configure(
+            consumer_group=event_bus_module.EVENT_BUS_CONSUMER_GROUP,
+            consumer_name=event_bus_module.EVENT_BUS_CONSUMER_NAME,
+            claim_idle_ms=event_bus_module.EVENT_BUS_CLAIM_IDLE_MS,
+        )
+    finally:
+        for name in [n for n in sys.modules if n == "redis" or n.startswith("redis.")]:
+            sys.modules.pop(name)
+        sys.modules.update(saved)
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_redis_publish_pipelines_concurrent_xadds(_redis_event_bus):
+    bus = _redis_event_bus
+    redis = bus._redis
+    pipelines = []
+    original_pipeline = redis.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipelines.append(kwargs)
+        return original_pipeline(*args, **kwargs)
+
+    redis.pipeline = counting_pipeline
+    await asyncio.gather(*(bus.publish("VITALS_RECORDED", {"seq": i}) for i in range(50)))
+
+    assert len(pipelines) == 1
+    assert await redis.xlen("AI Healthcare System:events:VITALS_RECORDED") == 50
+    assert bus.metrics()["topics"]["VITALS_RECORDED"]["published"] == 50
+
+
+@pytest.mark.asyncio
+async def test_redis_consumer_group_delivers_once_and_acks(_redis_event_bus):
+    bus = _redis_event_bus
+    received: list[dict] = []
+
+    async def handler(payload: dict) -> None:
+        received.append(payload)
+
+    bus.subscribe("ADMISSION_EVENT", handler)
+    await bus.start()
+    await bus.publish_many(("ADMISSION_EVENT", {"seq": i}) for i in range(5))
+    await _wait_for(lambda: len(received) == 5)
+
+    # Delivered exactly once (no extra local dispatch), in order, and acknowledged
+    await asyncio.sleep(0.05)
+    assert [p["seq"] for p in received] == [0, 1, 2, 3, 4]
+    pending = await bus._redis.xpending("AI Healthcare System:events:ADMISSION_EVENT", "test-group")
+    assert pending["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_consumer_claims_entries_left_by_dead_replica(_redis_event_bus):
+    bus = _redis_event_bus
+    redis = bus._redis
+    stream = "AI Healthcare System:events:CARE_EVENT"
+    received: list[dict] = []
+
+    async def handler(payload: dict) -> None:
+        received.append(payload)
+
+    bus.subscribe("CARE_EVENT", handler)
+    await bus._ensure_groups(bus._stream_keys())
+    await bus.publish_many(("CARE_EVENT", {"seq": i}) for i in range(3))
+    # Another replica reads the entries and crashes before acking
+    await redis.xreadgroup("test-group", "replica-b", {stream: ">"}, count=10)
+    assert (await redis.xpending(stream, "test-group"))["pending"] == 3
+
+    await bus.start()
+    await _wait_for(lambda: len(received) == 3)
+    await asyncio.sleep(0.05)
+
+    assert (await redis.xpending(stream, "test-group"))["pending"] == 0
+    assert bus.metrics()["topics"]["CARE_EVENT"]["claimed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_consumer_replays_own_unacked_entries_on_restart(_redis_event_bus):
+    bus = _redis_event_bus
+    redis = bus._redis
+    stream = "AI Healthcare System:events:DIAGNOSTIC_ALERT"
+    bus.configure(claim_idle_ms=60_000)  # only this consumer's own pending list applies
+    received: list[dict] = []
+
+    async def handler(payload: dict) -> None:
+        received.append(payload)
+
+    bus.subscribe("DIAGNOSTIC_ALERT", handler)
+    await bus._ensure_groups(bus._stream_keys())
+    await bus.publish("DIAGNOSTIC_ALERT", {"alert": "sepsis"})
+    await redis.xreadgroup("test-group", "replica-a", {stream: ">"}, count=10)  # read, then "crash"
+
+    await bus.start()
+    await _wait_for(lambda: len(received) == 1)
+    assert received[0]["alert"] == "sepsis"
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_overflow_policies():
+    from backend.event_bus import ClinicalEventBus
+
+    bus = ClinicalEventBus()
+    await bus.stop()  # no workers: the queue only fills
+    bus.reset_metrics()
+    try:
+        bus.configure(queue_maxsize=2, overflow_policy="drop_newest")
+        await bus.start()
+        await bus.stop()
+        for i in range(3):
+            await bus.publish("VITALS_RECORDED", {"seq": i})
+        assert [bus._queue.get_nowait()[1]["seq"] for _ in range(2)] == [0, 1]
+
+        bus.configure(overflow_policy="drop_oldest")
+        for i in range(3):
+            await bus.publish("VITALS_RECORDED", {"seq": i})
+        assert [bus._queue.get_nowait()[1]["seq"] for _ in range(2)] == [1, 2]
+        assert bus.metrics()["topics"]["VITALS_RECORDED"]["dropped"] == 2
+
+        bus.configure(overflow_policy="block")
+        for i in range(2):
+            await bus.publish("VITALS_RECORDED", {"seq": i})
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bus.publish("VITALS_RECORDED", {"seq": 2}), timeout=0.05)
+
+        with pytest.raises(ValueError):
+            bus.configure(overflow_policy="spill_to_disk")
+    finally:
+        from backend import event_bus as event_bus_module
+
+        bus.configure(
+            queue_maxsize=event_bus_module.EVENT_BUS_QUEUE_MAXSIZE,
+            overflow_policy=event_bus_module.EVENT_BUS_OVERFLOW_POLICY,
+        )
+        bus.reset_metrics()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_fan_out_concurrently_and_metrics_track_lag(_clean_event_bus):
+    bus = _clean_event_bus
+    bus.reset_metrics()
+    finished: list[str] = []
+
+    def slow_handler(name: str):
+        async def handler(payload: dict) -> None:
+            await asyncio.sleep(0.2)
+            finished.append(name)
+        return handler
+
+    async def failing_handler(payload: dict) -> None:
+        raise RuntimeError("subscriber bug")
+
+    for name in ("a", "b", "c"):
+        bus.subscribe("CARE_EVENT", slow_handler(name))
+    bus.subscribe("CARE_EVENT", failing_handler)
+
+    started = asyncio.get_running_loop().time()
+    await bus.publish("CARE_EVENT", {"patient_id": 7})
+    await bus.join()
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert sorted(finished) == ["a", "b", "c"]
+    assert elapsed < 0.5  # three 0.2s subscribers ran side by side
+    stats = bus.metrics()["topics"]["CARE_EVENT"]
+    assert (stats["published"], stats["delivered"], stats["failed"]) == (1, 1, 1)
+    assert stats["avg_lag_ms"] >= 0.0
@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+
+import numpy as np
+import pytest
+
+from backend import core_ai
+from backend.cache_service import cache
+from scripts.embedding_stub_server import EmbeddingStubServer, stub_embedding
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = EmbeddingStubServer(dim=8).start()
+    monkeypatch.setattr(core_ai, "EMBEDDING_SERVICE_URL", server.url)
+    monkeypatch.setattr(core_ai, "EMBEDDING_DIM", 8)
+    yield server
+    server.stop()
+
+
+def _texts(n):
+    prefix = uuid.uuid4().hex
+    return [f"{prefix} clinical note {i}" for i in range(n)]
+
+
+def test_embed_texts_batches_requests_and_preserves_order(stub_server, monkeypatch):
+    monkeypatch.setattr(core_ai, "EMBEDDING_BATCH_SIZE", 4)
+    texts = _texts(10)
+
+    vectors = core_ai.embed_texts(texts + [texts[0]])
+
+    assert stub_server.requests == 3  # 10 unique texts, 4 per request
+    assert stub_server.texts == 10
+    assert np.allclose(vectors[:10], [stub_embedding(t, 8) for t in texts], atol=1e-6)
+    assert vectors[10] == vectors[0]
+
+
+def test_embed_texts_serves_cached_texts_without_network(stub_server):
+    texts = _texts(3)
+    core_ai.embed_texts(texts[:2], task_type="retrieval_query")
+    assert stub_server.requests == 1
+
+    vectors = core_ai.embed_texts(texts, task_type="retrieval_query")
+    assert stub_server.requests == 2
+    assert stub_server.texts == 3
+    assert core_ai.embed_text(texts[1], task_type="retrieval_query") == vectors[1]
+    assert stub_server.requests == 2
+
+
+def test_embed_texts_failed_batch_returns_uncached_zero_vectors(stub_server, monkeypatch):
+    texts = _texts(2)
+    monkeypatch.setattr(core_ai, "EMBEDDING_SERVICE_URL", stub_server.url.replace("/embed", "/missing"))
+
+    assert core_ai.embed_texts(texts) == [[0.0] * 8, [0.0] * 8]
+    assert cache.get(core_ai._embedding_cache_key(texts[0], "retrieval_document")) is None
+
+
+@pytest.mark.asyncio
+async def test_embed_text_async_coalesces_concurrent_calls(stub_server, monkeypatch):
+    monkeypatch.setattr(core_ai, "EMBEDDING_COALESCE_WINDOW_MS", 20)
+    texts = _texts(12)
+
+    vectors = await asyncio.gather(*(core_ai.embed_text_async(t) for t in texts))
+
+    assert stub_server.requests == 1
+    assert np.allclose(vectors, [stub_embedding(t, 8) for t in texts], atol=1e-6)
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -82,11 +83,9 @@ def test_counterfactual_recourse_diabetes(client, db_session):
     # Mock models and predict_proba to control recourse optimization
     mock_model = MagicMock()
     def mock_predict_proba(X):
-        hypertension = X[0][0]
-        if hypertension == 1.0:
-            return [[0.3, 0.7]]
-        else:
-            return [[0.6, 0.4]]
+        hypertension = np.asarray(X)[:, 0]
+        pos = np.where(hypertension == 1.0, 0.7, 0.4)
+        return np.column_stack([1.0 - pos, pos])
     mock_model.predict_proba.side_effect = mock_predict_proba
 
     from backend import prediction as _pred
@@ -125,6 +124,8 @@ def test_counterfactual_recourse_diabetes(client, db_session):
         assert data["recourse_recommendation"]["hypertension"] == 0.0
         assert data["recourse_recommendation"]["high_chol"] == 0.0
         assert data["recourse_recommendation"]["smoking_history"] == 0.0
+        assert data["search_metadata"]["model_calls"] == 1
+        assert mock_model.predict_proba.call_count == 1
     finally:
         _pred.diabetes_model = original_model
 
@@ -169,11 +170,9 @@ def test_counterfactual_recourse_heart(client, db_session):
     # Mock models and predict_proba
     mock_model = MagicMock()
     def mock_predict_proba(X):
-        bp = X[0][3]
-        if bp > 120.0:
-            return [[0.2, 0.8]]
-        else:
-            return [[0.7, 0.3]]
+        bp = np.asarray(X)[:, 3]
+        pos = np.where(bp > 120.0, 0.8, 0.3)
+        return np.column_stack([1.0 - pos, pos])
     mock_model.predict_proba.side_effect = mock_predict_proba
 
     from backend import prediction as _pred
@@ -213,5 +212,38 @@ def test_counterfactual_recourse_heart(client, db_session):
         assert data["optimized_risk"] == 0.3
         assert data["changes_applied"]["smoker"] == "Stop smoking"
         assert "Reduce resting blood pressure" in data["changes_applied"]["trestbps"]
+        assert data["search_metadata"]["model_calls"] == 1
+        assert data["search_metadata"]["candidates_evaluated"] > 2
     finally:
         _pred.heart_model = original_model
+
+
+def test_recourse_search_scores_grid_in_one_call():
+    from backend.prediction import RECOURSE_GRID_STEPS, _search_clinical_recourse
+
+    mock_model = MagicMock()
+
+    def mock_predict_proba(X):
+        X = np.asarray(X)
+        # Risk falls with BMI and is high while hypertensive.
+        pos = np.clip(0.3 + 0.3 * (X[:, 0] == 1.0) + 0.04 * (X[:, 2] - 25.0), 0.0, 1.0)
+        return np.column_stack([1.0 - pos, pos])
+    mock_model.predict_proba.side_effect = mock_predict_proba
+
+    profile = [1.0, 1.0, 30.0, 0.0, 0.0, 1.0, 3.0, 1.0, 6.0]
+    search = _search_clinical_recourse("diabetes", mock_model, profile, 0.8)
+
+    assert mock_model.predict_proba.call_count == 1
+    assert search["model_calls"] == 1
+    # {hypertension}, {bmi grid}, {hypertension + bmi grid}
+    assert search["candidates_evaluated"] == 1 + 2 * RECOURSE_GRID_STEPS
+    assert "managing hypertension" in search["recommendation"]
+    assert "below the threshold" in search["recommendation"]
+
+
+def test_recourse_search_skips_low_risk_profiles():
+    from backend.prediction import _calculate_clinical_recourse
+
+    mock_model = MagicMock()
+    assert _calculate_clinical_recourse("diabetes", mock_model, [0.0] * 9, 0.2) is None
+    mock_model.predict_proba.assert_not_called()
@@ -364,6 +364,80 @@ def test_expectation_runner_chunked_validation():
     assert report_fail.success is False
 
 
+def test_expectation_runner_fused_partials_merge_across_chunks_workers_and_files(tmp_path, monkeypatch):
+    import pandas as pd
+
+    from backend import data_expectations
+    from backend.data_expectations import DistinctSketch, Expectation, ExpectationRunner
+
+    monkeypatch.setattr(data_expectations, "VALIDATION_RESULTS_DIR", tmp_path)
+    runner = ExpectationRunner()
+    runner.create_suite("fused_suite", "test_dataset")
+    for exp in [
+        Expectation("expect_column_values_not_null", "hr"),
+        Expectation("expect_column_values_between", "hr", {"min_value": 40, "max_value": 180}),
+        Expectation("expect_column_mean_between", "hr", {"min_value": 60, "max_value": 120}),
+        Expectation("expect_column_values_in_set", "dept", {"value_set": ["cardio", "neuro"]}),
+        Expectation("expect_column_values_to_match_regex", "mrn", {"regex": r"^MRN\d+$"}),
+        Expectation("expect_column_unique_value_count_between", "mrn", {"min_value": 1, "max_value": 10000}),
+        Expectation("expect_table_row_count_between", None, {"min_value": 1, "max_value": 10000}),
+    ]:
+        runner.add_expectation("fused_suite", exp)
+    records = [
+        {"mrn": f"MRN{i % 300}", "dept": "cardio" if i % 2 else "neuro", "hr": 60 + i % 50} for i in range(1000)
+    ]
+    records[10]["hr"] = None
+    records[20]["hr"] = 250
+    records[30]["dept"] = "oncology"
+    records[40]["mrn"] = "bad-mrn"
+
+    single = runner.validate("fused_suite", records, chunk_size=5000).results
+    chunked = runner.validate("fused_suite", records, chunk_size=64).results
+    parallel = runner.validate("fused_suite", records, chunk_size=200, workers=2).results
+    assert single == chunked == parallel
+    outcome = {r["expectation_type"]: r for r in single}
+    assert outcome["expect_column_values_not_null"]["observed"] == "1 nulls"
+    assert outcome["expect_column_values_between"]["observed"] == "Range: [60.0, 250.0]"
+    assert outcome["expect_column_values_in_set"]["observed"] == ["oncology"]
+    assert outcome["expect_column_values_to_match_regex"]["observed"] == "1 violations"
+    assert outcome["expect_column_unique_value_count_between"]["observed"] == 301
+
+    frame = pd.DataFrame(records)
+    frame.iloc[:500].to_csv(tmp_path / "part1.csv", index=False)
+    frame.iloc[500:].to_parquet(tmp_path / "part2.parquet", index=False)
+    from_files = runner.validate_files("fused_suite", [tmp_path / "part1.csv", tmp_path / "part2.parquet"], chunk_size=128, workers=2)
+    assert from_files.results == single
+
+    left, right = DistinctSketch(k=1024), DistinctSketch(k=1024)
+    left.add(pd.Series(range(0, 60000)))
+    right.add(pd.Series(range(40000, 100000)))
+    left.merge(right)
+    assert abs(left.estimate() - 100000) < 100000 * 0.1
+
+    exact = DistinctSketch()
+    exact.add(pd.Series([2**60, 2**60 + 1]))
+    exact.add(pd.Series([1.0, 2**60 + 1]))
+    assert exact.estimate() == 3
+
+    # Chunks are produced lazily, one evaluated before the next is sliced
+    events = []
+    chunks, evaluate = data_expectations.iter_chunks, data_expectations._evaluate_chunk
+
+    def logged_chunks(data, chunk_size):
+        for chunk in chunks(data, chunk_size):
+            events.append("chunk")
+            yield chunk
+
+    def logged_evaluate(compiled, chunk):
+        events.append("evaluate")
+        return evaluate(compiled, chunk)
+
+    monkeypatch.setattr(data_expectations, "iter_chunks", logged_chunks)
+    monkeypatch.setattr(data_expectations, "_evaluate_chunk", logged_evaluate)
+    runner.validate("fused_suite", records, chunk_size=400)
+    assert events == ["chunk", "evaluate"] * 3
+
+
 def test_column_level_lineage():
     from backend.data_catalog import data_catalog
     data_catalog.add_column_lineage(
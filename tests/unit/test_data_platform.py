@@ -8,6 +8,8 @@ Unit tests for the Unified Clinical Data + AI Platform:
 - Data & AI Apps Runtime
 """
 
+import pytest
+
 from backend.data_platform.agentic_bi import AgenticBIEngine
 from backend.data_platform.data_apps import AppStatus, DataAIAppsRuntime
 from backend.data_platform.data_catalog import (
@@ -76,6 +78,78 @@ def test_open_table_delete_and_history():
     assert len(tbl.history()) == 2
 
 
+def test_open_table_commits_copy_only_touched_files():
+    engine = OpenTableFormatEngine(root_dir=None)
+    tbl = engine.create_table("patients_cow", TableSchema(columns={"patient_id": "str", "age": "int"}))
+    for batch in range(3):
+        tbl.insert([{"patient_id": f"P{batch}-{i}", "age": i} for i in range(100)])
+    v3_files = tbl.data_files()
+
+    entry = tbl.merge_upsert([{"patient_id": "P1-5", "age": 1000}, {"patient_id": "NEW", "age": 1}], match_key="patient_id")
+    assert len(entry.removed_files) == 1 and len(entry.added_files) == 2
+    assert tbl.data_files(version=3) == v3_files
+    assert [f for f in tbl.data_files() if f in v3_files] == [v3_files[0], v3_files[2]]
+
+    tbl.delete("age", 1000)
+    assert tbl.row_count == 300
+    assert {r["patient_id"] for r in tbl.read(version=4)} >= {"P1-5", "NEW"}
+    assert "P1-5" not in {r["patient_id"] for r in tbl.read()}
+    arrow = tbl.read_arrow(version=3)
+    assert arrow.num_rows == 300 and arrow.column("age").num_chunks == 3
+
+
+def test_open_table_persists_log_compacts_and_vacuums(tmp_path):
+    engine = OpenTableFormatEngine(root_dir=str(tmp_path))
+    tbl = engine.create_table("vitals_log", TableSchema(columns={"patient_id": "str", "hr": "int"}))
+    for i in range(12):
+        tbl.insert([{"patient_id": f"P{i}", "hr": 60 + i}])
+    tbl.insert([{"patient_id": "Q1", "hr": 1}, {"patient_id": "Q2", "hr": 2}])
+    tbl.delete("patient_id", "P0")
+    assert tbl.delete("patient_id", "Q1").added_files[0].startswith("dv-")
+
+    reopened = OpenTableFormatEngine(root_dir=str(tmp_path)).get_table("vitals_log")
+    assert reopened.current_version == 15 and reopened.row_count == 12
+    assert [r["patient_id"] for r in reopened.read(version=2)] == ["P0", "P1"]
+    assert [r["patient_id"] for r in reopened.data_files()[-1].rows()] == ["Q2"]
+
+    assert reopened.compact(target_rows=100).operation == "OPTIMIZE"
+    assert len(reopened.data_files()) == 1
+    report = reopened.vacuum(retain_versions=0)
+    assert report["files_removed"] == 14 and len(list(tmp_path.glob("vitals_log/*.parquet"))) == 1
+    with pytest.raises(ValueError, match="vacuumed"):
+        reopened.read(version=2)
+    assert sorted(r["hr"] for r in reopened.read()) == [2] + list(range(61, 72))
+    assert OpenTableFormatEngine(root_dir=str(tmp_path)).get_table("vitals_log").row_count == 12
+
+
+def test_open_table_evolved_columns_share_one_type(tmp_path):
+    engine = OpenTableFormatEngine(root_dir=str(tmp_path))
+    tbl = engine.create_table("vitals_evolved", TableSchema(columns={"patient_id": "str"}))
+    tbl.insert([{"patient_id": "P1", "hr": 80}, {"patient_id": "P2", "hr": 90, "note": "post-op"}])
+    assert tbl.read()[1] == {"patient_id": "P2", "hr": 90, "note": "post-op"}
+
+    tbl.insert([{"patient_id": "P3", "hr": 72.5, "labs": {"k": 4.1}}])
+    with pytest.raises(ValueError, match="vitals_evolved"):
+        tbl.insert([{"patient_id": "P4", "hr": "high"}])
+    reopened = OpenTableFormatEngine(root_dir=str(tmp_path)).get_table("vitals_evolved")
+    with pytest.raises(ValueError):
+        reopened.insert([{"patient_id": "P4", "hr": "high"}])
+    reopened.insert([{"patient_id": "P5", "hr": 60, "labs": {"k": 3.9, "na": 140}}])
+
+    assert reopened.read_arrow().column("hr").to_pylist() == [80, 90, 72.5, 60]
+    assert reopened.compact(target_rows=100).operation == "OPTIMIZE"
+    assert reopened.read()[-1]["labs"] == {"k": 3.9, "na": 140}
+
+
+def test_open_table_drop_removes_persisted_log(tmp_path):
+    engine = OpenTableFormatEngine(root_dir=str(tmp_path))
+    engine.create_table("notes", TableSchema(columns={"id": "str"})).insert([{"id": "old1"}, {"id": "old2"}])
+    assert engine.drop_table("notes")
+    engine.create_table("notes", TableSchema(columns={"id": "str"})).insert([{"id": "new"}])
+
+    assert OpenTableFormatEngine(root_dir=str(tmp_path)).get_table("notes").read() == [{"id": "new"}]
+
+
 # ── Clinical Data Catalog ──────────────────────────────────────────
 
 def test_clinical_catalog_register_and_search():
@@ -139,6 +213,53 @@ def test_lakehouse_sql_select_and_where():
     assert count_res.rows[0]["count"] == 3
 
 
+def test_lakehouse_sql_joins_aggregates_params_and_cache(tmp_path, monkeypatch):
+    from backend.data_platform import lakehouse_sql
+
+    if not lakehouse_sql.HAS_DUCKDB:
+        pytest.skip("duckdb not installed")
+    engine = OpenTableFormatEngine(root_dir=str(tmp_path))
+    monkeypatch.setattr(lakehouse_sql, "open_table_engine", engine)
+    patients = engine.create_table("Patients", TableSchema(columns={"patient_id": "str", "dept": "str", "age": "int"}))
+    vitals = engine.create_table("vitals", TableSchema(columns={"patient_id": "str", "hr": "int", "note": "str"}))
+    patients.insert([{"patient_id": f"P{i}", "dept": "cardio" if i % 2 else "neuro", "age": 30 + i} for i in range(6)])
+    vitals.insert([{"patient_id": f"P{i % 6}", "hr": 60 + i, "note": "x" * 50} for i in range(30)])
+
+    sql_eng = LakehouseSQLEngine()
+    sql = (
+        "SELECT p.dept, COUNT(*) AS readings, MAX(v.hr) AS max_hr FROM patients p "
+        "JOIN vitals v ON v.patient_id = p.patient_id WHERE p.age >= $min_age GROUP BY p.dept ORDER BY p.dept"
+    )
+    result = sql_eng.execute(sql, {"min_age": 32})
+    assert result.rows == [{"dept": "cardio", "readings": 10, "max_hr": 89}, {"dept": "neuro", "readings": 10, "max_hr": 88}]
+    profile = result.profile
+    assert profile.rows_scanned == 36 and not profile.cache_hit
+    assert {"HASH_JOIN", "HASH_GROUP_BY"} <= {op["operator"] for op in profile.operators}
+    # Only the projected columns are read, never the wide ``note`` column
+    assert 0 < profile.bytes_read < vitals.read_arrow().nbytes
+    assert profile.table_versions == {"Patients": 1, "vitals": 1}
+
+    assert sql_eng.execute(sql, {"min_age": 32}).profile.cache_hit
+    assert not sql_eng.execute(sql, {"min_age": 40}).profile.cache_hit
+    vitals.insert([{"patient_id": "P3", "hr": 200, "note": ""}])
+    fresh = sql_eng.execute(sql, {"min_age": 32})
+    assert not fresh.profile.cache_hit and fresh.rows[0]["max_hr"] == 200
+    pinned = sql_eng.execute(sql, {"min_age": 32}, versions={"vitals": 1})
+    assert pinned.profile.cache_hit and pinned.rows[0]["max_hr"] == 89
+
+    engine.drop_table("vitals")
+    engine.create_table("vitals", TableSchema(columns={"patient_id": "str", "hr": "int", "note": "str"})).insert(
+        [{"patient_id": "P3", "hr": 61, "note": ""}]
+    )
+    recreated = sql_eng.execute(sql, {"min_age": 32})
+    assert not recreated.profile.cache_hit and recreated.rows == [{"dept": "cardio", "readings": 1, "max_hr": 61}]
+
+    assert sql_eng.execute("SELECT * FROM missing_table").total_count == 0
+    for statement in ("DELETE FROM vitals", "SELECT 1; SELECT 2", "SELECT * FROM vitals, read_csv('/etc/passwd')"):
+        with pytest.raises(Exception):
+            sql_eng.execute(statement)
+
+
 # ── MedFlow Pipeline ─────────────────────────────────────────────
 
 def test_medflow_pipeline_end_to_end():
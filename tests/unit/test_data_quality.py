@@ -1,6 +1,7 @@
 import json
 
 import pytest
+from sqlalchemy import event
 
 from backend import auth, models
 
@@ -102,6 +103,64 @@ def test_data_quality_report_is_facility_scoped(db_session):
     assert checks["vitals_spo2_range"]["total_count"] == 1
 
 
+def test_data_quality_report_aggregates_in_one_query_per_dataset_and_refreshes_incrementally(db_session):
+    data_quality = _data_quality_module()
+    facility = _create_facility(db_session, "Quality Incremental")
+    facility_id = facility.id
+    patient_id = _create_user(db_session, "quality_incremental_patient", "patient", facility_id).id
+    db_session.add(models.VitalObservation(facility_id=facility_id, patient_id=patient_id, source="manual", spo2=98, heart_rate=72))
+    db_session.commit()
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        data_quality.generate_quality_report(db_session, facility_id=facility_id)
+        assert len(statements) == 1 + len(data_quality.DATASET_AGGREGATES)
+
+        statements.clear()
+        cached = data_quality.generate_quality_report(db_session, facility_id=facility_id)
+        assert len(statements) == 1
+        assert {d["name"]: d["record_count"] for d in cached["datasets"]}["vital_observations"] == 1
+
+        db_session.add(models.VitalObservation(facility_id=facility_id, patient_id=patient_id, source="manual", spo2=150, heart_rate=300))
+        db_session.commit()
+        statements.clear()
+        report = data_quality.generate_quality_report(db_session, facility_id=facility_id)
+        assert len(statements) == 2 and "vital_observations.id >" in statements[1]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    checks = {check["id"]: check for check in report["checks"]}
+    assert checks["vitals_spo2_range"]["total_count"] == 2
+    assert checks["vitals_spo2_range"]["failed_count"] == 1
+    assert checks["vitals_heart_rate_range"]["failed_count"] == 1
+    assert data_quality.generate_quality_report(db_session, facility_id=facility_id, refresh=True)["checks"] == report["checks"]
+
+
+def test_rows_committed_after_the_watermark_read_are_counted_once(db_session, monkeypatch):
+    data_quality = _data_quality_module()
+    facility_id = _create_facility(db_session, "Quality Interleaved").id
+    patient_id = _create_user(db_session, "quality_interleaved_patient", "patient", facility_id).id
+    db_session.add(models.VitalObservation(facility_id=facility_id, patient_id=patient_id, source="manual", spo2=97))
+    db_session.commit()
+    read_watermarks = data_quality._watermarks
+
+    def watermarks_then_insert(db):
+        watermarks = read_watermarks(db)
+        db.add(models.VitalObservation(facility_id=facility_id, patient_id=patient_id, source="manual", spo2=96))
+        db.commit()
+        return watermarks
+
+    monkeypatch.setattr(data_quality, "_watermarks", watermarks_then_insert)
+    first = data_quality.generate_quality_report(db_session, facility_id=facility_id)
+    monkeypatch.setattr(data_quality, "_watermarks", read_watermarks)
+    second = data_quality.generate_quality_report(db_session, facility_id=facility_id)
+
+    assert {d["name"]: d["record_count"] for d in first["datasets"]}["vital_observations"] == 1
+    assert {d["name"]: d["record_count"] for d in second["datasets"]}["vital_observations"] == 2
+
+
 def test_data_quality_report_includes_lineage_for_core_datasets(db_session):
     data_quality = _data_quality_module()
 
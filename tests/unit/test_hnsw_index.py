@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from backend.hnsw_index import HnswIndex
+from backend.redis_cluster_cache import MultiTierHnswCacheMesh
+
+
+def _clustered(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 50, 1), dim))
+    data = centers[rng.integers(0, len(centers), n)] + 0.3 * rng.normal(size=(n, dim))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_hnsw_recall_matches_brute_force():
+    data = _clustered(3000)
+    index = HnswIndex(32, len(data), M=12, ef_construction=80, ef_search=48)
+    for vector in data:
+        index.add(vector)
+
+    rng = np.random.default_rng(1)
+    recalls = []
+    for row in rng.integers(0, len(data), 100):
+        query = data[row] + 0.02 * rng.normal(size=32)
+        slots, sims = index.search(query, k=10)
+        truth = np.argsort(-(data @ (query / np.linalg.norm(query))))[:10]
+        recalls.append(len(set(truth.tolist()) & set(slots.tolist())) / 10)
+        assert np.all(np.diff(sims) <= 1e-6)  # best first
+    assert np.mean(recalls) >= 0.95
+
+
+def test_hnsw_ring_buffer_overwrites_oldest_slots():
+    data = _clustered(700)
+    index = HnswIndex(32, 300, M=8, ef_construction=40)
+    evictions = [index.add(vector)[1] for vector in data]
+
+    assert len(index) == 300
+    assert evictions[:300] == [None] * 300
+    assert evictions[300:303] == [0, 1, 2]
+
+    # Only the most recent 300 vectors are reachable, each at its ring slot
+    for i in range(700 - 300, 700, 37):
+        slots, sims = index.search(data[i], k=1)
+        assert slots[0] == i % 300
+        assert sims[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_hnsw_soft_delete_hides_entries_but_keeps_routing():
+    data = _clustered(500)
+    index = HnswIndex(32, 500, M=8, ef_construction=40)
+    for vector in data:
+        index.add(vector)
+
+    assert index.mark_deleted(10)
+    assert not index.mark_deleted(10)
+    assert len(index) == 499
+    slots, _ = index.search(data[10], k=5)
+    assert 10 not in slots.tolist()
+    assert index.search(data[11], k=1)[0][0] == 11
+
+
+def test_hnsw_rejects_wrong_dimension_and_zero_vectors():
+    index = HnswIndex(4, 10)
+    with pytest.raises(ValueError):
+        index.add([1.0, 0.0])
+    with pytest.raises(ValueError):
+        index.add([0.0, 0.0, 0.0, 0.0])
+    assert index.search([1.0, 0.0], k=1)[0].size == 0
+
+
+def test_cache_mesh_l1_l2_and_invalidation():
+    mesh = MultiTierHnswCacheMesh(l1_capacity=2, similarity_threshold=0.95, l2_capacity=100)
+    data = _clustered(3)
+    mesh.insert_cache_mesh("hba1c meaning", data[0].tolist(), "HbA1c reflects average glucose.")
+
+    exact = mesh.lookup_cache_mesh("hba1c meaning")
+    assert (exact.hit, exact.tier_level) == (True, "L1_Microsecond_Memory")
+
+    near = mesh.lookup_cache_mesh("what does hba1c mean", (data[0] + 0.01 * data[1]).tolist())
+    assert (near.hit, near.tier_level) == (True, "L2_HNSW_Vector_Graph")
+    assert near.cached_response == "HbA1c reflects average glucose."
+
+    assert mesh.lookup_cache_mesh("unrelated", (-data[0]).tolist()).tier_level == "MISS"
+
+    assert mesh.invalidate_cache_mesh("hba1c meaning", data[0].tolist())
+    assert not mesh.lookup_cache_mesh("what does hba1c mean", data[0].tolist()).hit
+    assert mesh.l2_size == 0
+
+
+def test_cache_mesh_l1_is_lru_and_dimension_change_resets_l2():
+    mesh = MultiTierHnswCacheMesh(l1_capacity=2, l2_capacity=10)
+    mesh.insert_cache_mesh("a", [1.0, 0.0, 0.0], "A")
+    mesh.insert_cache_mesh("b", [0.0, 1.0, 0.0], "B")
+    mesh.lookup_cache_mesh("a")
+    mesh.insert_cache_mesh("c", [0.0, 0.0, 1.0], "C")
+    assert list(mesh.l1_cache) == ["a", "c"]
+
+    mesh.insert_cache_mesh("d", [1.0, 0.0, 0.0, 0.0], "D")
+    assert mesh.l2_index.dim == 4
+    assert mesh.l2_size == 1
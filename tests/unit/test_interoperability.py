@@ -5,6 +5,8 @@ ABDM readiness, DICOMweb, SMART on FHIR, and metrics endpoints.
 Covers: pure logic helpers, consent lifecycle, export endpoints,
 readiness checks, and metrics.
 """
+import hashlib
+import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
@@ -15,17 +17,22 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from backend import models
+from backend import bulk_export, fhir, models
+from backend.bulk_export import BulkExportEngine
 from backend.database import Base, get_db
 from backend.interoperability import (
     ALLOWED_EXPORT_RESOURCES,
     CONSENT_SCOPE,
+    BundleStream,
     _bundle_sha256,
     _canonical_json,
     _dt,
     _is_active_consent,
+    _iter_bundle_resources,
+    _parse_export_filters,
     _to_utc,
     _validate_resource_types,
+    write_bundle_ndjson,
 )
 from backend.main import app
 from backend.prediction import initialize_models
@@ -343,6 +350,100 @@ def test_export_doctor_patient_bundle_requires_doctor_or_admin(client):
     assert client.get("/interop/doctor/patients/1/fhir-bundle", headers=h).status_code == 403
 
 
+def _seed_patient_record(db_session, patient_id, encounters=3, vitals_per_encounter=4):
+    for e in range(encounters):
+        encounter = models.Encounter(patient_id=patient_id, encounter_type="OPD", reason="Follow-up")
+        db_session.add(encounter)
+        db_session.flush()
+        for v in range(vitals_per_encounter):
+            db_session.add(models.VitalObservation(
+                patient_id=patient_id, encounter_id=encounter.id, heart_rate=70 + v, spo2=98.0,
+            ))
+        prescription = models.Prescription(patient_id=patient_id, encounter_id=encounter.id)
+        prescription.items.append(models.PrescriptionItem(medication_name="Metformin", dosage="500mg", frequency="BID"))
+        db_session.add(prescription)
+    db_session.commit()
+
+
+def test_bundle_stream_matches_in_memory_bundle_hash(client, db_session):
+    _auth(client, "interop_stream_hash")
+    patient = db_session.query(models.User).filter_by(username="interop_stream_hash").one()
+    _seed_patient_record(db_session, patient.id)
+    filters = _parse_export_filters(None, None)
+    timestamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    stream = BundleStream(timestamp=timestamp, write_bytes=256)
+    chunks = list(stream.iter_bytes(_iter_bundle_resources(db_session, patient, filters, chunk_rows=2)))
+    bundle = fhir.build_bundle(list(_iter_bundle_resources(db_session, patient, filters)), timestamp=timestamp)
+
+    assert len(chunks) > 2
+    assert b"".join(chunks) == _canonical_json(bundle).encode("utf-8")
+    assert stream.sha256 == _bundle_sha256(bundle)
+    assert stream.resource_count == len(bundle["entry"]) == 1 + 3 + 12 + 3
+
+
+def test_streamed_patient_export_records_signed_manifest(client, db_session):
+    h = _auth(client, "interop_stream_pat")
+    client.post("/interop/consents", json={"purpose": "Export for care team", "recipient_type": "care_team"}, headers=h)
+    _seed_patient_record(db_session, _get_id(db_session, "interop_stream_pat"), encounters=2)
+
+    r = client.get("/interop/patient/fhir-bundle/stream", headers=h)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/fhir+json")
+    bundle = r.json()
+    assert bundle["resourceType"] == "Bundle" and len(bundle["entry"]) == 1 + 2 + 8 + 2
+
+    manifest = client.get(f"/interop/exports/{r.headers['X-Export-Id']}/manifest", headers=h).json()
+    assert manifest["bundle_sha256"] == _bundle_sha256(bundle)
+    assert manifest["resource_count"] == len(bundle["entry"])
+    assert manifest["signature"]
+
+
+def test_write_bundle_ndjson_writes_one_resource_per_line(client, db_session, tmp_path):
+    _auth(client, "interop_ndjson")
+    patient = db_session.query(models.User).filter_by(username="interop_ndjson").one()
+    _seed_patient_record(db_session, patient.id, encounters=1)
+    path = tmp_path / "patient.ndjson"
+
+    count, digest = write_bundle_ndjson(db_session, patient, _parse_export_filters("Encounter,Observation", None), str(path))
+
+    lines = path.read_bytes().splitlines()
+    assert count == len(lines) == 1 + 1 + 4
+    assert [json.loads(line)["resourceType"] for line in lines] == ["Patient", "Encounter"] + ["Observation"] * 4
+    assert digest == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_group_bulk_export_kick_off_poll_and_download(client, db_session, tmp_path, monkeypatch):
+    engine = BulkExportEngine(root_dir=str(tmp_path), max_workers=1, session_factory=TestingSessionLocal)
+    monkeypatch.setattr(bulk_export, "bulk_export_engine", engine)
+    facility = models.HospitalFacility(name="Bulk Export Campus")
+    db_session.add(facility)
+    db_session.commit()
+    facility_id = facility.id
+    ph = _auth(client, "interop_bulk_pat")
+    client.post("/interop/consents", json={"purpose": "Registry", "recipient_type": "care_team"}, headers=ph)
+    h = _auth(client, "interop_bulk_admin")
+    for username in ("interop_bulk_pat", "interop_bulk_admin"):
+        db_session.query(models.User).filter_by(username=username).update({"facility_id": facility_id})
+    _set_role(db_session, "interop_bulk_admin", "admin")
+    _seed_patient_record(db_session, _get_id(db_session, "interop_bulk_pat"), encounters=2)
+
+    assert client.get(f"/interop/fhir/Group/{facility_id}/$export", headers=ph).status_code == 403
+    r = client.get(f"/interop/fhir/Group/{facility_id}/$export?_type=Observation", headers=h)
+    assert r.status_code == 202 and r.json()["patient_count"] == 1
+    status_url = r.headers["Content-Location"]
+    assert engine.wait(r.json()["job_id"], timeout=10)
+
+    manifest = client.get(status_url, headers=h).json()
+    assert [(item["type"], item["count"]) for item in manifest["output"]] == [("Patient", 1), ("Observation", 8)]
+    ndjson = client.get(manifest["output"][1]["url"], headers=h)
+    assert ndjson.headers["content-type"].startswith("application/fhir+ndjson")
+    assert hashlib.sha256(ndjson.content).hexdigest() == manifest["output"][1]["sha256"]
+    assert client.delete(status_url, headers=h).status_code == 202
+    assert client.get(status_url, headers=h).status_code == 404
+    engine.close()
+
+
 # ══════════════════════════════════════════════════════════════════════
 # READINESS ENDPOINTS
 # ══════════════════════════════════════════════════════════════════════
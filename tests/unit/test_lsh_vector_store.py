@@ -121,3 +121,124 @@ def test_simple_vector_store_lsh_deletion(temp_vector_db):
         results = temp_vector_db.search("doc_4", k=1)
         if results:
             assert results[0] != "doc_4"
+
+
+def _one_hot_embeddings(n, dim=768):
+    embeddings = {}
+    for i in range(n):
+        vec = [0.0] * dim
+        vec[i] = 2.0  # not unit length; the store normalizes on insert
+        embeddings[f"doc_{i}"] = vec
+    return embeddings
+
+
+def test_simple_vector_store_keeps_normalized_float32_matrix(temp_vector_db):
+    embeddings = _one_hot_embeddings(3)
+    with patch("backend.rag.get_embedding", side_effect=lambda t: embeddings[t]):
+        for i in range(3):
+            temp_vector_db.add(text=f"doc_{i}", metadata={}, record_id=f"rec_{i}")
+
+    matrix = temp_vector_db.vectors
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (3, 768)
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+
+
+def test_simple_vector_store_tombstones_then_compacts(temp_vector_db, monkeypatch):
+    monkeypatch.setattr(rag.SimpleVectorStore, "COMPACT_MIN_DEAD", 3)
+    embeddings = _one_hot_embeddings(12)
+    with patch("backend.rag.get_embedding", side_effect=lambda t: embeddings[t]):
+        for i in range(12):
+            temp_vector_db.add(text=f"doc_{i}", metadata={}, record_id=f"rec_{i}")
+
+    temp_vector_db.delete("rec_0")
+    temp_vector_db.delete("rec_1")
+    assert temp_vector_db._size == 12  # tombstoned, not yet re-packed
+    assert temp_vector_db.count() == 10
+    assert "rec_0" not in temp_vector_db.ids
+
+    temp_vector_db.delete("rec_2")
+    assert temp_vector_db._size == 9
+    assert temp_vector_db._dead == 0
+    assert temp_vector_db.ids == [f"rec_{i}" for i in range(3, 12)]
+    assert temp_vector_db.id_to_idx["rec_3"] == 0
+
+
+def test_simple_vector_store_reloads_binary_vectors_and_mmap_sidecar(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "DB_FILE", str(tmp_path / "mmap_store.json"))
+    monkeypatch.setenv("VECTOR_STORE_MMAP", "1")
+    embeddings = _one_hot_embeddings(4)
+    with patch("backend.rag.get_embedding", side_effect=lambda t: embeddings[t]):
+        store = rag.SimpleVectorStore()
+        for i in range(4):
+            store.add(text=f"doc_{i}", metadata={"user_id": "1"}, record_id=f"rec_{i}")
+        store.save()
+
+    reloaded = rag.SimpleVectorStore()
+    assert isinstance(reloaded._matrix, np.memmap)
+    assert reloaded.ids == [f"rec_{i}" for i in range(4)]
+    assert np.allclose(reloaded.vectors, store.vectors)
+
+    with patch("backend.rag.get_query_embedding", side_effect=lambda q: embeddings[q]):
+        assert reloaded.search("doc_2", k=1) == ["doc_2"]
+    # Writes detach from the read-only mapping
+    with patch("backend.rag.get_embedding", return_value=[0.0] * 4 + [1.0] + [0.0] * 763):
+        reloaded.add(text="doc_4", metadata={}, record_id="rec_4")
+    assert reloaded.count() == 5
+
+
+def test_lsh_index_many_matches_per_item_index():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 32))
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+
+    batched = rag.LocalitySensitiveHash(num_tables=4, hash_size=5)
+    batched.index_many(ids, vectors)
+    single = rag.LocalitySensitiveHash(num_tables=4, hash_size=5)
+    for record_id, vector in zip(ids, vectors):
+        single.index(record_id, vector)
+
+    assert batched.tables == single.tables
+
+
+def test_lsh_multi_probe_widens_candidates_and_recall():
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(40, 64))
+    data = centers[rng.integers(0, len(centers), 4000)] + 0.35 * rng.normal(size=(4000, 64))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    lsh = rag.LocalitySensitiveHash(num_tables=4, hash_size=10)
+    lsh.index_many([str(i) for i in range(len(data))], data)
+
+    recall = {0: [], 4: []}
+    for q in data[rng.integers(0, len(data), 50)]:
+        truth = {str(i) for i in np.argsort(-(data @ q))[:10]}
+        exact_bucket = lsh.query(q, num_probes=0)
+        probed = lsh.query(q, num_probes=4)
+        assert exact_bucket <= probed
+        for probes, candidates in ((0, exact_bucket), (4, probed)):
+            recall[probes].append(len(truth & candidates) / 10)
+
+    assert np.mean(recall[4]) > np.mean(recall[0])
+
+
+def test_mmap_sidecar_is_not_reused_after_in_place_overwrite(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "DB_FILE", str(tmp_path / "mmap_store.json"))
+    monkeypatch.setenv("VECTOR_STORE_MMAP", "1")
+    embeddings = _one_hot_embeddings(4)
+    with patch("backend.rag.get_embedding", side_effect=lambda t: embeddings[t]):
+        store = rag.SimpleVectorStore()
+        for i in range(3):
+            store.add(text=f"doc_{i}", metadata={"user_id": "1"}, record_id=f"rec_{i}")
+        store.save()
+        # Same id, new content; rewriting the last row keeps the rowid order, so
+        # the id manifest alone would still match
+        store.add(text="doc_3", metadata={"user_id": "1"}, record_id="rec_2")
+
+    reloaded = rag.SimpleVectorStore()
+    assert not isinstance(reloaded._matrix, np.memmap)
+    assert int(np.argmax(reloaded.vectors[reloaded.id_to_idx["rec_2"]])) == 3
+    with patch("backend.rag.get_query_embedding", side_effect=lambda q: embeddings[q]):
+        assert reloaded.search("doc_3", k=1) == ["doc_3"]
+
+    reloaded.save()
+    assert isinstance(rag.SimpleVectorStore()._matrix, np.memmap)
@@ -3,6 +3,7 @@ import uuid
 from unittest.mock import patch
 
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
 
@@ -12,6 +13,7 @@ from backend.main import (
 )
 from backend.middleware import (
     REQUEST_ID_HEADER,
+    ClinicalRequestPipeline,
     ExceptionMiddleware,
     RequestTracingMiddleware,
     SecurityHeadersMiddleware,
@@ -113,6 +115,77 @@ def test_request_tracing_replaces_unsafe_client_request_id():
     assert uuid.UUID(request_id)
 
 
+def _pipeline_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ClinicalRequestPipeline)
+
+    @app.get("/v1/records")
+    def records(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/v1/stream")
+    def stream():
+        return StreamingResponse(iter([b"chunk-1,", b"chunk-2"]), media_type="text/plain")
+
+    @app.get("/v1/boom")
+    def boom():
+        raise RuntimeError("password=secret-db-password")
+
+    return app
+
+
+def test_pipeline_redirects_unversioned_routes_with_security_headers():
+    response = TestClient(_pipeline_app(), base_url="http://127.0.0.1").get(
+        "/records?limit=5", follow_redirects=False
+    )
+
+    assert response.status_code == 307
+    assert response.headers["location"] == "/v1/records?limit=5"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    # Redirects short-circuit before the tracing stage, as with the old stack
+    assert REQUEST_ID_HEADER not in response.headers
+
+
+def test_pipeline_rejects_missing_license_outside_tests(monkeypatch):
+    monkeypatch.delenv("TESTING", raising=False)
+    monkeypatch.setenv("LICENSE_KEY", " ")
+
+    client = TestClient(_pipeline_app(), base_url="http://127.0.0.1")
+    rejected = client.get("/v1/records")
+    exempt = client.get("/docs")
+
+    assert rejected.status_code == 402
+    assert "License Key is missing" in rejected.json()["detail"]
+    assert rejected.headers["X-Content-Type-Options"] == "nosniff"
+    assert exempt.status_code == 200
+
+
+def test_pipeline_traces_streams_and_logs_each_request(caplog):
+    caplog.set_level("INFO", logger="backend.middleware")
+    client = TestClient(_pipeline_app(), base_url="http://127.0.0.1")
+
+    traced = client.get("/v1/records", headers={REQUEST_ID_HEADER: "client-trace-456"})
+    streamed = client.get("/v1/stream")
+
+    assert traced.json()["request_id"] == "client-trace-456"
+    assert traced.headers["X-Correlation-ID"] == "client-trace-456"
+    assert traced.headers["Strict-Transport-Security"] == "max-age=31536000; includeSubDomains"
+    assert streamed.text == "chunk-1,chunk-2"
+    assert uuid.UUID(streamed.headers[REQUEST_ID_HEADER])
+    assert "GET /v1/records - 200" in caplog.text
+    assert "request_id=client-trace-456" in caplog.text
+
+
+def test_pipeline_hides_unhandled_errors_behind_security_headers():
+    response = TestClient(_pipeline_app(), base_url="http://127.0.0.1").get("/v1/boom")
+
+    assert response.status_code == 500
+    assert re.fullmatch(r"Error: [0-9a-f]{8}", response.json()["detail"])
+    assert "secret-db-password" not in response.text
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert uuid.UUID(response.headers[REQUEST_ID_HEADER])
+
+
 def test_allowed_hosts_from_env():
     with patch.dict("os.environ", {"ALLOWED_HOSTS": "127.0.0.1,api.hospital.example"}, clear=True):
         assert _load_allowed_hosts() == ["127.0.0.1", "api.hospital.example"]
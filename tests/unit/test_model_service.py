@@ -236,3 +236,165 @@ class TestBackwardCompatibility:
         status = get_model_status()
         assert status["diabetes_loaded"] is True
         assert status["heart_loaded"] is True
+
+
+# ── Batched Inference ───────────────────────────────────────────────
+
+class TestBatchPrediction:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.svc = ModelService()
+        self.svc.initialize()
+
+    def test_predict_proba_batch_scores_every_row(self):
+        rows = np.random.rand(50, 9)
+        probs = self.svc.predict_proba_batch("diabetes", rows)
+        assert probs.shape == (50,)
+        assert np.all((probs >= 0.0) & (probs <= 1.0))
+        assert self.svc._entries["diabetes"].prediction_count == 50
+
+    def test_predict_proba_batch_applies_scaler(self):
+        rows = np.random.rand(4, 24)
+        probs = self.svc.predict_proba_batch("kidney", rows)
+        assert probs.shape == (4,)
+
+    def test_predict_proba_batch_unknown_model(self):
+        with pytest.raises(ValueError, match="not found"):
+            self.svc.predict_proba_batch("pancreas", [[0.0]])
+
+    def test_predict_proba_batch_runs_one_model_call(self):
+        from unittest.mock import MagicMock
+        model = MagicMock()
+        model.predict_proba.return_value = np.tile([0.2, 0.8], (10, 1))
+        probs = self.svc.predict_proba_batch("heart", np.zeros((10, 13)), model=model)
+        assert model.predict_proba.call_count == 1
+        assert np.allclose(probs, 0.8)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_single_rows_are_coalesced(self):
+        import asyncio
+        self.svc._batcher.max_wait_ms = 5.0
+        results = await asyncio.gather(*[
+            self.svc.predict_proba_coalesced("diabetes", [0.0] * 9) for _ in range(20)
+        ])
+        assert len(results) == 20
+        stats = self.svc._batcher.stats()
+        assert stats["rows_scored"] == 20
+        assert stats["batches_run"] == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_batch_runs_off_the_event_loop(self, monkeypatch):
+        import asyncio
+        import time
+
+        real_batch = self.svc.predict_proba_batch
+
+        def slow_batch(*args, **kwargs):
+            time.sleep(0.2)
+            return real_batch(*args, **kwargs)
+
+        monkeypatch.setattr(self.svc, "predict_proba_batch", slow_batch)
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        ticker_task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*[
+            self.svc.predict_proba_coalesced("diabetes", [0.0] * 9) for _ in range(4)
+        ])
+        await ticker_task
+        assert len(results) == 4
+        # The loop kept ticking while the batch was scoring
+        assert sum(1 for t in ticks if t - started < 0.15) >= 5
+
+
+# ── Enclave Attestation Cache ───────────────────────────────────────
+
+class TestAttestationCache:
+    def test_measurement_is_cached_until_file_changes(self, tmp_path, monkeypatch):
+        from backend import model_service as ms
+        model_file = tmp_path / "diabetes_model.pkl"
+        model_file.write_bytes(b"model-v1")
+        svc = ModelService(model_dir=str(tmp_path))
+
+        calls = []
+        real_measure = ms.measure_model_file
+        monkeypatch.setattr(ms, "measure_model_file", lambda p: calls.append(p) or real_measure(p))
+
+        first = svc.attestation_for("diabetes")
+        second = svc.attestation_for("diabetes")
+        assert first is second
+        assert len(calls) == 1
+        assert svc._entries["diabetes"].attestation.digest == first.digest
+
+        model_file.write_bytes(b"model-v2-larger")
+        third = svc.attestation_for("diabetes")
+        assert len(calls) == 2
+        assert third.digest != first.digest
+
+    def test_missing_binary_returns_none(self, tmp_path):
+        svc = ModelService(model_dir=str(tmp_path))
+        assert svc.attestation_for("kidney") is None
+
+    def test_reload_invalidates_cache_and_trust_registry(self, tmp_path, monkeypatch):
+        from backend.tee_enclave import TRUSTED_MODEL_HASHES
+        (tmp_path / "heart_disease_model.pkl").write_bytes(b"heart")
+        svc = ModelService(model_dir=str(tmp_path))
+        monkeypatch.setattr(svc, "_load_real_models", lambda: None)
+        svc.attestation_for("heart")
+        TRUSTED_MODEL_HASHES["heart"] = "stale"
+
+        svc.reload()
+        assert svc._entries["heart"].attestation is None
+        assert "heart" not in TRUSTED_MODEL_HASHES
+
+
+# ── Batched SHAP Attribution ────────────────────────────────────────
+
+class TestAttributionEngine:
+    @pytest.fixture
+    def xgb_model(self):
+        xgb = pytest.importorskip("xgboost")
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(200, 9))
+        y = (X[:, 0] + X[:, 2] > 0).astype(int)
+        return xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(X, y), X
+
+    def test_engine_built_once_at_initialize(self):
+        svc = ModelService()
+        svc.initialize()
+        engine = svc._entries["diabetes"].attribution_engine
+        assert engine is not None
+        assert svc.attribution_engine("diabetes") is engine
+
+    def test_batch_matches_per_row_contributions(self, xgb_model):
+        model, X = xgb_model
+        svc = ModelService()
+        svc.initialize()
+        svc._entries["diabetes"].model = model
+        svc._build_attribution_engines()
+
+        engine = svc.attribution_engine("diabetes")
+        assert engine.kind == "xgboost"
+        batch = svc.attribute_batch("diabetes", X, chunk_size=64)
+        assert batch.shape == (200, 9)
+        per_row = np.vstack([engine.attribute(X[i:i + 1]) for i in range(5)])
+        assert np.allclose(batch[:5], per_row, atol=1e-5)
+
+    def test_population_mean_abs_is_chunk_invariant(self, xgb_model):
+        from backend.explainability import AttributionEngine
+        model, X = xgb_model
+        engine = AttributionEngine(model)
+        assert np.allclose(engine.mean_abs_attributions(X, chunk_size=7), engine.mean_abs_attributions(X), atol=1e-6)
+
+    def test_swapped_model_gets_fresh_engine(self, xgb_model):
+        model, _ = xgb_model
+        svc = ModelService()
+        svc.initialize()
+        cached = svc.attribution_engine("diabetes")
+        assert svc.attribution_engine("diabetes", model) is not cached
+        assert svc.attribution_engine("diabetes", model).model is model
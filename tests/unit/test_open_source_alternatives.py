@@ -2,6 +2,9 @@
 Unit tests for Polars, DuckDB, and Apache Iceberg / Delta Lake multi-format engines.
 """
 
+import pytest
+
+from backend.data_platform import polars_duckdb_engine as module
 from backend.data_platform.multi_format_exporter import (
     OpenTableSpec,
     multi_format_exporter,
@@ -37,6 +40,19 @@ def test_duckdb_sql_execution():
     assert res.record_count >= 1
 
 
+def test_duckdb_sql_over_sparse_records():
+    if not (module.HAS_DUCKDB and module.HAS_PYARROW):
+        pytest.skip("duckdb/pyarrow not installed")
+    engine = module.PolarsDuckDBEngine(pool_size=1)
+    records = [{"pid": "a", "hr": 80}, {"pid": "b", "hr": 90, "spo2": 97}]
+
+    res = engine.execute_duckdb_sql("SELECT pid, spo2 FROM vitals ORDER BY pid", records=records)
+    assert res.engine_used == "DUCKDB_VECTORIZED"
+    assert res.rows == [{"pid": "a", "spo2": None}, {"pid": "b", "spo2": 97}]
+    assert engine.register_dataset("sparse", records).columns == ["pid", "hr", "spo2"]
+    engine.close()
+
+
 def test_iceberg_manifest_exporter():
     cols = {"patient_id": "string", "heart_rate": "int", "timestamp": "long"}
     pkeys = ["patient_id"]
@@ -64,3 +80,36 @@ def test_delta_manifest_exporter():
     assert "commitInfo" in delta_meta
     assert "metaData" in delta_meta
     assert delta_meta["metaData"]["format"]["provider"] == "parquet"
+
+
+def test_registered_datasets_reuse_pooled_connections_and_stream_arrow_ipc():
+    if not (module.HAS_DUCKDB and module.HAS_POLARS and module.HAS_PYARROW):
+        pytest.skip("polars/duckdb/pyarrow not installed")
+    engine = module.PolarsDuckDBEngine(pool_size=2)
+    engine.register_dataset("vitals", [{"patient_id": f"P{i}", "dept": "cardio" if i % 2 else "neuro", "hr": 60 + i} for i in range(10)])
+
+    sql = "SELECT dept, COUNT(*) AS n FROM vitals WHERE hr >= $min_hr GROUP BY dept ORDER BY dept"
+    assert engine.execute_duckdb_sql(sql, params={"min_hr": 65}).rows == [{"dept": "cardio", "n": 3}, {"dept": "neuro", "n": 2}]
+    info = engine.append_to_dataset("vitals", [{"patient_id": "P99", "dept": "neuro", "hr": 150}])
+    assert info.version == 2 and info.row_count == 11
+    assert engine.execute_sql_arrow(sql, {"min_hr": 65}).column("n").to_pylist() == [3, 3]
+    assert engine._created == 1
+
+    # Ad-hoc records shadow the dataset for one query only
+    adhoc = engine.execute_duckdb_sql("SELECT COUNT(*) AS n FROM vitals", records=[{"hr": 1}])
+    assert adhoc.rows == [{"n": 1}]
+    assert engine.execute_duckdb_sql("SELECT COUNT(*) AS n FROM vitals").rows == [{"n": 11}]
+
+    plan = engine._dataset_plan("vitals", filters={"dept": "neuro"}, columns=["patient_id"]).explain()
+    assert "SELECTION" in plan or "FILTER" in plan
+    assert engine.query_dataset("vitals", filters={"dept": "neuro"}, columns=["patient_id"]).columns == ["patient_id"]
+
+    chunks = list(engine.stream_sql_ipc("SELECT * FROM vitals ORDER BY hr", batch_rows=4))
+    streamed = module.pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert streamed.num_rows == 11 and streamed.column("hr")[-1].as_py() == 150
+    assert len(chunks) >= 3
+
+    assert engine.drop_dataset("vitals")
+    engine.register_dataset("vitals", [{"hr": 1}])
+    assert engine.execute_duckdb_sql("SELECT COUNT(*) AS n FROM vitals").rows == [{"n": 1}]
+    engine.close()
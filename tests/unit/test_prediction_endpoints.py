@@ -237,3 +237,36 @@ def test_predict_diabetes_exception(client):
         assert resp.status_code == 500
 
 
+
+
+def test_predict_batch_scores_cohort(client):
+    records = [
+        {"age": 40 + i, "gender": 1, "hypertension": i % 2, "bmi": 22.0 + i, "general_health": 3}
+        for i in range(25)
+    ]
+    resp = client.post("/v1/predict/diabetes/batch", json={"records": records})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["model"] == "diabetes"
+    assert body["count"] == 25
+    assert {"prediction", "raw", "confidence", "risk_level", "probability"} <= set(body["results"][0])
+
+
+def test_predict_batch_unknown_model(client):
+    resp = client.post("/v1/predict/pancreas/batch", json={"records": [{"age": 40}]})
+    assert resp.status_code == 404
+
+
+def test_predict_batch_reports_invalid_record(client):
+    resp = client.post("/v1/predict/heart/batch", json={"records": [{"age": 50}, {"age": "not-a-number"}]})
+    assert resp.status_code == 422
+    assert resp.json()["detail"]["record_index"] == 1
+
+
+def test_predict_batch_stroke_rows_carry_conformal_set(client):
+    records = [{"gender": 1, "age": 60 + i, "hypertension": 1, "bmi": 28.0, "glucose": 140.0} for i in range(3)]
+    resp = client.post("/v1/predict/stroke/batch", json={"records": records})
+    assert resp.status_code == 200
+    for row in resp.json()["results"]:
+        # Same fixed q=0.1 threshold as the single-row /predict/stroke route
+        assert {"conformal_prediction_set", "uncertainty_status", "triage_recommendation"} <= set(row)
@@ -0,0 +1,135 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from backend import auth, models
+from backend.cache_service import cache
+from backend.principal_cache import PrincipalCache, principal_cache, token_key
+from backend.privacy_operations import execute_patient_deletion
+
+
+def _create_user(db_session, username: str, role: str = "doctor") -> models.User:
+    user = models.User(username=username, email=f"{username}@example.com", role=role)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def sql_counter(db_session):
+    statements = []
+    engine = db_session.get_bind()
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _count)
+
+
+def test_cached_principal_skips_signature_check_and_user_query(db_session, sql_counter, monkeypatch):
+    _create_user(db_session, "cached_doctor")
+    token = auth.create_access_token({"sub": "cached_doctor"})
+    first = auth.get_current_user(token=token, db=db_session)
+    db_session.expunge_all()
+
+    decodes = []
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **k: decodes.append(a) or {})
+    user_hits = principal_cache.stats()["user_hits"]
+    sql_counter.clear()
+    second = auth.get_current_user(token=token, db=db_session)
+
+    assert second.id == first.id and second.role == "doctor"
+    assert decodes == [] and sql_counter == []
+    assert principal_cache.stats()["user_hits"] == user_hits + 1
+
+
+def test_principal_is_resolved_once_per_request(db_session, sql_counter):
+    _create_user(db_session, "request_doctor")
+    token = auth.create_access_token({"sub": "request_doctor"})
+    request = SimpleNamespace(state=SimpleNamespace())
+
+    first = auth.get_current_user(token=token, db=db_session, request=request)
+    principal_cache.clear()
+    sql_counter.clear()
+
+    assert auth.get_current_user(token=token, db=db_session, request=request) is first
+    assert sql_counter == []
+
+
+def test_role_change_and_soft_delete_invalidate_cached_principal(db_session):
+    user = _create_user(db_session, "promoted_nurse", role="nurse")
+    token = auth.create_access_token({"sub": "promoted_nurse"})
+    auth.get_current_user(token=token, db=db_session)
+
+    user.role = "admin"
+    db_session.commit()
+    db_session.expunge_all()
+    assert auth.get_current_user(token=token, db=db_session).role == "admin"
+
+    user = db_session.query(models.User).filter_by(username="promoted_nurse").one()
+    user.is_deleted = True
+    db_session.commit()
+    db_session.expunge_all()
+    with pytest.raises(HTTPException) as exc:
+        auth.get_current_user(token=token, db=db_session)
+    assert exc.value.status_code == 401
+
+
+def test_bulk_patient_deletion_rejects_cached_principal(db_session):
+    patient = _create_user(db_session, "erased_patient", role="patient")
+    token = auth.create_access_token({"sub": "erased_patient"})
+    auth.get_current_user(token=token, db=db_session)
+
+    execute_patient_deletion(db_session, patient.id)
+    db_session.expunge_all()
+    with pytest.raises(HTTPException) as exc:
+        auth.get_current_user(token=token, db=db_session)
+    assert exc.value.status_code == 401
+
+
+def test_generation_bumped_by_another_worker_drops_snapshot(db_session, sql_counter):
+    _create_user(db_session, "shared_doctor")
+    token = auth.create_access_token({"sub": "shared_doctor"})
+    auth.get_current_user(token=token, db=db_session)
+    db_session.expunge_all()
+
+    # Another worker committing a change bumps the shared generation only.
+    cache.bump_tags(["principal:user:shared_doctor"])
+    sql_counter.clear()
+    auth.get_current_user(token=token, db=db_session)
+    assert any("FROM users" in statement for statement in sql_counter)
+
+
+def test_invalidation_waits_for_commit(db_session):
+    user = _create_user(db_session, "pending_nurse", role="nurse")
+    token = auth.create_access_token({"sub": "pending_nurse"})
+    auth.get_current_user(token=token, db=db_session)
+    before = principal_cache.user_version("pending_nurse")
+
+    user.role = "admin"
+    db_session.flush()
+    assert principal_cache.user_version("pending_nurse") == before
+    db_session.rollback()
+    assert principal_cache.user_version("pending_nurse") == before
+
+    user.role = "admin"
+    db_session.commit()
+    assert principal_cache.user_version("pending_nurse") != before
+
+
+def test_cache_entries_respect_token_expiry_and_size_bound():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    cache.put_claims("expired", {"sub": "a", "exp": time.time() - 1})
+    assert cache.get_claims("expired") is None
+
+    for key in ("k1", "k2", "k3"):
+        cache.put_claims(key, {"sub": key})
+    assert cache.get_claims("k1") is None
+    assert cache.get_claims("k3") == {"sub": "k3"}
+    assert cache.stats()["entries"] == 2
+    assert token_key("abc") == token_key("abc") != token_key("abd")
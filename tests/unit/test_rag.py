@@ -136,12 +136,11 @@ def test_store_search_empty():
 def test_store_search_logic():
     from unittest.mock import patch
 
-    import numpy as np
     store = rag.SimpleVectorStore()
     store.vectors = [[1.0, 0.0], [0.0, 1.0]]
     store.documents = ["Doc A", "Doc B"]
     store.metadatas = [{"id": 1}, {"id": 2}]
-    with patch("backend.rag.cosine_similarity", return_value=np.array([[0.9, 0.1]])):
+    with patch("backend.rag.get_query_embedding", return_value=[0.9, 0.1]):
         results = store.search("query")
         assert results == ["Doc A", "Doc B"]
 
@@ -149,16 +148,52 @@ def test_store_search_logic():
 def test_store_search_filter():
     from unittest.mock import patch
 
-    import numpy as np
     store = rag.SimpleVectorStore()
     store.vectors = [[1,0], [1,0]]
     store.documents = ["User1 Doc", "User2 Doc"]
     store.metadatas = [{"user_id": "1"}, {"user_id": "2"}]
-    with patch("backend.rag.cosine_similarity", return_value=np.array([[0.9, 0.9]])):
+    with patch("backend.rag.get_query_embedding", return_value=[1.0, 0.0]):
         results = store.search("q", filter_meta={"user_id": "1"})
         assert results == ["User1 Doc"]
 
 
+def test_metadata_index_lookup_intersects_and_returns_residual():
+    index = rag.MetadataIndex()
+    index.add(3, {"user_id": "u1", "facility_id": "f1", "type": "lab"})
+    index.add(1, {"user_id": " u1 ", "facility_id": "f2"})
+    index.add(7, {"user_id": "u1", "facility_id": "f1"})
+    index.add(5, {"user_id": "u2", "facility_id": "f1"})
+
+    keys, residual = index.lookup({"user_id": "u1"})
+    assert keys.tolist() == [1, 3, 7]
+    assert residual == {}
+
+    keys, residual = index.lookup({"user_id": "u1", "facility_id": "f1", "type": "lab"})
+    assert keys.tolist() == [3, 7]
+    assert residual == {"type": "lab"}
+
+    index.remove(7, {"user_id": "u1", "facility_id": "f1"})
+    assert index.lookup({"user_id": "u1", "facility_id": "f1"})[0].tolist() == [3]
+    assert index.lookup({"type": "lab"})[0] is None
+
+    restored = rag.MetadataIndex.from_dict(index.to_dict())
+    assert restored.lookup({"facility_id": "f1"})[0].tolist() == [3, 5]
+
+
+def test_store_search_filter_uses_metadata_index():
+    from unittest.mock import patch
+
+    store = rag.SimpleVectorStore()
+    store.vectors = [[1, 0]] * 20
+    store.documents = [f"Doc {i}" for i in range(20)]
+    store.metadatas = [{"user_id": str(i % 4)} for i in range(20)]
+    with patch("backend.rag.get_query_embedding", return_value=[1.0, 0.0]), \
+         patch("backend.rag._metadata_matches_filter") as scan:
+        results = store.search_with_scores("q", filter_meta={"user_id": "2"}, k=10)
+    scan.assert_not_called()
+    assert sorted(r["text"] for r in results) == ["Doc 10", "Doc 14", "Doc 18", "Doc 2", "Doc 6"]
+
+
 def test_add_checkup_exception(caplog):
     from unittest.mock import MagicMock, patch
     mock_store = MagicMock()
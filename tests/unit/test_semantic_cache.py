@@ -0,0 +1,117 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend import semantic_cache as semantic_cache_module
+from backend.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "semantic_cache.json")
+
+
+def _unit(seed, dim=32):
+    v = np.random.default_rng(seed).normal(size=dim)
+    return (v / np.linalg.norm(v)).tolist()
+
+
+def test_exact_and_semantic_hits(cache_path):
+    cache = SemanticCache(cache_path, threshold=0.95, save_interval=0)
+    cache.add("what is hba1c", _unit(1), "HbA1c reflects average glucose.")
+
+    assert cache.lookup("what is hba1c", []) == "HbA1c reflects average glucose."
+
+    near = np.asarray(_unit(1)) + 0.01 * np.asarray(_unit(2))
+    assert cache.lookup("what's hba1c?", near.tolist()) == "HbA1c reflects average glucose."
+    assert cache.lookup("unrelated", _unit(3)) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_embedding_dimension_change_replaces_stale_entries(cache_path):
+    cache = SemanticCache(cache_path, save_interval=0)
+    cache.add("old", _unit(1, dim=16), "old model")
+    cache.add("new", _unit(1, dim=32), "new model")
+    assert [e["query"] for e in cache.cache] == ["new"]
+
+
+def test_skips_uncacheable_and_duplicate_responses(cache_path):
+    cache = SemanticCache(cache_path, save_interval=0)
+    cache.add("q", _unit(1), "Service unavailable")
+    assert len(cache) == 0
+
+    cache.add("q", _unit(1), "first")
+    cache.add("q", _unit(2), "second")
+    assert len(cache) == 1
+    assert cache.lookup("q", []) == "first"
+
+
+def test_lru_eviction_respects_recent_use(cache_path):
+    cache = SemanticCache(cache_path, capacity=2, save_interval=0)
+    cache.add("a", _unit(1), "A")
+    cache.add("b", _unit(2), "B")
+    assert cache.lookup("a", []) == "A"  # "b" becomes least recently used
+
+    cache.add("c", _unit(3), "C")
+    assert cache.lookup("b", []) is None
+    assert cache.lookup("a", []) == "A"
+    assert cache.get_stats()["evictions"] == 1
+    assert len(cache._matrix) == 2  # evicted slot was reused
+
+
+def test_ttl_expires_entries(cache_path, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(semantic_cache_module.time, "time", lambda: clock["now"])
+    cache = SemanticCache(cache_path, ttl_seconds=60, save_interval=0)
+    cache.add("q", _unit(1), "cached")
+
+    clock["now"] += 30
+    assert cache.lookup("q", []) == "cached"
+    clock["now"] += 61
+    assert cache.lookup("other", _unit(1)) is None
+    assert cache.lookup("q", []) is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_binary_round_trip_and_legacy_json_migration(cache_path):
+    legacy = [{"query": "old", "embedding": [3.0, 4.0], "response": "legacy answer"}]
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+
+    migrated = SemanticCache(cache_path, save_interval=3600)
+    assert migrated.lookup("old", []) == "legacy answer"
+    assert migrated.cache[0]["embedding"] == pytest.approx([0.6, 0.8])
+
+    migrated.add("new", [0.0, 1.0], "new answer")
+    assert migrated._dirty  # debounced; not yet written
+    assert not os.path.exists(migrated.binary_filename)
+    migrated.flush()
+    assert os.path.exists(migrated.binary_filename)
+
+    reloaded = SemanticCache(cache_path)
+    assert [e["query"] for e in reloaded.cache] == ["old", "new"]
+    assert reloaded.lookup("similar", [0.01, 1.0]) == "new answer"
+
+
+def test_bucket_index_serves_large_caches(cache_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache_module, "ANN_MIN_ENTRIES", 256)
+    cache = SemanticCache(cache_path, capacity=1000, save_interval=3600)
+    vectors = np.random.default_rng(0).normal(size=(600, 64))
+    for i, v in enumerate(vectors):
+        cache.add(f"q{i}", v.tolist(), f"r{i}")
+    assert cache.get_stats()["ann_indexed"]
+
+    rng = np.random.default_rng(1)
+    for i in rng.integers(0, len(vectors), 25):
+        noisy = vectors[i] + 0.05 * np.linalg.norm(vectors[i]) / 8 * rng.normal(size=64)
+        assert cache.lookup("paraphrase", noisy.tolist()) == f"r{i}"
+
+
+def test_clear_removes_persisted_cache(cache_path):
+    cache = SemanticCache(cache_path, save_interval=0)
+    cache.add("q", _unit(1), "cached")
+    cache.clear()
+    assert len(cache) == 0
+    assert SemanticCache(cache_path).lookup("q", []) is None
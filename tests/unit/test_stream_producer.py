@@ -0,0 +1,148 @@
+import json
+import threading
+
+import pytest
+
+from backend.stream_producer import (
+    COMPRESSION_CODECS,
+    BufferedStreamProducer,
+    LocalLogBroker,
+    ProducerBufferFull,
+)
+
+
+def _read_all(broker, topic):
+    return {
+        p: [(r.key, json.loads(r.value)) for r in broker.read(topic, p)]
+        for p in range(broker.partitions_for(topic))
+    }
+
+
+def test_keyed_records_keep_per_patient_order_and_round_trip(tmp_path):
+    broker = LocalLogBroker(str(tmp_path), num_partitions=4)
+    producer = BufferedStreamProducer(broker, linger_ms=1, batch_size_bytes=2048)
+    for seq in range(600):
+        producer.send("vitals", {"patient_id": seq % 7, "seq": seq}, key=seq % 7)
+    assert producer.flush(timeout=5)
+
+    by_partition = _read_all(broker, "vitals")
+    assert sum(len(records) for records in by_partition.values()) == 600
+    for partition, records in by_partition.items():
+        for key, value in records:
+            assert key == str(value["patient_id"]).encode()
+            assert producer.partition_for("vitals", key) == partition
+        for patient in {v["patient_id"] for _, v in records}:
+            seqs = [v["seq"] for _, v in records if v["patient_id"] == patient]
+            assert seqs == sorted(seqs)
+    # Small batch size -> several batches, all delivered
+    stats = producer.stats()
+    assert stats["batches"] > 1 and stats["records_delivered"] == 600
+    producer.close()
+
+
+def test_linger_delivers_without_flush_and_reports_offsets(tmp_path):
+    broker = LocalLogBroker(str(tmp_path), num_partitions=1)
+    producer = BufferedStreamProducer(broker, linger_ms=5)
+    delivered = []
+    done = threading.Event()
+
+    def on_delivery(err, metadata):
+        delivered.append((err, metadata))
+        if len(delivered) == 3:
+            done.set()
+
+    for i in range(3):
+        producer.send("alerts", {"i": i}, on_delivery=on_delivery)
+    assert done.wait(2.0)
+    assert [m.offset for _, m in delivered] == [0, 1, 2]
+    assert all(err is None for err, _ in delivered)
+    producer.close()
+
+
+@pytest.mark.parametrize("codec", COMPRESSION_CODECS)
+def test_compression_codecs_round_trip(tmp_path, codec):
+    broker = LocalLogBroker(str(tmp_path), num_partitions=1)
+    producer = BufferedStreamProducer(broker, compression=codec)
+    payloads = [{"patient_id": 1, "hr": 80, "note": "stable " * 20} for _ in range(200)]
+    for payload in payloads:
+        producer.send("vitals", payload, key=1)
+    producer.close()
+
+    assert [json.loads(r.value) for r in broker.read("vitals", 0)] == payloads
+    if codec != "none":
+        assert broker.size_bytes("vitals") < producer.stats()["bytes_in"] / 4
+
+
+def test_unknown_codec_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BufferedStreamProducer(LocalLogBroker(str(tmp_path)), compression="snappy")
+
+
+def test_send_blocks_then_raises_when_buffer_is_full(tmp_path):
+    release = threading.Event()
+
+    class SlowBroker(LocalLogBroker):
+        def append(self, *args, **kwargs):
+            release.wait(5)
+            return super().append(*args, **kwargs)
+
+    producer = BufferedStreamProducer(
+        SlowBroker(str(tmp_path), num_partitions=1), linger_ms=0, buffer_max_records=3, max_block_ms=20
+    )
+    for i in range(3):
+        producer.send("vitals", {"i": i})
+    with pytest.raises(ProducerBufferFull):
+        producer.send("vitals", {"i": 3})
+    assert producer.stats()["blocked_sends"] == 1
+
+    release.set()
+    producer.send("vitals", {"i": 3}, max_block_ms=2000)
+    producer.close()
+    assert producer.stats()["records_delivered"] == 4
+
+
+def test_broker_failure_is_reported_to_callbacks(tmp_path):
+    class BrokenBroker(LocalLogBroker):
+        def append(self, *args, **kwargs):
+            raise OSError("disk full")
+
+    producer = BufferedStreamProducer(BrokenBroker(str(tmp_path)), retries=1, retry_backoff_ms=1)
+    errors = []
+    producer.send("vitals", {"i": 1}, key=1, on_delivery=lambda err, md: errors.append((err, md)))
+    producer.close()
+    assert len(errors) == 1
+    assert isinstance(errors[0][0], OSError) and errors[0][1] is None
+    assert producer.stats()["records_failed"] == 1
+
+
+def test_log_recovers_offsets_and_truncates_torn_tail(tmp_path):
+    broker = LocalLogBroker(str(tmp_path), num_partitions=2)
+    broker.append("vitals", 1, [b"p1", None], [b'{"a":1}', b'{"a":2}'], "zlib")
+    broker.close()
+    log_path = tmp_path / "vitals" / "partition-00001.log"
+    with open(log_path, "ab") as f:
+        f.write(b"HSL1\x00\x00partial")  # crash mid-batch
+
+    reopened = LocalLogBroker(str(tmp_path), num_partitions=16)
+    assert reopened.partitions_for("vitals") == 2  # fixed at topic creation
+    assert reopened.end_offset("vitals", 1) == 2
+    assert reopened.append("vitals", 1, [None], [b'{"a":3}']) == 2
+    assert [(r.offset, r.key) for r in reopened.read("vitals", 1, offset=1)] == [(1, None), (2, None)]
+
+
+@pytest.mark.asyncio
+async def test_stream_buffer_routes_to_local_log(tmp_path, monkeypatch):
+    from backend.event_bus import KafkaKinesisStreamBuffer
+
+    monkeypatch.delenv("KAFKA_BOOTSTRAP_SERVERS", raising=False)
+    monkeypatch.delenv("KINESIS_STREAM_NAME", raising=False)
+    monkeypatch.setenv("STREAM_LOG_DIR", str(tmp_path))
+    buffer = KafkaKinesisStreamBuffer()
+    assert buffer.buffer_mode == "local_log"
+
+    result = await buffer.publish_buffered_event("VITALS_RECORDED", {"patient_id": 42, "hr": 120})
+    assert result["status"] == "buffered" and result["engine"] == "Local Append Log"
+    producer = buffer._producer
+    buffer.close()
+    records = producer.broker.read("VITALS_RECORDED", result["partition"])
+    assert [json.loads(r.value)["hr"] for r in records] == [120]
@@ -170,6 +170,7 @@ def _patch_turbovec_store_embeddings(monkeypatch, fn=None):
     import backend.turbovec_store as tvs_mod
     monkeypatch.setattr(tvs_mod, "get_embedding", fn)
     monkeypatch.setattr(tvs_mod, "get_query_embedding", fn)
+    monkeypatch.setattr(tvs_mod, "get_embeddings", lambda texts, **kw: [fn(t) for t in texts])
 
 
 def _fresh_store(monkeypatch, tmp_path, quant="4"):
@@ -234,6 +235,7 @@ def store(tmp_path, monkeypatch):
     import backend.turbovec_store as tvs_mod
     from backend.turbovec_store import TurboVecVectorStore
     monkeypatch.setattr(tvs_mod, "get_embedding", lambda text, **kw: [1.0] * 768)
+    monkeypatch.setattr(tvs_mod, "get_embeddings", lambda texts, **kw: [[1.0] * 768 for _ in texts])
     monkeypatch.setattr(tvs_mod, "get_query_embedding", lambda text, **kw: [1.0] * 768)
 
     tvs = TurboVecVectorStore()
@@ -1130,3 +1132,165 @@ def test_property_invalid_quantization_fallback(quant, tmp_path, monkeypatch):
     mock_logger.warning.assert_called()
 
     rag_module._store = None
+
+
+# ===========================================================================
+# Batch ingestion and write-behind persistence
+# ===========================================================================
+
+
+def _write_behind_store(monkeypatch, tmp_path, max_pending="1000"):
+    monkeypatch.setenv("TURBOVEC_WRITE_BEHIND", "1")
+    monkeypatch.setenv("TURBOVEC_FLUSH_INTERVAL_S", "3600")
+    monkeypatch.setenv("TURBOVEC_FLUSH_MAX_PENDING", max_pending)
+    return _fresh_store(monkeypatch, tmp_path)
+
+
+def test_add_many_inserts_one_native_batch_and_saves_once(store, monkeypatch):
+    inserted_batches = []
+    original_add = store._index.add_with_ids
+
+    def counting_add(vectors, ids):
+        inserted_batches.append(len(ids))
+        original_add(vectors, ids)
+
+    saves = []
+    monkeypatch.setattr(store._index, "add_with_ids", counting_add)
+    monkeypatch.setattr(store, "save", lambda: saves.append(1))
+
+    texts = [f"doc {i}" for i in range(10)]
+    metas = [{"user_id": f"u{i % 2}"} for i in range(10)]
+    ids = [f"rec_{i}" for i in range(10)]
+    assert store.add_many(texts, metas, ids, batch_size=4) == 10
+
+    assert inserted_batches == [4, 4, 2]
+    assert len(saves) == 3
+    assert store.count() == 10
+    assert store._build_allowlist({"user_id": "u1"}) == ["rec_1", "rec_3", "rec_5", "rec_7", "rec_9"]
+
+
+def test_add_many_last_duplicate_wins_and_rejects_length_mismatch(store):
+    store.add_many(["first", "second"], [{"user_id": "a"}, {"user_id": "b"}], ["dup", "dup"])
+    assert store.count() == 1
+    assert store._texts["dup"] == "second"
+
+    with pytest.raises(ValueError):
+        store.add_many(["only text"], [], ["rec"])
+
+
+def test_delete_many_removes_known_ids_with_single_save(store, monkeypatch):
+    store.add_many(["a", "b", "c"], [{}, {}, {}], ["r1", "r2", "r3"])
+    saves = []
+    monkeypatch.setattr(store, "save", lambda: saves.append(1))
+
+    assert store.delete_many(["r1", "r3", "missing"]) == 2
+    assert store.count() == 1
+    assert len(saves) == 1
+    assert store.delete_many(["missing"]) == 0
+    assert len(saves) == 1
+
+
+def test_write_behind_defers_disk_writes_until_flush(tmp_path, monkeypatch):
+    s = _write_behind_store(monkeypatch, tmp_path)
+    try:
+        s.add_many(["a", "b"], [{"user_id": "u1"}, {"user_id": "u2"}], ["r1", "r2"])
+        assert s.dirty
+        assert not os.path.exists(s._index_path + ".meta.json")
+        assert not os.path.exists(s._log_path)
+
+        s.flush()
+        assert not s.dirty
+        with open(s._log_path, encoding="utf-8") as f:
+            assert [json.loads(line)["op"] for line in f] == ["put", "put"]
+        assert os.path.exists(s._index_path)
+    finally:
+        s.close()
+
+
+def test_write_behind_log_replays_on_load(tmp_path, monkeypatch):
+    s1 = _write_behind_store(monkeypatch, tmp_path)
+    s1.add_many(["a", "b", "c"], [{"user_id": "u1"}] * 3, ["r1", "r2", "r3"])
+    s1.delete("r2")
+    s1.add("a v2", {"user_id": "u9"}, "r1")
+    s1.close()
+
+    s2 = _write_behind_store(monkeypatch, tmp_path)
+    try:
+        assert s2._texts == {"r1": "a v2", "r3": "c"}
+        assert s2._metas["r1"] == {"user_id": "u9"}
+        assert s2._str_to_int == s1._str_to_int
+        assert s2._next_id == s1._next_id
+        assert sorted(r["id"] for r in s2.search_with_scores("q", k=5)) == ["r1", "r3"]
+    finally:
+        s2.close()
+
+
+def test_write_behind_flushes_on_size_and_compacts_log(tmp_path, monkeypatch):
+    s = _write_behind_store(monkeypatch, tmp_path, max_pending="3")
+    import backend.turbovec_store as tvs_mod
+    monkeypatch.setattr(tvs_mod, "_LOG_COMPACT_MIN_ENTRIES", 4)
+    try:
+        s.add_many(["a", "b"], [{}, {}], ["r1", "r2"])
+        assert s.dirty
+        s.delete("r1")  # third pending op triggers the size-based flush
+        assert not s.dirty
+        assert s._log_entries == 3
+
+        s.add_many(["c", "d", "e"], [{}, {}, {}], ["r3", "r4", "r5"])
+        # 6 logged ops > max(4, 4 live records): folded into .meta.json
+        assert not os.path.exists(s._log_path)
+        with open(s._index_path + ".meta.json", encoding="utf-8") as f:
+            assert sorted(json.load(f)["texts"]) == ["r2", "r3", "r4", "r5"]
+    finally:
+        s.close()
+
+
+def test_acl_allowlist_uses_persisted_metadata_index(tmp_path, monkeypatch):
+    s1 = _fresh_store(monkeypatch, tmp_path)
+    s1.add_many(
+        ["a", "b", "c", "d"],
+        [
+            {"user_id": "u1", "facility_id": "f1"},
+            {"user_id": "u1", "facility_id": "f2"},
+            {"user_id": "u2", "facility_id": "f1"},
+            {"user_id": "u1", "facility_id": "f1", "type": "lab"},
+        ],
+        ["r1", "r2", "r3", "r4"],
+    )
+    s1.delete("r1")
+
+    with open(s1._index_path + ".meta.json", encoding="utf-8") as f:
+        assert f.read().count('"metadata_index"') == 1
+
+    s2 = _fresh_store(monkeypatch, tmp_path)
+    with patch("backend.turbovec_store._metadata_matches_filter") as scan:
+        assert s2._build_allowlist({"user_id": "u1", "facility_id": "f1"}) == ["r4"]
+    scan.assert_not_called()
+    assert s2._build_allowlist({"user_id": "u1", "type": "lab"}) == ["r4"]
+    assert s2._allowlist_ids({"user_id": "nobody"}).size == 0
+    assert [r["id"] for r in s2.search_with_scores("q", filter_meta={"user_id": "u1"}, k=5)] in (
+        ["r2", "r4"],
+        ["r4", "r2"],
+    )
+
+
+def test_turbovec_store_imports_with_packaged_rag_installed():
+    """With clinical-rag-cache importable (the Docker image), backend.rag loses its
+    fallback definitions; turbovec_store must not depend on them."""
+    import subprocess
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, TESTING="1")
+    env["PYTHONPATH"] = os.pathsep.join(
+        [repo_root, os.path.join(repo_root, "packages", "clinical-rag-cache", "src")]
+    )
+    code = (
+        "import backend.rag as rag, backend.turbovec_store as tvs;"
+        "assert rag._pkg_rag is not None;"
+        "assert tvs.MetadataIndex is rag.MetadataIndex;"
+        "assert callable(tvs.get_embeddings)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=repo_root, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr